@@ -966,16 +966,11 @@ def api_scan_last():
 def api_scan_cache_info():
     """Return cache status to help users understand expected scan speed."""
     try:
-        # Import helper to get last US trading day (timezone-aware for HK users)
-        from modules.data_pipeline import get_last_us_trading_day_hk
+        # Caches are stamped with the last completed US session (ET), so the
+        # check is correct from Hong Kong and on weekends / US holidays
+        from modules import trading_calendar
+        today = trading_calendar.cache_asof()
         
-        # Use last US trading day (ET timezone, accounting for HK's position)
-        # This ensures cache checks are correct even when running from Hong Kong
-        trading_day = get_last_us_trading_day_hk()
-        today = trading_day.isoformat()
-        
-        cache_dir = ROOT / C.PRICE_CACHE_DIR
-
         # RS cache check — read first line only (fast, no pandas)
         rs_file = ROOT / C.DATA_DIR / "rs_cache.csv"
         rs_cached = False
@@ -1000,48 +995,26 @@ def api_scan_cache_info():
             except Exception:
                 pass
 
-        # Price cache: count today's meta files (sample-based for speed)
-        # Uses last US trading day (HK timezone-adjusted) for comparison
+        # Price cache: count tickers stamped for the trading day (store manifest)
         price_cached_today = 0
-        if cache_dir.exists():
-            metas = list(cache_dir.glob("*_2y.meta"))
-            if len(metas) > 200:
-                # Sample 200 files + extrapolate for speed
-                import random
-                sample = random.sample(metas, 200)
-                hits = sum(1 for m in sample if m.read_text().strip() == today)
-                price_cached_today = int(hits / 200 * len(metas))
-            else:
-                for meta in metas:
-                    try:
-                        if meta.read_text().strip() == today:
-                            price_cached_today += 1
-                    except Exception:
-                        pass
-
-        # Fundamentals cache: count today's fmeta files (sample-based)
-        # Uses last US trading day (HK timezone-adjusted) for comparison
+        try:
+            from modules import price_store
+            price_cached_today = price_store.count_fresh(price_store.MASTER, today)
+        except Exception:
+            pass
+
         fund_cached_today = 0
-        if cache_dir.exists():
-            fmetas = list(cache_dir.glob("*_fundamentals.fmeta"))
-            if len(fmetas) > 200:
-                import random
-                sample = random.sample(fmetas, 200)
-                hits = sum(1 for m in sample if m.read_text().strip() == today)
-                fund_cached_today = int(hits / 200 * len(fmetas))
-            else:
-                for fmeta in fmetas:
-                    try:
-                        if fmeta.read_text().strip() == today:
-                            fund_cached_today += 1
-                    except Exception:
-                        pass
-
-        # Finviz in-memory cache
+        try:
+            from modules import fundamentals_store
+            fund_cached_today = fundamentals_store.count_fresh("info")
+        except Exception:
+            pass
+
+        # Finviz persistent cache
         finviz_cached = False
         try:
-            from modules.data_pipeline import _finviz_cache
-            finviz_cached = len(_finviz_cache) > 0
+            from modules import finviz_cache
+            finviz_cached = finviz_cache.has_fresh("screener")
         except Exception:
             pass
 
@@ -3730,11 +3703,13 @@ def api_db_persistent_signals():
 
 @app.route("/api/db/rs-trend/<ticker>", methods=["GET"])
 def api_db_rs_trend(ticker: str):
-    """RS ranking trend for a ticker."""
+    """RS ranking trend for a ticker (RS-rank history, point-in-time RS, else DuckDB)."""
     days = int(request.args.get("days", 90))
     try:
-        from modules.db import query_rs_trend
-        df = query_rs_trend(ticker.upper(), days)
+        from modules.rs_ranking import get_rs_history
+        df = get_rs_history(ticker.upper(), days).copy()
+        df["rank_date"] = df["rank_date"].astype(str).str[:10]
+        df = df.astype(object).where(df.notna(), None)
         return jsonify({"ok": True, "ticker": ticker.upper(),
                         "rows": df.to_dict(orient="records")})
     except Exception as exc:
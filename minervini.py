@@ -25,7 +25,11 @@ Usage examples:
   python minervini.py daily
   python minervini.py rs top
   python minervini.py rs top --min 85
+  python minervini.py rs backfill
   python minervini.py vcp NVDA
+  python minervini.py cache stats
+  python minervini.py cache verify --repair
+  python minervini.py cache gc --dry-run
 
 Qullamaggie (QM) commands:
   python minervini.py qm-scan
@@ -281,7 +285,8 @@ def cmd_daily(args):
 
 def cmd_rs(args):
     """RS ranking utilities."""
-    from modules.rs_ranking import get_rs_rank, get_rs_top, compute_rs_rankings
+    from modules.rs_ranking import (get_rs_rank, get_rs_top, compute_rs_rankings,
+                                    backfill_rs_history)
     from modules.report     import print_scan_table
 
     sub = args.sub
@@ -295,8 +300,13 @@ def cmd_rs(args):
             print("  No results (RS cache may need refresh).")
     elif sub == "refresh":
         print("  Rebuilding RS universe and rankings …")
-        compute_rs_rankings(force_refresh=True)
+        compute_rs_rankings(force_refresh=True, rebuild=args.rebuild)
         print("  ✓ RS rankings refreshed.")
+    elif sub == "backfill":
+        print("  Back-filling point-in-time RS from cached price history …")
+        s = backfill_rs_history()
+        print(f"  ✓ {s['ranked_sessions']}/{s['sessions']} sessions ranked for "
+              f"{s['tickers']} tickers (from {s.get('first_ranked') or '—'}).")
     elif sub == "get":
         if not args.ticker:
             print("  Usage: rs get TICKER")
@@ -308,7 +318,46 @@ def cmd_rs(args):
             print(f"  {args.ticker.upper()}  RS Rank: {rank:.0f}")
     else:
         print(f"  Unknown rs sub-command: {sub}")
-        print("  Available: top | refresh | get")
+        print("  Available: top | refresh | backfill | get")
+
+
+def cmd_cache(args):
+    """Price-cache lifecycle: stats / verify / gc."""
+    from modules import cache_manager
+
+    sub = args.sub
+    if sub == "stats":
+        st = cache_manager.stats()
+        print(f"\n  {_BOLD}Price cache{_RESET}  {st['total_mb']:.1f} MB of {st['budget_mb']:.0f} MB"
+              f"  (fresh = session {st['asof']})")
+        for name, ds in st["datasets"].items():
+            print(f"    {name:<18} {ds['tickers']:>6} tickers  {ds['fresh']:>6} fresh"
+                  f"  {ds['buckets']:>3} buckets  {ds['mb']:>8.1f} MB")
+        fund = st["fundamentals"]
+        print(f"    {'fundamentals':<18} {fund['tickers']:>6} tickers  {fund['fresh_info']:>6} fresh"
+              f"                {fund['mb']:>8.1f} MB")
+        if st["legacy_files"]:
+            print(f"    legacy files       {st['legacy_files']:>6}  ({st['legacy_mb']:.1f} MB) — run 'cache gc'")
+    elif sub == "verify":
+        rep = cache_manager.verify(repair=args.repair)
+        print(f"\n  Checked {rep['buckets_checked']} buckets.")
+        for prob in rep["problems"]:
+            print(f"    {prob['dataset']}/bucket={prob['bucket']:02d}: {'; '.join(prob['issues'])}")
+        for tkr in rep["fundamentals_unreadable"]:
+            print(f"    fundamentals/{tkr}.json: unreadable")
+        if not rep["problems"] and not rep["fundamentals_unreadable"]:
+            print("  ✓ Cache is consistent.")
+        elif args.repair:
+            print(f"  ✓ Repaired {rep['repaired']} buckets.")
+        else:
+            print("  Run 'cache verify --repair' to fix.")
+    elif sub == "gc":
+        rep = cache_manager.gc(dry_run=args.dry_run)
+        verb = "Would free" if args.dry_run else "Freed"
+        print(f"\n  {verb} {rep['freed_mb']:.1f} MB: {rep['temp_files']} temp files, "
+              f"{rep['legacy_files']} legacy files, {len(rep['delisted'])} delisted tickers, "
+              f"{rep['fundamentals_expired']} expired fundamentals, "
+              f"{len(rep['evicted'])} LRU-evicted tickers.")
 
 
 def cmd_vcp(args):
@@ -626,12 +675,22 @@ def build_parser() -> argparse.ArgumentParser:
 
     # ── rs ────────────────────────────────────────────────────────────────────
     p_rs = sub.add_parser("rs", help="RS ranking utilities")
-    p_rs.add_argument("sub", choices=["top","refresh","get"])
+    p_rs.add_argument("sub", choices=["top","refresh","backfill","get"])
     p_rs.add_argument("ticker", nargs="?", default=None)
     p_rs.add_argument("--min",   type=float, default=None,
                       help="Minimum RS rank for 'top' sub-command")
     p_rs.add_argument("--limit", type=int, default=50,
                       help="Max rows to display for 'top'")
+    p_rs.add_argument("--rebuild", action="store_true",
+                      help="'refresh': re-download the full year instead of the newest sessions")
+
+    # ── cache ─────────────────────────────────────────────────────────────────
+    p_cache = sub.add_parser("cache", help="Price cache lifecycle (stats / verify / gc)")
+    p_cache.add_argument("sub", choices=["stats","verify","gc"])
+    p_cache.add_argument("--repair",  action="store_true",
+                         help="Fix problems found by 'verify'")
+    p_cache.add_argument("--dry-run", action="store_true",
+                         help="Report what 'gc' would remove without deleting")
 
     # ── vcp ───────────────────────────────────────────────────────────────────
     p_vcp = sub.add_parser("vcp", help="VCP pattern analysis for one or more tickers")
@@ -691,6 +750,7 @@ _DISPATCH = {
     "report":      cmd_report,
     "daily":       cmd_daily,
     "rs":          cmd_rs,
+    "cache":       cmd_cache,
     "vcp":         cmd_vcp,
     "qm-scan":     cmd_qm_scan,
     "qm-analyze":  cmd_qm_analyze,
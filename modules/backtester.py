@@ -11,7 +11,9 @@ Look-ahead bias protection
 ──────────────────────────
 get_enriched() computes rolling indicators purely from prior bars.
 We always slice df.iloc[:bar_i+1] so the VCP detector only sees history
-up to the as-of date — it can never read future price data.
+up to the as-of date — it can never read future price data.  TT9 uses the
+RS rank the ticker had on the as-of date (point-in-time RS dataset,
+rs_ranking.get_rs_point_in_time), not today's.
 """
 
 import sys
@@ -119,6 +121,18 @@ def run_backtest(
     except Exception as _spy_exc:
         logger.warning("[Backtest] SPY load failed — market filter skipped: %s", _spy_exc)
 
+    # ── 2b. Point-in-time RS rank for TT9 (the rank each as-of date had) ─────
+    from modules.rs_ranking import get_rs_point_in_time, RS_NOT_RANKED
+    pit_rank = np.full(total_bars, np.nan)
+    pit_line_high = np.zeros(total_bars, dtype=bool)
+    try:
+        pit_rs = get_rs_point_in_time(ticker, backfill=True)
+        pit_rank = pit_rs["rs_rank"].reindex(df_full.index).to_numpy(dtype=float)
+        pit_line_high = (pit_rs["rs_line_new_high"].reindex(df_full.index, fill_value=False)
+                         .to_numpy(dtype=bool))
+    except Exception as _rs_exc:
+        logger.warning("[Backtest] Point-in-time RS unavailable — TT9 unranked: %s", _rs_exc)
+
     signals         = []
     last_signal_bar = -999
     # leave room at the end to measure outcomes
@@ -155,9 +169,10 @@ def run_backtest(
             continue
 
         # C1: Trend Template validation (TT1-TT8) — only fire in Stage 2 uptrend
+        rs_at = RS_NOT_RANKED if np.isnan(pit_rank[bar_i]) else float(pit_rank[bar_i])
         if len(df_slice) >= 210:
             try:
-                tt = validate_trend_template(ticker, df=df_slice)
+                tt = validate_trend_template(ticker, df=df_slice, rs_rank=rs_at)
                 if not tt.get("passes", False):
                     continue
             except Exception as _tt_exc:
@@ -189,6 +204,8 @@ def run_backtest(
                 "bb_contracting":  bool(vcp.get("bb_contracting", False)),
                 "vol_dry":         bool(vcp.get("vol_dry_up", False)),
                 "pivot":           round(pivot, 2),
+                "rs_rank":         rs_at if rs_at != RS_NOT_RANKED else None,
+                "rs_line_new_high": bool(pit_line_high[bar_i]),
                 **outcome,
             }
         )
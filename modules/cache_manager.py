@@ -0,0 +1,282 @@
+"""
+modules/cache_manager.py
+────────────────────────
+Lifecycle of data/price_cache: integrity checks, garbage collection and a
+disk budget.
+
+Without it the directory only grows — delisted tickers stay forever, files
+from before the consolidated price store are never removed, and a crash
+between a bucket write and the manifest save leaves rows the manifest does
+not know about (or entries whose rows are gone), which silently forces
+re-downloads.
+
+  verify()   every price-store bucket against the CRC32 recorded in its
+             dataset manifest, plus manifest ↔ bucket agreement; unreadable
+             fundamentals documents.  repair=True fixes what it finds
+             (price_store.repair_bucket, fundamentals_store.drop).
+  gc()       stray temp files, pre-store per-ticker files (legacy fundamentals
+             are imported first), tickers whose last fetch was more than
+             CACHE_DELISTED_SESSIONS sessions past their last bar (delisted
+             or halted; stale-but-unused tickers are the LRU's job),
+             fundamentals untouched for
+             CACHE_FUNDAMENTALS_MAX_AGE_DAYS — then least-recently-used
+             tickers until the directory is under CACHE_MAX_MB.
+  stats()    sizes and counts per dataset, plus the write-behind queue
+             (cache_writer.stats(): depth, coalesced and written tickers).
+
+Usage:
+    python minervini.py cache stats | verify [--repair] | gc [--dry-run]
+    GET /api/cache/stats
+"""
+
+import json
+import logging
+import re
+import sys
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules import cache_writer, fundamentals_store, price_store, trading_calendar
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+_TEMP_MAX_AGE_SEC = 3600                 # younger temp files may belong to a running write
+_LEGACY_RE = re.compile(r"^[A-Z0-9.\-^=]+_(?:\w+\.parquet|\w+\.meta|fundamentals\.json|fundamentals\.fmeta)$",
+                        re.IGNORECASE)
+
+
+def _cache_dir() -> Path:
+    return ROOT / getattr(C, "PRICE_CACHE_DIR", "data/price_cache")
+
+
+def _dir_bytes(path: Path) -> int:
+    if not path.exists():
+        return 0
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _bucket_files(dataset: str) -> dict:
+    """bucket number → path of every bucket file on disk."""
+    root = price_store.STORE_DIR / dataset
+    out = {}
+    for path in root.glob("bucket=*/part.parquet"):
+        try:
+            out[int(path.parent.name.split("=", 1)[1])] = path
+        except ValueError:
+            continue
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Stats
+# ─────────────────────────────────────────────────────────────────────────────
+
+def stats() -> dict:
+    asof = trading_calendar.cache_asof()
+    datasets = {}
+    for ds in price_store.list_datasets():
+        manifest = price_store.get_manifest(ds)
+        datasets[ds] = {
+            "tickers": len(manifest),
+            "fresh": sum(1 for e in manifest.values() if e.get("asof") == asof),
+            "buckets": len(_bucket_files(ds)),
+            "mb": round(_dir_bytes(price_store.STORE_DIR / ds) / _MB, 2),
+        }
+    fund = fundamentals_store.stats()
+    legacy = [p for p in _cache_dir().glob("*") if p.is_file() and _LEGACY_RE.match(p.name)]
+    return {
+        "asof": asof,
+        "total_mb": round(_dir_bytes(_cache_dir()) / _MB, 2),
+        "budget_mb": float(getattr(C, "CACHE_MAX_MB", 2048)),
+        "datasets": datasets,
+        "fundamentals": {"tickers": fund["tickers"], "fresh_info": fund["fresh"]["info"],
+                         "mb": round(_dir_bytes(fundamentals_store.STORE_DIR) / _MB, 2)},
+        "legacy_files": len(legacy),
+        "legacy_mb": round(sum(p.stat().st_size for p in legacy) / _MB, 2),
+        "writer": cache_writer.stats(),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Verify
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _check_bucket(bucket: int, path, recorded: dict, expected: set) -> list:
+    """Problems of one bucket: checksum, unreadable, rows ↔ manifest."""
+    if path is None:
+        return ["missing file"] if expected else []
+    problems = []
+    payload = path.read_bytes()
+    if recorded.get(bucket, {}).get("crc32") != zlib.crc32(payload):
+        problems.append("checksum mismatch" if bucket in recorded else "no checksum")
+    try:
+        present = set(pq.read_table(path, columns=["Ticker"]).column("Ticker").to_pylist())
+    except Exception as exc:
+        return problems + [f"unreadable: {exc}"]
+    if present - expected:
+        problems.append(f"{len(present - expected)} tickers not in manifest")
+    if expected - present:
+        problems.append(f"{len(expected - present)} manifest tickers without rows")
+    return problems
+
+
+def verify(repair: bool = False) -> dict:
+    """Check (and with repair=True fix) the price store and fundamentals documents."""
+    cache_writer.flush()
+    report = {"buckets_checked": 0, "problems": [], "repaired": 0, "fundamentals_unreadable": []}
+    for ds in price_store.list_datasets():
+        manifest = price_store.get_manifest(ds)
+        recorded = price_store.get_bucket_sums(ds)
+        files = _bucket_files(ds)
+        by_bucket: dict = {}
+        for tkr, e in manifest.items():
+            by_bucket.setdefault(int(e.get("bucket", price_store.bucket_of(tkr))), set()).add(tkr)
+        for bucket in sorted(set(files) | set(by_bucket)):
+            report["buckets_checked"] += 1
+            problems = _check_bucket(bucket, files.get(bucket), recorded,
+                                     by_bucket.get(bucket, set()))
+            if not problems:
+                continue
+            report["problems"].append({"dataset": ds, "bucket": bucket, "issues": problems})
+            if repair:
+                price_store.repair_bucket(ds, bucket)
+                report["repaired"] += 1
+
+    for path in sorted(fundamentals_store.STORE_DIR.glob("*.json")):
+        if path.name == "manifest.json":
+            continue
+        try:
+            json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            report["fundamentals_unreadable"].append(path.stem)
+            if repair:
+                fundamentals_store.drop(path.stem)
+    return report
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Garbage collection
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _remove(paths: list, dry_run: bool) -> int:
+    freed = 0
+    for p in paths:
+        try:
+            freed += p.stat().st_size
+            if not dry_run:
+                p.unlink()
+        except OSError:
+            continue
+    return freed
+
+
+def _drop_tickers(tickers: list, dry_run: bool) -> None:
+    if dry_run or not tickers:
+        return
+    for ds in price_store.list_datasets():
+        price_store.drop_tickers(ds, tickers)
+    for tkr in tickers:
+        fundamentals_store.drop(tkr)
+
+
+def _estimated_bytes() -> dict:
+    """ticker → approximate bytes across datasets (bucket size shared by row count)."""
+    out: dict = {}
+    for ds in price_store.list_datasets():
+        manifest = price_store.get_manifest(ds)
+        rows: dict = {}
+        for e in manifest.values():
+            rows[int(e.get("bucket", 0))] = rows.get(int(e.get("bucket", 0)), 0) + e.get("rows", 0)
+        sizes = {b: p.stat().st_size for b, p in _bucket_files(ds).items()}
+        for tkr, e in manifest.items():
+            b = int(e.get("bucket", 0))
+            if rows.get(b):
+                out[tkr] = out.get(tkr, 0) + sizes.get(b, 0) * e.get("rows", 0) / rows[b]
+    return out
+
+
+def _stale_at_fetch(entry: dict, n: int) -> bool:
+    """True if the fetch stamped `asof` ended more than n sessions before it."""
+    last_bar, asof = entry.get("last_bar"), entry.get("asof")
+    if not last_bar or not asof or last_bar >= asof:
+        return False
+    start, end = date.fromisoformat(last_bar), date.fromisoformat(asof)
+    if (end - start).days <= n:                 # fewer than n sessions in any case
+        return False
+    return len(trading_calendar.sessions(start + timedelta(days=1), end)) > n
+
+
+def gc(dry_run: bool = False) -> dict:
+    """Remove dead cache files and evict LRU tickers until under CACHE_MAX_MB."""
+    cache_writer.flush()
+    price_store.flush_access()
+    report = {"temp_files": 0, "legacy_files": 0, "delisted": [], "fundamentals_expired": 0,
+              "evicted": [], "freed_mb": 0.0, "dry_run": dry_run}
+    freed = 0
+    now = time.time()
+    root = _cache_dir()
+
+    # 1. Temp files left behind by interrupted writes
+    temps = [p for p in root.rglob("*.tmp") if p.is_file() and now - p.stat().st_mtime > _TEMP_MAX_AGE_SEC]
+    freed += _remove(temps, dry_run)
+    report["temp_files"] = len(temps)
+
+    # 2. Pre-store per-ticker files (fundamentals are imported before removal)
+    legacy = [p for p in root.glob("*") if p.is_file() and _LEGACY_RE.match(p.name)]
+    if not dry_run:
+        for p in legacy:
+            if p.name.endswith("_fundamentals.json"):
+                fundamentals_store.read(p.name[:-len("_fundamentals.json")])
+    freed += _remove(legacy, dry_run)
+    report["legacy_files"] = len(legacy)
+
+    # 3. Tickers whose last fetch returned no bar for CACHE_DELISTED_SESSIONS
+    #    sessions before it (tickers merely not re-fetched are left to step 5)
+    n = int(getattr(C, "CACHE_DELISTED_SESSIONS", 20))
+    delisted: set = set()
+    for ds in price_store.list_datasets():
+        delisted |= {t for t, e in price_store.get_manifest(ds).items() if _stale_at_fetch(e, n)}
+    sizes = _estimated_bytes()
+    freed += sum(sizes.pop(t, 0) for t in delisted)
+    _drop_tickers(sorted(delisted), dry_run)
+    report["delisted"] = sorted(delisted)
+
+    # 4. Fundamentals documents not refreshed for CACHE_FUNDAMENTALS_MAX_AGE_DAYS
+    max_age = float(getattr(C, "CACHE_FUNDAMENTALS_MAX_AGE_DAYS", 120)) * 86400
+    for path in fundamentals_store.STORE_DIR.glob("*.json"):
+        if path.name != "manifest.json" and now - path.stat().st_mtime > max_age:
+            freed += path.stat().st_size
+            report["fundamentals_expired"] += 1
+            if not dry_run:
+                fundamentals_store.drop(path.stem)
+
+    # 5. Disk budget: least recently accessed tickers first, down to 90 % of the budget
+    budget = float(getattr(C, "CACHE_MAX_MB", 2048)) * _MB
+    total = _dir_bytes(root) - (freed if dry_run else 0)
+    if total > budget:
+        access: dict = {}
+        for ds in price_store.list_datasets():
+            for tkr, ts in price_store.get_access(ds).items():
+                access[tkr] = max(access.get(tkr, 0), ts)
+        evict = []
+        for tkr in sorted((t for t in access if t not in delisted), key=access.get):
+            if total <= budget * 0.9:
+                break
+            evict.append(tkr)
+            total -= sizes.get(tkr, 0)
+            freed += sizes.get(tkr, 0)
+        _drop_tickers(evict, dry_run)
+        report["evicted"] = evict
+
+    report["freed_mb"] = round(freed / _MB, 2)
+    logger.info("[CacheGC] %s", {k: (len(v) if isinstance(v, list) else v) for k, v in report.items()})
+    return report
@@ -0,0 +1,224 @@
+"""
+modules/cache_writer.py
+───────────────────────
+Write-behind queue for price-store writes.
+
+batch_download_and_enrich() wrote every batch three times (raw, enriched,
+indicator state) inline in its download loop, and each write rewrites whole
+bucket files — the scan waited on Parquet encoding between network batches.
+Writes are now queued here and a single background thread performs them:
+
+  • batching   — frames queued within CACHE_WRITE_DELAY_SEC (or until
+                 CACHE_WRITE_BATCH tickers are pending) go out as one
+                 price_store.write_frames() per dataset, so a bucket is
+                 rewritten once per flush instead of once per scan batch;
+  • coalescing — a ticker queued again before it was written replaces the
+                 earlier frame (only the latest version is written);
+  • read-your-writes — price_store calls wait_for() before it reads a
+                 manifest, so a reader never sees a ticker as missing or stale
+                 while its write is still queued;
+  • backpressure — submit() blocks once CACHE_WRITE_MAX_PENDING tickers are
+                 queued, bounding the memory held by the queue.
+
+flush() drains the queue; it runs at interpreter exit and from start_web.py's
+shutdown handler.  stats() reports queue depth and throughput.  With
+CACHE_WRITE_BEHIND_ENABLED = False every submit() writes synchronously.
+
+Usage (data_pipeline only):
+    cache_writer.submit(price_store.MASTER, {"NVDA": df}, asof, meta={"period": "2y"})
+    cache_writer.flush(timeout=10)
+    cache_writer.stats()        # {"depth", "max_depth", "submitted", "coalesced", …}
+"""
+
+import atexit
+import json
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules import price_store
+
+logger = logging.getLogger(__name__)
+
+_cond = threading.Condition()
+_pending: dict = {}          # dataset → {TICKER: (df, asof, meta_json, store_dir, on_written)}
+_inflight: dict = {}         # the snapshot being written right now (same shape)
+_urgent = False              # a reader or flush() is waiting
+_thread: Optional[threading.Thread] = None
+_stats = {"submitted": 0, "coalesced": 0, "written": 0, "flushes": 0, "errors": 0,
+          "dropped": 0, "max_depth": 0, "last_flush_ms": 0.0}
+
+
+def enabled() -> bool:
+    return bool(getattr(C, "CACHE_WRITE_BEHIND_ENABLED", True))
+
+
+def _depth_locked() -> int:
+    return sum(len(v) for v in _pending.values()) + sum(len(v) for v in _inflight.values())
+
+
+def _ensure_thread_locked() -> None:
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(target=_run, name="cache_writer", daemon=True)
+        _thread.start()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Writer thread
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _write_snapshot(snapshot: dict) -> None:
+    for dataset, items in snapshot.items():
+        groups: dict = {}
+        for tkr, (df, asof, meta_json, store_dir, cb) in items.items():
+            groups.setdefault((asof, meta_json, store_dir), []).append((tkr, df, cb))
+        for (asof, meta_json, store_dir), rows in groups.items():
+            if str(price_store.STORE_DIR) != store_dir:
+                # The store was relocated after the frames were queued (tests)
+                _stats["dropped"] += len(rows)
+                continue
+            try:
+                n = price_store.write_frames(dataset, {t: df for t, df, _ in rows}, asof,
+                                             json.loads(meta_json) if meta_json else None)
+                _stats["written"] += n
+            except Exception as exc:
+                _stats["errors"] += 1
+                logger.warning("[CacheWriter] %s write of %d tickers failed: %s",
+                               dataset, len(rows), exc)
+                continue
+            callbacks: dict = {}
+            for tkr, df, cb in rows:
+                if cb is not None:
+                    callbacks.setdefault(id(cb), (cb, {}))[1][tkr] = df
+            for cb, frames in callbacks.values():
+                try:
+                    cb(dataset, frames)
+                except Exception as exc:
+                    logger.debug("[CacheWriter] on_written callback failed: %s", exc)
+
+
+def _run() -> None:
+    global _pending, _inflight, _urgent
+    while True:
+        with _cond:
+            while not _pending:
+                _cond.wait()
+            delay = float(getattr(C, "CACHE_WRITE_DELAY_SEC", 0.5))
+            batch = int(getattr(C, "CACHE_WRITE_BATCH", 500))
+            deadline = time.monotonic() + delay
+            while not _urgent and sum(len(v) for v in _pending.values()) < batch:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                _cond.wait(left)
+            snapshot, _pending, _urgent = _pending, {}, False
+            _inflight = snapshot
+        t0 = time.perf_counter()
+        _write_snapshot(snapshot)
+        with _cond:
+            _inflight = {}
+            _stats["flushes"] += 1
+            _stats["last_flush_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            _cond.notify_all()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def submit(dataset: str, frames: dict, asof: str, meta: Optional[dict] = None,
+           on_written: Optional[Callable[[str, dict], None]] = None) -> int:
+    """
+    Queue `frames` (ticker → DataFrame) for price_store.write_frames().
+    `on_written(dataset, frames)` runs on the writer thread once they are stored.
+    Returns the number of frames queued.
+    """
+    frames = {t.upper(): df for t, df in (frames or {}).items() if df is not None and not df.empty}
+    if not frames:
+        return 0
+    if not enabled():
+        try:
+            n = price_store.write_frames(dataset, frames, asof, meta)
+        except Exception as exc:
+            logger.debug("[CacheWriter] %s write failed: %s", dataset, exc)
+            return 0
+        if n and on_written is not None:
+            on_written(dataset, frames)
+        return n
+    # Shallow copies: columns the caller adds to its frames later are not stored
+    frames = {t: df.copy(deep=False) for t, df in frames.items()}
+
+    meta_json = json.dumps(meta, sort_keys=True) if meta else ""
+    store_dir = str(price_store.STORE_DIR)
+    limit = max(1, int(getattr(C, "CACHE_WRITE_MAX_PENDING", 5000)))
+    global _urgent
+    with _cond:
+        _ensure_thread_locked()
+        while threading.current_thread() is not _thread and _depth_locked() >= limit:
+            _urgent = True
+            _cond.notify_all()
+            _cond.wait(0.1)
+        queued = _pending.setdefault(dataset, {})
+        for tkr, df in frames.items():
+            if tkr in queued:
+                _stats["coalesced"] += 1
+            queued[tkr] = (df, asof, meta_json, store_dir, on_written)
+        _stats["submitted"] += len(frames)
+        _stats["max_depth"] = max(_stats["max_depth"], _depth_locked())
+        _cond.notify_all()
+    return len(frames)
+
+
+def _is_pending_locked(dataset: str, tickers: Optional[set]) -> bool:
+    for queue in (_pending.get(dataset), _inflight.get(dataset)):
+        if queue and (tickers is None or not tickers.isdisjoint(queue)):
+            return True
+    return False
+
+
+def wait_for(dataset: str, tickers: Optional[Iterable[str]] = None) -> None:
+    """Block until queued writes of `tickers` (None → any ticker) in `dataset` are stored."""
+    global _urgent
+    if threading.current_thread() is _thread:
+        return
+    wanted = None if tickers is None else {t.upper() for t in tickers}
+    with _cond:
+        while _is_pending_locked(dataset, wanted):
+            _urgent = True
+            _cond.notify_all()
+            _cond.wait(0.05)
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Write everything queued; False if `timeout` seconds passed first."""
+    global _urgent
+    if threading.current_thread() is _thread:
+        return False
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _cond:
+        while _pending or _inflight:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            _urgent = True
+            _cond.notify_all()
+            _cond.wait(0.05)
+    return True
+
+
+def stats() -> dict:
+    with _cond:
+        return {**_stats, "depth": _depth_locked(),
+                "pending_by_dataset": {ds: len(v) for ds, v in _pending.items()},
+                "enabled": enabled()}
+
+
+price_store.set_pending_hook(wait_for)
+atexit.register(flush, 30.0)
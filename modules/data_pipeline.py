@@ -4,30 +4,33 @@ modules/data_pipeline.py
 Unified data access layer integrating all three libraries:
   • finvizfinance  → coarse screener, sector rankings, quick snapshots
   • yfinance       → historical OHLCV, fundamentals, earnings data
-  • pandas_ta      → SMA50/150/200, EMA9/21/50/150, RSI, ATR, BBands, Slope
+  • NumPy kernels  → SMA50/150/200, EMA9/21/50/150, RSI, ATR, BBands, Slope
+                     (modules/indicators.py; pandas_ta as optional backend)
 
 All upper-layer modules import ONLY from here — single point of change.
 """
 
 import os
 import sys
+import copy
+import functools
+import inspect
+import importlib.util
 import time
-import json
 import re
 import threading
+import queue
 import warnings
 import logging
 import xml.etree.ElementTree as ET
 from urllib import error as urlerror
 from urllib import request as urlrequest
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from pathlib import Path
-from typing import Optional
-from zoneinfo import ZoneInfo
+from typing import Iterator, Optional
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 
 # Suppress noisy warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -39,32 +42,25 @@ logging.getLogger("yfinance").setLevel(logging.CRITICAL)
 logging.getLogger("yfinance.data").setLevel(logging.CRITICAL)
 logging.getLogger("yfinance.utils").setLevel(logging.CRITICAL)
 
-# pandas_ta integration
-try:
-    import pandas_ta as ta
-    PTA_AVAILABLE = True
-except ImportError:
-    PTA_AVAILABLE = False
-    print("[WARN] pandas_ta not installed. Technical indicators unavailable.")
-
-# finvizfinance integration
-try:
-    from finvizfinance.screener.overview import Overview as FVOverview
-    from finvizfinance.screener.performance import Performance as FVPerformance
-    from finvizfinance.screener.technical import Technical as FVTechnical
-    from finvizfinance.screener.financial import Financial as FVFinancial
-    from finvizfinance.screener.ownership import Ownership as FVOwnership
-    from finvizfinance.group.performance import Performance as FVGroupPerf
-    from finvizfinance.quote import finvizfinance as FVQuote
-    FVF_AVAILABLE = True
-except ImportError:
-    FVF_AVAILABLE = False
+# pandas_ta integration — imported on first use (slow import; only the
+# "pandas_ta" technicals backend needs it, see TECHNICALS_BACKEND)
+ta = None
+PTA_AVAILABLE = importlib.util.find_spec("pandas_ta") is not None
+
+# finvizfinance integration (called through the live market-data provider)
+FVF_AVAILABLE = importlib.util.find_spec("finvizfinance") is not None
+if not FVF_AVAILABLE:
     print("[WARN] finvizfinance not installed. Using yfinance only.")
 
 # ─── path setup ──────────────────────────────────────────────────────────────
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 import trader_config as C
+from modules import price_store, indicator_engine, panel, frame_cache, yf_limiter, yf_async
+from modules import fundamentals_store, sec_cache, finviz_cache, trading_calendar, cache_writer
+from modules.data_providers import get_provider, set_provider   # re-exported
+from modules.lazy_frame import LazyFrame
+from modules import indicators as kernels   # `indicators` is a get_technicals() argument
 
 PRICE_CACHE_DIR = ROOT / C.PRICE_CACHE_DIR
 PRICE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -73,10 +69,8 @@ PRICE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 logger = logging.getLogger(__name__)
 
-_sec_lock = threading.Lock()
-_sec_ticker_map_cache: dict[str, int] | None = None
-_sec_companyfacts_cache: dict[int, dict] = {}
-_sec_last_call_ts = 0.0
+# Every price-store write drops the written tickers from the in-process frame cache
+price_store.add_write_listener(frame_cache.invalidate)
 
 _YAHOO_MARKET_RSS_URL = "https://feeds.finance.yahoo.com/rss/2.0/headline?s=%5EGSPC,%5EIXIC,%5EDJI&region=US&lang=en-US"
 _SEC_8K_ATOM_URL = "https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type=8-k&company=&dateb=&owner=include&start=0&count=100&output=atom"
@@ -86,8 +80,10 @@ _WSJ_MARKETS_RSS_URL = "https://feeds.a.dj.com/rss/RSSMarketsMain.xml"
 _last_fvf_call = 0.0
 
 def _fvf_sleep(min_gap: float = 1.2):
-    """Polite delay between finvizfinance requests."""
+    """Polite delay between finvizfinance requests (none when replaying)."""
     global _last_fvf_call
+    if not get_provider().live:
+        return
     elapsed = time.time() - _last_fvf_call
     if elapsed < min_gap:
         time.sleep(min_gap - elapsed)
@@ -144,26 +140,114 @@ def _yf_track_call() -> None:
 
 
 def _yf_track_error(exc: Exception) -> None:
-    """Track yfinance errors; set rate_limited if 429 or repeated 401."""
+    """
+    Track yfinance errors; set rate_limited if 429 or repeated 401.
+    429 / 401 / crumb errors also make the shared limiter back off.
+    """
     with _yf_stats_lock:
         _yf_stats["errors"] += 1
         desc = str(exc).lower()
         if "429" in desc or "too many requests" in desc or "rate limit" in desc:
             _yf_stats["rate_limited"] = True
             _yf_stats["rate_limit_ts"] = time.time()
+    if yf_limiter.is_throttle_error(exc):
+        yf_limiter.on_throttle()
 
 
 def get_yf_status() -> dict:
     """
     Return a snapshot of the yfinance call/error counters.
     Also auto-clears rate_limited after _YF_RATE_LIMIT_COOLDOWN seconds.
+    Includes the single-flight counters ("coalesced": callers that shared
+    another caller's in-flight fetch instead of issuing their own) and the
+    adaptive limiter state (rate_per_sec, concurrency_limit, queue_depth;
+    full snapshot under "limiter") and the async downloader counters.
     """
     with _yf_stats_lock:
         now = time.time()
         if (_yf_stats["rate_limited"]
                 and now - _yf_stats["rate_limit_ts"] > _YF_RATE_LIMIT_COOLDOWN):
             _yf_stats["rate_limited"] = False
-        return dict(_yf_stats)
+        status = dict(_yf_stats)
+    with _inflight_lock:
+        status["coalesced"] = _sf_stats["coalesced"]
+        status["coalesced_by_endpoint"] = dict(_sf_stats["by_endpoint"])
+        status["inflight"] = len(_inflight)
+    limiter = yf_limiter.status()
+    status["rate_per_sec"] = limiter["rate_per_sec"]
+    status["concurrency_limit"] = limiter["concurrency_limit"]
+    status["queue_depth"] = limiter["queue_depth"]
+    status["limiter"] = limiter
+    status["async_download"] = yf_async.stats()
+    return status
+
+
+# ─── Single-flight request coalescing ────────────────────────────────────────
+# Web jobs, Telegram /analyze threads, the auto-trader and the exit engine can
+# ask for the same ticker at the same moment.  Concurrent callers with the same
+# (endpoint, arguments) wait for the one in-flight fetch and share its result
+# instead of each hitting Yahoo (and each tripping the 401/crumb reset).
+_inflight_lock = threading.Lock()
+_inflight: dict = {}                          # key → {"done": Event, "result", "error"}
+_sf_stats: dict = {"coalesced": 0, "by_endpoint": {}}
+
+
+def _single_flight(key: tuple, fn):
+    """Run fn() once per concurrent `key`; followers get a copy of the leader's result."""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = {"done": threading.Event(), "result": None, "error": None}
+            _inflight[key] = flight
+        else:
+            _sf_stats["coalesced"] += 1
+            by_ep = _sf_stats["by_endpoint"]
+            by_ep[key[0]] = by_ep.get(key[0], 0) + 1
+    if not leader:
+        flight["done"].wait()
+        if flight["error"] is not None:
+            raise flight["error"]
+        return _shared_copy(flight["result"])
+    try:
+        flight["result"] = fn()
+        return flight["result"]
+    except Exception as exc:
+        flight["error"] = exc
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight["done"].set()
+
+
+def _shared_copy(result):
+    """Followers get their own copy — callers are free to mutate what they receive."""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy()
+    if isinstance(result, (dict, list)):
+        return copy.deepcopy(result)
+    return result
+
+
+def _coalesced(endpoint: str):
+    """Decorator: single-flight on (endpoint, bound arguments; ticker upper-cased)."""
+    def wrap(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (endpoint,) + tuple(v.upper() if k == "ticker" and isinstance(v, str) else v
+                                      for k, v in bound.arguments.items())
+            try:
+                hash(key)
+            except TypeError:                   # unhashable argument: no coalescing
+                return fn(*args, **kwargs)
+            return _single_flight(key, lambda: fn(*args, **kwargs))
+        return inner
+    return wrap
 
 def _reset_yf_crumb() -> bool:
     """
@@ -205,56 +289,9 @@ def _reset_yf_crumb() -> bool:
 
 # ─── US Trading Day Helpers (Timezone-Aware) ─────────────────────────────────
 
-# US stock market holidays (NYSE/NASDAQ closed)
-# These are in US Eastern Time (ET)
-_US_MARKET_HOLIDAYS = [
-    # Fixed holidays
-    (1, 1),    # New Year's Day
-    (7, 4),    # Independence Day
-    (12, 25),  # Christmas
-]
-
 def _is_us_market_holiday(check_date: date) -> bool:
     """Check if date is a US stock market holiday (NYSE/NASDAQ closed)."""
-    m, d = check_date.month, check_date.day
-    
-    # Fixed holidays
-    if (m, d) in _US_MARKET_HOLIDAYS:
-        return True
-    
-    # MLK Day (3rd Monday of January)
-    if m == 1 and 15 <= d <= 21 and check_date.weekday() == 0:
-        return True
-    
-    # Presidents Day (3rd Monday of February)
-    if m == 2 and 15 <= d <= 21 and check_date.weekday() == 0:
-        return True
-    
-    # Good Friday (roughly: between Mar 20 and Apr 23, on Friday)
-    # For exact calculation, would need dateutil.easter; this is conservative
-    if check_date.weekday() == 4:  # Friday
-        if (check_date.month == 3 and check_date.day >= 20) or \
-           (check_date.month == 4 and check_date.day <= 23):
-            # Rough approximation; not exact for all years
-            pass
-    
-    # Memorial Day (last Monday of May)
-    if m == 5 and check_date.weekday() == 0 and 25 <= d:
-        return True
-    
-    # Labor Day (1st Monday of September)
-    if m == 9 and check_date.weekday() == 0 and d <= 7:
-        return True
-    
-    # Thanksgiving (4th Thursday of November)
-    if m == 11 and check_date.weekday() == 3 and 22 <= d <= 28:
-        return True
-    
-    # Day after Thanksgiving (also closed)
-    if m == 11 and check_date.weekday() == 4 and 23 <= d <= 29:
-        return True
-    
-    return False
+    return trading_calendar.is_holiday(check_date)
 
 
 def get_last_us_trading_day_hk(reference_hk_dt: datetime | None = None) -> date:
@@ -264,7 +301,7 @@ def get_last_us_trading_day_hk(reference_hk_dt: datetime | None = None) -> date:
     This function:
     1. Takes the current Hong Kong time (or a reference time in HK)
     2. Converts to US Eastern Time (ET)
-    3. Finds the last valid trading day in ET (accounting for weekends + holidays)
+    3. Finds the last valid trading day in ET (weekends + holidays per modules/trading_calendar)
     
     This ensures that when a user in Hong Kong is deciding whether to run a scan,
     they check against the correct US trading day (not their local calendar day).
@@ -284,86 +321,41 @@ def get_last_us_trading_day_hk(reference_hk_dt: datetime | None = None) -> date:
         - ET: Friday 20:00 (same day, still open or just closed)
         - Returns: Friday (just-closed trading day)
     """
-    # Get current Hong Kong datetime
-    if reference_hk_dt is None:
-        hk_tz = ZoneInfo("Asia/Hong_Kong")
-        reference_hk_dt = datetime.now(hk_tz)
-    
-    # Convert to US Eastern Time
-    et_tz = ZoneInfo("America/New_York")
-    et_dt = reference_hk_dt.astimezone(et_tz)
-    
-    # Start from the ET date and walk backward to find a valid trading day
-    current_et = et_dt.date()
-    
-    for _ in range(10):  # Look back up to 10 days
-        # Skip weekends (5=Saturday, 6=Sunday)
-        if current_et.weekday() in (5, 6):
-            current_et -= timedelta(days=1)
-            continue
-        
-        # Skip market holidays
-        if _is_us_market_holiday(current_et):
-            current_et -= timedelta(days=1)
-            continue
-        
-        # Found a valid trading day
-        return current_et
-    
-    # Fallback (shouldn't happen with 10-day lookback)
-    return current_et
+    return trading_calendar.last_session(reference_hk_dt)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # A. finvizfinance — Screener & Snapshots  (with TTL cache)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-# In-memory cache: key = (sorted filter items, view) -> (timestamp, DataFrame)
-_finviz_cache: dict = {}
-
-def _finviz_cache_key(filters_dict: dict, view: str) -> tuple:
-    """Create a hashable cache key from filters + view."""
-    return (tuple(sorted(filters_dict.items())), view)
-
-
 def get_universe(filters_dict: dict, view: str = "Overview",
                  verbose: bool = True, use_cache: bool = True) -> pd.DataFrame:
     """
     Coarse screener via finvizfinance.
     Returns a DataFrame with Ticker + metadata columns.
     Falls back to empty DataFrame if network error.
-    Results are cached in-memory for FINVIZ_CACHE_TTL_HOURS to speed up repeated scans.
+    Results are persisted by modules/finviz_cache for FINVIZ_CACHE_TTL_HOURS and
+    shared across restarts; a stricter filter set is answered by narrowing a
+    cached looser one locally.  Replayed / synthetic providers bypass the cache.
     
     NOTE: Finvizfinance pagination is slow (~1s per 20 rows). This function allows
     up to max_time_sec (45s default) for finvizfinance to complete. Partial results OK.
     """
-    if not FVF_AVAILABLE:
+    provider = get_provider()
+    if provider.live and not FVF_AVAILABLE:
         logger.error("finvizfinance not available.")
         return pd.DataFrame()
 
-    # ── Check in-memory cache ────────────────────────────────────────────
-    cache_ttl_hours = getattr(C, "FINVIZ_CACHE_TTL_HOURS", 4)
-    cache_key = _finviz_cache_key(filters_dict, view)
-    if use_cache and cache_key in _finviz_cache:
-        cached_time, cached_df = _finviz_cache[cache_key]
-        age_hours = (time.time() - cached_time) / 3600
-        if age_hours < cache_ttl_hours and not cached_df.empty:
-            logger.info("[Finviz Cache HIT] Age %.1fh (TTL %dh), %d rows",
-                        age_hours, cache_ttl_hours, len(cached_df))
-            return cached_df.copy()
+    # ── Check persistent cache (exact or looser superset) ───────────────
+    use_cache = use_cache and provider.live
+    if use_cache:
+        cached_df = finviz_cache.get_screener(filters_dict, view)
+        if cached_df is not None:
+            return cached_df
 
     try:
         _fvf_sleep()
-        view_map = {
-            "Overview":    FVOverview,
-            "Performance": FVPerformance,
-            "Technical":   FVTechnical,
-            "Financial":   FVFinancial,
-            "Ownership":   FVOwnership,
-        }
-        cls = view_map.get(view, FVOverview)
-        screener = cls()
-        
+
         # ── Enhanced logging: Boost finvizfinance library logging ────────────────────
         try:
             import urllib3
@@ -375,12 +367,9 @@ def get_universe(filters_dict: dict, view: str = "Overview",
         except:
             pass
         
-        logger.info("[Finviz] Creating screener for view=%s", view)
+        logger.info("[Finviz] Creating screener for view=%s (provider=%s)", view, provider.name)
         logger.debug("[Finviz] Filters: %s", filters_dict)
-        
-        screener.set_filter(filters_dict=filters_dict)
-        logger.debug("[Finviz] Filter set successfully")
-        
+
         # ── Execute with patient timeout (allow partial results) ────────────────────
         import threading
         import traceback
@@ -412,7 +401,7 @@ def get_universe(filters_dict: dict, view: str = "Overview",
                     socket.setdefaulttimeout(50.0)
                     logger.debug("[Finviz] Socket timeout set to 50 seconds")
                     
-                    df = screener.screener_view()
+                    df = provider.screener(filters_dict, view)
                 finally:
                     # Restore original socket timeout
                     socket.setdefaulttimeout(original_timeout)
@@ -539,8 +528,9 @@ def get_universe(filters_dict: dict, view: str = "Overview",
             df = df.reset_index()
         df.columns = [str(c).strip() for c in df.columns]
 
-        # Save to in-memory cache
-        _finviz_cache[cache_key] = (time.time(), df.copy())
+        # Save to persistent cache
+        if use_cache:
+            finviz_cache.put_screener(filters_dict, view, df)
         logger.debug("[Finviz Cache SAVE] %d rows, view=%s", len(df), view)
         logger.info("[Finviz] ✓ Successfully cached %d rows from %s view", len(df), view)
         return df
@@ -557,16 +547,23 @@ def get_sector_rankings(group: str = "Sector") -> pd.DataFrame:
     Sector / industry performance ranking via finvizfinance Group module.
     group: 'Sector' | 'Industry' | 'Country' | 'Capitalization'
     Returns DataFrame sorted by Performance(Week) desc.
+    Cached by modules/finviz_cache for FINVIZ_GROUP_TTL_HOURS.
     """
-    if not FVF_AVAILABLE:
+    provider = get_provider()
+    if provider.live and not FVF_AVAILABLE:
         return pd.DataFrame()
+    if provider.live:
+        cached = finviz_cache.get_group(group)
+        if cached is not None:
+            return cached
     try:
         _fvf_sleep()
-        gp = FVGroupPerf()
-        df = gp.screener_view(group=group)
+        df = provider.group_performance(group)
         if df is None or df.empty:
             return pd.DataFrame()
         df.columns = [str(c).strip() for c in df.columns]
+        if provider.live:
+            finviz_cache.put_group(group, df)
         return df
     except Exception as exc:
         logger.warning(f"get_sector_rankings error: {exc}")
@@ -579,12 +576,11 @@ def get_snapshot(ticker: str) -> dict:
     Returns dict with ~70 key/value pairs (P/E, EPS, SMA20/50/200, RSI, etc.)
     Falls back to empty dict on error.
     """
-    if not FVF_AVAILABLE:
+    if get_provider().live and not FVF_AVAILABLE:
         return {}
     try:
         _fvf_sleep(0.8)
-        fv = FVQuote(ticker)
-        data = fv.ticker_fundament()
+        data = get_provider().snapshot(ticker)
         if not data:
             return {}
         return {k: v for k, v in data.items()}
@@ -595,24 +591,22 @@ def get_snapshot(ticker: str) -> dict:
 
 def get_insider_fvf(ticker: str) -> pd.DataFrame:
     """Insider trading data from finvizfinance."""
-    if not FVF_AVAILABLE:
+    if get_provider().live and not FVF_AVAILABLE:
         return pd.DataFrame()
     try:
         _fvf_sleep()
-        fv = FVQuote(ticker)
-        return fv.ticker_inside_trader()
+        return get_provider().insider(ticker)
     except Exception:
         return pd.DataFrame()
 
 
 def get_news_fvf(ticker: str) -> pd.DataFrame:
     """Recent news headlines from finvizfinance."""
-    if not FVF_AVAILABLE:
+    if get_provider().live and not FVF_AVAILABLE:
         return pd.DataFrame()
     try:
         _fvf_sleep()
-        fv = FVQuote(ticker)
-        return fv.ticker_news()
+        return get_provider().news(ticker)
     except Exception:
         return pd.DataFrame()
 
@@ -878,86 +872,15 @@ def _get_finviz_fundamentals_fallback(ticker: str) -> dict | None:
         return None
 
 
-def _sec_sleep(min_gap: float = 0.2):
-    """Polite delay between SEC requests (free public endpoint)."""
-    global _sec_last_call_ts
-    elapsed = time.time() - _sec_last_call_ts
-    if elapsed < min_gap:
-        time.sleep(min_gap - elapsed)
-    _sec_last_call_ts = time.time()
-
-
-def _http_get_json(url: str, headers: dict | None = None, timeout: float = 8.0) -> Optional[dict]:
-    """Small helper to fetch JSON via stdlib urllib with graceful failures."""
-    req = urlrequest.Request(url, headers=headers or {})
-    try:
-        with urlrequest.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode("utf-8")
-            return json.loads(raw)
-    except Exception as exc:
-        logger.debug("HTTP JSON fetch failed: %s (%s)", url, exc)
-        return None
-
-
-def _load_sec_ticker_map() -> dict[str, int]:
-    """Load SEC ticker->CIK map once per process."""
-    global _sec_ticker_map_cache
-    with _sec_lock:
-        if _sec_ticker_map_cache is not None:
-            return _sec_ticker_map_cache
-
-        user_agent = getattr(C, "SEC_USER_AGENT", "SEPA-StockLab/1.0 (local)")
-        timeout = float(getattr(C, "SEC_HTTP_TIMEOUT_SEC", 8.0))
-        _sec_sleep()
-        payload = _http_get_json(
-            "https://www.sec.gov/files/company_tickers.json",
-            headers={"User-Agent": user_agent, "Accept": "application/json"},
-            timeout=timeout,
-        )
+# SEC companyfacts series read by the free fallback (first non-empty wins)
+_SEC_EPS_SERIES = (("EarningsPerShareDiluted", "USD/shares"),
+                   ("EarningsPerShareBasic", "USD/shares"))
+_SEC_REVENUE_SERIES = (("Revenues", "USD"),
+                       ("RevenueFromContractWithCustomerExcludingAssessedTax", "USD"))
 
-        ticker_map: dict[str, int] = {}
-        if isinstance(payload, dict):
-            for rec in payload.values():
-                try:
-                    tkr = str(rec.get("ticker", "")).upper().strip()
-                    cik = int(rec.get("cik_str"))
-                    if tkr:
-                        ticker_map[tkr] = cik
-                except Exception:
-                    continue
-
-        _sec_ticker_map_cache = ticker_map
-        return ticker_map
 
-
-def _get_sec_companyfacts(cik: int) -> Optional[dict]:
-    """Fetch SEC CompanyFacts JSON for a CIK with in-memory cache."""
-    with _sec_lock:
-        cached = _sec_companyfacts_cache.get(cik)
-    if cached is not None:
-        return cached
-
-    user_agent = getattr(C, "SEC_USER_AGENT", "SEPA-StockLab/1.0 (local)")
-    timeout = float(getattr(C, "SEC_HTTP_TIMEOUT_SEC", 8.0))
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik:010d}.json"
-    _sec_sleep()
-    payload = _http_get_json(
-        url,
-        headers={"User-Agent": user_agent, "Accept": "application/json"},
-        timeout=timeout,
-    )
-
-    with _sec_lock:
-        _sec_companyfacts_cache[cik] = payload
-    return payload
-
-
-def _extract_sec_series(company_facts: dict, tag: str, unit: str) -> list[dict]:
-    """Extract one SEC us-gaap series list for a given tag/unit pair."""
-    try:
-        return company_facts["facts"]["us-gaap"][tag]["units"][unit]
-    except Exception:
-        return []
+def _first_sec_series(found: dict, candidates: tuple) -> list[dict]:
+    return next((found[k] for k in candidates if found.get(k)), [])
 
 
 def _latest_yoy_growth(series: list[dict]) -> Optional[float]:
@@ -1007,23 +930,14 @@ def _get_sec_fundamentals_fallback(ticker: str) -> dict | None:
         # SEC ticker map primarily covers standard US symbols.
         return None
 
-    ticker_map = _load_sec_ticker_map()
-    cik = ticker_map.get(tkr)
+    cik = sec_cache.ticker_map().get(tkr)
     if not cik:
         return None
 
-    facts = _get_sec_companyfacts(cik)
-    if not isinstance(facts, dict):
-        return None
-
-    eps_series = (
-        _extract_sec_series(facts, "EarningsPerShareDiluted", "USD/shares")
-        or _extract_sec_series(facts, "EarningsPerShareBasic", "USD/shares")
-    )
-    rev_series = (
-        _extract_sec_series(facts, "Revenues", "USD")
-        or _extract_sec_series(facts, "RevenueFromContractWithCustomerExcludingAssessedTax", "USD")
-    )
+    # Disk-cached companyfacts; only these series are kept in memory
+    found = sec_cache.series(cik, _SEC_EPS_SERIES + _SEC_REVENUE_SERIES)
+    eps_series = _first_sec_series(found, _SEC_EPS_SERIES)
+    rev_series = _first_sec_series(found, _SEC_REVENUE_SERIES)
 
     earnings_growth = _latest_yoy_growth(eps_series)
     revenue_growth = _latest_yoy_growth(rev_series)
@@ -1083,35 +997,150 @@ def _compose_free_fundamentals_fallback(ticker: str) -> dict | None:
 # B. yfinance — Historical & Fundamental Data
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def get_historical(ticker: str, period: str = "2y",
-                   use_cache: bool = True) -> pd.DataFrame:
+# ─── Master price series ──────────────────────────────────────────────────────
+# One OHLCV series per ticker is cached, spanning the longest period any caller
+# has asked for (at least PRICE_MASTER_PERIOD).  Shorter periods — 3mo / 6mo /
+# 1y / 2y — are trailing slices of it, so SEPA (2y), QM (6mo) and ML (1y) scans
+# of the same ticker share one download, one stored copy and one indicator pass.
+
+_PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1), "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6), "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2), "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def _period_span_days(period: str) -> float:
+    """Approximate calendar-day span of a yfinance period string ('max' → inf)."""
+    p = str(period).lower()
+    if p in _PERIOD_OFFSETS:
+        ref = pd.Timestamp("2000-01-01")
+        return float((ref + _PERIOD_OFFSETS[p] - ref).days)
+    if p.endswith("d") and p[:-1].isdigit():
+        return int(p[:-1]) * 7 / 5 + 4          # N bars plus a long weekend
+    if p == "ytd":
+        today = date.today()
+        return float((today - date(today.year, 1, 1)).days)
+    return float("inf")
+
+
+def _master_period(period: str, entry: Optional[dict] = None) -> str:
     """
-    Daily OHLCV history via yfinance.
-    Caches to parquet in data/price_cache/ to minimise repeated downloads.
-    Returns DataFrame with columns: Open, High, Low, Close, Volume.
+    Period to download for the master series: the longest of
+    PRICE_MASTER_PERIOD, the requested period and the period already stored.
     """
-    cache_file = PRICE_CACHE_DIR / f"{ticker.upper()}_{period}.parquet"
-    today = date.today().isoformat()
+    candidates = [getattr(C, "PRICE_MASTER_PERIOD", "2y"), period]
+    if entry and entry.get("period"):
+        candidates.append(entry["period"])
+    return max(candidates, key=_period_span_days)
+
+
+def _covers(entry: Optional[dict], period: str) -> bool:
+    """True if a stored master entry spans at least `period`."""
+    return bool(entry and entry.get("period")) and \
+        _period_span_days(entry["period"]) >= _period_span_days(period)
+
+
+def _slice_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Trailing window of a master series matching yfinance's `period` semantics."""
+    if df is None or df.empty:
+        return df
+    p = str(period).lower()
+    if p.endswith("d") and p[:-1].isdigit():
+        return df.iloc[-int(p[:-1]):].copy()
+    last = pd.Timestamp(df.index[-1]).normalize()
+    if p in _PERIOD_OFFSETS:
+        start = last - _PERIOD_OFFSETS[p]
+    elif p == "ytd":
+        start = pd.Timestamp(last.year, 1, 1)
+    else:
+        return df
+    return df.loc[df.index >= start]
+
+
+def _period_view(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """_slice_period() as an independent copy — never a view of a cached master."""
+    return df if df is None else _slice_period(df, period).copy()
+
+
+def _read_store_frame(dataset: str, ticker: str,
+                      entry: Optional[dict] = None) -> Optional[pd.DataFrame]:
+    """
+    price_store.read_frame() through the in-process frame cache, keyed by the
+    manifest entry's data version.  The returned frame is shared — don't mutate.
+    """
+    entry = entry if entry is not None else price_store.get_entry(dataset, ticker)
+    version = price_store.data_version(entry)
+    df = frame_cache.get(dataset, ticker, version) if version is not None else None
+    if df is None:
+        df = price_store.read_frame(dataset, ticker)
+        if df is not None and not df.empty and version is not None:
+            frame_cache.put(dataset, ticker, version, df)
+    return df
+
+
+def get_frame_cache_stats() -> dict:
+    """Hit / miss / eviction counters and size of the in-process frame cache."""
+    return frame_cache.stats()
 
-    # Try reading cache (valid for today)
-    if use_cache and cache_file.exists():
+
+def _remember(dataset: str, ticker: str, df: pd.DataFrame) -> None:
+    """Cache a frame just written to the store under its new data version."""
+    version = price_store.data_version(price_store.get_entry(dataset, ticker))
+    if version is not None:
+        frame_cache.put(dataset, ticker, version, df)
+
+
+def _remember_frames(dataset: str, frames: dict) -> None:
+    for tkr, df in frames.items():
+        _remember(dataset, tkr, df)
+
+
+def _store_write(dataset: str, frames: dict, asof: str, meta: Optional[dict] = None,
+                 remember: bool = False) -> int:
+    """
+    Queue frames for the price store (modules/cache_writer write-behind queue)
+    so store writes stay off the download / compute path.  remember=True puts
+    them in the frame cache once written.
+    """
+    return cache_writer.submit(dataset, frames, asof, meta,
+                               _remember_frames if remember else None)
+
+
+def _load_master(ticker: str, period: str,
+                 use_cache: bool = True) -> tuple[pd.DataFrame, str]:
+    """
+    Full master OHLCV series of a ticker covering at least `period`.
+    Returns (DataFrame, master period); an empty frame on download failure.
+    """
+    asof = trading_calendar.cache_asof()
+    entry = price_store.get_entry(price_store.MASTER, ticker) if use_cache else None
+    master = _master_period(period, entry)
+    covered = _covers(entry, master)
+
+    # Try reading cache (fresh for the last completed session)
+    if covered and entry.get("asof") == asof and entry.get("rows", 0) > 0:
         try:
-            df_cached = pd.read_parquet(cache_file)
-            if not df_cached.empty:
-                meta_file = cache_file.with_suffix(".meta")
-                if meta_file.exists():
-                    cache_date = meta_file.read_text().strip()
-                    if cache_date == today:
-                        return df_cached
+            df_cached = _read_store_frame(price_store.MASTER, ticker, entry)
+            if df_cached is not None and not df_cached.empty:
+                return df_cached, master
         except Exception:
             pass
 
-    # Rate-limit: add inter-request delay to avoid triggering yfinance 429 errors
-    # Especially important during parallel scans with many workers (e.g., ML Channel 3)
-    intra_request_delay = getattr(C, "YFINANCE_INTRA_REQUEST_DELAY_SEC", 0.1)
-    if intra_request_delay > 0:
-        time.sleep(intra_request_delay)
+    # Stale cache: fetch only the bars after the last cached bar
+    if covered and getattr(C, "PRICE_INCREMENTAL_ENABLED", True):
+        df_inc = _refresh_one_incremental(ticker, master, asof)
+        if df_inc is not None:
+            return df_inc, master
+
+    return _download_master(ticker, master, asof), master
 
+
+@_coalesced("history")
+def _download_master(ticker: str, master: str, asof: str) -> pd.DataFrame:
+    """Download and store a ticker's full master series; empty frame on failure."""
+    # Pacing across parallel scan workers is done by the shared yf_limiter.
     # Download from yfinance (retry with exponential backoff on 401/crumb error)
     max_retries = getattr(C, "YFINANCE_MAX_RETRIES", 1)
     retry_backoff = getattr(C, "YFINANCE_RETRY_BACKOFF", 0.5)
@@ -1119,23 +1148,13 @@ def get_historical(ticker: str, period: str = "2y",
     for _attempt in range(max_retries + 1):
         try:
             _yf_track_call()
-            tkr = yf.Ticker(ticker)
-            df = tkr.history(period=period, interval="1d", auto_adjust=True)
-            if df is None or df.empty:
+            df = get_provider().history(ticker, period=master)
+            if df.empty:
                 return pd.DataFrame()
-            # Keep only OHLCV columns
-            df = df[["Open", "High", "Low", "Close", "Volume"]].copy()
-            df.index = pd.to_datetime(df.index)
-            if df.index.tzinfo is not None:
-                df.index = df.index.tz_localize(None)
             df = df.dropna()
 
             # Save cache
-            try:
-                df.to_parquet(cache_file)
-                cache_file.with_suffix(".meta").write_text(today)
-            except Exception:
-                pass
+            _store_write(price_store.MASTER, {ticker: df}, asof, {"period": master}, remember=True)
 
             return df
         except Exception as exc:
@@ -1164,14 +1183,201 @@ def get_historical(ticker: str, period: str = "2y",
     return pd.DataFrame()
 
 
+def get_historical(ticker: str, period: str = "2y",
+                   use_cache: bool = True) -> pd.DataFrame:
+    """
+    Daily OHLCV history via yfinance.
+    Served as a trailing `period` slice of the ticker's master series, which
+    is cached once in the consolidated price store for all periods.
+    Returns DataFrame with columns: Open, High, Low, Close, Volume.
+    """
+    df, _master = _load_master(ticker, period, use_cache)
+    return _period_view(df, period)
+
+
+# ─── Incremental OHLCV refresh ────────────────────────────────────────────────
+# A stale cached series is extended by downloading only the bars after its last
+# cached bar (plus a few overlapping bars used to detect split/dividend
+# restatement of the auto-adjusted history).
+
+_OHLCV_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def get_intraday(ticker: str, period: str = "2d", interval: str = "5m",
+                 prepost: bool = False) -> pd.DataFrame:
+    """Intraday bars (exchange-local timestamps; pre/post market only with prepost); empty on error."""
+    try:
+        _yf_track_call()
+        df = get_provider().intraday(ticker, period=period, interval=interval, prepost=prepost)
+        return df if df is not None else pd.DataFrame()
+    except Exception as exc:
+        _yf_track_error(exc)
+        logger.debug("get_intraday(%s, %s) error: %s", ticker, interval, exc)
+        return pd.DataFrame()
+
+
+def _merge_incremental(cached: pd.DataFrame, fresh: pd.DataFrame,
+                       period: str) -> Optional[pd.DataFrame]:
+    """
+    Append newly downloaded bars to a cached OHLCV frame.
+
+    `fresh` must start at or before the cached frame's last bar so that the
+    overlapping bars can be compared.  Returns None when the cache cannot be
+    extended safely — no settled overlap, or the adjusted closes on the
+    overlap drifted by more than PRICE_INCREMENTAL_DRIFT_TOL (a split or
+    dividend restated the history) — and the caller does a full download.
+    """
+    if cached is None or cached.empty or fresh is None or fresh.empty:
+        return None
+    fresh = fresh[_OHLCV_COLS].dropna()
+    if fresh.empty:
+        return None
+
+    # The last cached bar may have been captured intraday, so only the settled
+    # bars before it are used for the restatement check.
+    overlap = cached.index.intersection(fresh.index)
+    settled = overlap[overlap < cached.index[-1]]
+    if len(settled) == 0:
+        return None
+    old_close = cached.loc[settled, "Close"].astype(float).replace(0, np.nan)
+    new_close = fresh.loc[settled, "Close"].astype(float)
+    drift = float((new_close / old_close - 1.0).abs().max())
+    tol = float(getattr(C, "PRICE_INCREMENTAL_DRIFT_TOL", 0.002))
+    if not np.isfinite(drift) or drift > tol:
+        logger.debug("[Incremental] adjusted-price drift %.4f > %.4f — full reload", drift, tol)
+        return None
+
+    merged = pd.concat([cached.loc[cached.index < fresh.index[0], _OHLCV_COLS], fresh])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    return _slice_period(merged, period)
+
+
+def _incremental_start(cached: pd.DataFrame) -> Optional[date]:
+    """First bar date to re-download for an incremental refresh, or None if too stale."""
+    if cached is None or len(cached) < 2:
+        return None
+    max_gap = int(getattr(C, "PRICE_INCREMENTAL_MAX_GAP_DAYS", 30))
+    last_bar = pd.Timestamp(cached.index[-1]).date()
+    if (date.today() - last_bar).days > max_gap:
+        return None
+    overlap = max(2, int(getattr(C, "PRICE_INCREMENTAL_OVERLAP_BARS", 5)))
+    return pd.Timestamp(cached.index[-min(overlap, len(cached))]).date()
+
+
+def _download_batches(tickers: list, batch_size: int, period: Optional[str] = None,
+                      start: Optional[date] = None):
+    """
+    Download OHLCV for `tickers`, yielding (batch tickers, {ticker: frame}) per batch.
+
+    With YF_ASYNC_DOWNLOAD_ENABLED the chart requests run concurrently on the
+    yf_async engine and are grouped into batches in completion order; tickers
+    it could not fetch are retried through yf.download().  Otherwise each batch
+    is one provider bulk_history() call (yf.download(threads=False) when live).
+    `start` takes precedence over `period`.
+    """
+    provider = get_provider()
+    if yf_async.enabled() and provider.async_bulk:
+        failed, done, frames = [], [], {}
+        for tkr, df in yf_async.stream(tickers, period=period, start=start):
+            _yf_track_call()
+            if df is None:
+                failed.append(tkr)       # yielded once, with the retry batches below
+                continue
+            done.append(tkr)
+            if not df.empty:
+                frames[tkr] = df
+            if len(done) == batch_size:
+                yield done, frames
+                done, frames = [], {}
+        if done:
+            yield done, frames
+        if failed:
+            logger.info("[Download] %d tickers failed on the async engine — retrying via yf.download",
+                        len(failed))
+        tickers = failed
+
+    for i in range(0, len(tickers), batch_size):
+        batch = tickers[i:i + batch_size]
+        frames = {}
+        try:
+            _yf_track_call()
+            frames = provider.bulk_history(batch, period=period, start=start)
+        except Exception as exc:
+            _yf_track_error(exc)
+            logger.warning("[Download] batch %d download error: %s", i // batch_size + 1, exc)
+        yield batch, frames
+
+
+def _refresh_one_incremental(ticker: str, period: str, asof: str) -> Optional[pd.DataFrame]:
+    """Extend one stale cached master series with only its missing bars; None → full download."""
+    try:
+        cached = _read_store_frame(price_store.MASTER, ticker)
+        start = _incremental_start(cached)
+        if start is None:
+            return None
+        _yf_track_call()
+        fresh = get_provider().history(ticker, start=start)
+        if fresh.empty:
+            return None
+        merged = _merge_incremental(cached, fresh, period)
+        if merged is None:
+            return None
+        _store_write(price_store.MASTER, {ticker: merged}, asof, {"period": period}, remember=True)
+        return merged
+    except Exception as exc:
+        _yf_track_error(exc)
+        logger.debug("get_historical(%s) incremental refresh failed: %s", ticker, exc)
+        return None
+
+
+def _refresh_batch_incremental(cached: dict, period: str,
+                               progress_cb=None) -> tuple[dict, list]:
+    """
+    Incrementally refresh many stale cached series with start-date batches.
+
+    Tickers are grouped by their re-download start date so each yf.download()
+    call fetches only a few bars per ticker.  Returns (merged frames, tickers
+    that need a full download).
+    """
+    batch_size = int(getattr(C, "PRICE_INCREMENTAL_BATCH_SIZE", 200))
+
+    merged_all: dict = {}
+    need_full: list = []
+    by_start: dict = {}
+    for tkr, df in cached.items():
+        start = _incremental_start(df)
+        if start is None:
+            need_full.append(tkr)
+        else:
+            by_start.setdefault(start, []).append(tkr)
+
+    total = sum(-(-len(tks) // batch_size) for tks in by_start.values())
+    bi = 0
+    for start in sorted(by_start):
+        for batch, fresh_frames in _download_batches(by_start[start], batch_size, start=start):
+            bi += 1
+            if progress_cb:
+                progress_cb(min(bi, total), total,
+                            f"Incremental refresh {bi}/{total} ({len(batch)} tickers since {start})")
+            for tkr in batch:
+                merged = _merge_incremental(cached[tkr], fresh_frames.get(tkr), period)
+                if merged is None:
+                    need_full.append(tkr)
+                else:
+                    merged_all[tkr] = merged
+
+    logger.info("[Incremental] %d series extended, %d need full download",
+                len(merged_all), len(need_full))
+    return merged_all, need_full
+
+
 def get_bulk_historical(tickers: list, period: str = "1y",
                         batch_size: int = None,
-                        sleep_sec: float = 2.0,
                         progress_cb=None) -> dict:
     """
     Batch download OHLCV for multiple tickers.
     Returns dict[ticker] -> DataFrame.
-    Downloads in batches to respect rate limits.
+    Downloads in batches (see _download_batches), paced by the shared yf_limiter.
 
     Args:
         progress_cb: optional callable(done: int, total: int, msg: str) called after each batch
@@ -1180,101 +1386,55 @@ def get_bulk_historical(tickers: list, period: str = "1y",
         batch_size = C.RS_BATCH_SIZE
 
     result = {}
-    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    n_batches = -(-len(tickers) // batch_size)
     downloaded_count = 0
 
-    for i, batch in enumerate(batches):
-        try:
-            _yf_track_call()
-            raw = yf.download(
-                tickers=batch,
-                period=period,
-                interval="1d",
-                auto_adjust=True,
-                threads=False,   # threads=True causes 'dict changed size during iteration' race condition
-                progress=False,
-            )
-            if raw is None or raw.empty:
-                continue
-
-            # Handle single vs multi-ticker column structure
-            if len(batch) == 1:
-                tkr = batch[0]
-                if isinstance(raw.columns, pd.MultiIndex):
-                    raw.columns = raw.columns.get_level_values(0)
-                if raw.index.tzinfo is not None:
-                    raw.index = raw.index.tz_localize(None)
-                result[tkr] = raw[["Open", "High", "Low", "Close", "Volume"]].dropna()
-            else:
-                for tkr in batch:
-                    try:
-                        if isinstance(raw.columns, pd.MultiIndex):
-                            df_t = raw.xs(tkr, axis=1, level=1)
-                        else:
-                            df_t = raw[[c for c in raw.columns
-                                        if tkr in str(c)]].copy()
-                            df_t.columns = [c.split("_")[0] for c in df_t.columns]
-                        if df_t.index.tzinfo is not None:
-                            df_t.index = df_t.index.tz_localize(None)
-                        df_t = df_t.dropna(how="all")
-                        if not df_t.empty:
-                            result[tkr] = df_t[["Open", "High", "Low",
-                                                 "Close", "Volume"]].dropna()
-                    except Exception:
-                        continue
-        except Exception as exc:
-            _yf_track_error(exc)
-            logger.warning(f"Batch download error (batch {i}): {exc}")
-
-        downloaded_count += len(batch)
+    for i, (batch, frames) in enumerate(_download_batches(tickers, batch_size, period=period)):
+        result.update(frames)
+        downloaded_count = min(len(tickers), downloaded_count + len(batch))
         if progress_cb is not None:
             try:
                 progress_cb(downloaded_count, len(tickers),
-                            f"批次 {i+1}/{len(batches)}: {downloaded_count}/{len(tickers)} tickers 下載完成")
+                            f"批次 {min(i+1, n_batches)}/{n_batches}: {downloaded_count}/{len(tickers)} tickers 下載完成")
             except Exception:
                 pass
 
-        if i < len(batches) - 1:
-            time.sleep(sleep_sec)
-
     return result
 
 
-def _rehydrate_fundamentals(raw: dict, ticker: str) -> dict:
-    """Convert cached JSON fundamentals payload into runtime dict/DataFrame shape."""
-    data = dict(raw or {})
-    data.setdefault("ticker", ticker.upper())
-    data.setdefault("info", {})
-
-    for key in (
-        "quarterly_eps", "earnings_surprise", "eps_revisions",
-        "eps_trend", "institutional_holders", "insider_transactions",
-        "analyst_targets", "quarterly_revenue",
-    ):
-        val = data.get(key)
-        if isinstance(val, list):
-            data[key] = pd.DataFrame(val) if val else pd.DataFrame()
-        elif isinstance(val, pd.DataFrame):
-            pass
-        else:
-            data[key] = pd.DataFrame()
-    return data
-
-
-def _load_db_fundamentals_cache(ticker: str) -> dict | None:
-    """Best-effort DuckDB fundamentals cache read; returns rehydrated dict or None."""
-    if not getattr(C, "DB_ENABLED", False):
-        return None
-    try:
-        from modules import db
-        cached = db.fund_cache_get(ticker)
-        if cached and cached.get("info"):
-            return _rehydrate_fundamentals(cached, ticker)
-    except Exception as exc:
-        logger.debug("get_fundamentals(%s) DB cache read failed: %s", ticker, exc)
-    return None
+# get_fundamentals() result key → provider field (modules/data_providers.FUNDAMENTAL_FIELDS)
+_FUND_FIELDS = {
+    "info":                  "info",
+    "quarterly_eps":         "quarterly_income_stmt",
+    "earnings_surprise":     "earnings_history",
+    "eps_revisions":         "eps_revisions",
+    "eps_trend":             "eps_trend",
+    "institutional_holders": "institutional_holders",
+    "insider_transactions":  "insider_transactions",
+    "analyst_targets":       "analyst_price_targets",
+}
+# Endpoints used in SEPA pillar scoring (get_fundamentals(scan_mode=True))
+_FUND_SCAN_FIELDS = ("info", "earnings_surprise", "institutional_holders",
+                     "insider_transactions")
+
+
+def _fundamentals_result(ticker: str, values: dict, source: str, quality: str) -> dict:
+    """Assemble the get_fundamentals() dict from per-field values."""
+    result = {"ticker": ticker.upper(), "info": {}}
+    for key in _FUND_FIELDS:
+        if key != "info":
+            result[key] = pd.DataFrame()
+    result["quarterly_revenue"] = pd.DataFrame()
+    result.update({k: v for k, v in values.items() if v is not None})
+    qi = result["quarterly_eps"]
+    if isinstance(qi, pd.DataFrame) and "Total Revenue" in qi.index:
+        result["quarterly_revenue"] = qi.loc[["Total Revenue"]]
+    result["fundamentals_source"] = source
+    result["fundamentals_quality"] = quality
+    return result
 
 
+@_coalesced("fundamentals")
 def get_fundamentals(ticker: str, use_cache: bool = True,
                      scan_mode: bool = False) -> dict:
     """
@@ -1282,208 +1442,90 @@ def get_fundamentals(ticker: str, use_cache: bool = True,
     Returns a single dict with keys from multiple data sources:
       info, quarterly_eps, earnings_surprise, eps_revisions,
       institutional_holders, insider_transactions, analyst_targets
-    Caches to JSON for up to FUNDAMENTALS_CACHE_DAYS to avoid repeated API calls.
+    Each field is cached in modules/fundamentals_store.py with its own TTL
+    (FUNDAMENTALS_FIELD_TTL_DAYS); only expired fields are re-fetched.
 
     Args:
         ticker:    Stock ticker symbol
-        use_cache: Check local file/DB cache before fetching
+        use_cache: Check the fundamentals store before fetching
         scan_mode: If True, only fetch endpoints used in SEPA pillar scoring
                    (.info, .get_earnings_history, .get_institutional_holders,
                     .get_insider_transactions) — skips 4 unused endpoints
                    to halve the yfinance API calls per ticker.
                    Full fetch is used for deep single-stock analysis.
+
+    Concurrent calls with the same arguments share one fetch (single-flight).
     """
-    cache_file = PRICE_CACHE_DIR / f"{ticker.upper()}_fundamentals.json"
-    meta_file  = cache_file.with_suffix(".fmeta")
-    today_str  = date.today().isoformat()
-    stale_fallback = None
+    wanted = _FUND_SCAN_FIELDS if scan_mode else tuple(_FUND_FIELDS)
     stale_max_days = int(getattr(C, "FUNDAMENTALS_STALE_FALLBACK_DAYS", 7))
     use_stale_fallback = bool(getattr(C, "FUNDAMENTALS_USE_STALE_FALLBACK", True))
 
-    # ── Try reading cache ────────────────────────────────────────────────
-    if use_cache and cache_file.exists() and meta_file.exists():
-        try:
-            cache_date = meta_file.read_text().strip()
-            cached_dt  = date.fromisoformat(cache_date)
-            raw = json.loads(cache_file.read_text(encoding="utf-8"))
-            cache_age_days = (date.today() - cached_dt).days
-            if cache_age_days < getattr(C, "FUNDAMENTALS_CACHE_DAYS", 1):
-                # If cached info is empty, the cache was written during an auth failure.
-                # Delete the stale files now and fall through to re-fetch.
-                if not raw.get("info"):
-                    logger.warning(
-                        "[Cache STALE] get_fundamentals(%s) — cached info is empty "
-                        "(likely prior 401). Deleting and re-fetching.", ticker
-                    )
-                    try:
-                        cache_file.unlink(missing_ok=True)
-                        meta_file.unlink(missing_ok=True)
-                    except Exception:
-                        pass
-                else:
-                    hydrated = _rehydrate_fundamentals(raw, ticker)
-                    hydrated["fundamentals_source"] = "cache_fresh"
-                    hydrated["fundamentals_quality"] = "ok"
-                    logger.debug("[Cache HIT] get_fundamentals(%s) from cache", ticker)
-                    return hydrated
-            elif use_stale_fallback and cache_age_days <= stale_max_days and raw.get("info"):
-                stale_fallback = _rehydrate_fundamentals(raw, ticker)
-                stale_fallback["fundamentals_source"] = "cache_stale"
-                stale_fallback["fundamentals_quality"] = "stale"
-                stale_fallback["stale_age_days"] = cache_age_days
-                logger.debug(
-                    "get_fundamentals(%s) stale cache retained for fallback (age=%sd)",
-                    ticker,
-                    cache_age_days,
-                )
-        except Exception:
-            pass
-
-    if stale_fallback is None and use_cache and use_stale_fallback:
-        stale_fallback = _load_db_fundamentals_cache(ticker)
-        if stale_fallback is not None:
-            stale_fallback["fundamentals_source"] = "db_cache_stale"
-            stale_fallback["fundamentals_quality"] = "stale"
-            stale_fallback["stale_age_days"] = None
-
-    # ── Fetch from yfinance ── (retry with exponential backoff on 401/crumb error) ─────────────
+    # ── Try the store ────────────────────────────────────────────────────
+    stored = fundamentals_store.read(ticker) if use_cache else {}
+    fresh = {k: e.value for k, e in stored.items() if e.fresh}
+    if not fresh.get("info"):
+        fresh.pop("info", None)
+    to_fetch = [k for k in wanted if k not in fresh]
+    if not to_fetch:
+        logger.debug("[Cache HIT] get_fundamentals(%s) from store", ticker)
+        return _fundamentals_result(ticker, fresh, "cache_fresh", "ok")
+
+    # ── Fetch expired fields from yfinance ── (retry with exponential backoff on 401/crumb error)
     max_retries = getattr(C, "YFINANCE_MAX_RETRIES", 1)
     retry_backoff = getattr(C, "YFINANCE_RETRY_BACKOFF", 0.5)
-    timeout_sec = getattr(C, "FUNDAMENTALS_TIMEOUT_SEC", 5.0)
-    skip_on_timeout = getattr(C, "FUNDAMENTALS_SKIP_ON_TIMEOUT", True)
 
     # Acquire semaphore BEFORE yfinance calls — limits parallel fundamental
     # requests across all threads to FUNDAMENTALS_MAX_CONCURRENT (default 4).
     # This prevents 429/401 rate-limit cascades when SEPA + QM Stage 3 run
     # concurrently in combined scan (otherwise up to 12 threads × 6 requests each).
+    fetched: dict = {}
     with _get_fundamentals_sem():
       for _attempt in range(max_retries + 1):
-        result = {
-            "ticker": ticker.upper(),
-            "info": {},
-            "quarterly_eps": pd.DataFrame(),
-            "earnings_surprise": pd.DataFrame(),
-            "eps_revisions": pd.DataFrame(),
-            "eps_trend": pd.DataFrame(),
-            "institutional_holders": pd.DataFrame(),
-            "insider_transactions": pd.DataFrame(),
-            "analyst_targets": pd.DataFrame(),
-            "quarterly_revenue": pd.DataFrame(),
-        }
+        fetched = {}
         _retry = False
         try:
             _yf_track_call()
-            tkr = yf.Ticker(ticker)
+            provider = get_provider()
 
             # .info — price, valuation, margins, ROE, SMA50/200, etc.
-            try:
-                info = tkr.info or {}
-                result["info"] = info
-            except Exception as _inf_exc:
-                _yf_track_error(_inf_exc)
-                if _attempt == 0 and _is_crumb_error(_inf_exc):
+            if "info" in to_fetch:
+                try:
+                    fetched["info"] = provider.fundamentals(ticker, "info") or {}
+                except Exception as _inf_exc:
+                    _yf_track_error(_inf_exc)
+                    if _attempt == 0 and _is_crumb_error(_inf_exc):
+                        logger.debug(
+                            f"get_fundamentals({ticker}) crumb/401 on .info (attempt {_attempt + 1}) — resetting session"
+                        )
+                        _reset_yf_crumb()
+                        _retry = True
+
+                # yfinance 1.2.0 silently returns {} on 401 without raising.
+                # If info is empty on the first attempt, try once more (not necessarily a crumb error).
+                if not _retry and not fetched.get("info") and _attempt == 0:
                     logger.debug(
-                        f"get_fundamentals({ticker}) crumb/401 on .info (attempt {_attempt + 1}) — resetting session"
+                        f"get_fundamentals({ticker}) .info is empty on attempt {_attempt + 1} — "
+                        "this is normal for some tickers (e.g. delisted, micro-cap)"
                     )
                     _reset_yf_crumb()
                     _retry = True
-                pass
 
-            # yfinance 1.2.0 silently returns {} on 401 without raising.
-            # If info is empty on the first attempt, try once more (not necessarily a crumb error).
-            if not _retry and not result["info"] and _attempt == 0:
-                logger.debug(
-                    f"get_fundamentals({ticker}) .info is empty on attempt {_attempt + 1} — "
-                    "this is normal for some tickers (e.g. delisted, micro-cap)"
-                )
-                _reset_yf_crumb()
-                _retry = True
+                if _retry:
+                    # Exponential backoff before retry
+                    if _attempt < max_retries:
+                        delay = retry_backoff * (2 ** _attempt)
+                        time.sleep(delay)
+                        continue
+                    else:
+                        break
 
-            if _retry:
-                # Exponential backoff before retry
-                if _attempt < max_retries:
-                    delay = retry_backoff * (2 ** _attempt)
-                    time.sleep(delay)
+            # Remaining expired endpoints; a failed one is simply left out
+            for key in to_fetch:
+                if key == "info":
                     continue
-                else:
-                    break
-
-            if result.get("info"):
-                result["fundamentals_source"] = "live"
-                result["fundamentals_quality"] = "ok"
-            else:
-                result["fundamentals_source"] = "live_empty"
-                result["fundamentals_quality"] = "degraded"
-
-            # Quarterly income statement (for EPS acceleration detection)
-            # scan_mode: SKIP — not used in SEPA pillar scoring
-            if not scan_mode:
-                try:
-                    qi = tkr.quarterly_income_stmt
-                    if qi is not None and not qi.empty:
-                        result["quarterly_eps"] = qi
-                except Exception:
-                    pass
-
-            # Earnings history (EPS surprise data)
-            try:
-                eh = tkr.get_earnings_history()
-                if eh is not None and not eh.empty:
-                    result["earnings_surprise"] = eh
-            except Exception:
-                pass
-
-            # EPS revisions (analyst upgrades/downgrades of estimates)
-            # scan_mode: SKIP — not used in SEPA pillar scoring
-            if not scan_mode:
-                try:
-                    er = tkr.get_eps_revisions()
-                    if er is not None and not er.empty:
-                        result["eps_revisions"] = er
-                except Exception:
-                    pass
-
-                # EPS trend over time
-                try:
-                    et = tkr.get_eps_trend()
-                    if et is not None and not et.empty:
-                        result["eps_trend"] = et
-                except Exception:
-                    pass
-
-            # Institutional holders
-            try:
-                ih = tkr.get_institutional_holders()
-                if ih is not None and not ih.empty:
-                    result["institutional_holders"] = ih
-            except Exception:
-                pass
-
-            # Insider transactions
-            try:
-                it = tkr.get_insider_transactions()
-                if it is not None and not it.empty:
-                    result["insider_transactions"] = it
-            except Exception:
-                pass
-
-            # Analyst price targets
-            # scan_mode: SKIP — not used in SEPA pillar scoring
-            #   (price targets in scoring come from .info["targetMeanPrice"])
-            if not scan_mode:
-                try:
-                    at = tkr.analyst_price_targets
-                    if at is not None and not at.empty:
-                        result["analyst_targets"] = at
-                except Exception:
-                    pass
-
-                # Quarterly revenue from income statement
                 try:
-                    if not result["quarterly_eps"].empty:
-                        qi = result["quarterly_eps"]
-                        if "Total Revenue" in qi.index:
-                            result["quarterly_revenue"] = qi.loc[["Total Revenue"]]
+                    value = provider.fundamentals(ticker, _FUND_FIELDS[key])
+                    fetched[key] = value if isinstance(value, pd.DataFrame) else pd.DataFrame()
                 except Exception:
                     pass
 
@@ -1514,7 +1556,8 @@ def get_fundamentals(ticker: str, use_cache: bool = True,
                     continue
                 break
 
-    if not result.get("info"):
+    info = fetched.get("info") or fresh.get("info")
+    if not info:
         free_fallback = _compose_free_fundamentals_fallback(ticker)
         if free_fallback is not None:
             logger.info(
@@ -1524,77 +1567,118 @@ def get_fundamentals(ticker: str, use_cache: bool = True,
             )
             return free_fallback
 
-    if not result.get("info") and stale_fallback is not None:
-
-        logger.info(
-            "get_fundamentals(%s): live info empty, using stale fallback (%s)",
-            ticker,
-            stale_fallback.get("fundamentals_source", "cache_stale"),
-        )
-        return stale_fallback
+        stale_info = stored.get("info")
+        if (use_stale_fallback and stale_info is not None and stale_info.value
+                and stale_info.age_days <= stale_max_days):
+            logger.info("get_fundamentals(%s): live info empty, using stale fallback "
+                        "(age=%sd)", ticker, stale_info.age_days)
+            values = {k: e.value for k, e in stored.items()}
+            values.update({k: v for k, v in fetched.items() if k != "info"})
+            result = _fundamentals_result(ticker, values, "cache_stale", "stale")
+            result["stale_age_days"] = stale_info.age_days
+            return result
 
-    # ── Save to cache ────────────────────────────────────────────────────
-    # Do NOT cache if info is empty — likely an auth failure.
-    # Caching bad data would cause repeated auth warnings on every subsequent request.
-    if not result.get("info"):
+        # Do NOT store anything — empty info is likely an auth failure, and
+        # the other endpoints answer empty for the same reason.
         logger.debug(
-            f"get_fundamentals({ticker}) — skipping cache write (empty info, possible auth failure)"
+            f"get_fundamentals({ticker}) — skipping store write (empty info, possible auth failure)"
         )
-    else:
-        try:
-            def _to_serialisable(v):
-                if isinstance(v, pd.DataFrame):
-                    if v.empty:
-                        return []
-                    return json.loads(v.to_json(orient="records", date_format="iso",
-                                                default_handler=str))
-                if isinstance(v, pd.Series):
-                    return v.tolist()
-                return v
-
-            cache_data = {k: _to_serialisable(v) for k, v in result.items()}
-            cache_file.write_text(
-                json.dumps(cache_data, ensure_ascii=False, default=str),
-                encoding="utf-8")
-            meta_file.write_text(today_str)
-            logger.debug("[Cache SAVE] get_fundamentals(%s)", ticker)
-        except Exception as exc:
-            logger.debug(f"Could not save fundamentals cache for {ticker}: {exc}")
-
-    # ── Also persist to DuckDB fundamentals_cache (background, non-blocking) ───────────
-    if getattr(C, "DB_ENABLED", False):
-        _bg_args = (ticker, result.copy())
-        threading.Thread(
-            target=_bg_fund_cache_set,
-            args=_bg_args,
-            daemon=True,
-            name=f"fund_cache_{ticker}",
-        ).start()
+        return _fundamentals_result(ticker, fetched, "live_empty", "degraded")
 
-    return result
+    # ── Save to the store ─────────────────────────────────────────────────
+    # Empty tables are not stored: yfinance also answers empty on a silent 401,
+    # so they are simply asked for again next time.
+    try:
+        fundamentals_store.put(ticker, {k: v for k, v in fetched.items()
+                                        if not (isinstance(v, pd.DataFrame) and v.empty)})
+        logger.debug("[Cache SAVE] get_fundamentals(%s) %s", ticker, sorted(fetched))
+    except Exception as exc:
+        logger.debug(f"Could not save fundamentals for {ticker}: {exc}")
+
+    # Expired values fill endpoints that failed this time
+    values = {k: e.value for k, e in stored.items()}
+    values.update(fresh)
+    values.update(fetched)
+    return _fundamentals_result(ticker, values, "live", "ok")
+
+
+# ─── Fundamentals prefetch ────────────────────────────────────────────────────
+# Stage 2 hands each survivor to prefetch_fundamentals() as soon as it passes,
+# so the scan_mode fetches Stage 3 needs run in the background while the rest
+# of Stage 2 is still validating.  A Stage 3 call for a ticker whose prefetch
+# is in flight joins it (single-flight); one that already finished is a store hit.
+_prefetch_lock = threading.Lock()
+_prefetch_pool = None
+_prefetch_futures: dict = {}     # TICKER → Future (queued or running)
+_prefetch_stats = {"queued": 0, "skipped_fresh": 0, "done": 0, "cancelled": 0}
 
 
-def _bg_fund_cache_set(ticker: str, data: dict):
-    """Background worker: store fundamentals result in DuckDB cache."""
+def _prefetch_one(ticker: str, scan_mode: bool) -> None:
     try:
-        import trader_config as _C
-        if not getattr(_C, "DB_ENABLED", False):
-            return
-        from modules import db
-        # Serialize DataFrames to JSON-safe dicts before storing
-        safe = {}
-        for k, v in data.items():
-            if isinstance(v, pd.DataFrame):
-                safe[k] = [] if v.empty else json.loads(
-                    v.to_json(orient="records", date_format="iso", default_handler=str))
-            elif isinstance(v, pd.Series):
-                safe[k] = v.tolist()
-            else:
-                safe[k] = v
-        db.fund_cache_set(ticker, safe)
-        logger.debug("[data_pipeline] DuckDB fund_cache_set(%s) done", ticker)
+        get_fundamentals(ticker, scan_mode=scan_mode)
     except Exception as exc:
-        logger.debug("[data_pipeline] _bg_fund_cache_set(%s) failed: %s", ticker, exc)
+        logger.debug("prefetch_fundamentals(%s) failed: %s", ticker, exc)
+    finally:
+        with _prefetch_lock:
+            _prefetch_futures.pop(ticker.upper(), None)
+            _prefetch_stats["done"] += 1
+
+
+def prefetch_fundamentals(tickers, scan_mode: bool = True) -> int:
+    """
+    Queue background get_fundamentals() for `tickers` whose fields are not
+    already fresh in the store.  Returns how many were queued.
+    No-op when FUNDAMENTALS_PREFETCH_ENABLED is False.
+    """
+    global _prefetch_pool
+    if not getattr(C, "FUNDAMENTALS_PREFETCH_ENABLED", True):
+        return 0
+    fields = _FUND_SCAN_FIELDS if scan_mode else tuple(_FUND_FIELDS)
+    queued = 0
+    for ticker in tickers:
+        key = ticker.upper()
+        with _prefetch_lock:
+            if key in _prefetch_futures:
+                continue
+        try:
+            if not fundamentals_store.missing(ticker, fields):
+                with _prefetch_lock:
+                    _prefetch_stats["skipped_fresh"] += 1
+                continue
+        except Exception:
+            pass
+        with _prefetch_lock:
+            if key in _prefetch_futures:
+                continue
+            if _prefetch_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                workers = int(getattr(C, "FUNDAMENTALS_PREFETCH_WORKERS",
+                                      getattr(C, "FUNDAMENTALS_MAX_CONCURRENT", 4)))
+                _prefetch_pool = ThreadPoolExecutor(max_workers=max(1, workers),
+                                                    thread_name_prefix="fund_prefetch")
+            _prefetch_futures[key] = _prefetch_pool.submit(_prefetch_one, ticker, scan_mode)
+            _prefetch_stats["queued"] += 1
+            queued += 1
+    return queued
+
+
+def cancel_prefetch() -> int:
+    """Drop prefetches that have not started yet (scan cancelled).  Returns how many."""
+    with _prefetch_lock:
+        pending = list(_prefetch_futures.items())
+    n = 0
+    for key, fut in pending:
+        if fut.cancel():
+            n += 1
+            with _prefetch_lock:
+                _prefetch_futures.pop(key, None)
+                _prefetch_stats["cancelled"] += 1
+    return n
+
+
+def get_prefetch_status() -> dict:
+    with _prefetch_lock:
+        return {**_prefetch_stats, "pending": len(_prefetch_futures)}
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1606,10 +1690,31 @@ def _bg_fund_cache_set(ticker: str, data: dict):
 _MINERVINI_STUDY = None
 _STUDY_TRIED = False
 
+def _pandas_ta():
+    """Import pandas_ta on first use; None if it is not installed or fails to import."""
+    global ta, PTA_AVAILABLE
+    if ta is None and PTA_AVAILABLE:
+        try:
+            import pandas_ta as _ta
+            ta = _ta
+        except Exception as exc:
+            PTA_AVAILABLE = False
+            logger.warning(f"pandas_ta import failed, using NumPy kernels: {exc}")
+    return ta
+
+
+def _technicals_backend() -> str:
+    """Configured get_technicals() backend ("numpy" | "pandas_ta")."""
+    backend = getattr(C, "TECHNICALS_BACKEND", "numpy")
+    if backend == "pandas_ta" and _pandas_ta() is None:
+        return "numpy"
+    return backend
+
+
 def _build_study():
     """Build the pandas_ta Strategy object (if supported by installed version)."""
     global _MINERVINI_STUDY, _STUDY_TRIED
-    if not PTA_AVAILABLE or _STUDY_TRIED:
+    if _pandas_ta() is None or _STUDY_TRIED:
         return
     _STUDY_TRIED = True
     try:
@@ -1638,7 +1743,8 @@ def _build_study():
         _MINERVINI_STUDY = None
 
 
-def get_technicals(df: pd.DataFrame, indicators: list[str] | None = None) -> pd.DataFrame:
+def get_technicals(df: pd.DataFrame, indicators: list[str] | None = None,
+                   backend: str | None = None) -> pd.DataFrame:
     """
     Compute technical indicators on an OHLCV DataFrame.
 
@@ -1646,55 +1752,37 @@ def get_technicals(df: pd.DataFrame, indicators: list[str] | None = None) -> pd.
         df: OHLCV DataFrame
         indicators: None (compute all) | list of indicator names (selective computation)
                    Examples: ["EMA_9", "EMA_21"], ["SMA_50", "SMA_150", "SMA_200"], etc.
+        backend:   "numpy" (modules/indicators.py kernels) | "pandas_ta";
+                   None → C.TECHNICALS_BACKEND.  Both emit the same columns.
                    
     Optimization: Pass indicators list to compute only needed columns (3-5x faster).
     - Gap Scanner: ["EMA_9", "EMA_21"]
     - Gainer Scanner: [] (OHLCV only, no indicators needed)
     - Leader Scanner: None (compute all, for full ML scoring)
+    Selective columns come from a LazyFrame (modules/lazy_frame.py), so they
+    equal the full-mode values; unknown names are skipped.  To pay only for
+    the columns actually read, wrap the frame in LazyFrame directly.
 
     Returns the enriched DataFrame (full or selective).
     """
-    if not PTA_AVAILABLE or df is None or df.empty:
+    if df is None or df.empty:
         return df
 
-    df = df.copy()
-    
     # ── Selective computation mode (faster for ML scanners) ───────────────────
     if indicators is not None:
-        close = df.get("Close", df.iloc[:, 3] if len(df.columns) > 3 else None)
-        if close is None:
-            return df
-        
-        # Compute only requested indicators
-        for ind in indicators:
-            if ind.startswith("EMA_"):
-                length = int(ind.split("_")[1])
-                if ind not in df.columns:
-                    try:
-                        df[ind] = close.ewm(span=length, adjust=False).mean()
-                    except Exception:
-                        pass
-            elif ind.startswith("SMA_"):
-                length = int(ind.split("_")[1])
-                if ind not in df.columns:
-                    try:
-                        df[ind] = close.rolling(length).mean()
-                    except Exception:
-                        pass
-            elif ind == "RSI_14":
-                if ind not in df.columns:
-                    try:
-                        df.ta.rsi(length=14, append=True)
-                    except Exception:
-                        pass
-            elif ind == "ATR_14":
-                if ind not in df.columns:
-                    try:
-                        df.ta.atr(length=14, append=True)
-                    except Exception:
-                        pass
+        if "Close" not in df.columns:
+            return df.copy()
+        lazy = LazyFrame(df)
+        return lazy.to_frame(_computable(lazy, [c for c in indicators if c not in df.columns]))
+
+    backend = _technicals_backend() if backend is None else backend
+    if backend == "numpy":
+        return _numpy_technicals(df)
+    if _pandas_ta() is None:
         return df
-    
+
+    df = df.copy()
+
     # ── Full computation mode (all indicators, default for Minervini) ─────────
     _build_study()
 
@@ -1807,6 +1895,31 @@ def get_technicals(df: pd.DataFrame, indicators: list[str] | None = None) -> pd.
     return df
 
 
+def _computable(lazy: LazyFrame, names: list) -> list:
+    """The subset of `names` a LazyFrame can produce (computing each once)."""
+    ok = []
+    for name in names:
+        try:
+            lazy[name]
+            ok.append(name)
+        except Exception:
+            pass
+    return ok
+
+
+def _numpy_technicals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Full get_technicals() column set from the NumPy kernels.  Rows without a
+    close (gaps inside the series) are skipped, as if the bar did not exist.
+    Indicator columns already on `df` are recomputed.
+    """
+    if any(c not in df.columns for c in ("High", "Low", "Close")) \
+            or df["Close"].isna().all():
+        return df.copy()
+    stale = [c for c in kernels.TECHNICAL_COLUMNS if c in df.columns]
+    return LazyFrame(df.drop(columns=stale) if stale else df).to_frame()
+
+
 def _rename_ta_columns(df: pd.DataFrame):
     """Normalise pandas_ta column names across different versions."""
     rename = {}
@@ -1826,6 +1939,8 @@ def _rename_ta_columns(df: pd.DataFrame):
             rename[col] = f"BBU_{s.split('_')[1]}_2.0"
         elif s.startswith("BBB_"):
             rename[col] = f"BBB_{s.split('_')[1]}_2.0"
+        elif s.startswith("BBP_"):
+            rename[col] = f"BBP_{s.split('_')[1]}_2.0"
     df.rename(columns=rename, inplace=True)
 
 
@@ -1833,17 +1948,113 @@ def _rolling_slope_pct(series: pd.Series, window: int) -> pd.Series:
     """
     Compute the slope of a series as percentage change per day
     over a rolling `window`, using simple linear regression.
+    Closed-form cumulative-sum kernel (indicators.rolling_slope_pct).
+    """
+    values = kernels.rolling_slope_pct(series.to_numpy(dtype=float), window)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _enrich_master(df: pd.DataFrame, cached: Optional[pd.DataFrame] = None,
+                   state: Optional[pd.DataFrame] = None
+                   ) -> tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """
+    Full indicator set for a master OHLCV series.
+
+    When the ticker's previously enriched frame and its indicator state are
+    given, only the bars added since are computed (indicator_engine);
+    otherwise get_technicals() runs over the whole history.
+    Returns (enriched, indicator state for the next refresh or None).
+    """
+    if cached is not None and state is not None \
+            and getattr(C, "INDICATOR_INCREMENTAL_ENABLED", True):
+        try:
+            out = indicator_engine.extend(cached, state, df)
+            if out is not None:
+                return out
+        except Exception as exc:
+            logger.debug("[Indicators] incremental extend failed — full recompute: %s", exc)
+    enriched = get_technicals(df)
+    return enriched, indicator_engine.seed_state(enriched)
+
+
+def enrich_panel(frames: dict) -> "panel.Panel":
+    """
+    Panel mode of get_technicals(): all tickers' OHLCV aligned as dates ×
+    tickers arrays (with a validity mask) and enriched in a few vectorised
+    passes.  Returns a read-only mapping {ticker: enriched DataFrame} whose
+    frames are built on first access; see modules/panel.py.
+    """
+    return panel.build_panel(frames)
+
+
+def _enrich_full(raw_frames: dict, workers: int = 32) -> tuple[dict, dict]:
+    """
+    Full indicator computation for many tickers — panel mode in chunks of
+    PANEL_CHUNK_TICKERS, or per-frame get_technicals() for small batches.
+    Returns (enriched frames, indicator state frames).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    keys = list(raw_frames)
+    if getattr(C, "PANEL_ENRICH_ENABLED", True) \
+            and len(keys) >= int(getattr(C, "PANEL_MIN_TICKERS", 8)):
+        chunk = max(1, int(getattr(C, "PANEL_CHUNK_TICKERS", 500)))
+        bars = indicator_engine.state_bars()
+        enriched, states = {}, {}
+        try:
+            for i in range(0, len(keys), chunk):
+                p = enrich_panel({t: raw_frames[t] for t in keys[i:i + chunk]})
+                for tkr in p:
+                    enriched[tkr] = p[tkr]
+                    state = p.state(tkr, bars)
+                    if state is not None:
+                        states[tkr] = state
+            return enriched, states
+        except Exception as exc:
+            logger.warning("[Panel] vectorised enrichment failed — per-ticker fallback: %s", exc)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        computed = dict(zip(keys, executor.map(_enrich_master, raw_frames.values())))
+    enriched = {t: e for t, (e, _s) in computed.items()}
+    states = {t: st for t, (_e, st) in computed.items() if st is not None}
+    return enriched, states
+
+
+def _enrich_masters(raw_frames: dict, workers: int = 32) -> tuple[dict, dict]:
     """
-    def slope(arr):
-        if len(arr) < 2 or np.isnan(arr).any():
-            return np.nan
-        x = np.arange(len(arr), dtype=float)
-        y = np.array(arr, dtype=float)
-        slope_val = np.polyfit(x, y, 1)[0]
-        base = y[0] if y[0] != 0 else 1.0
-        return slope_val / base * 100   # % per day
+    Full indicator set for many master series.  Each ticker resumes from its
+    stored enriched frame and indicator state when possible; the rest are
+    recomputed together by _enrich_full().
+    Returns (enriched frames, state frames).
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-    return series.rolling(window).apply(slope, raw=True)
+    keys = list(raw_frames)
+    enriched, new_states = {}, {}
+    if keys and getattr(C, "INDICATOR_INCREMENTAL_ENABLED", True):
+        cached = price_store.read_frames(price_store.MASTER_ENRICHED, keys)
+        states = price_store.read_frames(price_store.INDICATOR_STATE, keys)
+
+        def _extend(tkr):
+            try:
+                return indicator_engine.extend(cached.get(tkr.upper()),
+                                               states.get(tkr.upper()), raw_frames[tkr])
+            except Exception as exc:
+                logger.debug("[Indicators] %s incremental extend failed — full recompute: %s", tkr, exc)
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for tkr, out in zip(keys, executor.map(_extend, keys)):
+                if out is not None:
+                    enriched[tkr], new_states[tkr] = out
+
+    todo = {t: raw_frames[t] for t in keys if t not in enriched}
+    if todo:
+        full, full_states = _enrich_full(todo, workers)
+        enriched.update(full)
+        new_states.update(full_states)
+    enriched = {t: e for t, e in enriched.items() if e is not None and not e.empty}
+    return enriched, new_states
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1852,7 +2063,8 @@ def _rolling_slope_pct(series: pd.Series, window: int) -> pd.Series:
 
 def get_enriched(ticker: str, period: str = "2y",
                  use_cache: bool = True,
-                 indicators: list[str] | None = None) -> pd.DataFrame:
+                 indicators: list[str] | None = None,
+                 lazy: bool = False) -> pd.DataFrame:
     """
     Get OHLCV + technical indicators in one call.
     Returns DataFrame ready for trend template validation and VCP detection.
@@ -1863,262 +2075,258 @@ def get_enriched(ticker: str, period: str = "2y",
         use_cache: Use parquet cache (default True)
         indicators: None (compute all) | list (compute selective)
                    Example: ["EMA_9", "EMA_21"] for Gap Scanner
-
-    Cache strategy (two-tier):
-      1. _enriched.parquet — pre-computed indicators, fast read (no recompute)
-      2. Raw .parquet — download if needed, compute indicators, save enriched
-    The enriched cache is valid for the current calendar day only.
+        lazy: return a LazyFrame (modules/lazy_frame.py) whose indicator
+              columns are computed when first read.  Like `indicators`, the
+              slow path then skips the full enrichment and its cache write.
+
+    Cache strategy (two-tier, both in the consolidated price store):
+      1. "master_enriched" dataset — pre-computed indicators, fast read
+      2. "master" raw dataset — download if needed, compute indicators, save enriched
+    Indicators are always computed on the full master series and the result
+    is sliced to `period`, so e.g. SMA_150 agrees across 6mo / 1y / 2y callers.
+    Cached frames are fresh while they contain the last completed US session
+    (modules/trading_calendar), so weekends and holidays don't force a refresh.
     If use_cache=False, skip both caches and force a fresh yfinance download.
     """
-    today = date.today().isoformat()
-    enriched_file = PRICE_CACHE_DIR / f"{ticker.upper()}_{period}_enriched.parquet"
-    enriched_meta = enriched_file.with_suffix(".meta")
+    asof = trading_calendar.cache_asof()
+    enriched_ds = price_store.MASTER_ENRICHED
+    partial = lazy or indicators is not None
 
-    # Fast path: pre-computed enriched parquet (valid today)
-    if use_cache and enriched_file.exists() and enriched_meta.exists():
+    # Fast path: pre-computed enriched frame (fresh for the last completed session)
+    entry = price_store.get_entry(enriched_ds, ticker) if use_cache else None
+    if entry and entry.get("asof") == asof and entry.get("rows", 0) > 0 \
+            and _covers(entry, period):
         try:
-            if enriched_meta.read_text().strip() == today:
-                df = pd.read_parquet(enriched_file)
-                if not df.empty:
-                    # If indicators requested, return only those columns
-                    if indicators is not None:
-                        cols_to_keep = ["Open", "High", "Low", "Close", "Volume"]
-                        cols_to_keep += [c for c in indicators if c in df.columns]
-                        return df[cols_to_keep]
-                    return df
+            df = _read_store_frame(enriched_ds, ticker, entry)
+            if df is not None and not df.empty:
+                if partial:
+                    return _partial_view(df, period, indicators, lazy)
+                return _period_view(df, period)
         except Exception:
             pass
 
     # Slow path: download (or read raw cache) + compute + save enriched
-    df = get_historical(ticker, period=period, use_cache=use_cache)
+    df, master = _load_master(ticker, period, use_cache=use_cache)
     if df.empty:
         return df
-    
-    # Compute technicals (selective or full)
-    df_enriched = get_technicals(df, indicators=indicators)
+    # Selective / lazy mode: compute only what is read, don't cache the
+    # partial enriched frame.
+    if partial:
+        return _partial_view(df, period, indicators, lazy)
+
+    # Full mode: compute (resuming from yesterday's enriched frame + indicator
+    # state when possible) and save enriched.
+    if use_cache:
+        cached = state = None
+        if getattr(C, "INDICATOR_INCREMENTAL_ENABLED", True):
+            cached = _read_store_frame(enriched_ds, ticker)
+            state = price_store.read_frame(price_store.INDICATOR_STATE, ticker)
+        df_enriched, state = _enrich_master(df, cached, state)
+        _store_write(enriched_ds, {ticker: df_enriched}, asof, {"period": master}, remember=True)
+        if state is not None:
+            _store_write(price_store.INDICATOR_STATE, {ticker: state}, asof)
+    else:
+        df_enriched = get_technicals(df)
 
-    # Save enriched only if computing all (full mode)
-    # For selective mode, don't cache the partial enriched file
-    if use_cache and indicators is None:
-        try:
-            df_enriched.to_parquet(enriched_file)
-            enriched_meta.write_text(today)
-        except Exception:
-            pass
+    return _period_view(df_enriched, period)
 
-    return df_enriched
 
+def _partial_view(master_df: pd.DataFrame, period: str,
+                  indicators: list[str] | None, lazy: bool):
+    """
+    `period` view of a master frame for get_enriched(lazy= / indicators=):
+    the LazyFrame itself, or OHLCV plus the requested indicator columns.
+    Indicators see the whole master history either way.
+    """
+    view = LazyFrame(master_df, rows=len(_slice_period(master_df, period)))
+    if lazy:
+        return view
+    return view.to_frame(_OHLCV_COLS + _computable(view, indicators), base=False)
 
-def batch_download_and_enrich(tickers: list, period: str = "2y",
-                              progress_cb=None) -> dict:
+
+def stream_download_and_enrich(tickers: list, period: str = "2y",
+                               progress_cb=None) -> Iterator[tuple]:
     """
-    Batch-download OHLCV for many tickers, enrich with technicals,
-    and save per-ticker parquet cache. Much faster than individual calls.
+    Streaming form of batch_download_and_enrich(): yields (ticker, enriched
+    DataFrame) as soon as each one is ready, so callers can validate while
+    later batches are still downloading.
 
-    Args:
-        tickers:     list of ticker strings
-        period:      yfinance period string (e.g. "2y")
-        progress_cb: optional callable(batch_num, total_batches, msg)
+    Cached tickers come first (enriched fast path, then raw-cached slow path
+    and incremental refresh).  Uncached tickers are downloaded on a background
+    thread that stays at most STAGE2_PREFETCH_BATCHES batches ahead of the
+    consumer; each batch is enriched and yielded as it arrives.  Closing the
+    generator early stops the download after the batch in flight.
 
-    Returns:
-        dict[ticker] -> enriched DataFrame  (only non-empty results)
+    Tickers are yielded in the caller's spelling, each frame being the trailing
+    `period` slice of the stored master series; failed tickers are not yielded.
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    
-    today = date.today().isoformat()
+    asof = trading_calendar.cache_asof()
     batch_size = getattr(C, "STAGE2_BATCH_SIZE", 50)
-    sleep_sec  = getattr(C, "STAGE2_BATCH_SLEEP", 1.5)
-    # 32 workers for parallel parquet I/O.
-    # Fast path (enriched cache): pure PyArrow read, GIL-releasing → 32 workers is highly effective.
-    # Slow path (first scan of day, raw cache): includes get_technicals() which is GIL-bound,
-    # but still benefits from I/O overlap. After first scan, enriched cache makes subsequent
-    # same-day scans ~10-20x faster (parquet read only, no recomputation).
-    cache_workers = 32  # Parallel cache I/O readers
-
-    # ── Step 1: Parallel cache load for all tickers ──────────────────────
-    result = {}
-    need_download = []
-    
-    def _load_cached_ticker(tkr: str) -> tuple[str, pd.DataFrame | None, bool]:
-        """Load single cached ticker from enriched cache (pre-computed indicators).
-        
-        Priority:
-          1. _enriched.parquet — pre-computed, fast read, no recomputation needed
-          2. raw .parquet — compute technicals once, save enriched for next scan
-
-        Returns (ticker, df_or_None, is_fast_path).
-        """
-        raw_file      = PRICE_CACHE_DIR / f"{tkr.upper()}_{period}.parquet"
-        enriched_file = PRICE_CACHE_DIR / f"{tkr.upper()}_{period}_enriched.parquet"
-        raw_meta      = raw_file.with_suffix(".meta")
-        enriched_meta = enriched_file.with_suffix(".meta")
-        try:
-            # Fast path: enriched parquet already has pre-computed indicators
-            if enriched_file.exists() and enriched_meta.exists():
-                if enriched_meta.read_text().strip() == today:
-                    df = pd.read_parquet(enriched_file)
-                    if not df.empty:
-                        return (tkr, df, True)
-            # Slow path: raw parquet — compute technicals then save enriched
-            if raw_file.exists() and raw_meta.exists():
-                if raw_meta.read_text().strip() == today:
-                    df_raw = pd.read_parquet(raw_file)
-                    if not df_raw.empty:
-                        df_enriched = get_technicals(df_raw)
-                        # Save enriched so next scan uses fast path
-                        try:
-                            df_enriched.to_parquet(enriched_file)
-                            enriched_meta.write_text(today)
-                        except Exception:
-                            pass
-                        return (tkr, df_enriched, False)
-        except Exception:
-            pass
-        return (tkr, None, False)
-
-    # Parallel load cached tickers
+    raw_ds, enriched_ds = price_store.MASTER, price_store.MASTER_ENRICHED
+    master = _master_period(period)
+    master_meta = {"period": master}
+    wanted = {t.upper(): t for t in tickers}
+    done: set = set()               # caller-spelled tickers already yielded
+
+    def _covers_master(entry: Optional[dict]) -> bool:
+        return _covers(entry, master)
+
+    def _emit(frames: dict):
+        for tkr, df in frames.items():
+            key = wanted.get(tkr, tkr)
+            if key not in done:
+                done.add(key)
+                yield key, _slice_period(df, period)
+    # Workers for the slow path only (raw cached but not yet enriched this session):
+    # indicator work is mostly NumPy/pandas, so threads still overlap well.
+    compute_workers = 32
+
+    # ── Step 1: Bulk cache load for all tickers ──────────────────────────
+    # One manifest pass decides freshness, then each store bucket is read
+    # once — no per-ticker file opens.
     total = len(tickers)
     if progress_cb:
-        progress_cb(0, 1, f"Loading {total} tickers from cache (parallel)…")
-    
-    with ThreadPoolExecutor(max_workers=cache_workers) as executor:
-        futures = {executor.submit(_load_cached_ticker, tkr): tkr for tkr in tickers}
-        loaded = 0
-        n_fast = 0
-        for future in as_completed(futures):
-            loaded += 1
-            tkr, df, is_fast = future.result()
-            if df is not None:
-                result[tkr] = df
-                if is_fast:
-                    n_fast += 1
-            else:
-                need_download.append(tkr)
-            
-            # Progress every 200 tickers loaded
-            if loaded % 200 == 0 and progress_cb:
-                pct = int(loaded / total * 100)
-                progress_cb(1, 2, f"Cache loaded: {loaded}/{total} ({pct}%)…")
+        progress_cb(0, 1, f"Loading {total} tickers from cache (bulk)…")
+
+    fresh_enriched = price_store.fresh_tickers(enriched_ds, tickers, asof, _covers_master)
+    if fresh_enriched:
+        cached = price_store.read_frames(enriched_ds, fresh_enriched)
+        yield from _emit({t: df for t, df in cached.items() if not df.empty})
+    n_fast = len(done)
+
+    # Slow path: raw OHLCV fresh this session — compute technicals, save enriched
+    remaining = [t for t in tickers if t not in done]
+    fresh_raw = price_store.fresh_tickers(raw_ds, remaining, asof, _covers_master)
+    if fresh_raw:
+        raw_frames = price_store.read_frames(raw_ds, fresh_raw)
+        if progress_cb:
+            progress_cb(1, 2, f"Computing technicals for {len(raw_frames)} cached tickers…")
+        computed, states = _enrich_masters(raw_frames, compute_workers)
+        _store_write(enriched_ds, computed, asof, master_meta)
+        _store_write(price_store.INDICATOR_STATE, states, asof)
+        yield from _emit(computed)
+
+    need_download = [t for t in tickers if t not in done]
 
     if not need_download:
-        n_slow = len(result) - n_fast
-        if n_fast == len(result):
-            logger.info("[Batch] All %d tickers loaded from enriched cache — fast path (no recompute)", len(result))
+        n_slow = len(done) - n_fast
+        if n_fast == len(done):
+            logger.info("[Batch] All %d tickers loaded from enriched cache — fast path (no recompute)", len(done))
         else:
             logger.info("[Batch] All %d tickers cached: %d fast-path (enriched) + %d slow-path (computed+saved)",
-                        len(result), n_fast, n_slow)
+                        len(done), n_fast, n_slow)
         if progress_cb:
-            progress_cb(2, 2, f"Cache complete: all {len(result)} tickers ready")
-        return result
+            progress_cb(2, 2, f"Cache complete: all {len(done)} tickers ready")
+        return
 
-    logger.info("[Batch] %d/%d tickers need download (%d cached, loaded via %d workers)",
-                len(need_download), len(tickers), len(result), cache_workers)
+    # ── Step 1b: Incremental refresh of stale cached series ──────────────
+    # Only the bars after each ticker's last cached bar are downloaded; series
+    # whose adjusted history was restated fall through to the full download.
+    if getattr(C, "PRICE_INCREMENTAL_ENABLED", True):
+        manifest = price_store.get_manifest(raw_ds)
+        stale = [t for t in need_download if _covers_master(manifest.get(t.upper()))]
+        stale_cached = price_store.read_frames(raw_ds, stale) if stale else {}
+        if stale_cached:
+            if progress_cb:
+                progress_cb(1, 2, f"Incremental refresh for {len(stale_cached)} stale cached tickers…")
+            merged, _need_full = _refresh_batch_incremental(stale_cached, master, progress_cb)
+            enriched_frames, states = _enrich_masters(merged, compute_workers)
+            _store_write(raw_ds, merged, asof, master_meta)
+            _store_write(enriched_ds, enriched_frames, asof, master_meta)
+            _store_write(price_store.INDICATOR_STATE, states, asof)
+            yield from _emit(enriched_frames)
+            need_download = [t for t in tickers if t not in done]
+            if not need_download:
+                if progress_cb:
+                    progress_cb(2, 2, f"Cache complete: all {len(done)} tickers ready")
+                return
+
+    logger.info("[Batch] %d/%d tickers need download (%d cached)",
+                len(need_download), len(tickers), len(done))
     if progress_cb:
-        progress_cb(1, 2, f"Cache done: {len(result)} cached, {len(need_download)} need download")
+        progress_cb(1, 2, f"Cache done: {len(done)} cached, {len(need_download)} need download")
 
     # ── Step 2: Batch download uncached tickers ──────────────────────────
-    batches = [need_download[i:i + batch_size]
-               for i in range(0, len(need_download), batch_size)]
-    total_batches = len(batches)
+    # The download runs ahead on its own thread while this generator enriches
+    # and the caller validates the previous batch.
+    total_batches = -(-len(need_download) // batch_size)
+    # Very short histories are dropped from multi-ticker downloads (thin listings)
+    min_bars = 1 if len(need_download) == 1 else 50
+    batches: queue.Queue = queue.Queue(maxsize=max(1, int(getattr(C, "STAGE2_PREFETCH_BATCHES", 2))))
+    stop = threading.Event()
+    end = object()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-    for bi, batch in enumerate(batches):
-        if progress_cb:
-            progress_cb(bi + 1, total_batches,
-                        f"Downloading batch {bi+1}/{total_batches} ({len(batch)} tickers)")
+    def _producer() -> None:
         try:
-            logger.debug(f"[Batch {bi+1}] Downloading {len(batch)} tickers: {batch}")
-            raw = yf.download(
-                tickers=batch,
-                period=period,
-                interval="1d",
-                auto_adjust=True,
-                threads=False,   # threads=True causes 'dict changed size during iteration' race condition
-                progress=False,
-            )
-            logger.debug(f"[Batch {bi+1}] Download returned type {type(raw).__name__}")
-            
-            if raw is None:
-                logger.warning(f"[Batch {bi+1}] yf.download returned None")
-                continue
-            
-            if raw.empty:
-                logger.warning(f"[Batch {bi+1}] yf.download returned empty DataFrame")
+            for item in _download_batches(need_download, batch_size, period=master):
+                if not _put(item):
+                    return
+        except Exception as exc:
+            logger.warning("[Batch] download stream failed: %s", exc)
+        finally:
+            _put(end)
+
+    threading.Thread(target=_producer, name="batch-download", daemon=True).start()
+    try:
+        bi = 0
+        while (item := batches.get()) is not end:
+            batch, fetched = item
+            if progress_cb:
+                progress_cb(min(bi + 1, total_batches), total_batches,
+                            f"Downloaded batch {bi+1}/{total_batches} ({len(fetched)}/{len(batch)} tickers)")
+            bi += 1
+            raw_frames = {t: df for t, df in fetched.items() if len(df) >= min_bars}
+            if not raw_frames:
+                logger.warning(f"[Batch {bi}] no usable price data for {len(batch)} tickers")
                 continue
-            
-            logger.debug(f"[Batch {bi+1}] Raw data shape: {raw.shape}, MultiIndex: {isinstance(raw.columns, pd.MultiIndex)}")
-
-            # Parse per-ticker DataFrames from batch result
-            if len(batch) == 1:
-                tkr = batch[0]
-                if isinstance(raw.columns, pd.MultiIndex):
-                    raw.columns = raw.columns.get_level_values(0)
-                if raw.index.tzinfo is not None:
-                    raw.index = raw.index.tz_localize(None)
-                df_t = raw[["Open", "High", "Low", "Close", "Volume"]].dropna()
-                logger.debug(f"[Batch Single] {tkr} extracted, shape {df_t.shape if not df_t.empty else 'empty'}")
-                if not df_t.empty:
-                    # Save raw OHLCV cache
-                    try:
-                        cache_path = PRICE_CACHE_DIR / f"{tkr.upper()}_{period}.parquet"
-                        df_t.to_parquet(cache_path)
-                        cache_path.with_suffix(".meta").write_text(today)
-                    except Exception as save_err:
-                        logger.debug(f"[Batch Single] {tkr} cache save failed: {save_err}")
-                    try:
-                        logger.debug(f"[Batch Single] {tkr} calling get_technicals()...")
-                        tech_df = get_technicals(df_t)
-                        logger.debug(f"[Batch Single] {tkr} get_technicals returned shape {tech_df.shape}")
-                        result[tkr] = tech_df
-                        # Save enriched parquet so next same-day scan skips get_technicals()
-                        try:
-                            enriched_path = PRICE_CACHE_DIR / f"{tkr.upper()}_{period}_enriched.parquet"
-                            tech_df.to_parquet(enriched_path)
-                            enriched_path.with_suffix(".meta").write_text(today)
-                        except Exception:
-                            pass
-                    except Exception as tech_err:
-                        logger.error(f"[Batch Single] {tkr} get_technicals failed: {type(tech_err).__name__}: {tech_err}", exc_info=True)
-            else:
-                for tkr in batch:
-                    try:
-                        if isinstance(raw.columns, pd.MultiIndex):
-                            df_t = raw.xs(tkr, axis=1, level=1)
-                        else:
-                            continue
-                        if df_t.index.tzinfo is not None:
-                            df_t.index = df_t.index.tz_localize(None)
-                        df_t = df_t[["Open", "High", "Low", "Close", "Volume"]].dropna()
-                        if df_t.empty or len(df_t) < 50:
-                            continue
-                        # Save raw OHLCV cache
-                        try:
-                            cache_path = PRICE_CACHE_DIR / f"{tkr.upper()}_{period}.parquet"
-                            df_t.to_parquet(cache_path)
-                            cache_path.with_suffix(".meta").write_text(today)
-                        except Exception:
-                            pass
-                        tech_df = get_technicals(df_t)
-                        result[tkr] = tech_df
-                        # Save enriched parquet so next same-day scan skips get_technicals()
-                        try:
-                            enriched_path = PRICE_CACHE_DIR / f"{tkr.upper()}_{period}_enriched.parquet"
-                            tech_df.to_parquet(enriched_path)
-                            enriched_path.with_suffix(".meta").write_text(today)
-                        except Exception:
-                            pass
-                    except Exception:
-                        continue
+            # Whole batch enriched at once (panel mode for multi-ticker batches)
+            enriched_frames: dict = {}
+            state_frames: dict = {}
+            try:
+                enriched_frames, state_frames = _enrich_full(raw_frames)
+            except Exception as tech_err:
+                logger.error(f"[Batch {bi}] technicals failed: {type(tech_err).__name__}: {tech_err}", exc_info=True)
+            # Raw OHLCV + enriched are queued for the store (written behind the
+            # next download) so the next same-day scan takes the fast path.
+            _store_write(raw_ds, raw_frames, asof, master_meta)
+            _store_write(enriched_ds, enriched_frames, asof, master_meta)
+            _store_write(price_store.INDICATOR_STATE, state_frames, asof)
+            yield from _emit(enriched_frames)
+    finally:
+        stop.set()
 
-        except Exception as exc:
-            logger.error(f"[Batch {bi+1}] Download error: {type(exc).__name__}: {exc}", exc_info=True)
-            logger.error(f"[Batch {bi+1}] Exception details will help debug DataFrame ambiguity issues")
+    logger.info("[Batch] Enriched %d/%d tickers total", len(done), len(tickers))
 
-        # Rate-limit between batches
-        if bi < total_batches - 1:
-            time.sleep(sleep_sec)
 
-    logger.info("[Batch] Enriched %d/%d tickers total", len(result), len(tickers))
-    return result
+def batch_download_and_enrich(tickers: list, period: str = "2y",
+                              progress_cb=None) -> dict:
+    """
+    Batch-download OHLCV for many tickers, enrich with technicals,
+    and save to the consolidated price store. Much faster than individual calls.
+
+    Args:
+        tickers:     list of ticker strings
+        period:      yfinance period string (e.g. "2y")
+        progress_cb: optional callable(batch_num, total_batches, msg)
+
+    Like get_enriched(), everything is downloaded, enriched and stored as the
+    master series; each returned frame is the trailing `period` slice.
+    Collects stream_download_and_enrich(), which callers that can start
+    work per ticker should use instead.
+
+    Returns:
+        dict[ticker] -> enriched DataFrame  (only non-empty results)
+    """
+    return dict(stream_download_and_enrich(tickers, period, progress_cb))
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -2499,6 +2707,7 @@ def get_atr(df: pd.DataFrame, period: int = None) -> float:
     return float(intraday_ranges.mean())
 
 
+@_coalesced("earnings_date")
 def get_next_earnings_date(ticker: str) -> "date | None":
     """
     Fetch the next scheduled earnings date for a ticker via yfinance.
@@ -2513,8 +2722,8 @@ def get_next_earnings_date(ticker: str) -> "date | None":
     """
     from datetime import date as _date
     try:
-        tkobj = yf.Ticker(ticker)
-        cal   = tkobj.calendar
+        _yf_track_call()
+        cal = get_provider().calendar(ticker)
         
         # Check if cal is None first
         if cal is None:
@@ -2818,6 +3027,7 @@ def get_first_bounce_info(df: pd.DataFrame) -> dict:
     }
 
 
+@_coalesced("earnings_growth")
 def get_earnings_growth(ticker: str) -> dict:
     """
     Supplement 20 — Rocket Fuel: check for extreme earnings AND revenue growth.
@@ -2836,8 +3046,6 @@ def get_earnings_growth(ticker: str) -> dict:
             'adjustment'       : float — star adjustment for Dim A
             'note_zh'          : str   — Chinese description
     """
-    import yfinance as yf
-
     eps_min = getattr(C, "QM_ROCKET_FUEL_EPS_MIN", 100.0)
     rev_min = getattr(C, "QM_ROCKET_FUEL_REV_MIN", 100.0)
     bonus   = getattr(C, "QM_ROCKET_FUEL_BONUS", 0.25)
@@ -2849,8 +3057,8 @@ def get_earnings_growth(ticker: str) -> dict:
     }
 
     try:
-        t = yf.Ticker(ticker)
-        fin = t.quarterly_financials
+        _yf_track_call()
+        fin = get_provider().fundamentals(ticker, "quarterly_financials")
         if fin is None or fin.empty:
             return result
 
@@ -0,0 +1,574 @@
+"""
+modules/data_providers.py
+─────────────────────────
+Pluggable market-data providers underneath data_pipeline.
+
+Every network fetch data_pipeline (and rs_ranking / nasdaq_universe) makes
+goes through one provider object, so the same scans, backtests and
+auto-trader code can run live, record what they fetched, or replay offline:
+
+  • YFinanceProvider  "live"    — yfinance + finvizfinance, today's behaviour;
+                                  yfinance requests take a yf_limiter slot.
+  • RecordingProvider "record"  — wraps the live provider and writes every
+                                  response under MARKET_DATA_RECORD_DIR.
+  • ReplayProvider    "replay"  — serves those recordings with no network and
+                                  no pacing; with MARKET_DATA_SYNTHETIC, tickers
+                                  never recorded get a deterministic synthetic
+                                  series (seeded by ticker), so a CI box can
+                                  profile a scan with nothing recorded at all.
+
+The active provider comes from MARKET_DATA_PROVIDER (env SEPA_DATA_PROVIDER);
+set_provider() swaps it at runtime (benchmarks, tests).
+
+Methods (all return what the libraries return, normalised):
+    history(ticker, period=None, start=None)    daily OHLCV, tz-naive index
+    bulk_history(tickers, period=None, start=None) → {ticker: daily OHLCV}
+    intraday(ticker, period="2d", interval="5m") intraday bars (exchange tz)
+    fundamentals(ticker, field)                 yfinance Ticker field (FUNDAMENTAL_FIELDS)
+    calendar(ticker)                            yfinance Ticker.calendar
+    screener(filters_dict, view="Overview")     finviz screener table
+    group_performance(group="Sector")           finviz group performance table
+    snapshot(ticker) / insider(ticker) / news(ticker)   finviz quote data
+
+Usage:
+    from modules import data_providers
+    data_providers.get_provider().history("NVDA", period="2y")
+    prev = data_providers.set_provider(data_providers.ReplayProvider())
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+from modules import yf_limiter
+
+logger = logging.getLogger(__name__)
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+# data_pipeline field name → yfinance Ticker attribute (get_* are methods)
+FUNDAMENTAL_FIELDS = {
+    "info":                  "info",
+    "quarterly_income_stmt": "quarterly_income_stmt",
+    "quarterly_financials":  "quarterly_financials",
+    "earnings_history":      "get_earnings_history",
+    "eps_revisions":         "get_eps_revisions",
+    "eps_trend":             "get_eps_trend",
+    "institutional_holders": "get_institutional_holders",
+    "insider_transactions":  "get_insider_transactions",
+    "analyst_price_targets": "analyst_price_targets",
+}
+
+_FINVIZ_VIEWS = ("Overview", "Performance", "Technical", "Financial", "Ownership")
+
+
+def _span(period: Optional[str], start) -> dict:
+    """yfinance span kwargs: `start` wins over `period`."""
+    if start is not None:
+        return {"start": pd.Timestamp(start).date().isoformat()}
+    return {"period": period or "1y"}
+
+
+def _clean_daily(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """OHLCV columns with a tz-naive DatetimeIndex (empty frame for no data)."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV)
+    df = df[[c for c in OHLCV if c in df.columns]].copy()
+    df.index = pd.to_datetime(df.index)
+    if df.index.tzinfo is not None:
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+def split_download(raw: Optional[pd.DataFrame], tickers: list) -> dict:
+    """Split a yf.download() result into per-ticker OHLCV frames (tz-naive, NaN rows dropped)."""
+    out = {}
+    if raw is None or raw.empty:
+        return out
+    if len(tickers) == 1:
+        raw = raw.copy()
+        if isinstance(raw.columns, pd.MultiIndex):
+            raw.columns = raw.columns.get_level_values(0)
+        df_t = _clean_daily(raw).dropna()
+        if not df_t.empty:
+            out[tickers[0]] = df_t
+        return out
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return out
+    for tkr in tickers:
+        try:
+            df_t = _clean_daily(raw.xs(tkr, axis=1, level=1)).dropna()
+            if not df_t.empty:
+                out[tkr] = df_t
+        except Exception:
+            continue
+    return out
+
+
+def trim(df: pd.DataFrame, period: Optional[str] = None, start=None) -> pd.DataFrame:
+    """The part of a daily series a (period | start) request would have returned."""
+    if df.empty:
+        return df
+    if start is not None:
+        return df[df.index >= pd.Timestamp(start)]
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", str(period or "1y").lower())
+    if m is None:                                   # "max"
+        if str(period).lower() == "ytd":
+            return df[df.index >= pd.Timestamp(df.index[-1].year, 1, 1)]
+        return df
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "d":
+        return df.tail(n)
+    offset = {"wk": pd.DateOffset(weeks=n), "mo": pd.DateOffset(months=n),
+              "y": pd.DateOffset(years=n)}[unit]
+    return df[df.index > df.index[-1] - offset]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Interface + live provider
+# ─────────────────────────────────────────────────────────────────────────────
+
+class MarketDataProvider(ABC):
+    """
+    Interface.  `live` providers hit the network (pacing and limiter apply).
+    Test doubles implement the methods they need on top of ReplayProvider.
+    """
+
+    name = "base"
+    live = False
+    async_bulk = False          # bulk history may use the yf_async engine
+
+    @abstractmethod
+    def history(self, ticker: str, period: Optional[str] = None, start=None) -> pd.DataFrame:
+        ...
+
+    def bulk_history(self, tickers: list, period: Optional[str] = None, start=None) -> dict:
+        out = {}
+        for t in tickers:
+            df = self.history(t, period, start).dropna()
+            if not df.empty:
+                out[t] = df
+        return out
+
+    @abstractmethod
+    def intraday(self, ticker: str, period: str = "2d", interval: str = "5m",
+                 prepost: bool = False) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def fundamentals(self, ticker: str, field: str):
+        ...
+
+    @abstractmethod
+    def calendar(self, ticker: str):
+        ...
+
+    @abstractmethod
+    def screener(self, filters_dict: dict, view: str = "Overview") -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def group_performance(self, group: str = "Sector") -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def snapshot(self, ticker: str) -> dict:
+        ...
+
+    @abstractmethod
+    def insider(self, ticker: str) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def news(self, ticker: str) -> pd.DataFrame:
+        ...
+
+
+class YFinanceProvider(MarketDataProvider):
+    """yfinance for prices / fundamentals / calendar, finvizfinance for screens and quotes."""
+
+    name = "live"
+    live = True
+    async_bulk = True
+
+    def history(self, ticker, period=None, start=None):
+        with yf_limiter.request():
+            df = yf.Ticker(ticker).history(**_span(period, start), interval="1d", auto_adjust=True)
+        return _clean_daily(df)
+
+    def bulk_history(self, tickers, period=None, start=None):
+        tickers = list(tickers)
+        with yf_limiter.request():
+            raw = yf.download(
+                tickers=tickers,
+                **_span(period, start),
+                interval="1d",
+                auto_adjust=True,
+                threads=False,   # threads=True causes 'dict changed size during iteration' race condition
+                progress=False,
+            )
+        return split_download(raw, tickers)
+
+    def intraday(self, ticker, period="2d", interval="5m", prepost=False):
+        with yf_limiter.request():
+            df = yf.Ticker(ticker).history(period=period, interval=interval, prepost=prepost)
+        return df if df is not None else pd.DataFrame(columns=OHLCV)
+
+    def fundamentals(self, ticker, field):
+        attr = FUNDAMENTAL_FIELDS[field]
+        with yf_limiter.request():
+            value = getattr(yf.Ticker(ticker), attr)
+            return value() if callable(value) else value
+
+    def calendar(self, ticker):
+        with yf_limiter.request():
+            return yf.Ticker(ticker).calendar
+
+    # finviz — pacing is data_pipeline._fvf_sleep()
+    def screener(self, filters_dict, view="Overview"):
+        from finvizfinance.screener.overview import Overview
+        from finvizfinance.screener.performance import Performance
+        from finvizfinance.screener.technical import Technical
+        from finvizfinance.screener.financial import Financial
+        from finvizfinance.screener.ownership import Ownership
+        cls = dict(zip(_FINVIZ_VIEWS, (Overview, Performance, Technical, Financial, Ownership)))
+        screener = cls.get(view, Overview)()
+        screener.set_filter(filters_dict=filters_dict)
+        return screener.screener_view()
+
+    def group_performance(self, group="Sector"):
+        from finvizfinance.group.performance import Performance
+        return Performance().screener_view(group=group)
+
+    def snapshot(self, ticker):
+        from finvizfinance.quote import finvizfinance
+        return finvizfinance(ticker).ticker_fundament()
+
+    def insider(self, ticker):
+        from finvizfinance.quote import finvizfinance
+        return finvizfinance(ticker).ticker_inside_trader()
+
+    def news(self, ticker):
+        from finvizfinance.quote import finvizfinance
+        return finvizfinance(ticker).ticker_news()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Recording store
+# ─────────────────────────────────────────────────────────────────────────────
+# <dir>/<kind>/<key>.pkl — one file per ticker (history: the union of every
+# span recorded for it) or per argument hash (screener).
+
+def _record_dir() -> Path:
+    return ROOT / getattr(C, "MARKET_DATA_RECORD_DIR", "data/provider_recordings")
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(name).upper())
+
+
+def _intraday_kind(interval: str, prepost: bool) -> str:
+    return f"intraday_{interval}" + ("_prepost" if prepost else "")
+
+
+def _args_key(*parts) -> str:
+    blob = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+class _Store:
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else _record_dir()
+        self._lock = threading.Lock()
+
+    def path(self, kind: str, key: str) -> Path:
+        return self.root / kind / f"{key}.pkl"
+
+    def load(self, kind: str, key: str):
+        p = self.path(kind, key)
+        return pd.read_pickle(p) if p.exists() else None
+
+    def save(self, kind: str, key: str, value) -> None:
+        p = self.path(kind, key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        pd.to_pickle(value, tmp)
+        tmp.replace(p)
+
+    def merge_frame(self, kind: str, key: str, df: pd.DataFrame) -> None:
+        """Union a (time-indexed) frame into the stored one; newer rows win."""
+        if df is None or df.empty:
+            return
+        with self._lock:
+            old = self.load(kind, key)
+            if isinstance(old, pd.DataFrame) and not old.empty:
+                df = pd.concat([old, df])
+                df = df[~df.index.duplicated(keep="last")].sort_index()
+            self.save(kind, key, df)
+
+    def keys(self, kind: str) -> list:
+        d = self.root / kind
+        return sorted(p.stem for p in d.glob("*.pkl")) if d.exists() else []
+
+
+class RecordingProvider(MarketDataProvider):
+    """Delegates to `inner` (live by default) and records every successful response."""
+
+    name = "record"
+
+    def __init__(self, inner: Optional[MarketDataProvider] = None, root: Optional[Path] = None):
+        self.inner = inner or YFinanceProvider()
+        self.live = self.inner.live
+        self.store = _Store(root)
+
+    def history(self, ticker, period=None, start=None):
+        df = self.inner.history(ticker, period, start)
+        self.store.merge_frame("history", _safe(ticker), df.dropna())
+        return df
+
+    def bulk_history(self, tickers, period=None, start=None):
+        frames = self.inner.bulk_history(tickers, period, start)
+        for t, df in frames.items():
+            self.store.merge_frame("history", _safe(t), df)
+        return frames
+
+    def intraday(self, ticker, period="2d", interval="5m", prepost=False):
+        df = self.inner.intraday(ticker, period, interval, prepost)
+        self.store.merge_frame(_intraday_kind(interval, prepost), _safe(ticker), df)
+        return df
+
+    def fundamentals(self, ticker, field):
+        value = self.inner.fundamentals(ticker, field)
+        self.store.save(f"fundamentals_{field}", _safe(ticker), value)
+        return value
+
+    def calendar(self, ticker):
+        value = self.inner.calendar(ticker)
+        self.store.save("calendar", _safe(ticker), value)
+        return value
+
+    def screener(self, filters_dict, view="Overview"):
+        df = self.inner.screener(filters_dict, view)
+        self.store.save("screener", _args_key(filters_dict, view), df)
+        return df
+
+    def group_performance(self, group="Sector"):
+        df = self.inner.group_performance(group)
+        self.store.save("group", _safe(group), df)
+        return df
+
+    def snapshot(self, ticker):
+        value = self.inner.snapshot(ticker)
+        self.store.save("snapshot", _safe(ticker), value)
+        return value
+
+    def insider(self, ticker):
+        value = self.inner.insider(ticker)
+        self.store.save("insider", _safe(ticker), value)
+        return value
+
+    def news(self, ticker):
+        value = self.inner.news(ticker)
+        self.store.save("news", _safe(ticker), value)
+        return value
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Replay provider
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _last_session() -> pd.Timestamp:
+    """Most recent completed weekday (synthetic series end there)."""
+    d = date.today() - timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= timedelta(days=1)
+    return pd.Timestamp(d)
+
+
+def _seed(ticker: str) -> int:
+    return zlib.crc32(ticker.upper().encode())
+
+
+def synthetic_history(ticker: str, bars: int = 2520) -> pd.DataFrame:
+    """Deterministic daily OHLCV random walk for `ticker` (same ticker + day → same frame)."""
+    rng = np.random.default_rng(_seed(ticker))
+    drift = rng.uniform(-0.0004, 0.0014)
+    vol = rng.uniform(0.012, 0.035)
+    rets = rng.normal(drift, vol, bars)
+    close = rng.uniform(8.0, 300.0) * np.exp(np.cumsum(rets))
+    open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, vol / 4, bars))
+    wick = np.abs(rng.normal(0, vol / 2, (2, bars)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = np.round(rng.lognormal(np.log(rng.uniform(3e5, 2e7)), 0.35, bars))
+    idx = pd.bdate_range(end=_last_session(), periods=bars, name="Date")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close,
+                         "Volume": volume}, index=idx)
+
+
+def synthetic_info(ticker: str) -> dict:
+    """Plausible yfinance .info subset used by the SEPA / QM / ML scorers."""
+    rng = np.random.default_rng(_seed(ticker) + 1)
+    price = float(synthetic_history(ticker)["Close"].iloc[-1])
+    shares = float(rng.uniform(5e7, 2e9))
+    eps = float(rng.uniform(-1.0, 8.0))
+    return {
+        "symbol": ticker.upper(), "shortName": f"{ticker.upper()} Synthetic Corp",
+        "sector": "Technology", "industry": "Software - Application", "country": "United States",
+        "currentPrice": round(price, 2), "marketCap": int(price * shares),
+        "sharesOutstanding": int(shares), "floatShares": int(shares * 0.9),
+        "trailingEps": round(eps, 2), "forwardEps": round(eps * rng.uniform(0.9, 1.5), 2),
+        "earningsQuarterlyGrowth": round(float(rng.uniform(-0.3, 1.2)), 3),
+        "earningsGrowth": round(float(rng.uniform(-0.3, 1.2)), 3),
+        "revenueGrowth": round(float(rng.uniform(-0.1, 0.8)), 3),
+        "returnOnEquity": round(float(rng.uniform(-0.1, 0.45)), 3),
+        "profitMargins": round(float(rng.uniform(-0.1, 0.35)), 3),
+        "heldPercentInstitutions": round(float(rng.uniform(0.2, 0.9)), 3),
+        "averageVolume": int(rng.uniform(3e5, 2e7)),
+    }
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recordings (no network, no pacing).  Unrecorded price requests get
+    synthetic_history() when `synthetic`; unrecorded tables come back empty.
+    """
+
+    name = "replay"
+    live = False
+
+    def __init__(self, root: Optional[Path] = None, synthetic: Optional[bool] = None):
+        self.store = _Store(root)
+        self.synthetic = bool(getattr(C, "MARKET_DATA_SYNTHETIC", True)) if synthetic is None \
+            else synthetic
+        self._frames: dict = {}
+        self._lock = threading.Lock()
+
+    def _daily(self, ticker: str) -> pd.DataFrame:
+        key = _safe(ticker)
+        with self._lock:
+            df = self._frames.get(key)
+        if df is None:
+            df = self.store.load("history", key)
+            if df is None:
+                df = synthetic_history(ticker) if self.synthetic else pd.DataFrame(columns=OHLCV)
+            with self._lock:
+                df = self._frames.setdefault(key, df)
+        return df
+
+    def history(self, ticker, period=None, start=None):
+        return trim(self._daily(ticker), period, start).copy()
+
+    def bulk_history(self, tickers, period=None, start=None):
+        out = {}
+        for t in tickers:
+            df = self.history(t, period, start).dropna()
+            if not df.empty:
+                out[t] = df
+        return out
+
+    def intraday(self, ticker, period="2d", interval="5m", prepost=False):
+        df = self.store.load(_intraday_kind(interval, prepost), _safe(ticker))
+        if df is None or df.empty:
+            return pd.DataFrame(columns=OHLCV)
+        days = pd.Index(df.index.date).unique()[-int(re.sub(r"\D", "", period) or 1):]
+        return df[np.isin(df.index.date, days)].copy()
+
+    def fundamentals(self, ticker, field):
+        value = self.store.load(f"fundamentals_{field}", _safe(ticker))
+        if value is not None:
+            return value
+        if field == "info":
+            return synthetic_info(ticker) if self.synthetic else {}
+        return pd.DataFrame()
+
+    def calendar(self, ticker):
+        value = self.store.load("calendar", _safe(ticker))
+        if value is None and self.synthetic:
+            days = 5 + _seed(ticker) % 60
+            value = {"Earnings Date": [_last_session().date() + timedelta(days=days)]}
+        return value if value is not None else {}
+
+    def screener(self, filters_dict, view="Overview"):
+        df = self.store.load("screener", _args_key(filters_dict, view))
+        if df is not None:
+            return df
+        # Unrecorded screen: every ticker with recorded history, else a synthetic universe
+        tickers = self.store.keys("history")
+        if not tickers and self.synthetic:
+            n = int(getattr(C, "MARKET_DATA_SYNTHETIC_UNIVERSE", 200))
+            tickers = [f"SYN{i:04d}" for i in range(n)]
+        rows = []
+        for t in tickers:
+            last = self._daily(t).tail(20)
+            if last.empty:
+                continue
+            info = synthetic_info(t)
+            rows.append({"Ticker": t, "Company": info["shortName"], "Sector": info["sector"],
+                         "Industry": info["industry"], "Country": info["country"],
+                         "Market Cap": info["marketCap"] / 1e6,
+                         "Price": round(float(last["Close"].iloc[-1]), 2),
+                         "Volume": float(last["Volume"].mean())})
+        return pd.DataFrame(rows)
+
+    def group_performance(self, group="Sector"):
+        df = self.store.load("group", _safe(group))
+        return df if df is not None else pd.DataFrame()
+
+    def snapshot(self, ticker):
+        value = self.store.load("snapshot", _safe(ticker))
+        return value if value is not None else {}
+
+    def insider(self, ticker):
+        value = self.store.load("insider", _safe(ticker))
+        return value if value is not None else pd.DataFrame()
+
+    def news(self, ticker):
+        value = self.store.load("news", _safe(ticker))
+        return value if value is not None else pd.DataFrame()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Active provider
+# ─────────────────────────────────────────────────────────────────────────────
+_PROVIDERS = {"live": YFinanceProvider, "record": RecordingProvider, "replay": ReplayProvider}
+_active_lock = threading.Lock()
+_active: Optional[MarketDataProvider] = None
+
+
+def get_provider() -> MarketDataProvider:
+    """The process-wide provider (built from MARKET_DATA_PROVIDER on first use)."""
+    global _active
+    with _active_lock:
+        if _active is None:
+            name = str(getattr(C, "MARKET_DATA_PROVIDER", "live")).lower()
+            if name not in _PROVIDERS:
+                logger.warning("[Providers] unknown MARKET_DATA_PROVIDER=%r — using live", name)
+                name = "live"
+            _active = _PROVIDERS[name]()
+            if name != "live":
+                logger.info("[Providers] market data provider: %s", name)
+        return _active
+
+
+def set_provider(provider: Optional[MarketDataProvider]) -> Optional[MarketDataProvider]:
+    """Install `provider` (None → rebuild from config on next use); returns the previous one."""
+    global _active
+    with _active_lock:
+        prev, _active = _active, provider
+        return prev
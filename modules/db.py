@@ -197,15 +197,6 @@ def _ensure_schema(conn):
         )
     """)
 
-    # Phase 2: Fundamentals cache (JSON serialized DataFrames)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS fundamentals_cache (
-            ticker          VARCHAR PRIMARY KEY,
-            last_update     DATE,
-            data_json       VARCHAR
-        )
-    """)
-
     # ── Qullamaggie (QM) tables ───────────────────────────────────────────────
     conn.execute("""
         CREATE TABLE IF NOT EXISTS qm_scan_history (
@@ -1152,14 +1143,17 @@ def query_market_env_history(days: int = 60) -> pd.DataFrame:
 def query_price_history(ticker: str, days: int = 90) -> pd.DataFrame:
     """
     Return OHLCV price history for a ticker by reading directly from the
-    Parquet cache (no additional download needed).  Uses DuckDB read_parquet().
+    consolidated price store (no additional download needed).  Uses DuckDB
+    read_parquet() over the ticker's bucket file.
 
     Columns returned: date, open, high, low, close, volume
     """
-    parquet_file = _DB_PATH.parent / "price_cache" / f"{ticker.upper()}_2y.parquet"
-    if not parquet_file.exists():
-        logger.warning("[DB] query_price_history: no parquet file for %s", ticker)
+    from modules import price_store
+    entry = price_store.get_entry(price_store.MASTER, ticker)
+    if not entry:
+        logger.warning("[DB] query_price_history: no stored prices for %s", ticker)
         return pd.DataFrame()
+    parquet_file = price_store._bucket_file(price_store.MASTER, int(entry["bucket"]))
     try:
         conn = _get_conn()
         df = conn.execute(f"""
@@ -1170,10 +1164,11 @@ def query_price_history(ticker: str, days: int = 90) -> pd.DataFrame:
                 "Low"    AS low,
                 "Close"  AS close,
                 "Volume" AS volume
-            FROM read_parquet('{parquet_file.as_posix()}')
-            WHERE CAST("Date" AS DATE) >= CURRENT_DATE - INTERVAL ({days}) DAY
+            FROM read_parquet('{parquet_file.as_posix()}', hive_partitioning = false)
+            WHERE "Ticker" = ?
+              AND CAST("Date" AS DATE) >= CURRENT_DATE - INTERVAL ({days}) DAY
             ORDER BY date
-        """).df()
+        """, [ticker.upper()]).df()
         conn.close()
         return df
     except Exception as exc:
@@ -1186,7 +1181,7 @@ def db_stats() -> dict:
     tables = ["scan_history", "rs_history", "market_env_history",
               "market_news_history",
               "watchlist_log", "position_log", "watchlist_store",
-              "open_positions", "closed_positions", "fundamentals_cache"]
+              "open_positions", "closed_positions"]
     stats = {}
     _init_schema_once()
     try:
@@ -1507,59 +1502,6 @@ def pos_save(data: dict) -> bool:
                     pass
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-# Phase 2: Fundamentals cache APIs
-# ─────────────────────────────────────────────────────────────────────────────
-
-def fund_cache_get(ticker: str) -> Optional[dict]:
-    """Retrieve fundamentals from cache (as dict, rehydrated from JSON)."""
-    _init_schema_once()
-    try:
-        conn = _get_conn()
-        row = conn.execute(
-            "SELECT data_json FROM fundamentals_cache WHERE ticker = ?",
-            [ticker.upper()]
-        ).fetchone()
-        conn.close()
-        
-        if row and row[0]:
-            try:
-                return json.loads(row[0])
-            except Exception as exc:
-                logger.warning("[DB] fund_cache_get: JSON deserialize failed — %s", exc)
-        return None
-    except Exception as exc:
-        logger.warning("[DB] fund_cache_get failed: %s", exc)
-        return None
-
-
-def fund_cache_set(ticker: str, data: dict) -> bool:
-    """Store fundamentals in cache (serialized as JSON string)."""
-    if not data:
-        return False
-
-    try:
-        data_json = json.dumps(data, default=str)  # Serialize with fallback for non-JSON types
-    except Exception as exc:
-        logger.error("[DB] fund_cache_set: JSON serialize failed — %s", exc)
-        return False
-
-    _init_schema_once()
-    with _lock:
-        try:
-            conn = _get_conn()
-            conn.execute(
-                "INSERT OR REPLACE INTO fundamentals_cache (ticker, last_update, data_json) VALUES (?, ?, ?)",
-                [ticker.upper(), date.today(), data_json]
-            )
-            conn.close()
-            logger.info("[DB] fund_cache_set: cached for %s", ticker)
-            return True
-        except Exception as exc:
-            logger.error("[DB] fund_cache_set failed: %s", exc)
-            return False
-
-
 # ─────────────────────────────────────────────────────────────────────────────
 # Helper: JSON backup
 # ─────────────────────────────────────────────────────────────────────────────
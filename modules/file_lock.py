@@ -0,0 +1,99 @@
+"""
+modules/file_lock.py
+────────────────────
+Cross-process exclusive lock on a lock file, for the on-disk caches that
+several processes share (the web app and `minervini.py scan` run side by
+side against the same data/ directory).
+
+A thread lock alone cannot stop another process from rewriting a bucket file
+or saving a manifest between our read and our write; `locked(path)` holds an
+OS-level lock on `path` (fcntl.flock on POSIX, msvcrt.locking on Windows)
+together with a per-path thread lock.  It is re-entrant within a thread, so
+a locked helper may call another helper that takes the same lock.
+
+Usage:
+    with file_lock.locked(dataset_dir / ".lock"):
+        ... re-read the index, rewrite files, save the index ...
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+_guard = threading.Lock()
+_locks: dict[str, "_PathLock"] = {}
+
+
+class _PathLock:
+    """Thread-reentrant lock that also holds an OS lock on the file while owned."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self) -> "_PathLock":
+        self._rlock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = _acquire(self.path)
+            except BaseException:
+                self._rlock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            _release(fd)
+        self._rlock.release()
+
+
+def _acquire(path: Path) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.name == "nt":
+            os.lseek(fd, 0, os.SEEK_SET)
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)   # retries for ~10 s, then raises
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _release(fd: int) -> None:
+    try:
+        if os.name == "nt":
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def locked(path: Path) -> _PathLock:
+    """Exclusive lock on `path` across threads and processes (context manager)."""
+    key = os.path.abspath(str(path))
+    with _guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = _PathLock(Path(key))
+        return lock
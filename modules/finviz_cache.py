@@ -0,0 +1,330 @@
+"""
+modules/finviz_cache.py
+───────────────────────
+Persistent cache for finviz results: screener tables (get_universe), group
+performance tables (get_sector_rankings) and page-1 screener counts
+(market_env._finviz_quick_count).
+
+finvizfinance pages are paced at ~1.2 s each, so a full screener view costs
+minutes — and the old in-memory cache was lost on every restart of app.py or
+`minervini.py scan`.  Entries now live under FINVIZ_CACHE_DIR and are shared
+by every process until their TTL runs out (a process re-reads index.json
+whenever it changed on disk; writes re-read it under a file lock first, so
+concurrent processes never drop each other's entries):
+
+  screener   FINVIZ_CACHE_TTL_HOURS
+  group      FINVIZ_GROUP_TTL_HOURS   (default: the screener TTL)
+  count      FINVIZ_COUNT_TTL_HOURS
+
+A screener request with no fresh exact entry can still be answered from a
+fresh entry of the same view whose filters are *looser*: every cached filter
+is also requested (same value, or a tighter "Over/Under" bound) and every
+filter that differs can be checked against the cached table's columns
+(Price, Avg Volume, Volume, Country, Sector, Industry).  The cached rows are
+then narrowed locally instead of paging finviz again.
+
+Layout:
+  data/finviz_cache/index.json     key → {"kind", "filters"/"group"/"param",
+                                          "view", "ts", "rows", "value"}
+  data/finviz_cache/<key>.pkl      the table for screener / group entries
+
+Usage:
+    df = finviz_cache.get_screener(filters, "Overview")     # None on miss
+    finviz_cache.put_screener(filters, "Overview", df)
+    n = finviz_cache.get_count("geo_usa,sh_price_o5")
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules import file_lock
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = ROOT / getattr(C, "FINVIZ_CACHE_DIR", "data/finviz_cache")
+
+# finviz filter name → screener column it can be checked against locally
+LOCAL_FILTER_COLUMNS = {
+    "Price":          "Price",
+    "Average Volume": "Avg Volume",
+    "Current Volume": "Volume",
+    "Country":        "Country",
+    "Sector":         "Sector",
+    "Industry":       "Industry",
+}
+_PRUNE_AFTER_HOURS = 48.0               # expired entries older than this are deleted on write
+
+_lock = threading.Lock()
+_index: Optional[dict] = None
+_index_stamp: Optional[tuple] = None    # (mtime_ns, size) of the index.json _index came from
+_frames: dict = {}                      # key → (entry ts, DataFrame) already read this process
+_stats = {"hits": 0, "superset_hits": 0, "misses": 0, "writes": 0}
+
+
+def _ttl_hours(kind: str) -> float:
+    screener = float(getattr(C, "FINVIZ_CACHE_TTL_HOURS", 4))
+    if kind == "group":
+        return float(getattr(C, "FINVIZ_GROUP_TTL_HOURS", screener))
+    if kind == "count":
+        return float(getattr(C, "FINVIZ_COUNT_TTL_HOURS", 1))
+    return screener
+
+
+def _key(kind: str, *parts) -> str:
+    blob = json.dumps([kind, *parts], sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:20]
+
+
+def _frame_file(key: str) -> Path:
+    return CACHE_DIR / f"{key}.pkl"
+
+
+def _index_stat() -> Optional[tuple]:
+    try:
+        st = (CACHE_DIR / "index.json").stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_index_locked() -> dict:
+    """The index, re-read when another process has replaced index.json."""
+    global _index, _index_stamp
+    stamp = _index_stat()
+    if _index is None or stamp != _index_stamp:
+        try:
+            _index = json.loads((CACHE_DIR / "index.json").read_text(encoding="utf-8"))
+        except Exception:
+            _index = {}
+        _index_stamp = stamp
+    return _index
+
+
+def _save_index_locked() -> None:
+    global _index_stamp
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_DIR / "index.json.tmp"
+    tmp.write_text(json.dumps(_load_index_locked(), default=str), encoding="utf-8")
+    tmp.replace(CACHE_DIR / "index.json")
+    _index_stamp = _index_stat()
+
+
+def _fresh(entry: dict, now: float) -> bool:
+    return (now - float(entry.get("ts", 0))) < _ttl_hours(entry.get("kind", "")) * 3600
+
+
+def _read_frame(key: str, ts: float) -> Optional[pd.DataFrame]:
+    """The table of the entry written at `ts` (another process may have replaced it)."""
+    with _lock:
+        held = _frames.get(key)
+    if held is not None and held[0] == ts:
+        return held[1]
+    try:
+        df = pd.read_pickle(_frame_file(key))
+    except Exception as exc:
+        logger.debug("[FinvizCache] %s unreadable: %s", key, exc)
+        return None
+    with _lock:
+        _frames[key] = (ts, df)
+    return df
+
+
+def _put(key: str, entry: dict, df: Optional[pd.DataFrame] = None) -> None:
+    now = time.time()
+    entry = {**entry, "ts": now}
+    # The file lock makes load → update → save atomic across processes
+    with file_lock.locked(CACHE_DIR / ".lock"), _lock:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if df is not None:
+            tmp = _frame_file(key).with_suffix(".tmp")
+            pd.to_pickle(df, tmp)
+            tmp.replace(_frame_file(key))
+            _frames[key] = (now, df)
+            entry["rows"] = len(df)
+        index = _load_index_locked()
+        index[key] = entry
+        for old in [k for k, e in index.items()
+                    if now - float(e.get("ts", 0)) > max(_PRUNE_AFTER_HOURS,
+                                                         _ttl_hours(e.get("kind", ""))) * 3600]:
+            index.pop(old, None)
+            _frames.pop(old, None)
+            _frame_file(old).unlink(missing_ok=True)
+        _save_index_locked()
+        _stats["writes"] += 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Local filter evaluation
+# ─────────────────────────────────────────────────────────────────────────────
+
+_BOUND_RE = re.compile(r"^(Over|Under)\s+\$?([\d.]+)\s*([KMB]?)$", re.IGNORECASE)
+_SCALE = {"": 1.0, "K": 1e3, "M": 1e6, "B": 1e9}
+
+
+def _bound(value) -> Optional[tuple]:
+    """'Over $5' → ('over', 5.0); 'Over 300K' → ('over', 300000.0); else None."""
+    m = _BOUND_RE.match(str(value).strip())
+    if not m:
+        return None
+    return m.group(1).lower(), float(m.group(2)) * _SCALE[m.group(3).upper()]
+
+
+def _tighter_or_equal(wanted, cached) -> bool:
+    """True when filter value `wanted` selects a subset of what `cached` selects."""
+    if wanted == cached:
+        return True
+    w, c = _bound(wanted), _bound(cached)
+    if w is None or c is None or w[0] != c[0]:
+        return False
+    return w[1] >= c[1] if w[0] == "over" else w[1] <= c[1]
+
+
+def _apply_local(df: pd.DataFrame, name: str, value) -> Optional[pd.DataFrame]:
+    """Rows of `df` passing finviz filter `name`=`value`; None if not checkable here."""
+    col = LOCAL_FILTER_COLUMNS.get(name)
+    if col is None or col not in df.columns:
+        return None
+    bound = _bound(value)
+    if bound is not None:
+        vals = pd.to_numeric(df[col], errors="coerce")
+        return df[vals > bound[1]] if bound[0] == "over" else df[vals < bound[1]]
+    if name in ("Price", "Average Volume", "Current Volume"):
+        return None                                   # a range we do not parse
+    return df[df[col].astype(str).str.strip() == str(value).strip()]
+
+
+def narrow(df: pd.DataFrame, cached_filters: dict, wanted_filters: dict) -> Optional[pd.DataFrame]:
+    """
+    Answer `wanted_filters` from a table fetched with `cached_filters`, or
+    None when the cached set is not looser or a difference is not checkable.
+    """
+    for name, value in cached_filters.items():
+        if name not in wanted_filters or not _tighter_or_equal(wanted_filters[name], value):
+            return None
+    out = df
+    for name, value in wanted_filters.items():
+        if cached_filters.get(name) == value:
+            continue
+        out = _apply_local(out, name, value)
+        if out is None:
+            return None
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def get_screener(filters: dict, view: str) -> Optional[pd.DataFrame]:
+    """Fresh cached screener table for (filters, view) — exact or narrowed from a looser one."""
+    now = time.time()
+    key = _key("screener", filters, view)
+    with _lock:
+        index = dict(_load_index_locked())
+    entry = index.get(key)
+    if entry is not None and _fresh(entry, now):
+        df = _read_frame(key, entry["ts"])
+        if df is not None and not df.empty:
+            with _lock:
+                _stats["hits"] += 1
+            logger.info("[Finviz Cache HIT] Age %.1fh, %d rows",
+                        (now - entry["ts"]) / 3600, len(df))
+            return df.copy()
+
+    candidates = sorted(
+        ((k, e) for k, e in index.items()
+         if e.get("kind") == "screener" and e.get("view") == view and k != key
+         and _fresh(e, now)),
+        key=lambda item: item[1].get("rows", 0))
+    for k, e in candidates:
+        base = _read_frame(k, e["ts"])
+        if base is None or base.empty:
+            continue
+        out = narrow(base, e.get("filters") or {}, filters)
+        if out is not None:
+            with _lock:
+                _stats["superset_hits"] += 1
+            logger.info("[Finviz Cache HIT] narrowed %d → %d rows from a looser cached screen",
+                        len(base), len(out))
+            return out.reset_index(drop=True).copy()
+
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+
+def put_screener(filters: dict, view: str, df: pd.DataFrame) -> None:
+    if df is None or df.empty:
+        return
+    _put(_key("screener", filters, view),
+         {"kind": "screener", "filters": dict(filters), "view": view}, df.copy())
+
+
+def get_group(group: str) -> Optional[pd.DataFrame]:
+    key = _key("group", group)
+    with _lock:
+        entry = _load_index_locked().get(key)
+    if entry is None or not _fresh(entry, time.time()):
+        return None
+    df = _read_frame(key, entry["ts"])
+    return df.copy() if df is not None and not df.empty else None
+
+
+def put_group(group: str, df: pd.DataFrame) -> None:
+    if df is None or df.empty:
+        return
+    _put(_key("group", group), {"kind": "group", "group": group}, df.copy())
+
+
+def get_count(param: str) -> Optional[int]:
+    with _lock:
+        entry = _load_index_locked().get(_key("count", param))
+    if entry is None or not _fresh(entry, time.time()):
+        return None
+    return int(entry["value"])
+
+
+def put_count(param: str, value: int) -> None:
+    _put(_key("count", param), {"kind": "count", "param": param, "value": int(value)})
+
+
+def has_fresh(kind: str = "screener") -> bool:
+    now = time.time()
+    with _lock:
+        return any(e.get("kind") == kind and _fresh(e, now)
+                   for e in _load_index_locked().values())
+
+
+def stats() -> dict:
+    now = time.time()
+    with _lock:
+        index = _load_index_locked()
+        by_kind: dict = {}
+        for e in index.values():
+            k = by_kind.setdefault(e.get("kind", "?"), {"entries": 0, "fresh": 0})
+            k["entries"] += 1
+            k["fresh"] += int(_fresh(e, now))
+        return {**_stats, "kinds": by_kind}
+
+
+def reset() -> None:
+    """Forget the in-memory index and tables (files stay on disk)."""
+    global _index, _index_stamp
+    with _lock:
+        _index, _index_stamp = None, None
+        _frames.clear()
+        for k in _stats:
+            _stats[k] = 0
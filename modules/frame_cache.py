@@ -0,0 +1,133 @@
+"""
+modules/frame_cache.py
+──────────────────────
+Process-wide, memory-bounded LRU of price-store frames.
+
+get_enriched() is called again and again for the same ticker — the chart API
+twice per request, the analyzers, watchlist refresh, the backtesters (SPY on
+every run) — and each call re-read its bucket Parquet file.  This cache keeps
+recently used master frames (raw and enriched) in memory, keyed by
+(dataset, ticker) and tagged with the price-store data version of the
+manifest entry they were read under.  A lookup with a different version is a
+miss, and every price_store write drops the written tickers (write listener
+registered by data_pipeline), so an incremental refresh that appends bars is
+never served stale.
+
+Entries are evicted least-recently-used once their total size exceeds
+FRAME_CACHE_MAX_MB.  Cached frames are shared: callers must not mutate them
+(data_pipeline hands out period slices, which are copies).
+
+Usage (data_pipeline only):
+    df = frame_cache.get(dataset, ticker, version)    # None on miss
+    frame_cache.put(dataset, ticker, version, df)
+    frame_cache.invalidate(dataset, ["NVDA"])
+    frame_cache.stats()                                # hits / misses / bytes …
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable, Iterable, Optional
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+_lock = threading.Lock()
+_frames: "OrderedDict[tuple, tuple]" = OrderedDict()   # (dataset, TICKER) → (version, df, nbytes)
+_bytes = 0
+_counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def _budget() -> int:
+    return int(getattr(C, "FRAME_CACHE_MAX_MB", 512) * 1024 * 1024)
+
+
+def enabled() -> bool:
+    return bool(getattr(C, "FRAME_CACHE_ENABLED", True)) and _budget() > 0
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Shallow in-memory size of a numeric frame (data blocks + index)."""
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+def _drop_locked(key: tuple) -> None:
+    global _bytes
+    _version, _df, nbytes = _frames.pop(key)
+    _bytes -= nbytes
+
+
+def get(dataset: str, ticker: str, version: Hashable) -> Optional[pd.DataFrame]:
+    """Cached frame for (dataset, ticker) at `version`, or None."""
+    if not enabled():
+        return None
+    key = (dataset, ticker.upper())
+    with _lock:
+        item = _frames.get(key)
+        if item is None or item[0] != version:
+            if item is not None:
+                _drop_locked(key)               # superseded data version
+            _counters["misses"] += 1
+            return None
+        _frames.move_to_end(key)
+        _counters["hits"] += 1
+        return item[1]
+
+
+def put(dataset: str, ticker: str, version: Hashable, df: pd.DataFrame) -> None:
+    """Insert / replace a frame, then evict least-recently-used entries over budget."""
+    global _bytes
+    if not enabled() or df is None or df.empty:
+        return
+    nbytes = frame_nbytes(df)
+    budget = _budget()
+    if nbytes > budget:
+        return
+    key = (dataset, ticker.upper())
+    with _lock:
+        if key in _frames:
+            _drop_locked(key)
+        _frames[key] = (version, df, nbytes)
+        _bytes += nbytes
+        while _bytes > budget:
+            _drop_locked(next(iter(_frames)))
+            _counters["evictions"] += 1
+
+
+def invalidate(dataset: str, tickers: Optional[Iterable[str]] = None) -> int:
+    """Drop the given tickers (all when None) of one dataset.  Returns the count dropped."""
+    with _lock:
+        if tickers is None:
+            keys = [k for k in _frames if k[0] == dataset]
+        else:
+            keys = [k for k in ((dataset, t.upper()) for t in tickers) if k in _frames]
+        for key in keys:
+            _drop_locked(key)
+        _counters["invalidations"] += len(keys)
+        return len(keys)
+
+
+def clear() -> None:
+    """Empty the cache (counters are kept)."""
+    global _bytes
+    with _lock:
+        _frames.clear()
+        _bytes = 0
+
+
+def stats() -> dict:
+    """Counters and current size, for status endpoints."""
+    with _lock:
+        lookups = _counters["hits"] + _counters["misses"]
+        return {
+            **_counters,
+            "hit_rate":     round(_counters["hits"] / lookups, 4) if lookups else None,
+            "entries":      len(_frames),
+            "bytes":        _bytes,
+            "budget_bytes": _budget(),
+            "enabled":      enabled(),
+        }
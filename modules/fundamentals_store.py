@@ -0,0 +1,395 @@
+"""
+modules/fundamentals_store.py
+─────────────────────────────
+Single on-disk store behind get_fundamentals(), with a TTL per field.
+
+Fundamentals used to live in three places: ``{T}_fundamentals.json`` +
+``.fmeta`` sidecars (one date for the whole payload), the DuckDB
+``fundamentals_cache`` table, and the stale-fallback path that re-read both.
+Here every field carries its own fetch time and expires on its own schedule
+(FUNDAMENTALS_FIELD_TTL_DAYS), so a daily scan re-fetches .info but not the
+quarterly income statement:
+
+  info                                        1 day
+  eps_revisions / eps_trend / analyst_targets /
+  insider_transactions                        a few days
+  institutional_holders                       weeks (13F filings are quarterly)
+  quarterly_eps / earnings_surprise           a quarter — or as soon as the
+                                              next earnings date .info showed
+                                              when they were stored has passed
+
+Layout:
+  data/price_cache/fundamentals/<TICKER>.json
+        {"ticker", "fields": {field: {"ts": epoch-sec, "value": …,
+                                      "earnings": epoch-sec (quarterly fields)}}}
+        DataFrames are stored as pandas "split" JSON (index + columns kept).
+  data/price_cache/fundamentals/manifest.json
+        ticker → {field: ts}   (freshness counts without opening every file)
+
+Several processes (web app, CLI scans) share the store.  Manifest updates are
+batched — saved every FUNDAMENTALS_MANIFEST_BATCH documents or
+FUNDAMENTALS_MANIFEST_FLUSH_SEC after the first unsaved one, and at exit —
+under a cross-process file lock, merged into the manifest as another process
+last saved it (re-read whenever manifest.json changes on disk).
+
+A field fetched after the last completed US session (modules/trading_calendar)
+never expires before the next one closes — a Saturday or holiday start re-uses
+Friday evening's .info instead of fetching identical data.
+
+A legacy ``{T}_fundamentals.json`` cache is imported on first read, stamped
+with the date in its .fmeta.
+
+Usage:
+    entries = fundamentals_store.read("NVDA")      # field → Entry(value, ts, age_days, fresh)
+    fundamentals_store.put("NVDA", {"info": info, "eps_trend": df})
+    fundamentals_store.count_fresh("info")
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules import file_lock, trading_calendar
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = ROOT / getattr(C, "FUNDAMENTALS_STORE_DIR", "data/price_cache/fundamentals")
+LEGACY_DIR = ROOT / getattr(C, "PRICE_CACHE_DIR", "data/price_cache")
+
+FIELDS = ("info", "quarterly_eps", "earnings_surprise", "eps_revisions", "eps_trend",
+          "institutional_holders", "insider_transactions", "analyst_targets")
+# Superseded as soon as the company reports
+QUARTERLY_FIELDS = ("quarterly_eps", "earnings_surprise")
+
+_DEFAULT_TTL_DAYS = {
+    "info": 1, "quarterly_eps": 45, "earnings_surprise": 45,
+    "eps_revisions": 3, "eps_trend": 3, "analyst_targets": 3,
+    "insider_transactions": 3, "institutional_holders": 30,
+}
+
+_manifest_lock = threading.Lock()
+_manifest: Optional[dict] = None        # manifest.json as last read, plus _pending
+_manifest_stamp: Optional[tuple] = None  # (mtime_ns, size) of the manifest.json _manifest came from
+_pending: dict = {}                     # KEY → {field: ts}, or None when dropped (not yet saved)
+_pending_dir: Optional[Path] = None     # STORE_DIR the pending updates belong to
+_flush_timer: Optional[threading.Timer] = None
+_ticker_locks: dict = {}
+_ticker_locks_guard = threading.Lock()
+
+
+class Entry(NamedTuple):
+    value: object
+    ts: float
+    age_days: int          # calendar days since the fetch (0 = fetched today)
+    fresh: bool
+
+
+def ttl_days(field: str) -> float:
+    ttl = dict(_DEFAULT_TTL_DAYS)
+    ttl["info"] = getattr(C, "FUNDAMENTALS_CACHE_DAYS", ttl["info"])
+    ttl.update(getattr(C, "FUNDAMENTALS_FIELD_TTL_DAYS", None) or {})
+    return float(ttl.get(field, getattr(C, "FUNDAMENTALS_CACHE_DAYS", 1)))
+
+
+def _key(ticker: str) -> str:
+    return re.sub(r"[^A-Z0-9._-]", "_", ticker.upper())
+
+
+def _doc_file(ticker: str) -> Path:
+    return STORE_DIR / f"{_key(ticker)}.json"
+
+
+def _manifest_file() -> Path:
+    return STORE_DIR / "manifest.json"
+
+
+def _ticker_lock(ticker: str) -> threading.Lock:
+    with _ticker_locks_guard:
+        return _ticker_locks.setdefault(_key(ticker), threading.Lock())
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Value encoding
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _encode(value):
+    if isinstance(value, pd.DataFrame):
+        return {"__frame__": json.loads(value.to_json(orient="split", date_format="iso",
+                                                      default_handler=str))}
+    if isinstance(value, pd.Series):
+        return value.tolist()
+    return value
+
+
+def _decode(field: str, value):
+    if field == "info":
+        return dict(value or {})
+    if isinstance(value, dict) and "__frame__" in value:
+        f = value["__frame__"]
+        return pd.DataFrame(f.get("data") or [], index=f.get("index"), columns=f.get("columns"))
+    if isinstance(value, list):                        # legacy records JSON
+        return pd.DataFrame(value) if value else pd.DataFrame()
+    return pd.DataFrame()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Documents
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _import_legacy(ticker: str) -> dict:
+    """Fields of a pre-store ``{T}_fundamentals.json`` cache, stamped with its .fmeta date."""
+    cache_file = LEGACY_DIR / f"{ticker.upper()}_fundamentals.json"
+    meta_file = cache_file.with_suffix(".fmeta")
+    if not (cache_file.exists() and meta_file.exists()):
+        return {}
+    try:
+        day = date.fromisoformat(meta_file.read_text().strip())
+        raw = json.loads(cache_file.read_text(encoding="utf-8"))
+    except Exception as exc:
+        logger.debug("[FundStore] legacy cache for %s unreadable: %s", ticker, exc)
+        return {}
+    ts = datetime.combine(day, datetime.min.time()).timestamp()
+    # Empty lists were written for endpoints that were never fetched (scan_mode)
+    return {k: {"ts": ts, "value": raw[k]} for k in FIELDS if raw.get(k)}
+
+
+def _read_doc(ticker: str) -> dict:
+    path = _doc_file(ticker)
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception as exc:
+            logger.debug("[FundStore] %s unreadable, ignoring: %s", path.name, exc)
+            return {"ticker": ticker.upper(), "fields": {}}
+    fields = _import_legacy(ticker)
+    doc = {"ticker": ticker.upper(), "fields": fields}
+    if fields:
+        _write_doc(ticker, doc)
+    return doc
+
+
+def _write_doc(ticker: str, doc: dict) -> None:
+    _atomic_write_text(_doc_file(ticker), json.dumps(doc, ensure_ascii=False, default=str))
+    _note(ticker, {k: e["ts"] for k, e in doc["fields"].items()})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Manifest
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _manifest_stat() -> Optional[tuple]:
+    try:
+        st = _manifest_file().stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_manifest_locked() -> dict:
+    """The manifest with this process's unsaved updates, re-read when another process saved it."""
+    global _manifest, _manifest_stamp
+    stamp = _manifest_stat()
+    if _manifest is None or stamp != _manifest_stamp:
+        try:
+            manifest = json.loads(_manifest_file().read_text(encoding="utf-8")) if stamp else {}
+        except Exception:
+            manifest = {}
+        for key, stamps in _pending.items():
+            if stamps is None:
+                manifest.pop(key, None)
+            else:
+                manifest[key] = stamps
+        _manifest, _manifest_stamp = manifest, stamp
+    return _manifest
+
+
+def _note(ticker: str, stamps: Optional[dict]) -> None:
+    """Record a document's field stamps (None: dropped); saved with the next flush()."""
+    global _pending_dir, _flush_timer
+    key = _key(ticker)
+    with _manifest_lock:
+        manifest = _load_manifest_locked()
+        if stamps is None and key not in manifest and key not in _pending:
+            return
+        if stamps is None:
+            manifest.pop(key, None)
+        else:
+            manifest[key] = stamps
+        if not _pending:
+            _pending_dir = STORE_DIR
+            delay = float(getattr(C, "FUNDAMENTALS_MANIFEST_FLUSH_SEC", 5.0))
+            _flush_timer = threading.Timer(delay, flush)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+        _pending[key] = stamps
+        due = len(_pending) >= int(getattr(C, "FUNDAMENTALS_MANIFEST_BATCH", 200))
+    if due:
+        flush()
+
+
+def flush() -> None:
+    """Save unsaved manifest updates, merged into what other processes saved meanwhile."""
+    global _manifest_stamp, _pending_dir
+    with _manifest_lock:
+        if not _pending:
+            return
+        if _pending_dir != STORE_DIR:
+            # The store was relocated after the updates were made (tests)
+            _pending.clear()
+            return
+    with file_lock.locked(STORE_DIR / ".lock"), _manifest_lock:
+        if not _pending or _pending_dir != STORE_DIR:
+            return
+        manifest = _load_manifest_locked()
+        _atomic_write_text(_manifest_file(), json.dumps(manifest))
+        _manifest_stamp = _manifest_stat()
+        _pending.clear()
+        _pending_dir = None
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+
+
+def _age_days(ts: float, today: date) -> int:
+    return (today - date.fromtimestamp(ts)).days
+
+
+def _earnings_dates(info: dict) -> list:
+    out = []
+    for key in ("earningsTimestamp", "earningsTimestampStart"):
+        try:
+            when = float((info or {}).get(key) or 0)
+        except (TypeError, ValueError):
+            continue
+        if when > 0:
+            out.append(when)
+    return out
+
+
+def _next_earnings(info: dict, ts: float) -> Optional[float]:
+    """The first earnings date in .info after `ts` (recorded with quarterly fields)."""
+    return min((w for w in _earnings_dates(info) if w > ts), default=None)
+
+
+def _earnings_since(info: dict, ts: float, now: float) -> bool:
+    """True when .info records an earnings date between `ts` and now."""
+    return any(ts < when <= now for when in _earnings_dates(info))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _fresh_flags(fields: dict) -> dict:
+    """field → (ts, age_days, fresh) for raw stored entries."""
+    now, today = time.time(), date.today()
+    completed = trading_calendar.completed_at()
+    info = (fields.get("info") or {}).get("value") or {}
+    out = {}
+    for field, entry in fields.items():
+        ts = float(entry.get("ts") or 0)
+        age = _age_days(ts, today)
+        fresh = age < ttl_days(field) or ts >= completed
+        if fresh and field in QUARTERLY_FIELDS:
+            # .info moves on to the next quarter's date soon after a report,
+            # so the date seen at store time is what expires the field
+            reported = entry.get("earnings")
+            if (reported and float(reported) <= now) or _earnings_since(info, ts, now):
+                fresh = False
+        out[field] = (ts, age, fresh)
+    return out
+
+
+def _fields(ticker: str) -> dict:
+    with _ticker_lock(ticker):
+        return _read_doc(ticker).get("fields") or {}
+
+
+def read(ticker: str) -> dict:
+    """field → Entry for everything stored for `ticker` (expired fields included, fresh=False)."""
+    fields = _fields(ticker)
+    return {field: Entry(_decode(field, fields[field].get("value")), ts, age, fresh)
+            for field, (ts, age, fresh) in _fresh_flags(fields).items()}
+
+
+def put(ticker: str, values: dict, ts: Optional[float] = None) -> None:
+    """Store fetched `values` (field → dict/DataFrame), each stamped `ts` (default now)."""
+    values = {k: v for k, v in values.items() if k in FIELDS and v is not None}
+    if not values:
+        return
+    ts = time.time() if ts is None else ts
+    with _ticker_lock(ticker):
+        doc = _read_doc(ticker)
+        fields = doc.setdefault("fields", {})
+        info = values.get("info") or (fields.get("info") or {}).get("value") or {}
+        for field, value in values.items():
+            fields[field] = {"ts": ts, "value": _encode(value)}
+            if field in QUARTERLY_FIELDS and (when := _next_earnings(info, ts)):
+                fields[field]["earnings"] = when
+        doc["ticker"] = ticker.upper()
+        _write_doc(ticker, doc)
+
+
+def missing(ticker: str, fields) -> list:
+    """The subset of `fields` that is absent or expired for `ticker` (nothing is decoded)."""
+    stored = _fields(ticker)
+    flags = _fresh_flags(stored)
+    return [f for f in fields if f not in flags or not flags[f][2]
+            or (f == "info" and not stored[f].get("value"))]
+
+
+def drop(ticker: str) -> None:
+    with _ticker_lock(ticker):
+        _doc_file(ticker).unlink(missing_ok=True)
+        _note(ticker, None)
+
+
+def count_fresh(field: str = "info") -> int:
+    """Tickers whose `field` is within its TTL (from the manifest; earnings expiry not applied)."""
+    ttl, today = ttl_days(field), date.today()
+    completed = trading_calendar.completed_at()
+    with _manifest_lock:
+        manifest = dict(_load_manifest_locked())
+    return sum(1 for stamps in manifest.values()
+               if field in stamps and (_age_days(float(stamps[field]), today) < ttl
+                                       or float(stamps[field]) >= completed))
+
+
+def stats() -> dict:
+    with _manifest_lock:
+        n = len(_load_manifest_locked())
+    return {"tickers": n, "fresh": {f: count_fresh(f) for f in FIELDS},
+            "ttl_days": {f: ttl_days(f) for f in FIELDS}}
+
+
+def reset() -> None:
+    """Forget the in-memory manifest and unsaved updates (tests / after STORE_DIR changes)."""
+    global _manifest, _manifest_stamp, _pending_dir
+    with _manifest_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+        _manifest, _manifest_stamp, _pending_dir = None, None, None
+        _pending.clear()
+
+
+atexit.register(flush)
@@ -1520,14 +1520,14 @@ def _get_quote_from_yfinance(ticker: str) -> Dict[str, Any]:
     Returns last close price with estimated bid/ask spread.
     """
     try:
-        import yfinance as yf
         import pandas as pd
         import numpy as np
+        from modules.data_providers import get_provider
         
         _logger.debug(f"Fetching quote from yfinance for {ticker}")
         
-        # Download last day of data
-        data = yf.download(ticker, period="1d", progress=False)
+        # Download last day of data (through the market-data provider, uncached)
+        data = get_provider().history(ticker, period="1d")
         
         # Handle empty data
         if data is None or (isinstance(data, pd.DataFrame) and len(data) == 0):
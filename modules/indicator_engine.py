@@ -0,0 +1,307 @@
+"""
+modules/indicator_engine.py
+───────────────────────────
+Stateful incremental indicator engine for the enriched master series.
+
+get_technicals() recomputes every column over the full ~500-bar history.  When
+a cached master series only gained a few new bars, this engine resumes from the
+per-ticker rolling state persisted at the end of the previous enrichment and
+computes just the new rows — O(new bars) instead of O(history):
+
+  EMA_9/21/50/150          last EMA value                  (state)
+  SMA_50/150/200           rolling close sums              (state)
+  RSI_14                   Wilder average gain / loss      (state)
+  ATR_14                   Wilder average true range       (state)
+  BBANDS 20/2, 52W hi/lo   window closes, min/max deques   (enriched tail)
+  *_SLOPE                  last 22 MA values               (enriched tail)
+
+The state frame keeps one row per bar for the last INDICATOR_STATE_BARS bars,
+so a refresh that re-downloads a few overlapping bars (incremental OHLCV
+refresh) can rewind to the last unchanged bar.  The recurrences mirror the
+pandas / pandas_ta batch formulas, so results match get_technicals() on the
+same history to floating-point tolerance.
+
+Pure computation — no I/O.  data_pipeline persists the state frames in the
+price store next to the enriched frames.
+"""
+
+import sys
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+from modules import indicators
+
+logger = logging.getLogger(__name__)
+
+_OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+_SMA_LENGTHS = (50, 150, 200)
+_EMA_LENGTHS = (9, 21, 50, 150)
+_RSI_LEN = 14
+_ATR_LEN = 14
+_BB_LEN, _BB_STD = 20, 2.0
+_HL_WINDOW = 252
+_SLOPE_WINDOW = 22
+_SLOPE_COLS = {
+    "SMA200_SLOPE": "SMA_200", "SMA150_SLOPE": "SMA_150",
+    "EMA21_SLOPE": "EMA_21", "EMA50_SLOPE": "EMA_50",
+}
+_BB_PREFIXES = ("BBL_", "BBM_", "BBU_", "BBB_", "BBP_")
+
+_REQUIRED = (
+    _OHLCV
+    + [f"SMA_{n}" for n in _SMA_LENGTHS]
+    + [f"EMA_{n}" for n in _EMA_LENGTHS]
+    + ["RSI_14", "ATR_14", "HIGH_52W", "LOW_52W"]
+    + list(_SLOPE_COLS)
+)
+
+STATE_COLS = (
+    [f"EMA_{n}" for n in _EMA_LENGTHS]
+    + [f"SUM_{n}" for n in _SMA_LENGTHS]
+    + ["RSI_GAIN", "RSI_LOSS", "ATR"]
+)
+
+
+def state_bars() -> int:
+    """Number of per-bar state rows kept per ticker."""
+    overlap = int(getattr(C, "PRICE_INCREMENTAL_OVERLAP_BARS", 5))
+    return max(int(getattr(C, "INDICATOR_STATE_BARS", 10)), overlap + 2)
+
+
+def _bb_columns(columns) -> Optional[dict]:
+    """Map each Bollinger prefix to its (version-dependent) column name."""
+    out = {}
+    for prefix in _BB_PREFIXES:
+        hits = [c for c in columns if str(c).startswith(prefix)]
+        if len(hits) != 1:
+            return None
+        out[prefix] = hits[0]
+    return out
+
+
+def _ewm_step(prev: float, x: float, alpha: float) -> float:
+    """One step of pandas ewm(adjust=False).mean(), with its exact arithmetic."""
+    if prev == x:
+        return prev
+    old_wt = 1.0 - alpha
+    return (old_wt * prev + alpha * x) / (old_wt + alpha)
+
+
+def _slope_pct(y: np.ndarray) -> float:
+    """Least-squares slope of `y` in % of its first value per bar."""
+    return float(indicators.rolling_slope_pct(y, len(y))[-1])
+
+
+def _nonzero(x: float) -> float:
+    return x + sys.float_info.epsilon if x == 0 else x
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# State seeding (after a full batch computation)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def seed_state(enriched: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Build the state frame for the last INDICATOR_STATE_BARS bars of a frame
+    enriched by get_technicals().  None if the frame lacks indicator columns
+    (e.g. pandas_ta unavailable) or is too short to resume from.
+    """
+    if enriched is None or len(enriched) < _HL_WINDOW:
+        return None
+    if any(c not in enriched.columns for c in _REQUIRED) or _bb_columns(enriched.columns) is None:
+        return None
+
+    close = enriched["Close"].astype(float)
+    diff = close.diff()
+    state = pd.DataFrame(index=enriched.index)
+    for n in _EMA_LENGTHS:
+        state[f"EMA_{n}"] = enriched[f"EMA_{n}"].astype(float)
+    for n in _SMA_LENGTHS:
+        state[f"SUM_{n}"] = close.rolling(n).sum()
+    state["RSI_GAIN"] = diff.clip(lower=0).ewm(alpha=1.0 / _RSI_LEN, adjust=False).mean()
+    state["RSI_LOSS"] = diff.clip(upper=0).ewm(alpha=1.0 / _RSI_LEN, adjust=False).mean()
+    state["ATR"] = enriched["ATR_14"].astype(float)
+
+    state = state.iloc[-state_bars():]
+    if state.isna().any().any():
+        return None
+    return state
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental extension
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _resume_point(enriched: pd.DataFrame, state: pd.DataFrame,
+                  raw: pd.DataFrame) -> Optional[pd.Timestamp]:
+    """
+    Latest bar from which `raw` can be continued: its OHLCV up to that bar is
+    identical to the enriched frame's, and a state row exists for it.
+    """
+    old_part = raw[raw.index <= enriched.index[-1]]
+    ref = enriched.loc[enriched.index >= raw.index[0], _OHLCV]
+    if old_part.empty or not old_part.index.equals(ref.index):
+        return None
+    same = (old_part.to_numpy(dtype=float) == ref.to_numpy(dtype=float)).all(axis=1)
+    n_same = len(same) if same.all() else int(np.argmin(same))
+    if n_same == 0:
+        return None
+    candidates = state.index[state.index <= old_part.index[n_same - 1]]
+    return candidates[-1] if len(candidates) else None
+
+
+def extend(enriched: pd.DataFrame, state: pd.DataFrame,
+           raw: pd.DataFrame) -> Optional[tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Enrich the OHLCV frame `raw` by continuing the previously enriched frame
+    `enriched` from its saved `state` instead of recomputing the history.
+
+    `raw` is the refreshed master series: its bars up to the resume point must
+    be the same as the cached ones (leading bars may have been trimmed).
+    Returns (enriched frame aligned to raw, new state frame), or None when a
+    full get_technicals() pass is required (missing columns/state, restated
+    or re-ordered history, too little history for the 52-week window).
+    """
+    if enriched is None or state is None or raw is None:
+        return None
+    if enriched.empty or state.empty or raw.empty:
+        return None
+    if any(c not in enriched.columns for c in _REQUIRED):
+        return None
+    bb_cols = _bb_columns(enriched.columns)
+    if bb_cols is None or any(c not in state.columns for c in STATE_COLS):
+        return None
+
+    raw = raw[_OHLCV]
+    resume = _resume_point(enriched, state, raw)
+    if resume is None:
+        return None
+    pos = enriched.index.get_loc(resume)
+    if not isinstance(pos, (int, np.integer)) or pos + 1 < _HL_WINDOW:
+        return None
+
+    base = enriched.iloc[:pos + 1]
+    new = raw[raw.index > resume]
+    kept_state = state[state.index <= resume]
+    if new.empty:
+        out = base[base.index >= raw.index[0]]
+        return out, kept_state.iloc[-state_bars():]
+
+    st = kept_state.iloc[-1]
+    ema = {n: float(st[f"EMA_{n}"]) for n in _EMA_LENGTHS}
+    # The EMAs are stored in both frames: a mismatch means the state belongs
+    # to a different enrichment of this ticker (e.g. a lost write).
+    if any(ema[n] != float(base[f"EMA_{n}"].iloc[-1]) for n in _EMA_LENGTHS):
+        return None
+    sums = {n: float(st[f"SUM_{n}"]) for n in _SMA_LENGTHS}
+    rsi_gain, rsi_loss, atr = float(st["RSI_GAIN"]), float(st["RSI_LOSS"]), float(st["ATR"])
+
+    # Window closes: the last 252 enriched bars followed by the new bars
+    w0 = _HL_WINDOW
+    closes = np.concatenate([base["Close"].to_numpy(dtype=float)[-w0:],
+                             new["Close"].to_numpy(dtype=float)])
+    slope_hist = {col: list(base[src].to_numpy(dtype=float)[-(_SLOPE_WINDOW - 1):])
+                  for col, src in _SLOPE_COLS.items()}
+
+    # Monotonic deques of window positions for the rolling 52-week max / min
+    dq_max: deque = deque()
+    dq_min: deque = deque()
+    for p in range(w0):
+        while dq_max and closes[dq_max[-1]] <= closes[p]:
+            dq_max.pop()
+        dq_max.append(p)
+        while dq_min and closes[dq_min[-1]] >= closes[p]:
+            dq_min.pop()
+        dq_min.append(p)
+
+    prev_close = float(base["Close"].iloc[-1])
+    a_rsi, a_atr = 1.0 / _RSI_LEN, 1.0 / _ATR_LEN
+    rows, state_rows = [], []
+    for j, (_, bar) in enumerate(new.iterrows()):
+        p = w0 + j
+        c, h, lo = float(bar["Close"]), float(bar["High"]), float(bar["Low"])
+        row = {col: bar[col] for col in _OHLCV}
+
+        for n in _SMA_LENGTHS:
+            sums[n] += c - closes[p - n]
+            row[f"SMA_{n}"] = sums[n] / n
+        for n in _EMA_LENGTHS:
+            ema[n] = _ewm_step(ema[n], c, 2.0 / (n + 1))
+            row[f"EMA_{n}"] = ema[n]
+
+        d = c - prev_close
+        rsi_gain = _ewm_step(rsi_gain, max(d, 0.0), a_rsi)
+        rsi_loss = _ewm_step(rsi_loss, min(d, 0.0), a_rsi)
+        row["RSI_14"] = 100.0 * rsi_gain / (rsi_gain + abs(rsi_loss))
+        tr = max(abs(h - lo), abs(h - prev_close), abs(prev_close - lo))
+        atr = _ewm_step(atr, tr, a_atr)
+        row["ATR_14"] = atr
+
+        win = closes[p - _BB_LEN + 1:p + 1]
+        mid = win.sum() / _BB_LEN
+        std = float(np.sqrt(((win - mid) ** 2).sum() / (_BB_LEN - 1)))
+        lower, upper = mid - _BB_STD * std, mid + _BB_STD * std
+        band = _nonzero(upper - lower)
+        row[bb_cols["BBL_"]], row[bb_cols["BBM_"]], row[bb_cols["BBU_"]] = lower, mid, upper
+        row[bb_cols["BBB_"]] = 100 * band / mid
+        row[bb_cols["BBP_"]] = _nonzero(c - lower) / band
+
+        for col, src in _SLOPE_COLS.items():
+            hist = slope_hist[col]
+            hist.append(row[src])
+            row[col] = _slope_pct(np.array(hist[-_SLOPE_WINDOW:]))
+            del hist[:-(_SLOPE_WINDOW - 1)]
+
+        while dq_max and closes[dq_max[-1]] <= c:
+            dq_max.pop()
+        dq_max.append(p)
+        while dq_min and closes[dq_min[-1]] >= c:
+            dq_min.pop()
+        dq_min.append(p)
+        while dq_max[0] <= p - _HL_WINDOW:
+            dq_max.popleft()
+        while dq_min[0] <= p - _HL_WINDOW:
+            dq_min.popleft()
+        hi, lo52 = closes[dq_max[0]], closes[dq_min[0]]
+        row["HIGH_52W"], row["LOW_52W"] = hi, lo52
+        row["PCT_FROM_52W_HIGH"] = (c - hi) / hi * 100
+        row["PCT_FROM_52W_LOW"] = (c - lo52) / lo52 * 100
+
+        rows.append(row)
+        state_rows.append({**{f"EMA_{n}": ema[n] for n in _EMA_LENGTHS},
+                           **{f"SUM_{n}": sums[n] for n in _SMA_LENGTHS},
+                           "RSI_GAIN": rsi_gain, "RSI_LOSS": rsi_loss, "ATR": atr})
+        prev_close = c
+
+    added = pd.DataFrame(rows, index=new.index)
+    _add_trend_flags(added)
+    added = added.reindex(columns=enriched.columns)
+    for col in enriched.columns:
+        if enriched[col].dtype == bool:
+            added[col] = added[col].astype(bool)
+
+    out = pd.concat([base, added])
+    out = out[out.index >= raw.index[0]]
+    new_state = pd.concat([kept_state, pd.DataFrame(state_rows, index=new.index)])
+    return out, new_state[STATE_COLS].iloc[-state_bars():]
+
+
+def _add_trend_flags(df: pd.DataFrame) -> None:
+    """Boolean trend columns, as get_technicals() derives them."""
+    close = df["Close"]
+    for n in _SMA_LENGTHS:
+        df[f"ABOVE_SMA{n}"] = close > df[f"SMA_{n}"]
+    for a, b in [(50, 150), (50, 200), (150, 200)]:
+        df[f"SMA{a}_GT_SMA{b}"] = df[f"SMA_{a}"] > df[f"SMA_{b}"]
+    for n in _EMA_LENGTHS:
+        df[f"ABOVE_EMA{n}"] = close > df[f"EMA_{n}"]
+    for a, b in [(9, 21), (21, 50), (50, 150)]:
+        df[f"EMA{a}_GT_EMA{b}"] = df[f"EMA_{a}"] > df[f"EMA_{b}"]
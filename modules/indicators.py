@@ -0,0 +1,374 @@
+"""
+modules/indicators.py
+─────────────────────
+Vectorised NumPy indicator kernels.
+
+Every kernel takes a 1-D array (dates) or a 2-D array (dates × tickers) and
+works along axis 0, so the same code serves one ticker's enrichment and a
+cross-sectional panel of the whole universe.  NaN handling follows the pandas
+rolling semantics used by data_pipeline.get_technicals(): a window containing
+any NaN, or a window that is not yet full, yields NaN.
+"""
+
+import re
+from typing import Callable
+
+import numpy as np
+
+
+def _window_sums(a: np.ndarray, window: int) -> np.ndarray:
+    """Sum of each trailing `window` rows of `a` (row t → rows t-window+1 … t)."""
+    c = np.cumsum(a, axis=0)
+    out = c.copy()
+    out[window:] = c[window:] - c[:-window]
+    return out
+
+
+def rolling_slope_pct(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling least-squares slope in % of the window's first value per bar.
+
+    Closed form of ``np.polyfit(x, y, 1)[0] / y[0] * 100`` over each trailing
+    window (x = 0 … window-1), built from cumulative sums of y and j·y — one
+    O(n) pass instead of one polyfit per bar.  A first value of 0 uses a base
+    of 1, as the per-window implementation did.
+
+    Args:
+        values: 1-D (dates) or 2-D (dates × tickers) array
+        window: regression window length in bars
+
+    Returns an array of the same shape; NaN where the window is incomplete
+    or contains NaN.
+    """
+    y = np.asarray(values, dtype=float)
+    n = y.shape[0]
+    out = np.full(y.shape, np.nan)
+    if window < 2 or n < window:
+        return out
+
+    nan_mask = np.isnan(y)
+    # The slope is shift-invariant in y: centre the data before the cumulative
+    # sums so their magnitude (and rounding error) stays small.
+    filled = np.where(nan_mask, 0.0, y)
+    ref = filled.sum(axis=0) / np.maximum((~nan_mask).sum(axis=0), 1)
+    yc = np.where(nan_mask, 0.0, y - ref)
+
+    j = np.arange(n, dtype=float).reshape((n,) + (1,) * (y.ndim - 1))
+    sum_y = _window_sums(yc, window)
+    sum_jy = _window_sums(j * yc, window)
+    start = j - (window - 1)                          # index of each window's first bar
+    sum_xy = sum_jy - start * sum_y                   # Σ x·y with x = 0 … window-1
+
+    x_mean = (window - 1) / 2.0
+    sxx = window * (window * window - 1) / 12.0       # Σ (x - x̄)²
+    slope = (sum_xy - x_mean * sum_y) / sxx
+
+    first = np.full(y.shape, np.nan)
+    first[window - 1:] = y[:n - window + 1]
+    base = np.where(first == 0, 1.0, first)
+
+    n_nan = _window_sums(nan_mask.astype(np.int64), window)
+    valid = n_nan == 0
+    valid[:window - 1] = False
+    out[valid] = (slope / base * 100)[valid]
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Moving averages / Wilder smoothing
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _as_2d(values: np.ndarray) -> np.ndarray:
+    a = np.asarray(values, dtype=float)
+    return a.reshape(a.shape[0], -1)
+
+
+def run_age(values: np.ndarray) -> np.ndarray:
+    """Bars since each column's first non-NaN value (-1 before it)."""
+    started = np.maximum.accumulate(~np.isnan(_as_2d(values)), axis=0)
+    return (np.cumsum(started, axis=0) - 1).reshape(np.shape(values))
+
+
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    """Rolling mean over `length` bars (pandas rolling(length).mean() semantics)."""
+    x = np.asarray(values, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] < length:
+        return out
+    nan_mask = np.isnan(x)
+    filled = np.where(nan_mask, 0.0, x)
+    ref = filled.sum(axis=0) / np.maximum((~nan_mask).sum(axis=0), 1)
+    sums = _window_sums(np.where(nan_mask, 0.0, x - ref), length)
+    n_nan = _window_sums(nan_mask.astype(np.int64), length)
+    valid = n_nan == 0
+    valid[:length - 1] = False
+    out[valid] = (sums / length + ref)[valid]
+    return out
+
+
+def ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    pandas ``ewm(alpha=alpha, adjust=False).mean()`` along axis 0, with the same
+    arithmetic.  Each column's recursion starts at its first non-NaN value;
+    NaN gaps after that carry the last value forward.
+    """
+    x = _as_2d(values)
+    old_wt = 1.0 - alpha
+    if x.shape[1] == 1:
+        return np.array(_ewm_scalar(x[:, 0].tolist(), alpha, old_wt)).reshape(np.shape(values))
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1], np.nan)
+    with np.errstate(invalid="ignore"):
+        for t in range(x.shape[0]):
+            cur = x[t]
+            step = np.where(prev == cur, prev, (old_wt * prev + alpha * cur) / (old_wt + alpha))
+            prev = np.where(np.isnan(prev), cur, np.where(np.isnan(cur), prev, step))
+            out[t] = prev
+    return out.reshape(np.shape(values))
+
+
+def _ewm_scalar(xs: list, alpha: float, old_wt: float) -> list:
+    """Single-column ewm() on Python floats (per-row array ops dominate at width 1)."""
+    out = []
+    prev = float("nan")
+    for cur in xs:
+        if prev != prev:                       # NaN: start at the first value
+            prev = cur
+        elif cur == cur and cur != prev:
+            prev = (old_wt * prev + alpha * cur) / (old_wt + alpha)
+        out.append(prev)
+    return out
+
+
+def _presma(values: np.ndarray, length: int) -> np.ndarray:
+    """TA-Lib style seed: NaN for the first length-1 bars, their SMA at bar length-1."""
+    x = _as_2d(values)
+    age = run_age(x)
+    seed_sum = np.where((age >= 0) & (age < length), x, 0.0).sum(axis=0)
+    out = np.where(age < length - 1, np.nan, x)
+    seed_row = age == length - 1
+    out[seed_row] = np.broadcast_to(seed_sum / length, x.shape)[seed_row]
+    return out.reshape(np.shape(values))
+
+
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    """pandas_ta ``ema(length)``: SMA-seeded EMA with alpha = 2 / (length + 1)."""
+    return ewm(_presma(values, length), 2.0 / (length + 1))
+
+
+def rsi(close: np.ndarray, length: int = 14,
+        return_averages: bool = False):
+    """
+    Wilder RSI (pandas_ta ``rsi(length)``).  With return_averages=True also
+    returns the smoothed average gain / loss arrays (the loss is negative).
+    """
+    c = np.asarray(close, dtype=float)
+    diff = np.full(c.shape, np.nan)
+    diff[1:] = c[1:] - c[:-1]
+    gain = ewm(np.where(diff < 0, 0.0, diff), 1.0 / length)
+    loss = ewm(np.where(diff > 0, 0.0, diff), 1.0 / length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = 100.0 * gain / (gain + np.abs(loss))
+    return (out, gain, loss) if return_averages else out
+
+
+def _nonzero_range(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """x - y, plus epsilon on every column that has any zero difference (pandas_ta)."""
+    diff = x - y
+    has_zero = (diff == 0).any(axis=0)
+    return np.where(has_zero, diff + np.finfo(float).eps, diff)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; the first bar of each column uses its high-low range."""
+    h, lo, c = (np.asarray(a, dtype=float) for a in (high, low, close))
+    prev = np.full(c.shape, np.nan)
+    prev[1:] = c[:-1]
+    tr = np.fmax(np.abs(_nonzero_range(h, lo)), np.abs(h - prev))
+    return np.fmax(tr, np.abs(prev - lo))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+        length: int = 14) -> np.ndarray:
+    """pandas_ta ``atr(length)`` (RMA of the true range, SMA-seeded)."""
+    tr = true_range(high, low, close)
+    tr = np.where(np.isnan(close), np.nan, tr)
+    return ewm(_presma(tr, length), 1.0 / length)
+
+
+def bbands(close: np.ndarray, length: int = 20, std: float = 2.0) -> dict:
+    """
+    Bollinger bands (pandas_ta ``bbands(length, std)``, sample std dev).
+    Returns {"lower", "mid", "upper", "bandwidth", "percent"}.
+    """
+    c = np.asarray(close, dtype=float)
+    mid = sma(c, length)
+    sq = np.zeros(c.shape)
+    for k in range(length):                    # short window: direct, cancellation-free
+        lagged = np.full(c.shape, np.nan)
+        lagged[k:] = c[:c.shape[0] - k]
+        sq += (lagged - mid) ** 2
+    sd = np.sqrt(sq / (length - 1))
+    lower, upper = mid - std * sd, mid + std * sd
+    band = _nonzero_range(upper, lower)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "lower": lower, "mid": mid, "upper": upper,
+            "bandwidth": 100 * band / mid,
+            "percent": _nonzero_range(c, lower) / band,
+        }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Rolling extremes
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _rolling_extreme(values: np.ndarray, window: int, op) -> np.ndarray:
+    """Rolling max/min via a sparse table of power-of-two windows (log2 passes)."""
+    x = np.asarray(values, dtype=float)
+    n = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if n < window:
+        return out
+    span, table = 1, x.copy()
+    while span * 2 <= window:
+        shifted = np.full(x.shape, np.nan)
+        shifted[span:] = table[:n - span]
+        table = op(table, shifted)             # table[t] = extreme of x[t-2·span+1 … t]
+        span *= 2
+    shifted = np.full(x.shape, np.nan)
+    shifted[window - span:] = table[:n - (window - span)]
+    out[window - 1:] = op(table, shifted)[window - 1:]
+    return out
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """pandas rolling(window).max(): NaN for incomplete windows or windows with NaN."""
+    return _rolling_extreme(values, window, np.maximum)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """pandas rolling(window).min(): NaN for incomplete windows or windows with NaN."""
+    return _rolling_extreme(values, window, np.minimum)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Full indicator set (get_technicals column contract)
+# ─────────────────────────────────────────────────────────────────────────────
+
+SMA_LENGTHS = (50, 150, 200)
+EMA_LENGTHS = (9, 21, 50, 150)
+HL_WINDOW = 252
+SLOPE_WINDOW = 22
+OHLCV = ("Open", "High", "Low", "Close", "Volume")
+
+# Indicator columns of get_technicals(), in its column order
+TECHNICAL_COLUMNS = (
+    *(f"SMA_{n}" for n in SMA_LENGTHS),
+    *(f"EMA_{n}" for n in EMA_LENGTHS),
+    "RSI_14", "ATR_14",
+    "BBL_20_2.0", "BBM_20_2.0", "BBU_20_2.0", "BBB_20_2.0", "BBP_20_2.0",
+    "SMA200_SLOPE", "SMA150_SLOPE",
+    *(f"ABOVE_SMA{n}" for n in SMA_LENGTHS),
+    "SMA50_GT_SMA150", "SMA50_GT_SMA200", "SMA150_GT_SMA200",
+    "HIGH_52W", "LOW_52W", "PCT_FROM_52W_HIGH", "PCT_FROM_52W_LOW",
+    *(f"ABOVE_EMA{n}" for n in EMA_LENGTHS),
+    "EMA9_GT_EMA21", "EMA21_GT_EMA50", "EMA50_GT_EMA150",
+    "EMA21_SLOPE", "EMA50_SLOPE",
+)
+
+_MA = r"(SMA|EMA)(\d+)"                      # SMA50, EMA21 … inside derived names
+_BB_RE = re.compile(r"BB([LMUBP])_(\d+)_(\d+\.\d+)")
+_BB_KEYS = {"L": "lower", "M": "mid", "U": "upper", "B": "bandwidth", "P": "percent"}
+
+
+def _bar_count(c: np.ndarray):
+    return (~np.isnan(c)).sum(axis=0)
+
+
+def compute_column(name: str, get: Callable[[str], np.ndarray]) -> dict:
+    """
+    Compute indicator column `name` from its inputs, fetched with `get(column)`
+    (OHLCV or other indicator columns, memoised by the caller).
+
+    Returns {column: array}; kernels producing several columns at once (RSI
+    averages, all five Bollinger columns, both 52-week extremes) return them
+    all.  Besides TECHNICAL_COLUMNS any SMA_n / EMA_n / ABOVE_SMAn / SMAa_GT_EMAb
+    / SMAn_SLOPE / RSI_n / ATR_n / BB?_n_std name is understood.  Raises
+    KeyError for anything else.
+    """
+    c = get("Close")
+    m = re.fullmatch(r"(SMA|EMA)_(\d+)", name)
+    if m:
+        n = int(m.group(2))
+        if m.group(1) == "SMA":
+            return {name: sma(c, n)}
+        out = ema(c, n)
+        # Fewer bars than the length: get_technicals' fallback EMA seeded at
+        # the first close (pandas ewm(span=n, adjust=False)).
+        n_bars = _bar_count(c)
+        short = (n_bars > 0) & (n_bars < n)
+        if np.any(short):
+            out = np.where(short, ewm(c, 2.0 / (n + 1)), out)
+        return {name: out}
+
+    m = re.fullmatch(r"RSI_(\d+)", "RSI_14" if name in ("RSI_GAIN", "RSI_LOSS") else name)
+    if m:
+        n = int(m.group(1))
+        out, gain, loss = rsi(c, n, return_averages=True)
+        return {f"RSI_{n}": out, **({"RSI_GAIN": gain, "RSI_LOSS": loss} if n == 14 else {})}
+    m = re.fullmatch(r"ATR_(\d+)", name)
+    if m:
+        return {name: atr(get("High"), get("Low"), c, int(m.group(1)))}
+
+    m = _BB_RE.fullmatch(name)
+    if m:
+        length, std = int(m.group(2)), float(m.group(3))
+        bb = bbands(c, length, std)
+        return {f"BB{k}_{length}_{std}": bb[v] for k, v in _BB_KEYS.items()}
+
+    m = re.fullmatch(_MA + "_SLOPE", name)
+    if m:
+        return {name: rolling_slope_pct(get(f"{m.group(1)}_{m.group(2)}"), SLOPE_WINDOW)}
+    m = re.fullmatch("ABOVE_" + _MA, name)
+    if m:
+        return {name: c > get(f"{m.group(1)}_{m.group(2)}")}
+    m = re.fullmatch(_MA + "_GT_" + _MA, name)
+    if m:
+        return {name: get(f"{m.group(1)}_{m.group(2)}") > get(f"{m.group(3)}_{m.group(4)}")}
+
+    if name in ("HIGH_52W", "LOW_52W"):
+        # Rolling 252 bars, or expanding for shorter histories
+        rolling = _bar_count(c) >= HL_WINDOW
+        return {
+            "HIGH_52W": np.where(rolling, rolling_max(c, HL_WINDOW), np.fmax.accumulate(c, axis=0)),
+            "LOW_52W": np.where(rolling, rolling_min(c, HL_WINDOW), np.fmin.accumulate(c, axis=0)),
+        }
+    if name in ("PCT_FROM_52W_HIGH", "PCT_FROM_52W_LOW"):
+        ext = get("HIGH_52W" if name.endswith("HIGH") else "LOW_52W")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {name: (c - ext) / ext * 100}
+    raise KeyError(name)
+
+
+def technicals(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+               close: np.ndarray, volume: np.ndarray,
+               extras: bool = False) -> dict:
+    """
+    Every column of data_pipeline.get_technicals() for 1-D or 2-D OHLCV arrays,
+    in its column order.  Columns are assumed to hold one contiguous run of
+    bars each (leading / trailing NaN only).
+
+    With extras=True the dict also carries the Wilder RSI averages
+    ("RSI_GAIN", "RSI_LOSS") used to seed the incremental indicator engine.
+    """
+    memo = {k: np.asarray(v, dtype=float)
+            for k, v in zip(OHLCV, (open_, high, low, close, volume))}
+
+    def get(name: str) -> np.ndarray:
+        if name not in memo:
+            memo.update(compute_column(name, get))
+        return memo[name]
+
+    names = OHLCV + TECHNICAL_COLUMNS + (("RSI_GAIN", "RSI_LOSS") if extras else ())
+    return {name: get(name) for name in names}
@@ -0,0 +1,138 @@
+"""
+modules/lazy_frame.py
+─────────────────────
+Column-on-demand enriched frames.
+
+get_technicals() computes ~40 indicator columns, while most consumers read a
+handful: the ML gap scanner needs EMA_9 / EMA_21, the leader scanner the four
+EMAs.  A LazyFrame wraps an OHLCV frame and computes an indicator column
+(modules/indicators.py kernels) the first time it is read, memoising it —
+including any inputs it depends on (ABOVE_SMA50 → SMA_50).
+
+It supports the read-only subset of the DataFrame API those consumers use:
+``lf["EMA_21"]`` (Series), ``lf[["Close", "SMA_50"]]`` (DataFrame),
+``"SMA_200" in lf.columns``, ``len(lf)``, ``lf.empty``, ``lf.index`` and
+``lf.get(col)``; ``to_frame(cols)`` materialises a plain DataFrame.
+
+Indicators always see the whole wrapped history; ``rows=n`` exposes only the
+trailing n bars (a get_enriched() period slice of the master series).
+
+Usage:
+    lf = LazyFrame(ohlcv)
+    lf["EMA_9"].iloc[-1]                   # computes EMA_9 only
+    lf.last(["SMA_50", "ABOVE_SMA200"])    # last-row values
+    lf.to_frame()                          # full get_technicals() column set
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from modules import indicators
+
+
+class LazyFrame:
+    """Read-only OHLCV frame whose indicator columns are computed on first access."""
+
+    def __init__(self, df: pd.DataFrame, rows: Optional[int] = None):
+        self._df = df
+        # Bars without a close are skipped by the kernels, as if they did not exist
+        valid = df["Close"].notna().to_numpy() if "Close" in df.columns \
+            else np.zeros(len(df), bool)
+        self._pos = None if valid.all() else np.flatnonzero(valid)
+        self._arrays: dict = {}
+        self._series: dict = {}
+        self._lock = threading.RLock()
+        n = len(df) if rows is None else min(rows, len(df))
+        self._start = len(df) - n
+        self.index = df.index[self._start:]
+        extra = [c for c in indicators.TECHNICAL_COLUMNS if c not in df.columns]
+        self.columns = pd.Index(list(df.columns) + extra)
+
+    # ── DataFrame-like access ────────────────────────────────────────────
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._column(key)
+        return self.to_frame(list(key), base=False)
+
+    def __contains__(self, key) -> bool:
+        return key in self.columns
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.index) == 0
+
+    def get(self, key: str, default=None):
+        try:
+            return self._column(key)
+        except KeyError:
+            return default
+
+    def last(self, columns: list) -> pd.Series:
+        """Last-row value of each of `columns` (only those are computed)."""
+        return pd.Series({c: self._column(c).iloc[-1] if len(self) else np.nan
+                          for c in columns})
+
+    def to_frame(self, columns: Optional[list] = None, base: bool = True) -> pd.DataFrame:
+        """
+        Materialise a DataFrame: the wrapped frame's own columns (base=True)
+        plus `columns` (default: every get_technicals() indicator column).
+        Unknown names raise KeyError.
+        """
+        if columns is None:
+            columns = list(indicators.TECHNICAL_COLUMNS)
+        view = self._df.iloc[self._start:]
+        own = list(self._df.columns) if base else []
+        names = [c for c in dict.fromkeys(columns) if c not in own]
+        new = pd.DataFrame({c: view[c].to_numpy() if c in self._df.columns
+                            else self._full(c)[self._start:] for c in names},
+                           index=self.index)
+        return pd.concat([view[own], new], axis=1) if own else new
+
+    # ── Internals ────────────────────────────────────────────────────────
+    def _column(self, name: str) -> pd.Series:
+        with self._lock:
+            s = self._series.get(name)
+            if s is None:
+                if name in self._df.columns:
+                    s = self._df[name].iloc[self._start:]
+                else:
+                    s = pd.Series(self._full(name)[self._start:], index=self.index, name=name)
+                self._series[name] = s
+            return s
+
+    def _full(self, name: str) -> np.ndarray:
+        """Whole-history array of an indicator column, expanded over skipped bars."""
+        vals = self._get(name)
+        if self._pos is None:
+            return vals
+        full = np.zeros(len(self._df), bool) if vals.dtype == bool \
+            else np.full(len(self._df), np.nan)
+        full[self._pos] = vals
+        return full
+
+    def _get(self, name: str) -> np.ndarray:
+        """Memoised kernel input/output on the valid bars only."""
+        with self._lock:
+            arr = self._arrays.get(name)
+            if arr is None:
+                if name in self._df.columns:
+                    arr = self._df[name].to_numpy(dtype=float)
+                    if self._pos is not None:
+                        arr = arr[self._pos]
+                    self._arrays[name] = arr
+                elif name in indicators.OHLCV and "Close" in self._df.columns:
+                    arr = self._get("Close")              # Open / Volume missing
+                else:
+                    self._arrays.update(indicators.compute_column(name, self._get))
+                    arr = self._arrays[name]
+            return arr
@@ -33,6 +33,7 @@ from modules.data_pipeline import (
     get_sector_rankings,
     get_universe,
 )
+from modules import finviz_cache
 
 logger = logging.getLogger(__name__)
 
@@ -255,6 +256,7 @@ def _finviz_quick_count(f_param: str) -> Optional[int]:
     """
     Fetch ONLY page 1 of finviz screener and parse the total count.
     This takes ~0.5s instead of the 3-6 minutes needed to download all pages.
+    Counts are cached by modules/finviz_cache for FINVIZ_COUNT_TTL_HOURS.
 
     Args:
         f_param: comma-separated finviz filter codes, e.g.
@@ -262,6 +264,9 @@ def _finviz_quick_count(f_param: str) -> Optional[int]:
     Returns:
         Total matching stock count, or None on error.
     """
+    cached = finviz_cache.get_count(f_param)
+    if cached is not None:
+        return cached
     try:
         url = f"https://finviz.com/screener.ashx?v=111&f={f_param}"
         resp = _requests.get(url, headers=_FINVIZ_HEADERS, timeout=15)
@@ -270,11 +275,14 @@ def _finviz_quick_count(f_param: str) -> Optional[int]:
         # Parse: '#1 / 4239 Total'  or  '0 Total'
         m = _re.search(r'#1\s*/\s*([\d,]+)\s*Total', resp.text)
         if m:
-            return int(m.group(1).replace(',', ''))
-        if '0 Total' in resp.text:
-            return 0
-        logger.warning("_finviz_quick_count: could not parse total from page")
-        return None
+            count = int(m.group(1).replace(',', ''))
+        elif '0 Total' in resp.text:
+            count = 0
+        else:
+            logger.warning("_finviz_quick_count: could not parse total from page")
+            return None
+        finviz_cache.put_count(f_param, count)
+        return count
     except Exception as exc:
         logger.warning("_finviz_quick_count(%s) failed: %s", f_param, exc)
         return None
@@ -113,10 +113,9 @@ def run_gap_scanner(
     def _check_ticker_gap(ticker: str) -> dict | None:
         """Check a single ticker for gap-up. Returns result dict or None."""
         try:
-            # Performance optimization: only fetch EMA_9, EMA_21 (skip SMA, RSI, ATR, BBands)
-            # Gap check only needs: Open, Close, Volume, High, Low, and optional EMA context
-            df = get_enriched(ticker, period="3mo", use_cache=True,
-                            indicators=["EMA_9", "EMA_21"])
+            # Performance optimization: lazy frame — indicator columns are computed
+            # only when read (gap check reads OHLCV, then EMA_9 / EMA_21 for context)
+            df = get_enriched(ticker, period="3mo", use_cache=True, lazy=True)
             if df is None or len(df) < 5:
                 return None
 
@@ -418,10 +417,9 @@ def run_leader_scanner(
     def _check_ticker_leader(ticker: str) -> dict | None:
         """Check a single ticker for leader pattern. Returns result dict or None."""
         try:
-            # Performance optimization: only fetch EMA_9, EMA_21, EMA_50, EMA_150
-            # (needed by get_ema_alignment and get_pullback_depth)
-            df = get_enriched(ticker, period="1y", use_cache=True,
-                            indicators=["EMA_9", "EMA_21", "EMA_50", "EMA_150"])
+            # Performance optimization: lazy frame — only the EMAs read by
+            # get_ema_alignment / get_pullback_depth are computed
+            df = get_enriched(ticker, period="1y", use_cache=True, lazy=True)
             if df is None or len(df) < 50:
                 return None
 
@@ -10,6 +10,8 @@ Implements Martin Luk's 3-stage pullback screening funnel:
 Core philosophy: Pullback buying on rising EMA structure.
 95% technical — no fundamental filtering.
 EMA (not SMA) based; AVWAP as key S/R indicator.
+With SCAN_PIPELINE_ENABLED, Stage 3 scores each Stage 2 survivor as soon as
+it passes (modules/scan_pipeline.py).
 
 All market data goes exclusively through data_pipeline.py.
 """
@@ -32,6 +34,8 @@ ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 import trader_config as C
 
+from modules import scan_pipeline
+
 logger = logging.getLogger(__name__)
 
 # ── ANSI colours for terminal output ──────────────────────────────────────────
@@ -469,11 +473,23 @@ def _check_ml_stage2_event(ticker: str, df: pd.DataFrame,
     }
 
 
+def _attach_rs_ranks(rows: list[dict]) -> None:
+    """RS rank from the loaded snapshot / rs_cache.csv (no universe rebuild)."""
+    from modules.rs_ranking import get_rs_ranks, RS_NOT_RANKED
+    ranks = get_rs_ranks([r["ticker"] for r in rows], compute=False)
+    for r in rows:
+        if ranks[r["ticker"]] != RS_NOT_RANKED:
+            r["rs_rank"] = ranks[r["ticker"]]
+
+
 def run_ml_stage2(tickers: list[str], verbose: bool = True,
                   enriched_map: dict = None,
-                  channel_map: dict = None) -> list[dict]:
+                  channel_map: dict = None,
+                  on_pass=None) -> list[dict]:
     """
     Stage 2 — Download OHLCV and apply ML gate to each candidate.
+    Candidates are checked as their download batch arrives
+    (stream_download_and_enrich), overlapping the remaining downloads.
 
     Parameters
     ----------
@@ -481,10 +497,13 @@ def run_ml_stage2(tickers: list[str], verbose: bool = True,
         Mapping of ticker → channel label (e.g. "GAP", "GAINER", "LEADER", "").
         Stocks with channel "GAP" or "GAINER" use the relaxed event-channel
         filter (_check_ml_stage2_event). All others use the standard filter.
+    on_pass : callable | None
+        Called (from a filter thread) with each passing row, rs_rank
+        attached, as soon as it passes (pipelined Stage 3).
 
     Returns list of passing ticker dicts for Stage 3.
     """
-    from modules.data_pipeline import batch_download_and_enrich
+    from modules.data_pipeline import stream_download_and_enrich
 
     total = len(tickers)
     _progress("Stage 2", 12, f"下載 {total} 個股票歷史數據… Downloading history…")
@@ -493,7 +512,7 @@ def run_ml_stage2(tickers: list[str], verbose: bool = True,
     batch_size = getattr(C, "ML_STAGE2_BATCH_SIZE", 60)
     max_workers = getattr(C, "ML_STAGE2_MAX_WORKERS", 12)
 
-    # Monotonic progress: prevent regression when batch_download_and_enrich
+    # Monotonic progress: prevent regression when stream_download_and_enrich
     # switches from cache phase (scale 0–1) to download phase (scale 1–N).
     _s2_max_pct = [12]
     def _progress_cb(batch_num: int, total_batches: int, msg: str = ""):
@@ -502,16 +521,15 @@ def run_ml_stage2(tickers: list[str], verbose: bool = True,
         _progress("Stage 2", pct, msg)
 
     if enriched_map is None:
-        enriched = batch_download_and_enrich(
+        source = stream_download_and_enrich(
             tickers,
             period="1y",  # 1 year for EMA150 + momentum calculation
             progress_cb=_progress_cb,
         )
     else:
-        enriched = enriched_map
-        logger.info("[ML Stage2] Using pre-downloaded enriched_map (%d records)", len(enriched))
+        source = iter(enriched_map.items())
+        logger.info("[ML Stage2] Using pre-downloaded enriched_map (%d records)", len(enriched_map))
 
-    _progress("Stage 2", 48, "應用 ML EMA/ADR/動量過濾… Applying ML filters…")
     passed = []
 
     # MartinLukCore Ch2-3: Event-channel stocks (GAP/GAINER) use relaxed
@@ -521,14 +539,27 @@ def run_ml_stage2(tickers: list[str], verbose: bool = True,
     _event_enabled = getattr(C, "ML_EVENT_CHANNEL_ENABLED", True)
     _cmap = channel_map or {}
 
+    def _gate(check, *args) -> dict | None:
+        result = check(*args)
+        if result is not None and on_pass is not None:
+            _attach_rs_ranks([result])
+            on_pass(result)
+        return result
+
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Filters start on each ticker as soon as its batch is downloaded
         futures = {}
-        for tkr, df_data in enriched.items():
+        for tkr, df_data in source:
+            if _is_cancelled():
+                break
             ch = _cmap.get(tkr, "")
             if _event_enabled and ch in _event_channels:
-                futures[pool.submit(_check_ml_stage2_event, tkr, df_data, ch)] = tkr
+                futures[pool.submit(_gate, _check_ml_stage2_event, tkr, df_data, ch)] = tkr
             else:
-                futures[pool.submit(_check_ml_stage2, tkr, df_data)] = tkr
+                futures[pool.submit(_gate, _check_ml_stage2, tkr, df_data)] = tkr
+        if hasattr(source, "close"):
+            source.close()
+        _progress("Stage 2", 48, "應用 ML EMA/ADR/動量過濾… Applying ML filters…")
         done = 0
         for fut in as_completed(futures):
             if _is_cancelled():
@@ -549,6 +580,10 @@ def run_ml_stage2(tickers: list[str], verbose: bool = True,
             pct = 48 + int(done / max(total, 1) * 12)
             _progress("Stage 2", min(pct, 60), f"已檢查 {done}/{total}…", tkr)
 
+    # RS rank is shown in the result tables
+    if on_pass is None:
+        _attach_rs_ranks(passed)
+
     _progress("Stage 2", 62, f"{len(passed)} 通過 ADR/EMA/動量過濾")
     logger.info("[ML Stage2] %d / %d passed", len(passed), total)
     return passed
@@ -847,8 +882,6 @@ def run_ml_stage3(s2_rows: list[dict],
         skip the get_enriched() network call entirely — zero additional
         yfinance requests.
     """
-    from modules.data_pipeline import get_enriched
-
     total = len(s2_rows)
     logger.debug("[ML Stage3 DEBUG] Starting Stage 3 with %d candidates", total)
     _progress("Stage 3", 65, f"Scoring {total} candidates with ML pullback analysis…")
@@ -862,21 +895,33 @@ def run_ml_stage3(s2_rows: list[dict],
         ticker = row["ticker"]
         pct = 65 + int((i / max(total, 1)) * 30)
         _progress("Stage 3", min(pct, 95), f"Scoring {ticker}…", ticker)
+        result = _score_ml_row(row, enriched_map)
+        if result is not None:
+            scored.append(result)
+
+    return _finish_ml_stage3(scored)
+
+
+def _score_ml_row(row: dict, enriched_map: dict | None = None) -> dict | None:
+    """Stage 3 for one Stage 2 row; None if it has no data, fails or errors."""
+    from modules.data_pipeline import get_enriched
+
+    ticker = row["ticker"]
+    try:
+        # Combined scan path: use pre-downloaded data (zero network calls)
+        if enriched_map and ticker in enriched_map:
+            df = enriched_map[ticker]
+        else:
+            df = get_enriched(ticker, period="1y", use_cache=True)
+        if df is None or df.empty:
+            return None
+        return _score_ml_stage3(row, df)
+    except Exception as exc:
+        logger.warning("[ML S3 ERROR] %s: %s", ticker, exc)
+        return None
 
-        try:
-            # Combined scan path: use pre-downloaded data (zero network calls)
-            if enriched_map and ticker in enriched_map:
-                df = enriched_map[ticker]
-            else:
-                df = get_enriched(ticker, period="1y", use_cache=True)
-            if df is None or df.empty:
-                continue
-            result = _score_ml_stage3(row, df)
-            if result is not None:
-                scored.append(result)
-        except Exception as exc:
-            logger.warning("[ML S3 ERROR] %s: %s", ticker, exc)
 
+def _finish_ml_stage3(scored: list[dict]) -> pd.DataFrame:
     if not scored:
         return pd.DataFrame()
 
@@ -886,6 +931,48 @@ def run_ml_stage3(s2_rows: list[dict],
     return df_out
 
 
+def _run_ml_stage2_3_pipelined(tickers: list[str], channel_map: dict,
+                               market_env: str, verbose: bool = True) -> tuple[list, pd.DataFrame]:
+    """
+    Stage 2 with each survivor scored by Stage 3 workers (ML_STAGE3_WORKERS)
+    while Stage 2 is still running.  Returns (Stage 2 rows, run_ml_stage3-style
+    DataFrame).  Channel badge and market_env are set on each row before it is
+    scored, as run_ml_scan does for the sequential path.
+    """
+    def _score(row: dict) -> dict | None:
+        if _is_cancelled():
+            return None
+        if not row.get("channel"):
+            row["channel"] = channel_map.get(row["ticker"], "")
+        row.setdefault("market_env", market_env)
+        return _score_ml_row(row)
+
+    def _report(row: dict, scored, done: int, submitted: int, feeding: bool) -> None:
+        ticker = row["ticker"]
+        if feeding:
+            # Stage 2 owns the bar (12–62) until it finishes; show both counters
+            with _ml_scan_lock:
+                pct = _ml_progress.get("pct", 62)
+            _progress("Stage 2+3", pct,
+                      f"Stage 3 {done}/{submitted} scored — {ticker} (Stage 2 still running)", ticker)
+        else:
+            _progress("Stage 3", min(95, 65 + int(done / max(submitted, 1) * 30)),
+                      f"Scoring {ticker}…", ticker)
+
+    workers = getattr(C, "ML_STAGE3_WORKERS", 4)
+    logger.info("[ML Scan] Pipelined Stage 2 → Stage 3 (%d scoring workers)", workers)
+    with scan_pipeline.Stage3Pipeline(_score, workers=workers, cancelled=_is_cancelled,
+                                      on_scored=_report, name="ml-stage3") as pipe:
+        s2_rows = run_ml_stage2(tickers, verbose=verbose, channel_map=channel_map,
+                                on_pass=pipe.put)
+        _progress("Stage 2", 62,
+                  f"✓ 通過篩選: {len(s2_rows)}/{len(tickers)} | "
+                  f"已排除: {len(tickers) - len(s2_rows)} 檔 | Stage 3: {pipe.done}/{pipe.submitted} scored")
+        pipe.close()
+    logger.info("[ML Stage3] Scored %d/%d candidates", len(pipe.results), len(s2_rows))
+    return s2_rows, _finish_ml_stage3(pipe.results)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CSV auto-save
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1029,17 +1116,24 @@ def run_ml_scan(verbose: bool = True, min_star: Optional[float] = None,
     # Build channel_map so Stage 2 can route GAP/GAINER to the relaxed
     # event-channel filter (_check_ml_stage2_event) per MartinLukCore Ch2-3.
     channel_map = {r["ticker"]: r.get("channel", "") for r in candidates}
-    s2_rows = run_ml_stage2([r["ticker"] for r in candidates], verbose=verbose,
-                            channel_map=channel_map)
+    df_all = None
+    if scan_pipeline.enabled():
+        s2_rows, df_all = _run_ml_stage2_3_pipelined([r["ticker"] for r in candidates],
+                                                     channel_map, market_env_label,
+                                                     verbose=verbose)
+    else:
+        s2_rows = run_ml_stage2([r["ticker"] for r in candidates], verbose=verbose,
+                                channel_map=channel_map)
     if _is_cancelled():
         return pd.DataFrame(), pd.DataFrame()
     if not s2_rows:
         _progress("Done", 100, "沒有候選股票通過 ADR/EMA/動量過濾")
         return pd.DataFrame(), pd.DataFrame()
-    # Display Stage 2 filter results
-    _progress("Stage 2", 50,
-              f"✓ 通過篩選: {len(s2_rows)}/{s2_input} ({len(s2_rows)*100//s2_input}%) | "
-              f"已排除: {s2_input - len(s2_rows)} 檔")
+    # Display Stage 2 filter results (the pipelined path already has)
+    if df_all is None:
+        _progress("Stage 2", 50,
+                  f"✓ 通過篩選: {len(s2_rows)}/{s2_input} ({len(s2_rows)*100//s2_input}%) | "
+                  f"已排除: {s2_input - len(s2_rows)} 檔")
     logger.info("[ML Scan] Stage2 filter: %d/%d passed (%.0f%%) | excluded: %d",
                 len(s2_rows), s2_input, len(s2_rows)*100/s2_input if s2_input > 0 else 0, s2_input - len(s2_rows))
     # Propagate channel badge into Stage 2 rows
@@ -1053,13 +1147,14 @@ def run_ml_scan(verbose: bool = True, min_star: Optional[float] = None,
     logger.info("[ML Scan] Stage2: %d candidates", len(s2_rows))
 
     # ── Stage 3 ───────────────────────────────────────────────────────────
-    logger.debug("[ML Scan] About to call run_ml_stage3 with %d candidates", len(s2_rows))
-    try:
-        df_all = run_ml_stage3(s2_rows)
-        logger.debug("[ML Scan] run_ml_stage3 returned %d results", len(df_all) if not df_all.empty else 0)
-    except Exception as e:
-        logger.error("[ML Scan] STAGE 3 CRASHED: %s", e, exc_info=True)
-        raise
+    if df_all is None:
+        logger.debug("[ML Scan] About to call run_ml_stage3 with %d candidates", len(s2_rows))
+        try:
+            df_all = run_ml_stage3(s2_rows)
+            logger.debug("[ML Scan] run_ml_stage3 returned %d results", len(df_all) if not df_all.empty else 0)
+        except Exception as e:
+            logger.error("[ML Scan] STAGE 3 CRASHED: %s", e, exc_info=True)
+            raise
 
     if df_all.empty:
         _progress("Done", 100, "沒有候選股票通過質量評分")
@@ -29,11 +29,12 @@ from pathlib import Path
 
 import pandas as pd
 import requests
-import yfinance as yf
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 import trader_config as C
+from modules import yf_async
+from modules.data_providers import get_provider
 
 logger = logging.getLogger(__name__)
 
@@ -199,8 +200,8 @@ def _fetch_price_volume_rows(
     vol_min: float,
 ) -> list[dict]:
     """
-    Download last 5 trading days of OHLCV for all tickers using yfinance
-    batch downloads.
+    Download last 5 trading days of OHLCV for all tickers using batch
+    downloads from the market-data provider (yfinance when live).
 
     Returns a list of dicts: [{"ticker": str, "close": float, "avg_vol": float}, ...]
     for every ticker that passes price_min AND vol_min.
@@ -209,18 +210,33 @@ def _fetch_price_volume_rows(
     different thresholds (e.g. SEPA @$10 vs QM @$5) to re-filter in-memory
     without re-downloading from yfinance.
 
-    Uses NASDAQ_BATCH_SIZE and NASDAQ_BATCH_SLEEP from trader_config.
+    Uses NASDAQ_BATCH_SIZE from trader_config; requests are paced by the
+    shared yf_limiter.
     """
     batch_size = getattr(C, "NASDAQ_BATCH_SIZE", 100)
-    batch_sleep = getattr(C, "NASDAQ_BATCH_SLEEP", 0.5)
-    total       = len(raw_tickers)
     rows: list[dict] = []
 
+    if yf_async.enabled() and get_provider().async_bulk:
+        # Concurrent per-ticker chart requests; failures go through the batch loop below
+        t_async, failed = time.time(), []
+        for ticker, df in yf_async.stream(raw_tickers, period="5d"):
+            if df is None:
+                failed.append(ticker)
+            elif not df.empty:
+                c, v = float(df["Close"].iloc[-1]), float(df["Volume"].mean())
+                if c >= price_min and v >= vol_min:
+                    rows.append({"ticker": str(ticker), "close": round(c, 4), "avg_vol": round(v, 0)})
+        logger.info("[NASDAQ Universe] Async engine: %d rows from %d tickers in %.0fs (%d failed)",
+                    len(rows), len(raw_tickers), time.time() - t_async, len(failed))
+        raw_tickers = failed
+
+    total       = len(raw_tickers)
+
     logger.info(
         "[NASDAQ Universe] Fetching price/vol for %d tickers (price≥%.2f, vol≥%d) … "
         "(batches of %d, ~%.0f min)",
         total, price_min, vol_min, batch_size,
-        (total / batch_size) * (batch_sleep + 1.5) / 60,
+        (total / batch_size) * 1.5 / 60,
     )
     t0 = time.time()
 
@@ -244,40 +260,18 @@ def _fetch_price_volume_rows(
         try:
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
-                data = yf.download(
-                    batch,
-                    period="5d",
-                    interval="1d",
-                    auto_adjust=True,
-                    threads=False,   # threads=True causes 'dict changed size during iteration' race condition
-                    progress=False,
-                )
-            if data.empty:
-                continue
-
-            close  = data["Close"]
-            volume = data["Volume"]
-
-            # Normalise: yf returns multi-level columns when batch > 1 ticker
-            if isinstance(close, pd.DataFrame):
-                last_close = close.iloc[-1].dropna()
-                avg_volume = volume.mean()
-            else:
-                last_close = pd.Series({batch[0]: float(close.iloc[-1])})
-                avg_volume = pd.Series({batch[0]: float(volume.mean())})
+                frames = get_provider().bulk_history(batch, period="5d")
 
             # Apply build-time minimum thresholds
-            for ticker in last_close.index:
-                c = float(last_close.get(ticker, 0) or 0)
-                v = float(avg_volume.get(ticker, 0) or 0)
+            for ticker, df in frames.items():
+                c = float(df["Close"].iloc[-1])
+                v = float(df["Volume"].mean())
                 if c >= price_min and v >= vol_min:
                     rows.append({"ticker": str(ticker), "close": round(c, 4), "avg_vol": round(v, 0)})
 
         except Exception as e:
             logger.warning("[NASDAQ Universe] Batch %d error: %s", i // batch_size, e)
 
-        time.sleep(batch_sleep)
-
     # Restore yfinance logger level
     _yf_logger.setLevel(_orig_yf_level)
 
@@ -0,0 +1,200 @@
+"""
+modules/panel.py
+────────────────
+Cross-sectional panel engine — technicals for many tickers as 2-D arrays.
+
+Per-ticker enrichment runs get_technicals() once per frame inside thread
+pools, where the pandas/NumPy work is largely serialised by the GIL.  A panel
+aligns the OHLCV of all tickers into dense (dates × tickers) float arrays with
+a validity mask and computes every SEPA / QM / ML indicator column in a
+handful of vectorised passes (modules/indicators.py).  Per-ticker DataFrames —
+identical in columns and values to get_technicals() output — are built only
+when a ticker is accessed.
+
+Tickers whose bars are not one contiguous run on the shared date axis (a
+missing day in the middle) are computed on their own compressed series, so
+every ticker's rolling windows count its own bars exactly as the per-frame
+path does.
+
+Usage (through data_pipeline):
+    p = data_pipeline.enrich_panel(frames)      # {ticker: OHLCV DataFrame}
+    p["NVDA"]                                   # enriched DataFrame (memoised)
+    p.last("SMA200_SLOPE")                      # latest value per ticker (Series)
+    p.column("Close")                           # dates × tickers array
+"""
+
+import sys
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from modules import indicators
+
+_OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+_EXTRAS = ("RSI_GAIN", "RSI_LOSS")           # engine-state arrays, not frame columns
+
+# Indicator state columns kept for indicator_engine (see seed_state there)
+_STATE_SOURCES = {
+    **{f"EMA_{n}": f"EMA_{n}" for n in indicators.EMA_LENGTHS},
+    "RSI_GAIN": "RSI_GAIN", "RSI_LOSS": "RSI_LOSS", "ATR": "ATR_14",
+}
+
+
+def align(frames: dict) -> tuple[pd.DatetimeIndex, list, np.ndarray, dict]:
+    """
+    Align per-ticker OHLCV frames on the union of their dates.
+
+    Returns (dates, tickers, valid mask [dates × tickers], {column: 2-D array}).
+    A cell is valid when the ticker has a bar with a non-NaN close that day.
+    """
+    tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+    if not tickers:
+        return pd.DatetimeIndex([], name="Date"), [], np.zeros((0, 0), bool), {}
+    dates = frames[tickers[0]].index
+    for t in tickers[1:]:
+        if not frames[t].index.equals(dates):
+            dates = dates.union(frames[t].index)
+    dates = pd.DatetimeIndex(dates, name="Date")
+
+    arrays = {c: np.full((len(dates), len(tickers)), np.nan) for c in _OHLCV}
+    for j, t in enumerate(tickers):
+        df = frames[t]
+        rows = dates.get_indexer(df.index)
+        for c in _OHLCV:
+            arrays[c][rows, j] = df[c].to_numpy(dtype=float)
+    valid = ~np.isnan(arrays["Close"])
+    return dates, tickers, valid, arrays
+
+
+def _contiguous(valid: np.ndarray) -> np.ndarray:
+    """Per column: True if its valid cells form one unbroken run."""
+    n_valid = valid.sum(axis=0)
+    first = valid.argmax(axis=0)
+    last = valid.shape[0] - 1 - valid[::-1].argmax(axis=0)
+    return (n_valid == 0) | (last - first + 1 == n_valid)
+
+
+class Panel(Mapping):
+    """
+    Dates × tickers technicals with lazy, memoised per-ticker DataFrame views.
+
+    Behaves as a read-only dict {ticker: enriched DataFrame}.  `column(name)`
+    exposes the raw 2-D array for cross-sectional work.
+    """
+
+    def __init__(self, dates: pd.DatetimeIndex, tickers: list,
+                 valid: np.ndarray, arrays: dict):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.valid = valid
+        self.columns = [c for c in arrays if c not in _EXTRAS]
+        self._pos = {t: j for j, t in enumerate(self.tickers)}
+        self._views: dict = {}
+        self._lock = threading.Lock()
+
+        # Stored ticker-major (tickers × dates × columns), one float and one
+        # bool cube, so a per-ticker view is two contiguous slices.
+        names = list(arrays)
+        self._float_cols = [c for c in names if arrays[c].dtype != bool]
+        self._bool_cols = [c for c in names if arrays[c].dtype == bool]
+        shape = (len(self.tickers), len(dates))
+        self._float = np.empty(shape + (len(self._float_cols),))
+        self._bool = np.empty(shape + (len(self._bool_cols),), dtype=bool)
+        for k, c in enumerate(self._float_cols):
+            self._float[:, :, k] = arrays[c].T
+        for k, c in enumerate(self._bool_cols):
+            self._bool[:, :, k] = arrays[c].T
+        self._where = {c: (self._float, k) for k, c in enumerate(self._float_cols)}
+        self._where.update({c: (self._bool, k) for k, c in enumerate(self._bool_cols)})
+
+    # ── Mapping protocol ─────────────────────────────────────────────────
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        with self._lock:
+            df = self._views.get(ticker)
+        if df is not None:
+            return df
+        j = self._pos[ticker]                      # KeyError for unknown tickers
+        rows = self.valid[:, j]
+        index = self.dates[rows]
+        parts = [pd.DataFrame(self._float[j][rows], columns=self._float_cols, index=index)]
+        if self._bool_cols:
+            parts.append(pd.DataFrame(self._bool[j][rows], columns=self._bool_cols, index=index))
+        df = pd.concat(parts, axis=1).reindex(columns=self.columns, copy=False)
+        with self._lock:
+            return self._views.setdefault(ticker, df)
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    # ── Cross-sectional access ───────────────────────────────────────────
+    def column(self, name: str) -> np.ndarray:
+        """The (dates × tickers) array of one column; NaN/False where not valid."""
+        cube, k = self._where[name]
+        return cube[:, :, k].T
+
+    def last(self, name: str) -> pd.Series:
+        """Value of `name` at each ticker's last valid bar."""
+        n = self.valid.shape[0]
+        last_row = n - 1 - self.valid[::-1].argmax(axis=0)
+        vals = self.column(name)[last_row, np.arange(len(self.tickers))]
+        out = pd.Series(vals, index=self.tickers, name=name)
+        out[~self.valid.any(axis=0)] = np.nan
+        return out
+
+    def state(self, ticker: str, bars: int) -> Optional[pd.DataFrame]:
+        """
+        indicator_engine state frame for the last `bars` bars of a ticker, or
+        None when its history is too short to resume incrementally from.
+        """
+        j = self._pos[ticker]
+        rows = np.flatnonzero(self.valid[:, j])
+        if len(rows) < indicators.HL_WINDOW:
+            return None
+        tail = rows[-bars:]
+        data = {k: self.column(src)[tail, j] for k, src in _STATE_SOURCES.items()}
+        for n in indicators.SMA_LENGTHS:
+            data[f"SUM_{n}"] = self.column(f"SMA_{n}")[tail, j] * n
+        state = pd.DataFrame(data, index=self.dates[tail])
+        if state.isna().any().any():
+            return None
+        return state
+
+
+def _compute(arrays: dict) -> dict:
+    return indicators.technicals(*(arrays[c] for c in _OHLCV), extras=True)
+
+
+def build_panel(frames: dict) -> Panel:
+    """Align `frames` ({ticker: OHLCV DataFrame}) and compute all technicals."""
+    dates, tickers, valid, arrays = align(frames)
+    if not tickers:
+        return Panel(dates, [], valid, {})
+    out = _compute(arrays)
+
+    # Rolling windows must count each ticker's own bars: tickers with holes
+    # on the shared axis are recomputed on their compressed series.
+    for j in np.flatnonzero(~_contiguous(valid)):
+        rows = np.flatnonzero(valid[:, j])
+        sub = _compute({c: arrays[c][rows, j] for c in _OHLCV})
+        for name, vals in sub.items():
+            col = out[name]
+            col[:, j] = False if col.dtype == bool else np.nan
+            col[rows, j] = vals
+
+    # Cells without a bar carry no indicator values (EWM recursions carry
+    # forward over trailing gaps).
+    for name, col in out.items():
+        if col.dtype == bool:
+            col &= valid
+        else:
+            col[~valid] = np.nan
+    return Panel(dates, tickers, valid, out)
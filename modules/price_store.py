@@ -0,0 +1,679 @@
+"""
+modules/price_store.py
+──────────────────────
+Consolidated columnar price store — replaces the per-ticker
+``{TICKER}_{period}.parquet`` + ``.meta`` sidecar files.
+
+Layout (one directory per dataset, e.g. "master" raw OHLCV or "master_enriched"):
+
+  data/price_cache/store/<dataset>/bucket=NN/part.parquet
+        many tickers per file, long format: Date, Ticker, Open … (indicators)
+  data/price_cache/store/<dataset>/manifest.json
+        ticker → {"bucket", "asof", "rows", "last_bar", "cols", "version",
+                  + caller meta}; "cols" names a column list stored once
+        per dataset under "schemas"
+  data/price_cache/store/<dataset>/manifest.<generation>.log
+        manifest changes since manifest.json was last written, one JSON
+        record per line; folded into manifest.json once it outgrows half of it
+
+Tickers are assigned to one of PRICE_STORE_BUCKETS buckets by a stable CRC32
+hash, so a full-universe load opens ~64 files instead of 4 × N small files.
+Freshness is decided from the single manifest (no per-ticker stat/read).
+Every write stamps a new data "version" on the entry and notifies the write
+listeners (data_pipeline's in-process frame cache drops the tickers).
+Bucket files are written temp-file-then-rename; the manifest also records
+each bucket's CRC32 / size and each ticker's last read time, which
+modules/cache_manager uses for integrity checks and LRU eviction.
+The web app and the CLI may write the same store at once: bucket rewrites and
+manifest changes hold a per-dataset file lock (modules/file_lock), and a
+process re-reads the manifest and journal whenever they changed on disk, so
+it never saves over another process's entries.
+data_pipeline queues its writes through modules/cache_writer; manifest reads
+wait for queued writes of the tickers they ask about (set_pending_hook).
+
+This module is internal to the data access layer — upper-layer modules go
+through data_pipeline.get_historical / get_enriched / batch_download_and_enrich.
+"""
+
+import atexit
+import os
+import sys
+import json
+import time
+import zlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules import file_lock
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = ROOT / getattr(C, "PRICE_STORE_DIR", "data/price_cache/store")
+
+# Period-agnostic master series (see data_pipeline._load_master): one raw and
+# one enriched dataset serve every yfinance period as a trailing slice.
+MASTER = "master"
+MASTER_ENRICHED = "master_enriched"
+INDICATOR_STATE = "indicator_state"      # indicator_engine rolling state per ticker
+
+_manifest_lock = threading.Lock()
+_manifests: dict[str, dict] = {}            # dataset path → {ticker: entry}
+_schemas: dict[str, dict] = {}              # dataset path → {cols id: [column, …]}
+_stamps: dict[str, tuple] = {}              # dataset path → (manifest stat, generation, journal bytes applied)
+_bucket_sums: dict[str, dict] = {}          # dataset path → {"NN": {"crc32", "bytes"}}
+_access: dict[str, dict] = {}               # dataset path → {ticker: last read epoch}
+_access_dirty: set = set()                  # (dataset, dataset path) with reads not yet saved
+_write_listeners: list = []                 # fn(dataset, [TICKER, …]) after writes / drops
+_pending_hook: Optional[Callable] = None    # fn(dataset, tickers | None): wait for queued writes
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Layout helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _n_buckets() -> int:
+    return max(1, int(getattr(C, "PRICE_STORE_BUCKETS", 64)))
+
+
+def bucket_of(ticker: str) -> int:
+    """Stable bucket number for a ticker (CRC32, independent of PYTHONHASHSEED)."""
+    return zlib.crc32(ticker.upper().encode("utf-8")) % _n_buckets()
+
+
+def _dataset_dir(dataset: str) -> Path:
+    return STORE_DIR / dataset
+
+
+def _bucket_file(dataset: str, bucket: int) -> Path:
+    return _dataset_dir(dataset) / f"bucket={bucket:02d}" / "part.parquet"
+
+
+def _manifest_file(dataset: str) -> Path:
+    return _dataset_dir(dataset) / "manifest.json"
+
+
+def _atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """Write to a temp file in the same directory, then rename over the target."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+
+
+def _atomic_write_table(path: Path, table: pa.Table) -> dict:
+    """Write a bucket atomically; returns its {"crc32", "bytes"} for the manifest."""
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink, compression="zstd")
+    payload = sink.getvalue().to_pybytes()
+    _atomic_write_bytes(path, payload)
+    return {"crc32": zlib.crc32(payload), "bytes": len(payload)}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Manifest (freshness index)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _load_manifest_locked(dataset: str) -> dict:
+    """
+    The dataset manifest, kept in sync with disk: re-read when manifest.json
+    was replaced (by any process), then journal records not yet applied.
+    """
+    key = str(_dataset_dir(dataset))
+    stamp = _stat(_manifest_file(dataset))
+    if key not in _manifests or key not in _stamps or _stamps[key][0] != stamp:
+        _read_manifest_locked(dataset, stamp)
+    _replay_journal_locked(dataset)
+    return _manifests[key]
+
+
+def _stat(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _journal_file(dataset: str, generation) -> Path:
+    return _dataset_dir(dataset) / f"manifest.{generation}.log"
+
+
+def _read_manifest_locked(dataset: str, stamp: Optional[tuple]) -> None:
+    key = str(_dataset_dir(dataset))
+    doc = {}
+    mf = _manifest_file(dataset)
+    if stamp is not None:
+        try:
+            doc = json.loads(mf.read_text(encoding="utf-8"))
+        except Exception as exc:
+            logger.warning("[PriceStore] manifest unreadable (%s): %s — starting empty", mf, exc)
+            doc = {}
+    schemas = dict(doc.get("schemas", {}))
+    manifest = doc.get("tickers", {})
+    for entry in manifest.values():
+        if isinstance(entry.get("cols"), list):         # manifests written before schemas
+            entry["cols"] = _intern_cols(schemas, entry["cols"])
+    # Reads recorded here but not saved yet survive the re-read
+    access = doc.get("access", {})
+    for tkr, ts in _access.get(key, {}).items():
+        if ts > access.get(tkr, 0):
+            access[tkr] = ts
+    _manifests[key] = manifest
+    _schemas[key] = schemas
+    _bucket_sums[key] = doc.get("buckets", {})
+    _access[key] = access
+    _stamps[key] = (stamp, doc.get("generation", 0), 0)
+
+
+def _replay_journal_locked(dataset: str) -> None:
+    """Apply complete journal lines appended since the last look."""
+    key = str(_dataset_dir(dataset))
+    stamp, generation, offset = _stamps[key]
+    jf = _journal_file(dataset, generation)
+    size = (_stat(jf) or (0, 0))[1]
+    if size <= offset:
+        return
+    try:
+        with open(jf, "rb") as fh:
+            fh.seek(offset)
+            chunk = fh.read(size - offset)
+    except FileNotFoundError:           # compacted meanwhile: the next stat re-reads
+        return
+    end = chunk.rfind(b"\n") + 1       # a line still being appended waits for next time
+    for line in chunk[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            _apply_record_locked(key, json.loads(line))
+        except ValueError as exc:
+            logger.warning("[PriceStore] skipping bad journal line in %s: %s", jf, exc)
+    _stamps[key] = (stamp, generation, offset + end)
+
+
+def _apply_record_locked(key: str, record: dict) -> None:
+    _schemas[key].update(record.get("schemas", {}))
+    _manifests[key].update(record.get("tickers", {}))
+    for tkr in record.get("drop", []):
+        _manifests[key].pop(tkr, None)
+    sums = _bucket_sums[key]
+    for bucket, checksum in record.get("buckets", {}).items():
+        if checksum is None:
+            sums.pop(bucket, None)
+        else:
+            sums[bucket] = checksum
+
+
+def _intern_cols(schemas: dict, cols: list) -> str:
+    """Id of a column list in the dataset's shared schema table (added if new)."""
+    cols = [str(c) for c in cols]
+    sid = f"{zlib.crc32(json.dumps(cols).encode('utf-8')):08x}"
+    schemas.setdefault(sid, cols)
+    return sid
+
+
+def _save_manifest_locked(dataset: str) -> None:
+    """Write the whole manifest (compaction) and start a new, empty journal."""
+    key = str(_dataset_dir(dataset))
+    manifest = _manifests.get(key, {})
+    access = _access.get(key, {})
+    schemas = _schemas.get(key, {})
+    used = {e.get("cols") for e in manifest.values()}
+    old_generation = _stamps.get(key, (None, 0, 0))[1]
+    generation = time.time_ns()
+    payload = json.dumps({"version": 2, "generation": generation,
+                          "schemas": {s: c for s, c in schemas.items() if s in used},
+                          "tickers": manifest,
+                          "buckets": _bucket_sums.get(key, {}),
+                          "access": {t: ts for t, ts in access.items() if t in manifest}},
+                         separators=(",", ":"))
+    mf = _manifest_file(dataset)
+    _atomic_write_bytes(mf, payload.encode("utf-8"))
+    _journal_file(dataset, old_generation).unlink(missing_ok=True)
+    _stamps[key] = (_stat(mf), generation, 0)
+    _access_dirty.discard((dataset, key))
+
+
+def _commit_locked(dataset: str, record: dict) -> None:
+    """
+    Persist a manifest change already applied in memory: append it to the
+    journal, or compact once the journal outgrows half the manifest.
+    Caller holds _dataset_lock and _manifest_lock.
+    """
+    key = str(_dataset_dir(dataset))
+    stamp, generation, offset = _stamps[key]
+    if offset > max(64 * 1024, (stamp or (0, 0))[1] // 2):
+        _save_manifest_locked(dataset)
+        return
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    jf = _journal_file(dataset, generation)
+    jf.parent.mkdir(parents=True, exist_ok=True)
+    with open(jf, "ab") as fh:
+        fh.write(line)
+    _stamps[key] = (stamp, generation, offset + len(line))
+
+
+def _entry_cols(entry: dict, schemas: dict) -> Optional[list]:
+    cols = entry.get("cols")
+    return cols if isinstance(cols, list) else schemas.get(cols)
+
+
+def _dataset_lock(dataset: str):
+    """Serialises bucket rewrites and manifest saves of a dataset across processes."""
+    return file_lock.locked(_dataset_dir(dataset) / ".lock")
+
+
+def set_pending_hook(fn: Optional[Callable[[str, Optional[list]], None]]) -> None:
+    """
+    Install fn(dataset, tickers) that blocks until writes of `tickers` (None →
+    all) queued outside this module have landed — cache_writer's write-behind
+    queue — so manifest reads always see the caller's own writes.
+    """
+    global _pending_hook
+    _pending_hook = fn
+
+
+def _await_pending(dataset: str, tickers: Optional[Iterable[str]] = None) -> None:
+    if _pending_hook is not None:
+        _pending_hook(dataset, None if tickers is None else list(tickers))
+
+
+def get_manifest(dataset: str) -> dict:
+    """Return a shallow copy of the dataset manifest (ticker → entry)."""
+    _await_pending(dataset)
+    with _manifest_lock:
+        return dict(_load_manifest_locked(dataset))
+
+
+def get_entry(dataset: str, ticker: str) -> Optional[dict]:
+    """Return the manifest entry of one ticker, or None if not stored."""
+    _await_pending(dataset, [ticker])
+    with _manifest_lock:
+        entry = _load_manifest_locked(dataset).get(ticker.upper())
+        return dict(entry) if entry else None
+
+
+def data_version(entry: Optional[dict]):
+    """Identity of the data behind a manifest entry; changes on every write."""
+    if not entry:
+        return None
+    return entry.get("version") or (entry.get("asof"), entry.get("last_bar"), entry.get("rows"))
+
+
+def add_write_listener(fn: Callable[[str, list], None]) -> None:
+    """Call fn(dataset, tickers) after tickers of a dataset are written or dropped."""
+    if fn not in _write_listeners:
+        _write_listeners.append(fn)
+
+
+def _notify_write(dataset: str, tickers: list) -> None:
+    for fn in list(_write_listeners):
+        try:
+            fn(dataset, tickers)
+        except Exception as exc:
+            logger.debug("[PriceStore] write listener failed: %s", exc)
+
+
+def is_fresh(dataset: str, ticker: str, asof: str) -> bool:
+    """True if the ticker was written for the given as-of date (ISO string)."""
+    entry = get_entry(dataset, ticker)
+    return bool(entry) and entry.get("asof") == asof and entry.get("rows", 0) > 0
+
+
+def fresh_tickers(dataset: str, tickers: Iterable[str], asof: str,
+                  where: Optional[Callable[[dict], bool]] = None) -> set:
+    """
+    Subset of `tickers` whose stored copy is fresh for `asof` (one manifest pass).
+    `where` optionally filters on the manifest entry as well.
+    """
+    tickers = list(tickers)
+    _await_pending(dataset, tickers)
+    with _manifest_lock:
+        manifest = _load_manifest_locked(dataset)
+        return {
+            t for t in tickers
+            if (e := manifest.get(t.upper())) and e.get("asof") == asof and e.get("rows", 0) > 0
+            and (where is None or where(e))
+        }
+
+
+def count_fresh(dataset: str, asof: str) -> int:
+    """Number of tickers in the dataset written for `asof`."""
+    _await_pending(dataset)
+    with _manifest_lock:
+        return sum(1 for e in _load_manifest_locked(dataset).values() if e.get("asof") == asof)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Read path
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _table_to_frames(table: pa.Table, wanted: set, manifest: dict, schemas: dict) -> dict:
+    """Split a bucket table (sorted by Ticker, Date) into per-ticker DataFrames."""
+    out = {}
+    if table.num_rows == 0:
+        return out
+    tick_col = table.column("Ticker").to_numpy(zero_copy_only=False)
+    uniq, starts = np.unique(tick_col, return_index=True)
+    order = np.argsort(starts)
+    uniq, starts = uniq[order], starts[order]
+    ends = np.append(starts[1:], len(tick_col))
+    for tkr, start, end in zip(uniq, starts, ends):
+        if tkr not in wanted:
+            continue
+        cols = _entry_cols(manifest.get(tkr, {}), schemas)
+        sub = table.slice(int(start), int(end - start))
+        keep = ["Date"] + [c for c in (cols or sub.column_names) if c in sub.column_names
+                           and c not in ("Date", "Ticker")]
+        df = sub.select(keep).to_pandas()
+        df = df.set_index("Date")
+        df.index = pd.to_datetime(df.index)
+        df.index.name = "Date"
+        out[str(tkr)] = df
+    return out
+
+
+def _read_bucket(dataset: str, bucket: int, tickers: list, manifest: dict, schemas: dict) -> dict:
+    path = _bucket_file(dataset, bucket)
+    if not path.exists():
+        return {}
+    try:
+        table = pq.read_table(path, filters=[("Ticker", "in", tickers)])
+    except Exception as exc:
+        logger.warning("[PriceStore] bucket read failed (%s): %s", path, exc)
+        return {}
+    return _table_to_frames(table, set(tickers), manifest, schemas)
+
+
+def read_frames(dataset: str, tickers: Optional[Iterable[str]] = None,
+                workers: int = 8) -> dict:
+    """
+    Bulk-load stored frames.  `tickers=None` loads the whole dataset.
+    Returns dict[ticker] -> DataFrame (Date index); missing tickers are omitted.
+    Buckets are read in parallel (PyArrow releases the GIL while decoding).
+    """
+    if tickers is not None:
+        tickers = [t for t in tickers if t]
+    _await_pending(dataset, tickers)
+    with _manifest_lock:
+        manifest = dict(_load_manifest_locked(dataset))
+        schemas = dict(_schemas[str(_dataset_dir(dataset))])
+    if tickers is None:
+        wanted = list(manifest.keys())
+    else:
+        wanted = [t.upper() for t in tickers if t.upper() in manifest]
+    if not wanted:
+        return {}
+    _touch(dataset, wanted)
+
+    by_bucket: dict[int, list] = {}
+    for tkr in wanted:
+        by_bucket.setdefault(int(manifest[tkr].get("bucket", bucket_of(tkr))), []).append(tkr)
+
+    result: dict = {}
+    if len(by_bucket) == 1 or workers <= 1:
+        for b, tks in by_bucket.items():
+            result.update(_read_bucket(dataset, b, tks, manifest, schemas))
+        return result
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(by_bucket))) as pool:
+        for frames in pool.map(lambda kv: _read_bucket(dataset, kv[0], kv[1], manifest, schemas),
+                               by_bucket.items()):
+            result.update(frames)
+    return result
+
+
+def read_frame(dataset: str, ticker: str) -> Optional[pd.DataFrame]:
+    """Load one ticker's frame, or None if not stored."""
+    return read_frames(dataset, [ticker], workers=1).get(ticker.upper())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Write path
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _canonical(table: pa.Table) -> pa.Table:
+    """
+    Numeric columns as float64, so frames from different download paths
+    (Ticker.history() has int64 Volume, bulk downloads float64) share a bucket.
+    """
+    fields = [pa.field(f.name, pa.float64())
+              if pa.types.is_integer(f.type) or pa.types.is_floating(f.type) else f
+              for f in table.schema]
+    schema = pa.schema(fields)
+    return table if schema.equals(table.schema) else table.cast(schema)
+
+
+def _concat_tables(tables: list) -> pa.Table:
+    tables = [_canonical(t) for t in tables]     # buckets written before canonical dtypes
+    try:
+        return pa.concat_tables(tables, promote_options="default")
+    except TypeError as exc:
+        if "promote_options" not in str(exc):
+            raise
+        return pa.concat_tables(tables, promote=True)   # pyarrow < 14
+
+
+def _frame_to_table(ticker: str, df: pd.DataFrame) -> pa.Table:
+    flat = df.copy()
+    flat.index = pd.to_datetime(flat.index)
+    flat.index.name = "Date"
+    flat = flat.reset_index()
+    flat.columns = [str(c) for c in flat.columns]
+    flat.insert(1, "Ticker", ticker)
+    table = pa.Table.from_pandas(flat, preserve_index=False)
+    return _canonical(table.replace_schema_metadata(None))
+
+
+def write_frames(dataset: str, frames: dict, asof: str,
+                 meta: Optional[dict] = None) -> int:
+    """
+    Upsert per-ticker frames into the dataset and stamp them fresh for `asof`.
+    Each touched bucket is rewritten once (read → replace tickers → atomic rename)
+    and the new entries are appended to the manifest journal, all under the
+    dataset's cross-process lock.  `meta` holds extra manifest fields recorded
+    on every written entry.  Returns the number of tickers written.
+    """
+    by_bucket: dict[int, dict] = {}
+    for tkr, df in frames.items():
+        if df is None or df.empty:
+            continue
+        by_bucket.setdefault(bucket_of(tkr), {})[tkr.upper()] = df
+    if not by_bucket:
+        return 0
+
+    entries: dict = {}
+    sums: dict = {}
+    version = time.time_ns()
+    key = str(_dataset_dir(dataset))
+    with _dataset_lock(dataset):
+        for bucket, bucket_frames in by_bucket.items():
+            path = _bucket_file(dataset, bucket)
+            tables = []
+            if path.exists():
+                try:
+                    old = pq.read_table(path).replace_schema_metadata(None)
+                    keep = pc.invert(pc.is_in(old.column("Ticker"),
+                                              value_set=pa.array(list(bucket_frames))))
+                    tables.append(old.filter(keep))
+                except Exception as exc:
+                    logger.warning("[PriceStore] rewriting unreadable bucket %s: %s", path, exc)
+            tables.extend(_frame_to_table(t, df) for t, df in bucket_frames.items())
+            merged = _concat_tables(tables).sort_by([("Ticker", "ascending"), ("Date", "ascending")])
+            sums[f"{bucket:02d}"] = _atomic_write_table(path, merged)
+
+        with _manifest_lock:
+            manifest = _load_manifest_locked(dataset)
+            schemas = _schemas[key]
+            new_schemas = {}
+            for bucket, bucket_frames in by_bucket.items():
+                for tkr, df in bucket_frames.items():
+                    sid = _intern_cols(schemas, df.columns)
+                    new_schemas[sid] = schemas[sid]
+                    entries[tkr] = {
+                        "bucket":   bucket,
+                        "asof":     asof,
+                        "rows":     int(len(df)),
+                        "last_bar": pd.Timestamp(df.index[-1]).date().isoformat(),
+                        "cols":     sid,
+                        "version":  version,
+                        **(meta or {}),
+                    }
+            manifest.update(entries)
+            _bucket_sums[key].update(sums)
+            _commit_locked(dataset, {"schemas": new_schemas, "tickers": entries, "buckets": sums})
+    _notify_write(dataset, list(entries))
+    return len(entries)
+
+
+def write_frame(dataset: str, ticker: str, df: pd.DataFrame, asof: str,
+                meta: Optional[dict] = None) -> bool:
+    """Upsert one ticker.  Returns True on success."""
+    try:
+        return write_frames(dataset, {ticker: df}, asof, meta) == 1
+    except Exception as exc:
+        logger.debug("[PriceStore] write %s/%s failed: %s", dataset, ticker, exc)
+        return False
+
+
+def drop_tickers(dataset: str, tickers: Iterable[str]) -> int:
+    """Remove tickers from the dataset (data rows and manifest entries)."""
+    tickers = list(tickers)
+    _await_pending(dataset, tickers)
+    with _dataset_lock(dataset):
+        with _manifest_lock:
+            manifest = _load_manifest_locked(dataset)
+            doomed = [t.upper() for t in tickers if t.upper() in manifest]
+            by_bucket: dict[int, list] = {}
+            for tkr in doomed:
+                by_bucket.setdefault(int(manifest[tkr].get("bucket", bucket_of(tkr))), []).append(tkr)
+        sums: dict = {}
+        for bucket, tks in by_bucket.items():
+            path = _bucket_file(dataset, bucket)
+            if not path.exists():
+                continue
+            old = pq.read_table(path)
+            keep = pc.invert(pc.is_in(old.column("Ticker"), value_set=pa.array(tks)))
+            sums[f"{bucket:02d}"] = _atomic_write_table(path, old.filter(keep))
+        with _manifest_lock:
+            manifest = _load_manifest_locked(dataset)
+            for tkr in doomed:
+                manifest.pop(tkr, None)
+            _bucket_sums[str(_dataset_dir(dataset))].update(sums)
+            _commit_locked(dataset, {"drop": doomed, "buckets": sums})
+    _notify_write(dataset, doomed)
+    return len(doomed)
+
+
+def repair_bucket(dataset: str, bucket: int) -> dict:
+    """
+    Make one bucket agree with the manifest: an unreadable (or missing) file
+    is deleted and its tickers forgotten; rows of tickers the manifest does
+    not know are removed; manifest entries without rows are dropped.  The
+    bucket checksum is re-recorded.  Returns {"forgotten": [...], "orphans": [...]}.
+    """
+    path = _bucket_file(dataset, bucket)
+    with _dataset_lock(dataset):
+        with _manifest_lock:
+            manifest = _load_manifest_locked(dataset)
+            expected = {t for t, e in manifest.items() if int(e.get("bucket", -1)) == bucket}
+        try:
+            table = pq.read_table(path) if path.exists() else None
+        except Exception as exc:
+            logger.warning("[PriceStore] discarding unreadable bucket %s: %s", path, exc)
+            table = None
+        present = set() if table is None else \
+            set(table.column("Ticker").unique().to_pylist())
+        orphans = sorted(present - expected)
+        checksum = None
+        if table is None:
+            path.unlink(missing_ok=True)
+        elif orphans:
+            keep = pc.is_in(table.column("Ticker"), value_set=pa.array(sorted(expected) or [""]))
+            checksum = _atomic_write_table(path, table.filter(keep))
+        else:
+            payload = path.read_bytes()
+            checksum = {"crc32": zlib.crc32(payload), "bytes": len(payload)}
+        forgotten = sorted(expected - present)
+        with _manifest_lock:
+            manifest = _load_manifest_locked(dataset)
+            for tkr in forgotten:
+                manifest.pop(tkr, None)
+            sums = _bucket_sums[str(_dataset_dir(dataset))]
+            if checksum is None:
+                sums.pop(f"{bucket:02d}", None)
+            else:
+                sums[f"{bucket:02d}"] = checksum
+            _commit_locked(dataset, {"drop": forgotten, "buckets": {f"{bucket:02d}": checksum}})
+    if forgotten or orphans:
+        _notify_write(dataset, forgotten + orphans)
+    return {"forgotten": forgotten, "orphans": orphans}
+
+
+def _touch(dataset: str, tickers: list) -> None:
+    now = round(time.time())
+    with _manifest_lock:
+        _load_manifest_locked(dataset)
+        access = _access.setdefault(str(_dataset_dir(dataset)), {})
+        for tkr in tickers:
+            access[tkr] = now
+        _access_dirty.add((dataset, str(_dataset_dir(dataset))))
+
+
+def get_access(dataset: str) -> dict:
+    """ticker → last access epoch (last read, else last write)."""
+    with _manifest_lock:
+        manifest = _load_manifest_locked(dataset)
+        reads = _access.get(str(_dataset_dir(dataset)), {})
+        return {t: max(reads.get(t, 0), (e.get("version") or 0) / 1e9)
+                for t, e in manifest.items()}
+
+
+def flush_access(dataset: Optional[str] = None) -> None:
+    """Persist read times recorded since the last manifest save."""
+    with _manifest_lock:
+        dirty = list(_access_dirty)
+    for ds, path in dirty:
+        # Skip datasets of a store directory that is no longer current
+        if (dataset is None or ds == dataset) and path == str(_dataset_dir(ds)):
+            with _dataset_lock(ds), _manifest_lock:
+                _load_manifest_locked(ds)          # merges other processes' entries first
+                _save_manifest_locked(ds)
+
+
+atexit.register(flush_access)
+
+
+def get_bucket_sums(dataset: str) -> dict:
+    """Bucket number → {"crc32", "bytes"} recorded at the last write."""
+    with _manifest_lock:
+        _load_manifest_locked(dataset)
+        return {int(b): dict(s) for b, s in _bucket_sums.get(str(_dataset_dir(dataset)), {}).items()}
+
+
+def bucket_path(dataset: str, bucket: int) -> Path:
+    return _bucket_file(dataset, bucket)
+
+
+def list_datasets() -> list:
+    """Names of all datasets present on disk."""
+    if not STORE_DIR.exists():
+        return []
+    return sorted(p.name for p in STORE_DIR.iterdir() if p.is_dir())
+
+
+def dataset_glob(dataset: str) -> str:
+    """Glob matching every bucket file of a dataset (for DuckDB read_parquet)."""
+    return (_dataset_dir(dataset) / "bucket=*" / "part.parquet").as_posix()
@@ -837,7 +837,8 @@ def analyze_qm(ticker: str,
     Args:
         ticker:       Stock symbol
         df:           Enriched OHLCV DataFrame (fetched if None)
-        rs_rank:      Pre-computed RS percentile rank (0-99)
+        rs_rank:      Pre-computed RS percentile rank (0-99); looked up in the
+                      loaded RS rankings if None
         print_report: Print terminal report
 
     Returns:
@@ -856,6 +857,12 @@ def analyze_qm(ticker: str,
                 "stars": 0.0, "capped_stars": 0.0,
                 "recommendation": "PASS", "recommendation_zh": "無法取得數據"}
 
+    if rs_rank is None:
+        # Loaded RS snapshot / rs_cache.csv only — never a universe rebuild
+        from modules.rs_ranking import get_rs_ranks, RS_NOT_RANKED
+        rs_rank = get_rs_ranks([ticker], compute=False)[ticker]
+        rs_rank = None if rs_rank == RS_NOT_RANKED else rs_rank
+
     close = float(df["Close"].iloc[-1]) if not df.empty else 0.0
     dv    = get_dollar_volume(df)
     atr_val = get_atr(df)
@@ -20,7 +20,8 @@ Look-ahead bias protection
 ──────────────────────────
 All indicators (SMA, ADR, momentum, etc.) are computed from rolling windows.
 We slice  df.iloc[:bar_i+1]  at every checkpoint so the QM detectors can never
-see price data from the future.
+see price data from the future.  The RS rank is the one the ticker had on the
+as-of date (point-in-time RS dataset, rs_ranking.get_rs_point_in_time).
 
 Phase 2 (Portfolio-level) backtest is implemented in qm_portfolio_backtester.py.
 """
@@ -172,6 +173,15 @@ def run_qm_backtest(
     except Exception as _spy_exc:
         logger.warning("[QM BT] SPY load failed — market filter skipped: %s", _spy_exc)
 
+    # Point-in-time RS rank per bar (NaN where the dataset has none)
+    try:
+        from modules.rs_ranking import get_rs_point_in_time
+        pit_rank = (get_rs_point_in_time(ticker, backfill=True)["rs_rank"]
+                    .reindex(df_full.index).to_numpy(dtype=float))
+    except Exception as _rs_exc:
+        logger.warning("[QM BT] Point-in-time RS unavailable: %s", _rs_exc)
+        pit_rank = np.full(total_bars, np.nan)
+
     # ── 3. Walk-forward scan loop ─────────────────────────────────────────────
     signals: list[dict] = []
     last_signal_bar = -999
@@ -217,7 +227,9 @@ def run_qm_backtest(
         logger.debug(f"[QM BT Stage2 PASS] Bar {bar_i}: ADR={adr_val:.2f}%, DV=${dv_val:.1f}M")
 
         # ── QM Stage 3 — star rating ─────────────────────────────────────────
-        star_info = _qm_stage3_score(ticker, df_slice, stage2, debug_mode=debug_mode)
+        rs_at = None if np.isnan(pit_rank[bar_i]) else float(pit_rank[bar_i])
+        star_info = _qm_stage3_score(ticker, df_slice, stage2, debug_mode=debug_mode,
+                                     rs_rank=rs_at)
         if star_info is None:
             continue
         star_rating = star_info.get("star_rating", 0.0)
@@ -402,15 +414,16 @@ def _qm_stage2_check(ticker: str, df: pd.DataFrame, debug_mode: bool = False) ->
     }
 
 
-def _qm_stage3_score(ticker: str, df: pd.DataFrame, stage2: dict, debug_mode: bool = False) -> dict | None:
+def _qm_stage3_score(ticker: str, df: pd.DataFrame, stage2: dict, debug_mode: bool = False,
+                     rs_rank: float | None = None) -> dict | None:
     """
     Run the full QM 6-dimension star rating on a point-in-time slice.
+    `rs_rank` is the RS rank as of the slice's last bar (None → neutral 50).
     Returns dict with star_rating and setup_type; None if veto (all MAs down).
     In debug_mode, returns a minimum viable star rating even if analyze_qm fails.
     """
     try:
         from modules.qm_analyzer import analyze_qm
-        from modules.rs_ranking import get_rs_rank
     except ImportError as exc:
         logger.warning("[QM BT] analyze_qm import failed: %s", exc)
         if debug_mode:
@@ -426,10 +439,8 @@ def _qm_stage3_score(ticker: str, df: pd.DataFrame, stage2: dict, debug_mode: bo
     except Exception:
         pass
 
-    try:
-        rs_rank = get_rs_rank(ticker)
-    except Exception:
-        rs_rank = 50.0   # neutral fallback
+    if rs_rank is None:
+        rs_rank = 50.0   # neutral fallback — today's rank would leak future data
 
     try:
         result = analyze_qm(ticker, df, rs_rank=rs_rank, print_report=False)
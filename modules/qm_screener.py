@@ -10,6 +10,8 @@ Implements Kristjan Kullamägi's 3-stage breakout screening funnel:
 Author note: This system is PURE TECHNICAL — no fundamental filtering.
 ADR has independent veto power; stocks with ADR < QM_MIN_ADR_PCT are always rejected.
 Market environment gate: QM breakouts blocked in confirmed bear/downtrend.
+With SCAN_PIPELINE_ENABLED, Stage 3 scores each Stage 2 survivor as soon as
+it passes (modules/scan_pipeline.py).
 
 All market data goes exclusively through data_pipeline.py.
 """
@@ -32,6 +34,8 @@ ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 import trader_config as C
 
+from modules import scan_pipeline
+
 logger = logging.getLogger(__name__)
 
 # ── ANSI colours for terminal output ──────────────────────────────────────────
@@ -365,15 +369,29 @@ def _check_qm_stage2(ticker: str, df: pd.DataFrame) -> dict | None:
     }
 
 
+def _attach_rs_ranks(rows: list[dict]) -> None:
+    """RS rank from the loaded snapshot / rs_cache.csv (no universe rebuild)."""
+    from modules.rs_ranking import get_rs_ranks, RS_NOT_RANKED
+    ranks = get_rs_ranks([r["ticker"] for r in rows], compute=False)
+    for r in rows:
+        if ranks[r["ticker"]] != RS_NOT_RANKED:
+            r["rs_rank"] = ranks[r["ticker"]]
+
+
 def run_qm_stage2(tickers: list[str], verbose: bool = True,
-                  enriched_map: dict = None, shared: bool = False) -> list[dict]:
+                  enriched_map: dict = None, shared: bool = False,
+                  on_pass=None) -> list[dict]:
     """
     Stage 2 — Download OHLCV and apply QM gate to each candidate.
+    Candidates are checked as their download batch arrives
+    (stream_download_and_enrich), overlapping the remaining downloads.
     Returns list of passing ticker dicts for Stage 3.
+    `on_pass(row)` is called (from a gate thread) for each survivor as soon as
+    it passes, with its rs_rank attached (pipelined Stage 3).
     
     If enriched_map is provided, skip batch download (for combined scanning).
     """
-    from modules.data_pipeline import batch_download_and_enrich
+    from modules.data_pipeline import stream_download_and_enrich
 
     total = len(tickers)
     _progress("Stage 2", 12, f"Downloading price history for {total} candidates…")
@@ -381,10 +399,9 @@ def run_qm_stage2(tickers: list[str], verbose: bool = True,
 
     batch_size  = getattr(C, "QM_STAGE2_BATCH_SIZE",  40)
     max_workers = getattr(C, "QM_STAGE2_MAX_WORKERS", 12)
-    sleep_sec   = getattr(C, "QM_STAGE2_BATCH_SLEEP",  1.5)
 
     def _progress_cb(batch_num: int, total_batches: int, msg: str = ""):
-        # Monotonic progress: prevent regression when batch_download_and_enrich
+        # Monotonic progress: prevent regression when stream_download_and_enrich
         # switches from cache phase (scale 0–1) to download phase (scale 1–N).
         if not hasattr(_progress_cb, "_max_pct"):
             _progress_cb._max_pct = 12
@@ -393,24 +410,35 @@ def run_qm_stage2(tickers: list[str], verbose: bool = True,
         _progress("Stage 2", pct, msg)
 
     if enriched_map is None:
-        enriched = batch_download_and_enrich(
+        source = stream_download_and_enrich(
             tickers,
             period="6mo",  # 6 months sufficient: ADR(14d) + mom 6M(126d) + 6d consolidation + SMA50
             progress_cb=_progress_cb,
         )
     else:
-        enriched = enriched_map
+        source = iter(enriched_map.items())
         if verbose:
-            logger.info("[QM Stage2] Using pre-downloaded enriched_map (%d records)", len(enriched))
+            logger.info("[QM Stage2] Using pre-downloaded enriched_map (%d records)", len(enriched_map))
 
-    _progress("Stage 2", 48, f"Applying QM momentum/ADR/dollar-volume filters…")
     passed = []
 
+    def _gate(tkr: str, df: pd.DataFrame) -> dict | None:
+        result = _check_qm_stage2(tkr, df)
+        if result is not None and on_pass is not None:
+            _attach_rs_ranks([result])
+            on_pass(result)
+        return result
+
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        futures = {
-            pool.submit(_check_qm_stage2, tkr, df): tkr
-            for tkr, df in enriched.items()
-        }
+        # Gates start on each ticker as soon as its batch is downloaded
+        futures = {}
+        for tkr, df in source:
+            if _is_cancelled():
+                break
+            futures[pool.submit(_gate, tkr, df)] = tkr
+        if hasattr(source, "close"):
+            source.close()
+        _progress("Stage 2", 48, f"Applying QM momentum/ADR/dollar-volume filters…")
         done = 0
         for fut in as_completed(futures):
             if _is_cancelled():
@@ -430,6 +458,10 @@ def run_qm_stage2(tickers: list[str], verbose: bool = True,
             pct = 48 + int(done / max(total, 1) * 12)
             _progress("Stage 2", min(pct, 60), f"Checked {done}/{total}…", tkr)
 
+    # RS rank feeds the strict_rs filter and the result tables
+    if on_pass is None:
+        _attach_rs_ranks(passed)
+
     _progress("Stage 2", 62, f"{len(passed)} passed ADR/momentum/volume gate")
     logger.info("[QM Stage2] %d / %d passed", len(passed), total)
     return passed
@@ -639,8 +671,6 @@ def run_qm_stage3(stage2_rows: list[dict],
     Returns:
         pd.DataFrame sorted by qm_star descending, capped at QM_SCAN_TOP_N rows.
     """
-    from modules.data_pipeline import get_technicals
-
     total = len(stage2_rows)
     _progress("Stage 3", 64, f"Quality scoring {total} Stage-2 candidates…")
     logger.info("[QM Stage3] Scoring %d candidates", total)
@@ -649,32 +679,11 @@ def run_qm_stage3(stage2_rows: list[dict],
     _done       = [0]   # completed counter (mutable for closure)
     _s3_max_pct = [64]  # monotonic progress floor
 
-    def _score_one(i: int, row: dict) -> dict | None:
-        """Per-ticker worker: fetch enriched data + run Stage 3 scoring."""
-        if _is_cancelled():
-            return None
-        ticker = row["ticker"]
-
-        # Get enriched DataFrame — prefers _1y_enriched.parquet fast path
-        df = pd.DataFrame()
-        if enriched_cache and ticker in enriched_cache:
-            raw_df = enriched_cache[ticker]
-            df = get_technicals(raw_df) if "SMA_20" not in raw_df.columns else raw_df
-        else:
-            from modules.data_pipeline import get_enriched as _get_enriched
-            df = _get_enriched(ticker, period="1y", use_cache=True)
-
-        try:
-            return _score_qm_stage3(row, df)
-        except Exception as exc:
-            logger.warning("[QM S3 ERROR] %s: %s", ticker, exc)
-            return None
-
     max_workers = getattr(C, "QM_STAGE3_WORKERS", 6)
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
         futs = {
-            pool.submit(_score_one, i, row): row["ticker"]
-            for i, row in enumerate(stage2_rows)
+            pool.submit(_score_qm_row, row, enriched_cache): row["ticker"]
+            for row in stage2_rows
         }
         for fut in as_completed(futs):
             ticker = futs[fut]
@@ -690,6 +699,34 @@ def run_qm_stage3(stage2_rows: list[dict],
             if scored is not None:
                 results.append(scored)
 
+    return _finish_qm_stage3(results)
+
+
+def _score_qm_row(row: dict, enriched_cache: dict | None = None) -> dict | None:
+    """Per-ticker Stage 3 worker: fetch enriched data + run Stage 3 scoring."""
+    from modules.data_pipeline import get_technicals
+    if _is_cancelled():
+        return None
+    ticker = row["ticker"]
+
+    # Get enriched DataFrame — prefers _1y_enriched.parquet fast path
+    df = pd.DataFrame()
+    if enriched_cache and ticker in enriched_cache:
+        raw_df = enriched_cache[ticker]
+        df = get_technicals(raw_df) if "SMA_20" not in raw_df.columns else raw_df
+    else:
+        from modules.data_pipeline import get_enriched as _get_enriched
+        df = _get_enriched(ticker, period="1y", use_cache=True)
+
+    try:
+        return _score_qm_stage3(row, df)
+    except Exception as exc:
+        logger.warning("[QM S3 ERROR] %s: %s", ticker, exc)
+        return None
+
+
+def _finish_qm_stage3(results: list[dict]) -> pd.DataFrame:
+    """Stage 3 rows sorted by qm_star, capped at QM_SCAN_TOP_N."""
     _progress("Stage 3", 95, f"Sorting {len(results)} results…")
 
     if not results:
@@ -702,6 +739,37 @@ def run_qm_stage3(stage2_rows: list[dict],
     return df_out.head(top_n)
 
 
+def _run_qm_stage2_3_pipelined(candidates: list, verbose: bool = True) -> tuple[list, pd.DataFrame]:
+    """
+    Stage 2 with each survivor scored by Stage 3 workers while Stage 2 is
+    still running.  Returns (Stage 2 rows, run_qm_stage3-style DataFrame).
+    """
+    def _report(row: dict, scored, done: int, submitted: int, feeding: bool) -> None:
+        ticker = row["ticker"]
+        if feeding:
+            # Stage 2 owns the bar (12–62) until it finishes; show both counters
+            with _qm_scan_lock:
+                pct = _qm_progress.get("pct", 62)
+            _progress("Stage 2+3", pct,
+                      f"Stage 3 {done}/{submitted} scored — {ticker} (Stage 2 still running)", ticker)
+        else:
+            _progress("Stage 3", min(94, 64 + int(done / max(submitted, 1) * 30)),
+                      f"Scoring {ticker}…", ticker)
+
+    workers = getattr(C, "QM_STAGE3_WORKERS", 6)
+    logger.info("[QM Scan] Pipelined Stage 2 → Stage 3 (%d scoring workers)", workers)
+    with scan_pipeline.Stage3Pipeline(_score_qm_row, workers=workers, cancelled=_is_cancelled,
+                                      on_scored=_report, name="qm-stage3") as pipe:
+        s2_rows = run_qm_stage2(candidates, verbose=verbose, on_pass=pipe.put)
+        _s1_cnt, _s2_cnt = len(candidates), len(s2_rows)
+        _progress("Stage 2", 63,
+                  f"✓ 通過篩選: {_s2_cnt}/{_s1_cnt} ({_s2_cnt * 100 // _s1_cnt if _s1_cnt else 0}%) | "
+                  f"已排除: {_s1_cnt - _s2_cnt} | Stage 3: {pipe.done}/{pipe.submitted} scored")
+        pipe.close()
+    logger.info("[QM Stage3] Scored %d/%d candidates", len(pipe.results), len(s2_rows))
+    return s2_rows, _finish_qm_stage3(pipe.results)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Public entry point
 # ─────────────────────────────────────────────────────────────────────────────
@@ -798,8 +866,12 @@ def run_qm_scan(verbose: bool = True, min_star: Optional[float] = None, top_n: O
     logger.info("[QM Scan] Stage1: %d candidates", len(candidates))
     _progress("Stage 1", 11, f"✓ Stage 1: {len(candidates):,} 個候選股票")
 
-    # ── Stage 2 ──────────────────────────────────────────────
-    s2_rows = run_qm_stage2(candidates, verbose=verbose)
+    # ── Stage 2 (→ Stage 3 pipelined) ─────────────────────────
+    df_all = None
+    if scan_pipeline.enabled():
+        s2_rows, df_all = _run_qm_stage2_3_pipelined(candidates, verbose=verbose)
+    else:
+        s2_rows = run_qm_stage2(candidates, verbose=verbose)
     if _is_cancelled():
         return pd.DataFrame(), pd.DataFrame()
     if not s2_rows:
@@ -808,12 +880,14 @@ def run_qm_scan(verbose: bool = True, min_star: Optional[float] = None, top_n: O
     _s1_cnt = len(candidates)
     _s2_cnt = len(s2_rows)
     logger.info("[QM Scan] Stage2: %d candidates", _s2_cnt)
-    _progress("Stage 2", 63,
-              f"✓ 通過篩選: {_s2_cnt}/{_s1_cnt} ({_s2_cnt * 100 // _s1_cnt if _s1_cnt else 0}%) | "
-              f"已排除: {_s1_cnt - _s2_cnt} | ADR/動能/量能")
+    if df_all is None:
+        _progress("Stage 2", 63,
+                  f"✓ 通過篩選: {_s2_cnt}/{_s1_cnt} ({_s2_cnt * 100 // _s1_cnt if _s1_cnt else 0}%) | "
+                  f"已排除: {_s1_cnt - _s2_cnt} | ADR/動能/量能")
 
     # ── Stage 3 ───────────────────────────────────────────────────────────
-    df_all = run_qm_stage3(s2_rows)
+    if df_all is None:
+        df_all = run_qm_stage3(s2_rows)
 
     if df_all.empty:
         _progress("Done", 100, "No candidates passed quality scoring")
@@ -0,0 +1,327 @@
+"""
+modules/rs_matrix.py
+────────────────────
+Persisted close-price matrix and RS-rank history behind rs_ranking.
+
+compute_rs_rankings() used to download a full year of closes for the whole
+RS universe whenever rs_cache.csv was not from the last completed session.
+The closes it ranks are now kept as one dates × tickers matrix
+(RS_MATRIX_DIR/closes.arrow).  A daily refresh downloads only the bars after
+the matrix's last date plus PRICE_INCREMENTAL_OVERLAP_BARS overlapping bars;
+tickers whose adjusted closes on the overlap drifted (split / dividend
+restatement), tickers new to the universe and matrices older than
+PRICE_INCREMENTAL_MAX_GAP_DAYS get the full year instead — the same rules as
+data_pipeline's incremental OHLCV refresh.
+
+Each ranking also stores its RS_Rank row per session in
+RS_MATRIX_DIR/rank_history.arrow (dates × tickers), so an RS trend is one
+column read instead of a DuckDB query per ticker.
+
+rs_ranking.backfill_rs_history() adds a point-in-time dataset back-filled
+from the cached price history: the RS_Rank every ticker had on each past
+session (pit_rank.arrow), its RS line — close / SPY close — (rs_line.arrow)
+and RS-line new-high flags (rs_line_flags.arrow, uint8 bits).  Backtests read
+the rank a ticker had on the as-of date instead of today's.  Once built, the
+dataset is extended by the sessions the close matrix gained since.
+
+All files are uncompressed Arrow IPC (Feather v2) with one float64 column
+per ticker: a handful of tickers is read through a memory map without
+touching the rest, and a full 8,000-ticker matrix loads in a fraction of a
+second (a wide Parquet file takes seconds).
+
+Usage:
+    closes = rs_matrix.load_closes()
+    start  = rs_matrix.incremental_start(closes)       # None → full download
+    closes, reload = rs_matrix.extend(closes, {"NVDA": close_series})
+    closes = rs_matrix.replace(closes, full_year_closes)
+    rs_matrix.save_closes(closes)
+    rs_matrix.append_rank_history(ranks)              # dates × tickers
+    rs_matrix.rank_history(["NVDA"], days=90)
+    rs_matrix.point_in_time("NVDA")                   # rs_rank, rs_line, new-high flags
+"""
+
+import logging
+import os
+import sys
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as pf
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules.data_providers import trim
+
+logger = logging.getLogger(__name__)
+
+RS_DIR = ROOT / getattr(C, "RS_MATRIX_DIR", "data/price_cache/rs")
+CLOSES_FILE = "closes.arrow"
+HISTORY_FILE = "rank_history.arrow"
+PIT_RANK_FILE = "pit_rank.arrow"
+PIT_LINE_FILE = "rs_line.arrow"
+PIT_FLAGS_FILE = "rs_line_flags.arrow"
+
+# Bits of rs_line_flags.arrow
+RS_LINE_NEW_HIGH = 1                    # RS line at its RS_LINE_HIGH_BARS high
+RS_LINE_HIGH_BEFORE_PRICE = 2           # … while the close is not at its own high
+
+_lock = threading.Lock()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Files
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+def _read(name: str, columns: Optional[list] = None) -> pd.DataFrame:
+    """A dates × tickers file (all tickers, or `columns`) as a float (or uint8) frame."""
+    path = RS_DIR / name
+    if not path.exists():
+        return _empty()
+    try:
+        table = pf.read_table(path, columns=None if columns is None else ["Date", *columns],
+                              memory_map=True)
+        names = table.column_names[1:]
+        values = np.column_stack([table.column(c).to_numpy() for c in names]) if names \
+            else np.empty((table.num_rows, 0))
+        index = pd.DatetimeIndex(table.column("Date").to_numpy(), name="Date")
+        del table                       # drop the memory map before the file can be replaced
+        return pd.DataFrame(values, index=index, columns=names)
+    except Exception as exc:
+        logger.warning("[RS matrix] %s unreadable (%s) — starting empty", path.name, exc)
+        return _empty()
+
+
+def _stored_columns(name: str) -> set:
+    path = RS_DIR / name
+    if not path.exists():
+        return set()
+    with pa.memory_map(str(path)) as src:
+        return set(pa.ipc.open_file(src).schema.names[1:])
+
+
+def _write(name: str, df: pd.DataFrame) -> None:
+    """Write to a temp file in the same directory, then rename over the target."""
+    path = RS_DIR / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    flags = len(df.columns) > 0 and (df.dtypes == np.uint8).all()
+    values = df.to_numpy(dtype=np.uint8 if flags else float)
+    arrays = [pa.array(df.index.values.astype("datetime64[ns]"))]
+    arrays += [pa.array(values[:, i]) for i in range(values.shape[1])]
+    pf.write_feather(pa.Table.from_arrays(arrays, names=["Date", *map(str, df.columns)]),
+                     tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def _last_date(name: str) -> Optional[pd.Timestamp]:
+    """Last session of a file (its Date column only), or None."""
+    path = RS_DIR / name
+    if not path.exists():
+        return None
+    with _lock:
+        try:
+            dates = pf.read_table(path, columns=["Date"], memory_map=True).column("Date").to_numpy()
+        except Exception:
+            return None
+    return pd.Timestamp(dates[-1]) if len(dates) else None
+
+
+def load_closes() -> pd.DataFrame:
+    """The persisted close matrix (dates × tickers, float), empty if none."""
+    with _lock:
+        return _read(CLOSES_FILE)
+
+
+def closes_asof() -> Optional[pd.Timestamp]:
+    """Last session of the persisted close matrix, or None."""
+    return _last_date(CLOSES_FILE)
+
+
+def save_closes(closes: pd.DataFrame) -> None:
+    with _lock:
+        _write(CLOSES_FILE, closes)
+    logger.info("[RS matrix] Saved %d sessions × %d tickers (last %s)", len(closes),
+                closes.shape[1], closes.index[-1].date() if len(closes) else "—")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental update
+# ─────────────────────────────────────────────────────────────────────────────
+
+def incremental_start(closes: pd.DataFrame) -> Optional[date]:
+    """First session to re-download for an incremental update, or None if too stale."""
+    if closes is None or len(closes) < 2:
+        return None
+    max_gap = int(getattr(C, "PRICE_INCREMENTAL_MAX_GAP_DAYS", 30))
+    if (date.today() - closes.index[-1].date()).days > max_gap:
+        return None
+    overlap = max(2, int(getattr(C, "PRICE_INCREMENTAL_OVERLAP_BARS", 5)))
+    return closes.index[-min(overlap, len(closes))].date()
+
+
+def extend(closes: pd.DataFrame, fresh: dict) -> tuple[pd.DataFrame, list]:
+    """
+    Overwrite the matrix from the first fresh bar on with `fresh`
+    ({ticker: Close series starting at incremental_start()}).
+
+    Returns (matrix, tickers to reload in full): those whose closes on the
+    settled overlap — the bars before the matrix's last one, which may have
+    been captured intraday — are missing or drifted by more than
+    PRICE_INCREMENTAL_DRIFT_TOL.  Their columns are left as they were.
+    """
+    if not fresh:
+        return closes, []
+    new = pd.DataFrame(fresh, dtype=float).sort_index()
+    reload = [t for t in new.columns if t not in closes.columns]
+    known = new.columns.drop(reload)
+    settled = closes.index.intersection(new.index)
+    settled = settled[settled < closes.index[-1]]
+    old = closes.loc[settled, known].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = new.loc[settled, known].to_numpy() / np.where(old == 0, np.nan, old)
+    drift = pd.DataFrame(np.abs(ratio - 1.0), columns=known).max()
+    tol = float(getattr(C, "PRICE_INCREMENTAL_DRIFT_TOL", 0.002))
+    reload += list(known[~(drift <= tol).to_numpy()])
+    keep = known[(drift <= tol).to_numpy()]
+    if len(keep) == 0:
+        return closes, reload
+
+    first = new.index[0]
+    dates = closes.index[closes.index >= first].union(new.index)
+    tail = closes.reindex(dates).to_numpy(copy=True)
+    upd = new[keep].reindex(dates).to_numpy()
+    cols = closes.columns.get_indexer(keep)
+    tail[:, cols] = np.where(np.isnan(upd), tail[:, cols], upd)
+    merged = pd.concat([closes.loc[closes.index < first],
+                        pd.DataFrame(tail, index=dates, columns=closes.columns)])
+    merged.index.name = "Date"
+    return merged, reload
+
+
+def replace(closes: pd.DataFrame, full: dict) -> pd.DataFrame:
+    """
+    Put full-history columns ({ticker: Close series}) into the matrix, then keep
+    the last year of sessions and drop tickers without a close in it.
+    """
+    if full:
+        add = pd.DataFrame(full, dtype=float)
+        if add.index.tzinfo is not None:
+            add.index = add.index.tz_localize(None)
+        closes = pd.concat([closes.drop(columns=[t for t in add.columns if t in closes.columns]),
+                            add], axis=1)
+    if closes.empty:
+        return closes
+    closes = trim(closes.sort_index(), "1y").dropna(axis=1, how="all")
+    closes.index.name = "Date"
+    return closes
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RS-rank history
+# ─────────────────────────────────────────────────────────────────────────────
+
+def append_rank_history(ranks: pd.DataFrame) -> None:
+    """Store RS_Rank rows (dates × tickers), replacing sessions already stored."""
+    if ranks is None or ranks.empty:
+        return
+    keep = int(getattr(C, "RS_HISTORY_MAX_DAYS", 756))
+    with _lock:
+        hist = _read(HISTORY_FILE)
+        hist = pd.concat([hist.loc[~hist.index.isin(ranks.index)], ranks.astype(float)])
+        hist = hist.sort_index().tail(keep).dropna(axis=1, how="all")
+        _write(HISTORY_FILE, hist)
+
+
+def rank_history(tickers: Optional[list] = None, days: Optional[int] = None) -> pd.DataFrame:
+    """
+    Stored RS_Rank per session (dates × tickers) — all tickers, or those of
+    `tickers` that have a history; only the last `days` calendar days if given.
+    """
+    columns = None
+    with _lock:
+        if tickers is not None:
+            stored = _stored_columns(HISTORY_FILE)
+            columns = [t.upper() for t in tickers if t.upper() in stored]
+            if not columns:
+                return _empty()
+        hist = _read(HISTORY_FILE, columns)
+    if days is not None and len(hist):
+        hist = hist[hist.index >= pd.Timestamp(date.today()) - pd.Timedelta(days=int(days))]
+    return hist
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Point-in-time RS dataset
+# ─────────────────────────────────────────────────────────────────────────────
+
+def save_point_in_time(ranks: pd.DataFrame, line: pd.DataFrame, flags: pd.DataFrame) -> None:
+    """Replace the point-in-time dataset (three dates × tickers frames, same shape)."""
+    with _lock:
+        _write(PIT_RANK_FILE, ranks)
+        _write(PIT_LINE_FILE, line)
+        _write(PIT_FLAGS_FILE, flags.astype(np.uint8))
+    logger.info("[RS matrix] Saved point-in-time RS: %d sessions × %d tickers (last %s)",
+                len(ranks), ranks.shape[1], ranks.index[-1].date() if len(ranks) else "—")
+
+
+def append_point_in_time(ranks: pd.DataFrame, line: pd.DataFrame, flags: pd.DataFrame,
+                         start: Optional[pd.Timestamp] = None) -> None:
+    """
+    Add sessions to the point-in-time dataset, replacing sessions already
+    stored; stored sessions before `start` (the cached span) are dropped.
+    """
+    with _lock:
+        for name, new in ((PIT_RANK_FILE, ranks), (PIT_LINE_FILE, line), (PIT_FLAGS_FILE, flags)):
+            old = _read(name)
+            old = old.loc[~old.index.isin(new.index)]
+            if start is not None:
+                old = old.loc[old.index >= start]
+            out = pd.concat([old.astype(float), new.astype(float)]).sort_index()
+            if name == PIT_FLAGS_FILE:
+                out = out.fillna(0).astype(np.uint8)
+            out.index.name = "Date"
+            _write(name, out)
+    logger.info("[RS matrix] Added %d point-in-time RS sessions × %d tickers (last %s)",
+                len(ranks), ranks.shape[1], ranks.index[-1].date() if len(ranks) else "—")
+
+
+def point_in_time_asof() -> Optional[pd.Timestamp]:
+    """Last session of the point-in-time dataset, or None if there is none."""
+    return _last_date(PIT_RANK_FILE)
+
+
+def point_in_time(ticker: str, days: Optional[int] = None) -> pd.DataFrame:
+    """
+    One ticker's point-in-time RS per session: rs_rank (NaN where it was not
+    ranked), rs_line, rs_line_new_high and rs_line_high_before_price; empty if
+    the dataset does not have it.  Only the last `days` calendar days if given.
+    """
+    ticker = ticker.upper()
+    cols = ["rs_rank", "rs_line", "rs_line_new_high", "rs_line_high_before_price"]
+    with _lock:
+        if ticker not in _stored_columns(PIT_RANK_FILE):
+            return pd.DataFrame(columns=cols, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+        rank = _read(PIT_RANK_FILE, [ticker])
+        line = _read(PIT_LINE_FILE, [ticker])
+        flags = _read(PIT_FLAGS_FILE, [ticker])
+    bits = flags[ticker].reindex(rank.index).fillna(0).astype(np.uint8).to_numpy()
+    out = pd.DataFrame({
+        "rs_rank": rank[ticker],
+        "rs_line": line[ticker].reindex(rank.index),
+        "rs_line_new_high": (bits & RS_LINE_NEW_HIGH) > 0,
+        "rs_line_high_before_price": (bits & RS_LINE_HIGH_BEFORE_PRICE) > 0,
+    }, index=rank.index)
+    if days is not None and len(out):
+        out = out[out.index >= pd.Timestamp(date.today()) - pd.Timedelta(days=int(days))]
+    return out
@@ -9,26 +9,44 @@ Methodology (IBD-style, Minervini-aligned):
 Result: percentile rank 1-99 across the full US stock universe.
 TT9 Minervini requirement: RS ≥ 70 (ideal ≥ 80).
 
-Cache: data/rs_cache.csv — rebuilt once per calendar day.
+Cache: data/rs_cache.csv — rebuilt once per completed US session
+       (CacheDate = modules/trading_calendar.cache_asof()).
+       The year of closes behind it is kept as a dates × tickers matrix
+       (modules/rs_matrix.py), so a rebuild downloads only the newest
+       sessions; every ranked session's RS_Rank row is kept as history.
+       backfill_rs_history() ranks every past session of the cached price
+       history the same way (point-in-time RS, RS line, RS-line new highs).
+
+Lookups go through an RSSnapshot: the loaded ranking plus a ticker → (RS_Raw,
+RS_Rank) hash index, shared read-only by every thread and swapped as a whole
+when the rankings are reloaded.
+
+Usage:
+    get_rs_rank("NVDA")                          # 1-99 or RS_NOT_RANKED
+    get_rs_ranks(tickers)                        # {ticker: rank}, one snapshot
+    get_rs_ranks(tickers, compute=False)         # memory / rs_cache.csv only
+    get_rs_point_in_time("NVDA")                 # RS as it was on each past session
 """
 
 import os
 import sys
 import time
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from datetime import date, datetime
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 import trader_config as C
 
-from modules.data_pipeline import get_universe, FVF_AVAILABLE
+from modules.data_pipeline import get_universe, get_provider, get_historical, FVF_AVAILABLE
+from modules import yf_async, trading_calendar, rs_matrix, price_store
 try:
     from modules.nasdaq_universe import get_universe_nasdaq as _get_nasdaq_universe
     _NASDAQ_AVAILABLE = True
@@ -109,24 +127,34 @@ def build_rs_universe() -> list:
 # Return calculation
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _calculate_returns(close_prices: pd.DataFrame) -> pd.DataFrame:
+def _calculate_returns(close_prices: pd.DataFrame, rows=None, floor=None):
     """
     Calculate weighted RS score for each ticker column in close_prices.
     close_prices: DataFrame where each column is a ticker, index is dates.
+
+    Returns a Series for the last row, or with `rows` (row positions) a
+    DataFrame (those dates × tickers) computed in one pass over the matrix.
+    Lookbacks are row offsets clipped at the first row — or per row at
+    `floor` (first row of each row's window) — so a row's score only depends
+    on the rows up to it.
     """
     w = C.RS_WEIGHTS
-    today_price = close_prices.iloc[-1]
+    values = close_prices.to_numpy(dtype=float)
+    pos = np.array([len(values) - 1]) if rows is None else np.asarray(rows, dtype=int)
+    first = 0 if floor is None else np.asarray(floor, dtype=int)
+    today_price = values[pos]
 
-    def lookback_return(days: int) -> pd.Series:
-        idx = max(0, len(close_prices) - days - 1)
-        past_price = close_prices.iloc[idx]
-        return (today_price - past_price) / past_price.replace(0, np.nan) * 100
+    def lookback_return(days: int) -> np.ndarray:
+        past_price = values[np.maximum(pos - days, first)]
+        past_price = np.where(past_price == 0, np.nan, past_price)
+        return (today_price - past_price) / past_price * 100
 
     # Approximate trading days per period
-    r3m  = lookback_return(63)   # ~3 months
-    r6m  = lookback_return(126)  # ~6 months
-    r9m  = lookback_return(189)  # ~9 months
-    r12m = lookback_return(252)  # ~12 months
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r3m  = lookback_return(63)   # ~3 months
+        r6m  = lookback_return(126)  # ~6 months
+        r9m  = lookback_return(189)  # ~9 months
+        r12m = lookback_return(252)  # ~12 months
 
     rs_raw = (
         r3m  * w["3m"] +
@@ -134,59 +162,52 @@ def _calculate_returns(close_prices: pd.DataFrame) -> pd.DataFrame:
         r9m  * w["9m"] +
         r12m * w["12m"]
     )
-    return rs_raw
+    if rows is None:
+        return pd.Series(rs_raw[0], index=close_prices.columns)
+    return pd.DataFrame(rs_raw, index=close_prices.index[pos], columns=close_prices.columns)
+
+
+def _percentile_ranks(rs_raw: pd.DataFrame) -> pd.DataFrame:
+    """Percentile rank (1-99) of each row across tickers; NaN stays unranked."""
+    return (rs_raw.rank(axis=1, pct=True) * 100).clip(1, 99).round(1)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Main ranking computation
+# Close-price download
 # ─────────────────────────────────────────────────────────────────────────────
 
-def compute_rs_rankings(universe: list = None,
-                        force_refresh: bool = False) -> pd.DataFrame:
+def _download_closes(tickers: list, period: str = "1y", start=None,
+                     min_bars: int = 51) -> dict:
     """
-    Compute RS percentile rankings for the full universe.
-    Returns DataFrame with columns: Ticker, RS_Raw, RS_Rank (1-99).
+    {ticker: Close series} for `tickers` — concurrent chart requests on the
+    async engine where enabled, parallel provider bulk batches (with back-off
+    on rate limits) for the rest.  Series with fewer than `min_bars` closes
+    are dropped.  `start` takes precedence over `period`.
     """
-    # — Check cache —
-    if not force_refresh and RS_CACHE_FILE.exists():
-        try:
-            df_cache = pd.read_csv(RS_CACHE_FILE)
-            cached_date = df_cache.get("CacheDate", pd.Series()).iloc[0] if len(df_cache) > 0 else ""
-            if str(cached_date) == date.today().isoformat() and len(df_cache) > 10:
-                logger.info("[RS] Loaded %d RS ranks from cache (%s)", len(df_cache), cached_date)
-                return df_cache
-        except Exception:
-            pass
-
-    if universe is None:
-        universe = build_rs_universe()
-
-    if not universe:
-        return pd.DataFrame(columns=["Ticker", "RS_Raw", "RS_Rank", "CacheDate"])
-
-    # — Batch download 1-year close prices —
-    logger.info("[RS] Downloading 1-year history for %d tickers in batches of %d...",
-                len(universe), C.RS_BATCH_SIZE)
-
     all_close: dict = {}
-    batches = [universe[i:i + C.RS_BATCH_SIZE]
-               for i in range(0, len(universe), C.RS_BATCH_SIZE)]
+    pending = list(tickers)
+    if not pending:
+        return all_close
+    if yf_async.enabled() and get_provider().async_bulk:
+        # Concurrent per-ticker chart requests; failures fall back to yf.download batches
+        pending = []
+        for tkr, df in yf_async.stream(list(tickers), period=period, start=start):
+            if df is None:
+                pending.append(tkr)
+            elif df["Close"].dropna().shape[0] >= min_bars:
+                all_close[tkr] = df["Close"]
+        logger.info("[RS] Async engine fetched %d tickers (%d left for batch download)",
+                    len(all_close), len(pending))
+    batches = [pending[i:i + C.RS_BATCH_SIZE]
+               for i in range(0, len(pending), C.RS_BATCH_SIZE)]
     total = len(batches)
-    batch_sleep = getattr(C, "RS_BATCH_SLEEP", 0.5)
     parallel_batches = getattr(C, "RS_PARALLEL_BATCHES", 3)
 
     def _download_batch_with_retry(batch: list, max_retries: int = 3) -> object:
-        """yf.download wrapper with exponential back-off on rate-limit (429) errors."""
+        """Provider bulk download ({ticker: OHLCV}) with exponential back-off on rate-limit (429) errors."""
         for attempt in range(max_retries):
             try:
-                return yf.download(
-                    tickers=batch,
-                    period="1y",
-                    interval="1d",
-                    auto_adjust=True,
-                    threads=False,   # threads=True causes 'dict changed size during iteration' race condition
-                    progress=False,
-                )
+                return get_provider().bulk_history(batch, period=period, start=start)
             except Exception as exc:
                 err = str(exc).lower()
                 # Classify error type
@@ -220,35 +241,17 @@ def compute_rs_rankings(universe: list = None,
         idx, batch = batch_info
         local_close = {}
         logger.debug("[RS] Batch %d/%d (%d tickers)...", idx + 1, total, len(batch))
-        # Small stagger to avoid simultaneous bursts
-        if idx > 0:
-            time.sleep(batch_sleep * (idx % parallel_batches))
-        raw = _download_batch_with_retry(batch)
-        if raw is not None and not raw.empty:
-            if isinstance(raw.columns, pd.MultiIndex):
-                try:
-                    closes = raw["Close"]
-                    if isinstance(closes, pd.Series):
-                        closes = closes.to_frame(name=batch[0])
-                    for col in closes.columns:
-                        if closes[col].dropna().shape[0] > 50:
-                            local_close[col] = closes[col]
-                except Exception:
-                    for tkr in batch:
-                        try:
-                            s = raw.xs(tkr, axis=1, level=1)["Close"]
-                            if s.dropna().shape[0] > 50:
-                                local_close[tkr] = s
-                        except Exception:
-                            pass
-            else:
-                if "Close" in raw.columns:
-                    local_close[batch[0]] = raw["Close"]
+        # Bursts across the parallel workers are smoothed by yf_limiter
+        frames = _download_batch_with_retry(batch) or {}
+        for tkr, df in frames.items():
+            if df["Close"].dropna().shape[0] >= min_bars:
+                local_close[tkr] = df["Close"]
         return local_close
 
     # ── Download batches in parallel ─────────────────────────────────────
-    logger.info("[RS] Downloading %d batches with %d parallel workers...",
-                total, parallel_batches)
+    if batches:
+        logger.info("[RS] Downloading %d batches with %d parallel workers...",
+                    total, parallel_batches)
     with ThreadPoolExecutor(max_workers=parallel_batches) as pool:
         futures = {pool.submit(_process_batch, (i, b)): i
                    for i, b in enumerate(batches)}
@@ -258,37 +261,115 @@ def compute_rs_rankings(universe: list = None,
                 all_close.update(local_close)
             except Exception as exc:
                 logger.warning("[RS] Batch future error: %s", exc)
+    return all_close
+
 
-    logger.info("[RS] Downloaded price data for %d tickers", len(all_close))
+def _update_close_matrix(universe: list, rebuild: bool = False) -> tuple:
+    """
+    Bring the persisted close matrix (modules/rs_matrix.py) up to date for
+    `universe`: only the newest sessions for tickers already in it, a full
+    year for new or restated tickers (or everything when the matrix is
+    missing, too old, or `rebuild`).
 
-    if not all_close:
+    Returns (closes of the universe tickers, sessions to record in the
+    RS-rank history).
+    """
+    closes = pd.DataFrame() if rebuild else rs_matrix.load_closes()
+    start = rs_matrix.incremental_start(closes)
+    if start is None:
+        closes = closes.iloc[0:0, 0:0]
+    last = closes.index[-1] if len(closes) else None
+
+    known = [t for t in universe if t in closes.columns]
+    full = [t for t in universe if t not in closes.columns]
+    if known:
+        logger.info("[RS] Incremental update: %d tickers since %s", len(known), start)
+        recent = _download_closes(known, start=start, min_bars=1)
+        closes, reload = rs_matrix.extend(closes, recent)
+        full += reload
+    if full:
+        logger.info("[RS] Downloading 1-year history for %d tickers in batches of %d...",
+                    len(full), C.RS_BATCH_SIZE)
+        # A restated ticker whose full download fails keeps its old column
+        closes = rs_matrix.replace(closes, _download_closes(full))
+    else:
+        closes = rs_matrix.replace(closes, {})
+    if not closes.empty:
+        rs_matrix.save_closes(closes)
+
+    # A fresh matrix only yields today's ranking: its earlier rows lack a full lookback year
+    added = closes.index[-1:] if last is None else closes.index[closes.index > last]
+    return closes.reindex(columns=[t for t in dict.fromkeys(universe) if t in closes.columns]), added
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Main ranking computation
+# ─────────────────────────────────────────────────────────────────────────────
+
+def compute_rs_rankings(universe: list = None,
+                        force_refresh: bool = False,
+                        rebuild: bool = False) -> pd.DataFrame:
+    """
+    Compute RS percentile rankings for the full universe.
+    Returns DataFrame with columns: Ticker, RS_Raw, RS_Rank (1-99).
+
+    With RS_INCREMENTAL_ENABLED the closes come from the persisted matrix
+    (only the newest sessions are downloaded; `rebuild` re-downloads the full
+    year) and the RS_Rank of every added session goes to the rank history.
+    """
+    # — Check cache —
+    if not force_refresh and RS_CACHE_FILE.exists():
+        try:
+            df_cache = pd.read_csv(RS_CACHE_FILE)
+            cached_date = df_cache.get("CacheDate", pd.Series()).iloc[0] if len(df_cache) > 0 else ""
+            if str(cached_date) == trading_calendar.cache_asof() and len(df_cache) > 10:
+                logger.info("[RS] Loaded %d RS ranks from cache (%s)", len(df_cache), cached_date)
+                return df_cache
+        except Exception:
+            pass
+
+    if universe is None:
+        universe = build_rs_universe()
+
+    if not universe:
         return pd.DataFrame(columns=["Ticker", "RS_Raw", "RS_Rank", "CacheDate"])
 
-    # — Build aligned DataFrame —
-    df_close = pd.DataFrame(all_close)
-    if df_close.index.tzinfo is not None:
-        df_close.index = df_close.index.tz_localize(None)
-    df_close = df_close.sort_index()
+    # — 1-year close prices: persisted matrix, or a full batch download —
+    if getattr(C, "RS_INCREMENTAL_ENABLED", True):
+        df_close, added = _update_close_matrix(universe, rebuild=rebuild)
+    else:
+        logger.info("[RS] Downloading 1-year history for %d tickers in batches of %d...",
+                    len(universe), C.RS_BATCH_SIZE)
+        all_close = _download_closes(universe)
+        logger.info("[RS] Downloaded price data for %d tickers", len(all_close))
+        df_close = pd.DataFrame(all_close)
+        if len(df_close) and df_close.index.tzinfo is not None:
+            df_close.index = df_close.index.tz_localize(None)
+        df_close = df_close.sort_index()
+        added = df_close.index[-1:]
+
+    if df_close.empty:
+        return pd.DataFrame(columns=["Ticker", "RS_Raw", "RS_Rank", "CacheDate"])
 
     # Require at least 63 trading days (3 months) of data
     df_close = df_close.loc[:, df_close.count() >= 63]
 
-    # — Calculate RS raw scores —
-    rs_raw = _calculate_returns(df_close)
-    rs_raw = rs_raw.dropna()
+    # — Calculate RS raw scores and percentile ranks (1-99) for each added session —
+    rows = sorted({i for i in df_close.index.get_indexer(added) if i >= 0} | {len(df_close) - 1})
+    raw_hist = _calculate_returns(df_close, rows=rows)
+    rank_hist = _percentile_ranks(raw_hist)
+    rs_raw = raw_hist.iloc[-1].dropna()
 
     if rs_raw.empty:
         return pd.DataFrame(columns=["Ticker", "RS_Raw", "RS_Rank", "CacheDate"])
 
-    # — Percentile rank (1-99) —
-    rs_rank = rs_raw.rank(pct=True) * 100
-    rs_rank = rs_rank.clip(1, 99).round(1)
+    rs_rank = rank_hist.iloc[-1][rs_raw.index]
 
     result = pd.DataFrame({
         "Ticker":    rs_raw.index,
         "RS_Raw":    rs_raw.values.round(2),
         "RS_Rank":   rs_rank.values.round(1),
-        "CacheDate": date.today().isoformat(),
+        "CacheDate": trading_calendar.cache_asof(),
     })
     result = result.sort_values("RS_Rank", ascending=False).reset_index(drop=True)
 
@@ -299,6 +380,12 @@ def compute_rs_rankings(universe: list = None,
     except Exception as exc:
         logger.warning(f"Could not save RS cache: {exc}")
 
+    # — RS-rank history (ticker × date) —
+    try:
+        rs_matrix.append_rank_history(rank_hist)
+    except Exception as exc:
+        logger.warning("RS rank history write skipped: %s", exc)
+
     # — DuckDB 歷史記錄 —
     if getattr(C, "DB_ENABLED", True):
         try:
@@ -310,38 +397,323 @@ def compute_rs_rankings(universe: list = None,
     return result
 
 
-
 # ─────────────────────────────────────────────────────────────────────────────
-# Query interface
+# Point-in-time RS history
 # ─────────────────────────────────────────────────────────────────────────────
 
-_rs_df: pd.DataFrame = pd.DataFrame()
+_backfill_lock = threading.Lock()
 
 
-def _ensure_rs_loaded(force_refresh: bool = False):
-    """Load RS rankings into memory (from cache or compute)."""
-    global _rs_df
-    if force_refresh or _rs_df.empty:
-        _rs_df = compute_rs_rankings(force_refresh=force_refresh)
+def _cached_closes(universe: list = None) -> pd.DataFrame:
+    """
+    Closes (dates × tickers) from the cached price history: the price store's
+    master series, completed with the RS close matrix.  `universe` defaults to
+    the close matrix's tickers, else everything in the store.
+    """
+    matrix = rs_matrix.load_closes()
+    if universe is None:
+        universe = list(matrix.columns) or None
+    frames = price_store.read_frames(price_store.MASTER, universe)
+    store = pd.DataFrame({t: df["Close"] for t, df in frames.items() if "Close" in df.columns},
+                         dtype=float)
+    if len(store) and store.index.tzinfo is not None:
+        store.index = store.index.tz_localize(None)
+    if universe is not None:
+        matrix = matrix.reindex(columns=[t for t in matrix.columns if t in set(universe)])
+    cols = list(dict.fromkeys([*store.columns, *matrix.columns]))
+    dates = store.index.union(matrix.index)
+    a = store.reindex(index=dates, columns=cols).to_numpy()
+    b = matrix.reindex(index=dates, columns=cols).to_numpy()
+    # The store's longer series win; the matrix fills sessions and tickers it lacks
+    return pd.DataFrame(np.where(np.isnan(a), b, a), index=dates, columns=cols).sort_index()
+
+
+def backfill_rs_history(universe: list = None, since=None) -> dict:
+    """
+    Build the point-in-time RS dataset (modules/rs_matrix.py) from cached
+    prices, with no downloads except the benchmark's.  With `since` (the
+    dataset's last session) only the sessions after it are ranked and
+    appended, from the trailing window their lookbacks need.
+
+    For every session of the cached history this is the RS_Rank each ticker
+    had on that date — ranked exactly as compute_rs_rankings() would have on
+    that day: against the tickers with a close then, over the year of
+    sessions before it, requiring 63 closes in it.  Sessions with less than a
+    year of history before them are left unranked.  It also stores the RS
+    line (close / RS_LINE_BENCHMARK close) and RS-line new-high flags.
+
+    The universe is today's (see _cached_closes), so past ranks carry its
+    survivorship bias.  Returns a summary dict.
+    """
+    with _backfill_lock:
+        closes = _cached_closes(universe)
+        bench_ticker = getattr(C, "RS_LINE_BENCHMARK", "SPY")
+        bench = get_historical(bench_ticker, period=getattr(C, "PRICE_MASTER_PERIOD", "2y"))
+        if bench is None or bench.empty or closes.empty:
+            logger.warning("[RS] Point-in-time back-fill skipped: no cached history")
+            return {"sessions": 0, "ranked_sessions": 0, "tickers": 0}
+        bench = bench["Close"].astype(float)
+        if bench.index.tzinfo is not None:
+            bench.index = bench.index.tz_localize(None)
+
+        # Session calendar = the benchmark's bars within the cached span
+        dates = bench.index[(bench.index >= closes.index[0]) & (bench.index <= closes.index[-1])]
+        span_start = dates[0] if len(dates) else None
+        bars = int(getattr(C, "RS_LINE_HIGH_BARS", 252))
+
+        # Each session's window: the sessions of the year before it (rs_matrix.replace)
+        floor = dates.searchsorted(dates - pd.DateOffset(years=1), side="right")
+        full_year = floor > 0
+        first = 0
+        if since is not None:
+            first = int(dates.searchsorted(pd.Timestamp(since), side="right"))
+            if first >= len(dates):
+                return {"sessions": 0, "ranked_sessions": 0, "tickers": closes.shape[1]}
+            # Keep only what the new sessions look back over: a year of closes, RS_LINE_HIGH_BARS bars
+            start = max(0, min(int(floor[first]), first - bars + 1))
+            dates, floor, full_year = dates[start:], floor[start:] - start, full_year[start:]
+            first -= start
+        closes = closes.reindex(dates)
+        closes = closes.loc[:, closes.notna().any()]
+        values = closes.to_numpy()
+        rows = np.flatnonzero(full_year[first:]) + first
+        counts = np.vstack([np.zeros((1, values.shape[1]), dtype=int),
+                            np.cumsum(~np.isnan(values), axis=0)])
+        raw = _calculate_returns(closes, rows=rows, floor=floor[rows])
+        raw = raw.where(counts[rows + 1] - counts[floor[rows]] >= 63)
+        # Sessions only the longer-cached tickers reach would be ranked against a
+        # hand-picked few: require RS_PIT_MIN_COVERAGE of the widest cross-section
+        ranked = raw.notna().sum(axis=1)
+        raw = raw[ranked >= getattr(C, "RS_PIT_MIN_COVERAGE", 0.5) * max(ranked.max(), 1)]
+        rows = closes.index.get_indexer(raw.index)
+        ranks = _percentile_ranks(raw).reindex(dates)
+
+        # RS line and its new highs
+        line = closes.div(bench.reindex(dates), axis=0)
+        line_high = (line >= line.rolling(bars, min_periods=bars).max()).to_numpy()
+        price_high = (closes >= closes.rolling(bars, min_periods=bars).max()).to_numpy()
+        flags = (line_high * rs_matrix.RS_LINE_NEW_HIGH
+                 | (line_high & ~price_high) * rs_matrix.RS_LINE_HIGH_BEFORE_PRICE)
+        flags = pd.DataFrame(flags.astype(np.uint8), index=dates, columns=closes.columns)
+        if since is None:
+            rs_matrix.save_point_in_time(ranks, line, flags)
+        else:
+            rs_matrix.append_point_in_time(ranks.iloc[first:], line.iloc[first:],
+                                           flags.iloc[first:], start=span_start)
+
+        summary = {"sessions": len(dates) - first, "ranked_sessions": len(rows),
+                   "tickers": closes.shape[1],
+                   "first_ranked": str(dates[rows[0]].date()) if len(rows) else None,
+                   "last": str(dates[-1].date())}
+        logger.info("[RS] Point-in-time RS %s: %s",
+                    "back-filled" if since is None else "extended", summary)
+        return summary
+
+
+def ensure_rs_history() -> bool:
+    """
+    Bring the point-in-time RS dataset up to the RS close matrix
+    (RS_PIT_AUTO_BACKFILL): back-fill it if it is missing, else rank only the
+    sessions added since its last one.  True if a dataset is available.
+    """
+    asof = rs_matrix.point_in_time_asof()
+    if not getattr(C, "RS_PIT_AUTO_BACKFILL", True):
+        return asof is not None
+    closes_asof = rs_matrix.closes_asof()
+    if asof is not None and (closes_asof is None or asof >= closes_asof):
+        return True
+    try:
+        backfill_rs_history(since=asof)
+    except Exception as exc:
+        logger.warning("[RS] Point-in-time back-fill failed: %s", exc)
+    return rs_matrix.point_in_time_asof() is not None
+
 
+def get_rs_point_in_time(ticker: str, days: int = None,
+                         backfill: bool = False) -> pd.DataFrame:
+    """
+    RS as it was on each past session for `ticker` (Date index): rs_rank
+    (NaN where unranked), rs_line, rs_line_new_high, rs_line_high_before_price.
+    Empty if the point-in-time dataset does not cover the ticker.
+    `backfill` first brings a stale dataset up to date (ensure_rs_history).
+    """
+    if backfill:
+        ensure_rs_history()
+    return rs_matrix.point_in_time(ticker, days=days)
+
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Query interface
+# ─────────────────────────────────────────────────────────────────────────────
 
 # Sentinel value indicating RS rank was NOT calculated (ticker missing from RS universe).
 # Distinct from a genuinely low score so callers can distinguish "not ranked" from "weak".
 RS_NOT_RANKED = -1.0
 
 
+class RSSnapshot:
+    """
+    One loaded RS ranking: the ranked DataFrame plus a hash index
+    TICKER → (RS_Raw, RS_Rank) built once at load time.
+
+    A snapshot is never modified after construction.  Readers take a reference
+    to the current one and do every lookup of a batch against it; a refresh
+    builds a new snapshot and swaps the module reference (_install), so
+    concurrent scans never see a half-loaded ranking.  The RS histories read
+    through it are kept in a small LRU (RS_HISTORY_LRU_SIZE entries).
+    """
+    __slots__ = ("df", "asof", "index", "_history", "_history_lock")
+
+    def __init__(self, df: pd.DataFrame = None):
+        if df is None:
+            df = pd.DataFrame(columns=["Ticker", "RS_Raw", "RS_Rank", "CacheDate"])
+        self.df = df
+        self.asof = str(df["CacheDate"].iloc[0]) if "CacheDate" in df.columns and len(df) else ""
+        self.index = {}
+        if len(df) and "Ticker" in df.columns:
+            raw = df["RS_Raw"].astype(float) if "RS_Raw" in df.columns else pd.Series(np.nan, index=df.index)
+            # Reversed so the first row wins for a duplicated ticker, as the old row scan did
+            self.index = dict(zip(df["Ticker"].astype(str).str.upper()[::-1],
+                                  zip(raw[::-1].tolist(), df["RS_Rank"].astype(float)[::-1].tolist())))
+        self._history: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()   # (TICKER, days) → rows
+        self._history_lock = threading.Lock()
+
+    @property
+    def empty(self) -> bool:
+        return not self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def rank(self, ticker: str) -> float:
+        """RS rank 1-99, or RS_NOT_RANKED."""
+        entry = self.index.get(str(ticker).upper())
+        return entry[1] if entry else RS_NOT_RANKED
+
+    def ranks(self, tickers) -> dict:
+        """{ticker: rank or RS_NOT_RANKED}, keyed as the caller spelled them."""
+        index = self.index
+        out = {}
+        for t in tickers:
+            entry = index.get(str(t).upper())
+            out[t] = entry[1] if entry else RS_NOT_RANKED
+        return out
+
+    def history(self, ticker: str, days: int = 90) -> pd.DataFrame:
+        """
+        Daily (rank_date, rs_rank) rows for `ticker` from the RS-rank history
+        and the point-in-time dataset (rs_matrix; with rs_line and
+        rs_line_new_high where back-filled), else (rank_date, rs_raw, rs_rank)
+        from the DuckDB rs_history table.  Recently read tickers are served
+        from the snapshot's LRU.
+        """
+        key = (str(ticker).upper(), int(days))
+        with self._history_lock:
+            hist = self._history.get(key)
+            if hist is not None:
+                self._history.move_to_end(key)
+                return hist
+        hist = pd.DataFrame(columns=["rank_date", "rs_raw", "rs_rank"])
+        stored = rs_matrix.rank_history([key[0]], days=key[1])
+        pit = rs_matrix.point_in_time(key[0], days=key[1])
+        rank = pit["rs_rank"].dropna()
+        if key[0] in stored.columns:
+            rank = stored[key[0]].dropna().combine_first(rank)   # recorded rankings win
+        if len(rank):
+            hist = rank.rename("rs_rank").rename_axis("rank_date").to_frame()
+            if len(pit):
+                hist = hist.join(pit[["rs_line", "rs_line_new_high"]])
+            hist = hist.reset_index()
+        elif getattr(C, "DB_ENABLED", True):
+            try:
+                from modules.db import query_rs_trend
+                hist = query_rs_trend(key[0], days=key[1])
+            except Exception as exc:
+                logger.debug("[RS] rs_history read skipped: %s", exc)
+        with self._history_lock:
+            self._history[key] = hist
+            self._history.move_to_end(key)
+            while len(self._history) > max(1, int(getattr(C, "RS_HISTORY_LRU_SIZE", 256))):
+                self._history.popitem(last=False)
+        return hist
+
+
+_snapshot: RSSnapshot = RSSnapshot()
+_rs_df: pd.DataFrame = _snapshot.df        # frame of the current snapshot (read-only)
+_load_lock = threading.Lock()
+
+
+def _install(df: pd.DataFrame) -> RSSnapshot:
+    """Build a snapshot from a ranking frame and make it the current one."""
+    global _snapshot, _rs_df
+    snap = RSSnapshot(df)
+    _snapshot, _rs_df = snap, snap.df
+    return snap
+
+
+def _ensure_rs_loaded(force_refresh: bool = False) -> RSSnapshot:
+    """Load RS rankings into memory (from cache or compute); returns the snapshot."""
+    snap = _snapshot
+    if not force_refresh and not snap.empty:
+        return snap
+    with _load_lock:
+        # Another thread may have loaded the rankings while this one waited
+        if not force_refresh and not _snapshot.empty:
+            return _snapshot
+        return _install(compute_rs_rankings(force_refresh=force_refresh))
+
+
+def _load_cache_file() -> RSSnapshot:
+    """
+    The in-memory snapshot, else whatever rs_cache.csv holds (today's or
+    stale), installed as the current snapshot.  Never downloads.
+    """
+    snap = _snapshot
+    if not snap.empty or not RS_CACHE_FILE.exists():
+        return snap
+    with _load_lock:
+        if not _snapshot.empty:
+            return _snapshot
+        try:
+            df_cache = pd.read_csv(RS_CACHE_FILE)
+            if len(df_cache) > 10 and "Ticker" in df_cache.columns:
+                snap = _install(df_cache)
+                logger.info("[RS] Loaded %d RS ranks from %s (as of %s)",
+                            len(snap), RS_CACHE_FILE.name, snap.asof or "unknown")
+        except Exception as e:
+            logger.debug("[RS] Cache read failed: %s", e)
+    return _snapshot
+
+
 def get_rs_rank(ticker: str, force_refresh: bool = False) -> float:
     """
     Get the RS percentile rank of a single ticker.
     Returns float 1-99, or RS_NOT_RANKED (-1.0) if ticker not in universe.
     """
-    _ensure_rs_loaded(force_refresh)
-    if _rs_df.empty:
-        return RS_NOT_RANKED
-    row = _rs_df[_rs_df["Ticker"].str.upper() == ticker.upper()]
-    if row.empty:
-        return RS_NOT_RANKED
-    return float(row["RS_Rank"].iloc[0])
+    return _ensure_rs_loaded(force_refresh).rank(ticker)
+
+
+def get_rs_ranks(tickers, force_refresh: bool = False,
+                 compute: bool = True) -> dict:
+    """
+    RS percentile ranks for many tickers, all from one snapshot.
+    Returns {ticker: rank 1-99 or RS_NOT_RANKED}, keyed as passed in.
+
+    compute=False never triggers a universe rebuild: it uses the in-memory
+    rankings, else any existing rs_cache.csv (stale is acceptable), else
+    every ticker is RS_NOT_RANKED.
+    """
+    snap = _ensure_rs_loaded(force_refresh) if compute else _load_cache_file()
+    return snap.ranks(tickers)
+
+
+def get_rs_history(ticker: str, days: int = 90) -> pd.DataFrame:
+    """
+    Daily RS rank history of a ticker: the RS-rank history and point-in-time
+    dataset (rs_matrix), else DuckDB rs_history; see RSSnapshot.history().
+    """
+    return _snapshot.history(ticker, days)
 
 
 def _compute_approx_rs_rank(ticker: str) -> float:
@@ -373,18 +745,11 @@ def _compute_approx_rs_rank(ticker: str) -> float:
     try:
         logger.info("[RS] Downloading 1-year history for %d-stock reference set (lightweight RS for %s)...",
                     len(reference), ticker)
-        raw = yf.download(
-            tickers=reference,
-            period="1y",
-            interval="1d",
-            auto_adjust=True,
-            threads=False,
-            progress=False,
-        )
-        if raw is None or raw.empty:
+        frames = get_provider().bulk_history(reference, period="1y")
+        if not frames:
             return RS_NOT_RANKED
 
-        closes = raw["Close"] if isinstance(raw.columns, pd.MultiIndex) else raw
+        closes = pd.DataFrame({t: df["Close"] for t, df in frames.items()}).sort_index()
         closes = closes.dropna(axis=1, how="all")
         closes = closes.loc[:, closes.count() >= 63]
 
@@ -411,35 +776,20 @@ def get_rs_rank_lightweight(ticker: str) -> float:
     """
     Get RS rank for a single ticker WITHOUT triggering a full universe rebuild.
 
-    Used by single-stock analysis (stock_analyzer, qm_analyzer, ml_analyzer) to avoid
-    downloading ~8000 tickers just to score one stock.
+    Used by single-stock analysis (stock_analyzer) to avoid downloading ~8000
+    tickers just to score one stock.  qm_analyzer / ml_analyzer only use the
+    loaded rankings (get_rs_ranks(compute=False)) and skip the RS bonus otherwise.
 
     Lookup priority:
-    1. In-memory cache (_rs_df) — already loaded, instant
-    2. Any existing rs_cache.csv (today's or stale — acceptable for individual analysis)
+    1. In-memory snapshot — already loaded, instant
+    2. Any existing rs_cache.csv (today's or stale — acceptable for individual analysis),
+       loaded into memory for subsequent calls in this session
     3. Approximate RS computed from ticker vs ~100-stock reference set (fast, ~5s)
     """
-    global _rs_df
-
-    # 1. Already in memory
-    if not _rs_df.empty:
-        row = _rs_df[_rs_df["Ticker"].str.upper() == ticker.upper()]
-        if not row.empty:
-            return float(row["RS_Rank"].iloc[0])
-
-    # 2. Any existing cache file (today's → fresh; older → stale but acceptable)
-    if RS_CACHE_FILE.exists():
-        try:
-            df_cache = pd.read_csv(RS_CACHE_FILE)
-            if len(df_cache) > 10 and "Ticker" in df_cache.columns:
-                _rs_df = df_cache  # load into memory for subsequent calls in this session
-                row = df_cache[df_cache["Ticker"].str.upper() == ticker.upper()]
-                if not row.empty:
-                    cache_date = df_cache["CacheDate"].iloc[0] if "CacheDate" in df_cache.columns else "unknown"
-                    logger.info("[RS] Using cached RS rank for %s from %s (stale ok for single-stock analysis)", ticker, cache_date)
-                    return float(row["RS_Rank"].iloc[0])
-        except Exception as e:
-            logger.debug("[RS] Cache read failed: %s", e)
+    # 1 + 2. In memory, or any existing cache file (today's → fresh; older → stale but acceptable)
+    rank = _load_cache_file().rank(ticker)
+    if rank != RS_NOT_RANKED:
+        return rank
 
     # 3. No cache or ticker missing — compute approximate RS from a small reference set
     logger.info("[RS] No RS cache available for %s — using lightweight reference set computation", ticker)
@@ -452,14 +802,13 @@ def get_rs_top(percentile: float = 80.0,
     Get all stocks with RS rank above the given percentile.
     Returns DataFrame sorted by RS_Rank descending.
     """
-    _ensure_rs_loaded(force_refresh)
-    if _rs_df.empty:
+    rs_df = _ensure_rs_loaded(force_refresh).df
+    if rs_df.empty:
         return pd.DataFrame()
-    df = _rs_df[_rs_df["RS_Rank"] >= percentile].copy()
+    df = rs_df[rs_df["RS_Rank"] >= percentile].copy()
     return df.sort_values("RS_Rank", ascending=False)
 
 
 def get_rs_dataframe(force_refresh: bool = False) -> pd.DataFrame:
     """Return the full RS ranking DataFrame."""
-    _ensure_rs_loaded(force_refresh)
-    return _rs_df.copy()
+    return _ensure_rs_loaded(force_refresh).df.copy()
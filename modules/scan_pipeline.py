@@ -0,0 +1,130 @@
+"""
+modules/scan_pipeline.py
+────────────────────────
+Stage 2 → Stage 3 pipelining for the scanners.
+
+run_scan, run_qm_scan and run_ml_scan finished Stage 2 for every candidate
+before Stage 3 started, although Stage 3 is dominated by network-bound
+fundamentals / earnings lookups.  With SCAN_PIPELINE_ENABLED each scanner
+hands its Stage 2 an `on_pass` hook that puts every survivor on a
+Stage3Pipeline the moment it passes; the pipeline's workers score it while
+Stage 2 is still downloading and validating the rest, so the end-to-end scan
+takes roughly the longer stage instead of the sum of both.
+
+  • bounded   — the queue holds at most SCAN_PIPELINE_QUEUE_SIZE survivors;
+                put() blocks Stage 2 while Stage 3 is that far behind;
+  • cancel    — put() gives up and workers stop scoring once `cancelled()`
+                is true; close() still joins every worker;
+  • progress  — on_scored(row, result, done, submitted, feeding) runs after
+                each row (in the worker thread), `feeding` being True while
+                Stage 2 may still add rows.
+
+Results come back in completion order; the scanners sort them afterwards.
+
+Usage:
+    with scan_pipeline.Stage3Pipeline(score_one, workers=6,
+                                      cancelled=_is_cancelled) as pipe:
+        s2_rows = run_qm_stage2(candidates, on_pass=pipe.put)
+    scored = pipe.results
+"""
+
+import logging
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def enabled() -> bool:
+    return bool(getattr(C, "SCAN_PIPELINE_ENABLED", True))
+
+
+class Stage3Pipeline:
+    """Bounded queue of Stage 2 survivors scored by a pool of Stage 3 threads."""
+
+    def __init__(self, score: Callable, workers: int = 6,
+                 maxsize: Optional[int] = None,
+                 cancelled: Optional[Callable[[], bool]] = None,
+                 on_scored: Optional[Callable] = None,
+                 name: str = "stage3"):
+        if maxsize is None:
+            maxsize = int(getattr(C, "SCAN_PIPELINE_QUEUE_SIZE", 64))
+        self._score = score
+        self._cancelled = cancelled or (lambda: False)
+        self._on_scored = on_scored
+        self._queue: queue.Queue = queue.Queue(max(1, maxsize))
+        self._lock = threading.Lock()
+        self._closed = False
+        self.results: list = []
+        self.submitted = 0
+        self.done = 0
+        self._threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+                         for i in range(max(1, int(workers)))]
+        for t in self._threads:
+            t.start()
+
+    @property
+    def feeding(self) -> bool:
+        """True until close(): Stage 2 may still add rows."""
+        return not self._closed
+
+    def put(self, row) -> bool:
+        """Queue one survivor, waiting while the queue is full.  False if cancelled."""
+        with self._lock:
+            self.submitted += 1             # counted first so done ≤ submitted
+        while not self._cancelled():
+            try:
+                self._queue.put(row, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        with self._lock:
+            self.submitted -= 1
+        return False
+
+    def _work(self) -> None:
+        while True:
+            row = self._queue.get()
+            if row is _STOP:
+                return
+            result = None
+            if not self._cancelled():
+                try:
+                    result = self._score(row)
+                except Exception as exc:
+                    logger.warning("[Pipeline] Stage 3 error: %s", exc)
+            with self._lock:
+                self.done += 1
+                if result is not None:
+                    self.results.append(result)
+                done, submitted = self.done, self.submitted
+            if self._on_scored is not None:
+                try:
+                    self._on_scored(row, result, done, submitted, self.feeding)
+                except Exception as exc:
+                    logger.debug("[Pipeline] progress callback failed: %s", exc)
+
+    def close(self) -> list:
+        """No more rows: let the workers drain the queue, join them, return the results."""
+        if not self._closed:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for t in self._threads:
+                t.join()
+        return self.results
+
+    def __enter__(self) -> "Stage3Pipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
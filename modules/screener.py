@@ -9,6 +9,9 @@ Stage 2 (Precise) — yfinance + pandas_ta: validate ALL TT1-TT10 conditions
                     → reduces to ~20-50 stocks
 Stage 3 (Score)   — Full SEPA 5-pillar scoring + VCP detection
                     → final ranked watchlist candidates
+
+With SCAN_PIPELINE_ENABLED, run_scan scores each Stage 2 survivor as soon as
+it passes (modules/scan_pipeline.py) instead of waiting for Stage 2 to finish.
 """
 
 import sys
@@ -19,10 +22,9 @@ import random
 from datetime import date
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import pandas as pd
-import numpy as np
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
@@ -31,9 +33,10 @@ import trader_config as C
 from modules.data_pipeline import (
     get_universe, get_enriched, get_fundamentals,
     get_sector_rankings, FVF_AVAILABLE,
-    batch_download_and_enrich,
+    stream_download_and_enrich, prefetch_fundamentals, cancel_prefetch,
 )
-from modules.rs_ranking import get_rs_rank, _ensure_rs_loaded
+from modules.rs_ranking import get_rs_rank, get_rs_ranks, _ensure_rs_loaded
+from modules import trend_template, scan_pipeline
 from modules.vcp_detector import detect_vcp
 
 logger = logging.getLogger(__name__)
@@ -223,7 +226,8 @@ def validate_trend_template(ticker: str,
                              df: pd.DataFrame = None,
                              rs_rank: float = None) -> dict:
     """
-    Check all 10 Minervini Trend Template conditions for a single stock.
+    Check all 10 Minervini Trend Template conditions for a single stock
+    (trend_template.validate; trend_template.evaluate does many stocks in one pass).
 
     Returns dict:
       passes: bool (all mandatory TT1-TT8 satisfied)
@@ -231,155 +235,34 @@ def validate_trend_template(ticker: str,
       checks: dict {condition_name: bool}
       notes:  list of strings
     """
-    checks = {f"TT{i}": False for i in range(1, 11)}
-    notes  = []
-
     if df is None:
         df = get_enriched(ticker, period="2y")
-
-    if df is None or len(df) < 210:
-        return {"passes": False, "score": 0, "checks": checks,
-                "notes": [f"Insufficient history ({len(df) if df is not None else 0} days)"]}
-
-    last = df.iloc[-1]
-    close = float(last["Close"])
-
-    def sma(col):
-        """Safe SMA value retrieval, with rolling fallback."""
-        if col in df.columns and not pd.isna(last.get(col, np.nan)):
-            return float(last[col])
-        length = int(col.split("_")[1])
-        val = df["Close"].rolling(length).mean().iloc[-1]
-        return float(val) if not pd.isna(val) else None
-
-    sma50  = sma("SMA_50")
-    sma150 = sma("SMA_150")
-    sma200 = sma("SMA_200")
-
-    # ─ TT1: Price > SMA150 ───────────────────────────────────────────────────
-    if sma150 and close > sma150:
-        checks["TT1"] = True
-    else:
-        notes.append(f"TT1 FAIL: Price {close:.2f} ≤ SMA150 {f'{sma150:.2f}' if sma150 else 'N/A'}")
-
-    # ─ TT2: Price > SMA200 ───────────────────────────────────────────────────
-    if sma200 and close > sma200:
-        checks["TT2"] = True
-    else:
-        notes.append(f"TT2 FAIL: Price {close:.2f} ≤ SMA200 {f'{sma200:.2f}' if sma200 else 'N/A'}")
-
-    # ─ TT3: SMA150 > SMA200 ──────────────────────────────────────────────────
-    if sma150 and sma200 and sma150 > sma200:
-        checks["TT3"] = True
-    else:
-        notes.append("TT3 FAIL: SMA150 ≤ SMA200 (not properly aligned)")
-
-    # ─ TT4: SMA200 rising for ≥1 month ───────────────────────────────────────
-    sma200_series = df["Close"].rolling(200).mean() if "SMA_200" not in df.columns \
-                    else df["SMA_200"]
-    sma200_clean  = sma200_series.dropna()
-    if len(sma200_clean) >= C.TT4_SMA200_RISING_DAYS + 1:
-        past_sma200  = float(sma200_clean.iloc[-(C.TT4_SMA200_RISING_DAYS + 1)])
-        now_sma200   = float(sma200_clean.iloc[-1])
-        if now_sma200 > past_sma200:
-            checks["TT4"] = True
-        else:
-            notes.append(f"TT4 FAIL: SMA200 not rising ({past_sma200:.2f}→{now_sma200:.2f})")
-    else:
-        notes.append("TT4: Insufficient data to confirm SMA200 trend")
-
-    # ─ TT5: SMA50 > SMA150 AND SMA50 > SMA200 ───────────────────────────────
-    if sma50 and sma150 and sma200 and sma50 > sma150 and sma50 > sma200:
-        checks["TT5"] = True
-    else:
-        notes.append("TT5 FAIL: SMA50 not above both SMA150 and SMA200")
-
-    # ─ TT6: Price > SMA50 ────────────────────────────────────────────────────
-    if sma50 and close > sma50:
-        checks["TT6"] = True
-    else:
-        notes.append(f"TT6 FAIL: Price {close:.2f} ≤ SMA50 {f'{sma50:.2f}' if sma50 else 'N/A'}")
-
-    # ─ TT7: Price ≥ 52W Low × 1.25 ───────────────────────────────────────────
-    if "LOW_52W" in df.columns:
-        low52 = float(df["LOW_52W"].iloc[-1])
-    else:
-        low52 = float(df["Low"].rolling(min(252, len(df))).min().iloc[-1])
-    pct_above_low = (close - low52) / low52 * 100 if low52 > 0 else 0
-    if pct_above_low >= C.TT7_MIN_ABOVE_52W_LOW_PCT:
-        checks["TT7"] = True
-    else:
-        notes.append(f"TT7 FAIL: Only {pct_above_low:.1f}% above 52W low "
-                     f"(need ≥{C.TT7_MIN_ABOVE_52W_LOW_PCT}%)")
-
-    # ─ TT8: Price within 25% of 52W High ─────────────────────────────────────
-    if "HIGH_52W" in df.columns:
-        hi52 = float(df["HIGH_52W"].iloc[-1])
-    else:
-        hi52 = float(df["High"].rolling(min(252, len(df))).max().iloc[-1])
-    pct_below_hi = (hi52 - close) / hi52 * 100 if hi52 > 0 else 100
-    if pct_below_hi <= C.TT8_MAX_BELOW_52W_HIGH_PCT:
-        checks["TT8"] = True
-    else:
-        notes.append(f"TT8 FAIL: {pct_below_hi:.1f}% below 52W high "
-                     f"(max {C.TT8_MAX_BELOW_52W_HIGH_PCT}%)")
-
-    # ─ TT9: RS Rank ≥ 70 (EXTRA — "non-absolute but strongly recommended" per Minervini) ─
-    from modules.rs_ranking import RS_NOT_RANKED
-    if rs_rank is None:
+    if rs_rank is None and df is not None and len(df) >= trend_template.MIN_BARS:
         rs_rank = get_rs_rank(ticker)
-    if rs_rank == RS_NOT_RANKED:
-        # Ticker not in RS universe — cannot evaluate TT9.  Do NOT penalise;
-        # mark as unknown so Stage 3 scoring can handle it via fundamental data.
-        checks["TT9"] = False
-        notes.append(f"TT9: RS rank not available (ticker not in RS universe)")
-    elif rs_rank >= C.TT9_MIN_RS_RANK:
-        checks["TT9"] = True
-    else:
-        notes.append(f"TT9: RS rank {rs_rank:.0f} (need ≥{C.TT9_MIN_RS_RANK})")
-
-    # ─ TT10: Sector in top third performance ─────────────────────────────────
-    # (Assessed at portfolio level — marked True by default in single-stock analysis)
-    checks["TT10"] = True    # Updated by run_stage2 using sector rankings
-
-    score = sum(checks.values())
-    # TT1-TT8 are the mandatory Minervini conditions
-    mandatory = [checks[f"TT{i}"] for i in range(1, 9)]
-    passes = all(mandatory)
-
-    if passes and not notes:
-        notes.append("[OK] All TT1-TT8 mandatory conditions passed")
-
-    return {
-        "ticker":  ticker.upper(),
-        "passes":  bool(passes),
-        "score":   int(score),
-        "checks":  checks,
-        "close":   float(round(close, 2)),
-        "sma50":   float(round(sma50, 2)) if sma50 else None,
-        "sma150":  float(round(sma150, 2)) if sma150 else None,
-        "sma200":  float(round(sma200, 2)) if sma200 else None,
-        "rs_rank": float(round(rs_rank, 1)) if rs_rank != RS_NOT_RANKED else None,
-        "pct_from_52w_high": float(round(-pct_below_hi, 1)),
-        "pct_from_52w_low":  float(round(pct_above_low, 1)),
-        "notes":   notes,
-    }
+    return trend_template.validate(ticker, df, rs_rank)
 
 
 def run_stage2(tickers: list,
                sector_leaders: set = None,
                verbose: bool = True,
                enriched_map: dict = None,
-               shared: bool = False) -> list:
+               shared: bool = False,
+               on_pass: Optional[Callable[[dict], None]] = None) -> list:
     """
     Stage 2: Run TT1-TT10 precise validation on each ticker.
-    Uses batch download + parallel threads for speed.  Returns list of dicts (only passing).
+    Tickers are evaluated in vectorised chunks (trend_template.evaluate) as
+    their batch arrives from stream_download_and_enrich(), overlapping the
+    remaining downloads.  Returns list of dicts (only passing).
+    Each survivor's scan_mode fundamentals are prefetched in the background
+    (prefetch_fundamentals) so Stage 3 finds them in the store.
+    `on_pass(result)` is called for each survivor as soon as it passes
+    (pipelined Stage 3, see run_scan).
     
     If enriched_map is provided, skip batch download (for combined scanning).
     """
     if verbose:
         print(f"\n[Stage 2] Validating Trend Template (TT1-TT10) "
-              f"for {len(tickers)} tickers (batch download + parallel)...")
+              f"for {len(tickers)} tickers (streamed download + vectorised)...")
 
     # Ensure RS rankings are loaded (from cache or compute)
     _ensure_rs_loaded()
@@ -390,65 +273,83 @@ def run_stage2(tickers: list,
     filtered_tickers = list(tickers)
     total = len(filtered_tickers)
 
-    # ── Batch download all historical data first ─────────────────────────
+    # Monotonic progress: track max pct seen to prevent regression when the
+    # stream switches from cache phase to download phase, and between download
+    # and validation updates (they interleave).
+    _s2_max_pct = [34]
+    def _report(pct: int, msg: str, ticker: str = "") -> None:
+        _s2_max_pct[0] = max(_s2_max_pct[0], pct)
+        _progress("Stage 2 -- Trend Template", _s2_max_pct[0], msg, ticker)
+
+    # ── Price data: streamed per download batch ─────────────────────────
     if enriched_map is None:
         _progress("Stage 2 -- Trend Template", 34, "Batch-downloading price data...")
-        # Monotonic progress: track max pct seen to prevent regression when
-        # batch_download_and_enrich switches from cache phase to download phase.
-        _s2_max_pct = [34]
         def _sepa_batch_cb(bi: int, bt: int, msg: str = "") -> None:
-            pct = max(_s2_max_pct[0], min(48, 33 + int(bi / max(bt, 1) * 15)))
-            _s2_max_pct[0] = pct
-            _progress("Stage 2 -- Trend Template", pct, msg)
-        enriched_map = batch_download_and_enrich(
+            _report(min(48, 33 + int(bi / max(bt, 1) * 15)), msg)
+        source = stream_download_and_enrich(
             filtered_tickers, period="2y",
             progress_cb=_sepa_batch_cb,
         )
     else:
         if verbose:
             logger.info("[Stage 2] Using pre-downloaded enriched_map (%d records)", len(enriched_map))
+        source = ((t, enriched_map.get(t)) for t in filtered_tickers)
 
-    # ── Parallel TT validation using pre-downloaded data ─────────────────
+    # ── Vectorised TT validation, one chunk per arriving batch ──────────
     passing = []
     done    = [0]
 
-    def _validate(ticker: str):
-        if _cancelled():
-            return None
+    def _validate(chunk: dict) -> None:
         try:
-            rs = get_rs_rank(ticker)
-            df = enriched_map.get(ticker)
-            if df is None or df.empty:
-                # Fallback to individual download if batch missed this ticker
-                df = get_enriched(ticker, period="2y")
-            result = validate_trend_template(ticker, df=df, rs_rank=rs)
-            if sector_leaders and ticker in sector_leaders:
-                result["checks"]["TT10"] = True
-            if result["passes"]:
-                result["df"] = df
-            return result
+            tt = trend_template.evaluate(chunk, rs_ranks=get_rs_ranks(chunk))
         except Exception as exc:
-            logger.warning(f"Stage 2 error for {ticker}: {exc}")
-            return None
-
-    workers = min(getattr(C, "STAGE2_MAX_WORKERS", 16), total)
-    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
-        futures = {pool.submit(_validate, t): t for t in filtered_tickers}
-        for fut in as_completed(futures):
-            if _cancelled():
-                pool.shutdown(wait=False, cancel_futures=True)
-                break
-            done[0] += 1
-            ticker = futures[fut]
-            pct = 48 + int(done[0] / total * 18)
-            _progress("Stage 2 -- Trend Template", pct,
-                      f"{done[0]}/{total} validated", ticker)
-            try:
-                res = fut.result()
-                if res and res.get("passes"):
-                    passing.append(res)
-            except Exception as exc:
-                logger.warning(f"Stage 2 future error for {ticker}: {exc}")
+            logger.warning(f"Stage 2 error for chunk of {len(chunk)}: {exc}")
+            return
+        done[0] += len(chunk)
+        survivors = list(tt.index[tt["passes"].to_numpy()])
+        for ticker in survivors:
+            # Note strings are only built for survivors (trend_template.result)
+            result = trend_template.result(tt, ticker)
+            result["df"] = chunk[ticker]
+            passing.append(result)
+            if on_pass is not None:
+                on_pass(result)
+        # Warm Stage 3's fundamentals while Stage 2 carries on
+        if survivors:
+            prefetch_fundamentals(survivors)
+        _report(48 + int(done[0] / max(total, 1) * 18), f"{done[0]}/{total} validated",
+                survivors[-1] if survivors else "")
+
+    chunk_size = max(1, getattr(C, "STAGE2_BATCH_SIZE", 50))
+    chunk: dict = {}
+    seen, missing = set(), []
+    for ticker, df in source:
+        if _cancelled():
+            break
+        seen.add(ticker)
+        if df is None or df.empty:
+            missing.append(ticker)
+            continue
+        chunk[ticker] = df
+        if len(chunk) >= chunk_size:
+            _validate(chunk)
+            chunk = {}
+    source.close()
+    if chunk and not _cancelled():
+        _validate(chunk)
+
+    # Fallback to individual downloads for tickers the batch missed
+    missing += [t for t in filtered_tickers if t not in seen]
+    if missing and not _cancelled():
+        workers = min(getattr(C, "STAGE2_MAX_WORKERS", 16), len(missing))
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            fetched = dict(zip(missing, pool.map(
+                lambda t: None if _cancelled() else get_enriched(t, period="2y"), missing)))
+        fetched = {t: df for t, df in fetched.items() if df is not None and not df.empty}
+        if fetched:
+            _validate(fetched)
+    if _cancelled():
+        cancel_prefetch()
 
     if verbose:
         logger.info("[Stage 2] %d/%d pass Trend Template", len(passing), total)
@@ -776,29 +677,87 @@ def run_scan(custom_filters: Optional[dict] = None,
         return pd.DataFrame()
     _progress("Stage 1 -- Coarse Filter", 33, f"{len(s1_tickers)} candidates")
 
-    # -- Stage 2 ---------------------------------------------------------------
+    # -- Stage 2 → Stage 3 ------------------------------------------------------
     _t2 = _time.perf_counter()
-    s2_results = run_stage2(s1_tickers, sector_leaders, verbose=verbose)
-    logger.info("[Timing] Stage 2: %.1fs -> %d passed TT", _elapsed(_t2), len(s2_results))
-    _s1_cnt = len(s1_tickers)
-    _s2_cnt = len(s2_results)
-    _progress("Stage 2 -- Trend Template", 66,
-              f"✓ TT通過: {_s2_cnt}/{_s1_cnt} ({_s2_cnt * 100 // _s1_cnt if _s1_cnt else 0}%) | "
-              f"已排除: {_s1_cnt - _s2_cnt} | 耗時 {_elapsed(_t2):.0f}s")
-    if _cancelled():
-        # Return partial results if anything passed Stage 2
-        if not s2_results:
+    if scan_pipeline.enabled():
+        s2_results, df_out = _run_stage2_3_pipelined(s1_tickers, sector_leaders, verbose)
+        logger.info("[Timing] Stage 2+3 (pipelined): %.1fs -> %d passed TT, %d scored",
+                    _elapsed(_t2), len(s2_results), len(df_out))
+        if not s2_results and not _cancelled():
+            print("[Stage 2] No tickers passed Trend Template")
+    else:
+        s2_results = run_stage2(s1_tickers, sector_leaders, verbose=verbose)
+        logger.info("[Timing] Stage 2: %.1fs -> %d passed TT", _elapsed(_t2), len(s2_results))
+        _s1_cnt = len(s1_tickers)
+        _s2_cnt = len(s2_results)
+        _progress("Stage 2 -- Trend Template", 66,
+                  f"✓ TT通過: {_s2_cnt}/{_s1_cnt} ({_s2_cnt * 100 // _s1_cnt if _s1_cnt else 0}%) | "
+                  f"已排除: {_s1_cnt - _s2_cnt} | 耗時 {_elapsed(_t2):.0f}s")
+        if _cancelled():
+            # Return partial results if anything passed Stage 2
+            if not s2_results:
+                return pd.DataFrame()
+        elif not s2_results:
+            print("[Stage 2] No tickers passed Trend Template")
             return pd.DataFrame()
-    elif not s2_results:
-        print("[Stage 2] No tickers passed Trend Template")
+
+        # -- Stage 3 -----------------------------------------------------------
+        _t3 = _time.perf_counter()
+        df_out = run_stage3(s2_results, verbose=verbose, shared=False)
+        logger.info("[Timing] Stage 3: %.1fs -> %d stocks scored", _elapsed(_t3), len(df_out))
+    if not s2_results:
         return pd.DataFrame()
 
-    # -- Stage 3 ---------------------------------------------------------------
-    total3 = len(s2_results)
-    _progress("Stage 3 -- SEPA Scoring", 66, f"Scoring {total3} qualifying stocks...")
+    logger.info("[Timing] Total scan: %.1fs", _elapsed())
+    logger.info("[Stage 3] %d stocks in final results", len(df_out))
+    print("=" * 60)
+    _elapsed_total = _elapsed()
+    _progress("Complete", 100,
+              f"✅ 掃描完成: {len(df_out)} 隻符合條件 | "
+              f"Stage1→{len(s1_tickers)} | Stage2→{len(s2_results)} | Stage3→{len(df_out)} | "
+              f"耗時 {_elapsed_total:.0f}s")
+
+    # Return tuple: (passed quality gate, all Stage 2 passing stocks)
+    return df_out, pd.DataFrame(s2_results) if s2_results else pd.DataFrame()
+
+
+def _run_stage2_3_pipelined(s1_tickers: list, sector_leaders: set,
+                            verbose: bool = True) -> tuple:
+    """
+    Stage 2 with every survivor scored by Stage 3 workers while Stage 2 is
+    still running.  Returns (Stage 2 results, run_stage3-style DataFrame).
+    """
+    total1 = len(s1_tickers)
+
+    def _report(row: dict, scored, done: int, submitted: int, feeding: bool) -> None:
+        ticker = row["ticker"]
+        if feeding:
+            # Stage 2 owns the bar (34–66) until it finishes; show both counters
+            with _scan_lock:
+                pct = _scan_progress.get("pct", 66)
+            _progress("Stage 2+3 -- TT + SEPA Scoring", pct,
+                      f"Stage 3 [{done}/{submitted}] scored {ticker} (Stage 2 still running)", ticker)
+        else:
+            _progress("Stage 3 -- SEPA Scoring", 66 + int(done / max(submitted, 1) * 33),
+                      f"[{done}/{submitted}] Scoring {ticker}", ticker)
+        if verbose:
+            print(f"  [{done}/{submitted}] Scoring {ticker}...", end="\r")
+
+    workers = max(1, getattr(C, "STAGE3_MAX_WORKERS", 6))
     if verbose:
-        print(f"\n[Stage 3] SEPA 5-pillar scoring for {total3} qualifying stocks "
-              f"(parallel, {getattr(C, 'STAGE3_MAX_WORKERS', 6)} workers)...")
+        print(f"\n[Stage 2+3] Pipelined: Stage 3 SEPA scoring ({workers} workers) "
+              f"starts on each Trend Template survivor as it passes...")
+    with scan_pipeline.Stage3Pipeline(_score_stage3, workers=workers,
+                                      cancelled=_cancelled, on_scored=_report,
+                                      name="sepa-stage3") as pipe:
+        s2_results = run_stage2(s1_tickers, sector_leaders, verbose=verbose, on_pass=pipe.put)
+        _s2_cnt = len(s2_results)
+        _progress("Stage 2 -- Trend Template", 66,
+                  f"✓ TT通過: {_s2_cnt}/{total1} ({_s2_cnt * 100 // total1 if total1 else 0}%) | "
+                  f"已排除: {total1 - _s2_cnt} | Stage 3: {pipe.done}/{pipe.submitted} scored")
+        pipe.close()            # drain the rest with Stage 3 owning the bar
+    return s2_results, _finish_stage3(pipe.results, verbose=verbose, shared=False)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Stage 3 worker — extracted for reusability (combined scanning)
@@ -837,48 +796,9 @@ def run_stage3(s2_results: list,
         random.Random(shuffle_seed).shuffle(stage3_worklist)
         logger.info("[Stage 3] Shuffled scoring order (seed=%s)", shuffle_seed)
 
-    def _score_one(tt_result):
-        """Score a single ticker (thread-safe)."""
-        if _cancelled():
-            return None
-        ticker = tt_result["ticker"]
-        df     = tt_result.get("df")
-        try:
-            fundamentals = get_fundamentals(ticker, scan_mode=True)
-            scored = score_sepa_pillars(
-                ticker, df,
-                fundamentals=fundamentals,
-                tt_result=tt_result,
-                rs_rank=tt_result["rs_rank"],
-            )
-            # Enrich with company info
-            info = fundamentals.get("info", {})
-            scored["company"]  = info.get("shortName", ticker)
-            scored["sector"]   = info.get("sector", "")
-            scored["industry"] = info.get("industry", "")
-            scored["market_cap"] = info.get("marketCap", 0)
-            scored["tt_score"] = tt_result["score"]
-            vcp = scored.get("vcp") or {}
-            scored["vcp_grade"]     = vcp.get("grade", "D")
-            scored["vcp_score_raw"] = vcp.get("vcp_score", 0)
-            scored["t_count"]       = vcp.get("t_count", 0)
-            pivot_price = vcp.get("pivot_price", None)
-            if pivot_price is None and df is not None and not df.empty and "High" in df.columns:
-                recent_high = pd.to_numeric(df["High"], errors="coerce").dropna().tail(20)
-                if not recent_high.empty:
-                    pivot_price = float(recent_high.max())
-            scored["pivot"]         = float(round(pivot_price, 2)) if pivot_price is not None else None
-            # Strip heavy nested dicts -- prevents _clean() recursion issues
-            scored.pop("vcp", None)
-            scored.pop("df", None)
-            return scored
-        except Exception as exc:
-            logger.warning(f"Stage 3 error for {ticker}: {exc}")
-            return None
-
     stage3_workers = min(getattr(C, "STAGE3_MAX_WORKERS", 6), total3)
     with ThreadPoolExecutor(max_workers=max(stage3_workers, 1)) as pool:
-        futures = {pool.submit(_score_one, tt): tt["ticker"] for tt in stage3_worklist}
+        futures = {pool.submit(_score_stage3, tt): tt["ticker"] for tt in stage3_worklist}
         for fut in as_completed(futures):
             if _cancelled():
                 pool.shutdown(wait=False, cancel_futures=True)
@@ -899,6 +819,51 @@ def run_stage3(s2_results: list,
             except Exception as exc:
                 logger.warning(f"Stage 3 future error for {ticker}: {exc}")
 
+    return _finish_stage3(rows, verbose=verbose, shared=shared)
+
+
+def _score_stage3(tt_result: dict) -> Optional[dict]:
+    """SEPA-score one Stage 2 result (thread-safe); None on error or cancel."""
+    if _cancelled():
+        return None
+    ticker = tt_result["ticker"]
+    df     = tt_result.get("df")
+    try:
+        fundamentals = get_fundamentals(ticker, scan_mode=True)
+        scored = score_sepa_pillars(
+            ticker, df,
+            fundamentals=fundamentals,
+            tt_result=tt_result,
+            rs_rank=tt_result["rs_rank"],
+        )
+        # Enrich with company info
+        info = fundamentals.get("info", {})
+        scored["company"]  = info.get("shortName", ticker)
+        scored["sector"]   = info.get("sector", "")
+        scored["industry"] = info.get("industry", "")
+        scored["market_cap"] = info.get("marketCap", 0)
+        scored["tt_score"] = tt_result["score"]
+        vcp = scored.get("vcp") or {}
+        scored["vcp_grade"]     = vcp.get("grade", "D")
+        scored["vcp_score_raw"] = vcp.get("vcp_score", 0)
+        scored["t_count"]       = vcp.get("t_count", 0)
+        pivot_price = vcp.get("pivot_price", None)
+        if pivot_price is None and df is not None and not df.empty and "High" in df.columns:
+            recent_high = pd.to_numeric(df["High"], errors="coerce").dropna().tail(20)
+            if not recent_high.empty:
+                pivot_price = float(recent_high.max())
+        scored["pivot"]         = float(round(pivot_price, 2)) if pivot_price is not None else None
+        # Strip heavy nested dicts -- prevents _clean() recursion issues
+        scored.pop("vcp", None)
+        scored.pop("df", None)
+        return scored
+    except Exception as exc:
+        logger.warning(f"Stage 3 error for {ticker}: {exc}")
+        return None
+
+
+def _finish_stage3(rows: list, verbose: bool = True, shared: bool = False) -> pd.DataFrame:
+    """Rank scored rows and apply the SCAN_MIN_SCORE / SCAN_TOP_N quality gate."""
     if not rows:
         if verbose:
             print("[Stage 3] No stocks scored successfully")
@@ -927,31 +892,6 @@ def run_stage3(s2_results: list,
     return df_out
 
 
-# ═════════════════════════════════════════════════════════════════════════════════
-# ═════════════════════════════════════════════════════════════════════════════════
-
-    # -- Stage 3 ---------------------------------------------------------------
-    _t3 = _time.perf_counter()
-    df_out = run_stage3(s2_results, verbose=verbose, shared=False)
-    logger.info("[Timing] Stage 3: %.1fs -> %d stocks scored", _elapsed(_t3), len(df_out))
-    
-    logger.info("[Timing] Total scan: %.1fs", _elapsed())
-    logger.info("[Stage 3] %d stocks in final results", len(df_out))
-    print("=" * 60)
-    _elapsed_total = _elapsed()
-    _progress("Complete", 100,
-              f"✅ 掃描完成: {len(df_out)} 隻符合條件 | "
-              f"Stage1→{len(s1_tickers)} | Stage2→{len(s2_results)} | Stage3→{len(df_out)} | "
-              f"耗時 {_elapsed_total:.0f}s")
-    
-    # Return tuple: (passed quality gate, all Stage 2 passing stocks)
-    return df_out, pd.DataFrame(s2_results) if s2_results else pd.DataFrame()
-
-
-
-
-
-
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
 def _get_sector_leaders(sector_df: pd.DataFrame, top_pct: float = 0.35) -> set:
@@ -0,0 +1,327 @@
+"""
+modules/sec_cache.py
+────────────────────
+Bounded on-disk cache for the SEC endpoints behind the free fundamentals
+fallback (data_pipeline._get_sec_fundamentals_fallback).
+
+A companyfacts document runs to several MB per issuer.  It used to be kept
+whole in an unbounded module dict for every CIK ever touched, and
+company_tickers.json was downloaded again on every process start.  Now:
+
+  • both are stored gzip-compressed under SEC_CACHE_DIR together with the
+    response's ETag / Last-Modified; once older than
+    SEC_CACHE_REVALIDATE_HOURS they are revalidated with a conditional GET
+    (304 → the copy on disk is kept, nothing is downloaded);
+  • companyfacts files are evicted least-recently-used once the directory
+    passes SEC_CACHE_MAX_MB;
+  • memory holds the ticker map plus an LRU (SEC_SERIES_LRU_SIZE CIKs) of only
+    the us-gaap series the fallback reads, trimmed to the fields
+    _latest_yoy_growth uses — never a whole companyfacts document.
+
+When SEC cannot be reached the last copy on disk is served, however old.
+
+Usage:
+    cik = sec_cache.ticker_map().get("NVDA")
+    got = sec_cache.series(cik, [("EarningsPerShareDiluted", "USD/shares")])
+    got[("EarningsPerShareDiluted", "USD/shares")]   # → [{"form", "val", "fp", "fy", "end"}, …]
+"""
+
+import gzip
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules import file_lock
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = ROOT / getattr(C, "SEC_CACHE_DIR", "data/sec_cache")
+TICKER_MAP = "company_tickers"
+_POINT_KEYS = ("form", "val", "fp", "fy", "end")
+_MIN_GAP_SEC = 0.2                      # SEC asks for ≤10 requests/sec
+
+_lock = threading.Lock()                # index, LRU, ticker map, counters
+_fetch_lock = threading.Lock()          # one SEC request at a time
+_last_call = [0.0]
+_index: Optional[dict] = None           # name → {"etag", "last_modified", "checked", "bytes", "used"}
+_index_stamp: Optional[tuple] = None    # (mtime_ns, size) of the index.json _index came from
+_series_lru: "OrderedDict[int, dict]" = OrderedDict()   # cik → {"checked", "series": {(tag, unit): […]}}
+_ticker_map: Optional[dict] = None
+_ticker_map_checked = 0.0
+_stats = {"requests": 0, "downloaded": 0, "not_modified": 0, "errors": 0,
+          "disk_reads": 0, "lru_hits": 0, "evicted": 0}
+
+
+def _revalidate_sec() -> float:
+    return float(getattr(C, "SEC_CACHE_REVALIDATE_HOURS", 24)) * 3600.0
+
+
+def _data_file(name: str) -> Path:
+    return CACHE_DIR / f"{name}.json.gz"
+
+
+def _index_file() -> Path:
+    return CACHE_DIR / "index.json"
+
+
+def _index_stat() -> Optional[tuple]:
+    try:
+        st = _index_file().stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_index_locked() -> dict:
+    """
+    The index, re-read when another process has replaced index.json; "used"
+    times recorded here since the last save are kept.
+    """
+    global _index, _index_stamp
+    stamp = _index_stat()
+    if _index is None or stamp != _index_stamp:
+        try:
+            disk = json.loads(_index_file().read_text(encoding="utf-8"))
+        except Exception:
+            disk = {}
+        for name, meta in (_index or {}).items():
+            if name in disk and meta.get("used", 0) > disk[name].get("used", 0):
+                disk[name]["used"] = meta["used"]
+        _index, _index_stamp = disk, stamp
+    return _index
+
+
+def _save_index_locked() -> None:
+    """Caller holds _disk_lock() and _lock (and loaded the index under them)."""
+    global _index_stamp
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = _index_file().with_suffix(".tmp")
+    tmp.write_text(json.dumps(_load_index_locked()), encoding="utf-8")
+    tmp.replace(_index_file())
+    _index_stamp = _index_stat()
+
+
+def _disk_lock():
+    """Cross-process lock around data-file writes and index saves."""
+    return file_lock.locked(CACHE_DIR / ".lock")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HTTP
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _conditional_get(url: str, meta: dict) -> tuple:
+    """(status, gzip bytes | None, validators).  status 0 = network failure."""
+    headers = {
+        "User-Agent": getattr(C, "SEC_USER_AGENT", "SEPA-StockLab/1.0 (local)"),
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip",
+    }
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    timeout = float(getattr(C, "SEC_HTTP_TIMEOUT_SEC", 8.0))
+    with _fetch_lock:
+        wait = _MIN_GAP_SEC - (time.monotonic() - _last_call[0])
+        if wait > 0:
+            time.sleep(wait)
+        _last_call[0] = time.monotonic()
+        with _lock:
+            _stats["requests"] += 1
+        try:
+            with urlrequest.urlopen(urlrequest.Request(url, headers=headers),
+                                    timeout=timeout) as resp:
+                body = resp.read()
+                if resp.headers.get("Content-Encoding", "").lower() != "gzip":
+                    body = gzip.compress(body, compresslevel=6)
+                return resp.status, body, {"etag": resp.headers.get("ETag"),
+                                           "last_modified": resp.headers.get("Last-Modified")}
+        except urlerror.HTTPError as exc:
+            if exc.code == 304:
+                return 304, None, {}
+            logger.debug("[SEC] %s → HTTP %s", url, exc.code)
+            return exc.code, None, {}
+        except Exception as exc:
+            logger.debug("[SEC] %s failed: %s", url, exc)
+            return 0, None, {}
+
+
+def _evict_locked(keep: str) -> None:
+    """Drop least-recently-used companyfacts files until under SEC_CACHE_MAX_MB."""
+    index = _load_index_locked()
+    budget = float(getattr(C, "SEC_CACHE_MAX_MB", 256)) * 1024 * 1024
+    total = sum(m.get("bytes", 0) for m in index.values())
+    for name in sorted((n for n in index if n.startswith("CIK") and n != keep),
+                       key=lambda n: index[n].get("used", 0)):
+        if total <= budget:
+            break
+        total -= index[name].get("bytes", 0)
+        _data_file(name).unlink(missing_ok=True)
+        del index[name]
+        _stats["evicted"] += 1
+
+
+def _refresh(name: str, url: str) -> tuple:
+    """
+    (path | None, changed): the cached gzip for `name`, revalidated with a
+    conditional GET when older than SEC_CACHE_REVALIDATE_HOURS.
+    """
+    path = _data_file(name)
+    now = time.time()
+    with _lock:
+        meta = dict(_load_index_locked().get(name) or {})
+    on_disk = path.exists() and bool(meta)
+    if on_disk and now - meta.get("checked", 0) < _revalidate_sec():
+        with _lock:
+            _load_index_locked().get(name, {})["used"] = now
+        return path, False
+
+    status, body, validators = _conditional_get(url, meta if on_disk else {})
+    if not ((status == 304 and on_disk) or (status == 200 and body)):
+        with _lock:
+            _stats["errors"] += 1
+        # SEC unreachable / error: serve whatever is on disk
+        return (path, False) if on_disk else (None, False)
+    with _disk_lock(), _lock:
+        index = _load_index_locked()
+        if status == 304:
+            _stats["not_modified"] += 1
+            index[name] = {**(index.get(name) or meta), "checked": now, "used": now}
+            _save_index_locked()
+            return path, False
+        _stats["downloaded"] += 1
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(body)
+        tmp.replace(path)
+        index[name] = {**validators, "checked": now, "used": now, "bytes": len(body)}
+        _evict_locked(keep=name)
+        _save_index_locked()
+        return path, True
+
+
+def _read_json(path: Path):
+    with _lock:
+        _stats["disk_reads"] += 1
+    return json.loads(gzip.decompress(path.read_bytes()))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def ticker_map() -> dict:
+    """SEC ticker → CIK map ({} when never downloaded and SEC is unreachable)."""
+    global _ticker_map, _ticker_map_checked
+    with _lock:
+        if _ticker_map is not None and time.time() - _ticker_map_checked < _revalidate_sec():
+            return _ticker_map
+    base = getattr(C, "SEC_WWW_URL", "https://www.sec.gov").rstrip("/")
+    path, changed = _refresh(TICKER_MAP, f"{base}/files/company_tickers.json")
+    if path is None:
+        return _ticker_map or {}
+    if _ticker_map is not None and not changed:
+        with _lock:
+            _ticker_map_checked = time.time()
+        return _ticker_map
+
+    mapping: dict[str, int] = {}
+    try:
+        payload = _read_json(path)
+    except Exception as exc:
+        logger.debug("[SEC] ticker map unreadable: %s", exc)
+        payload = {}
+    for rec in (payload.values() if isinstance(payload, dict) else []):
+        try:
+            tkr = str(rec.get("ticker", "")).upper().strip()
+            if tkr:
+                mapping[tkr] = int(rec.get("cik_str"))
+        except Exception:
+            continue
+    with _lock:
+        _ticker_map, _ticker_map_checked = mapping, time.time()
+    return mapping
+
+
+def _extract(facts: dict, tag: str, unit: str) -> list:
+    try:
+        points = facts["facts"]["us-gaap"][tag]["units"][unit]
+    except Exception:
+        return []
+    return [{k: p.get(k) for k in _POINT_KEYS} for p in points if isinstance(p, dict)]
+
+
+def series(cik: int, tag_units) -> dict:
+    """
+    {(tag, unit): [points]} for the requested us-gaap series of `cik`
+    (a series the company does not report → []).  Served from the in-memory
+    LRU when possible; otherwise extracted from the cached companyfacts file.
+    """
+    keys = [tuple(k) for k in tag_units]
+    now = time.time()
+    with _lock:
+        entry = _series_lru.get(cik)
+        if entry is not None and now - entry["checked"] < _revalidate_sec() \
+                and all(k in entry["series"] for k in keys):
+            _series_lru.move_to_end(cik)
+            _stats["lru_hits"] += 1
+            return {k: entry["series"][k] for k in keys}
+
+    base = getattr(C, "SEC_DATA_URL", "https://data.sec.gov").rstrip("/")
+    name = f"CIK{int(cik):010d}"
+    path, changed = _refresh(name, f"{base}/api/xbrl/companyfacts/{name}.json")
+    if path is None:
+        return {k: [] for k in keys}
+
+    known = {} if (entry is None or changed) else dict(entry["series"])
+    if any(k not in known for k in keys):
+        try:
+            facts = _read_json(path)
+        except Exception as exc:
+            logger.debug("[SEC] %s unreadable: %s", path.name, exc)
+            return {k: [] for k in keys}
+        known.update({k: _extract(facts, *k) for k in keys if k not in known})
+        del facts
+
+    with _lock:
+        _series_lru[cik] = {"checked": now, "series": known}
+        _series_lru.move_to_end(cik)
+        while len(_series_lru) > max(1, int(getattr(C, "SEC_SERIES_LRU_SIZE", 512))):
+            _series_lru.popitem(last=False)
+    return {k: known[k] for k in keys}
+
+
+def stats() -> dict:
+    with _lock:
+        index = _load_index_locked()
+        facts = [m for n, m in index.items() if n.startswith("CIK")]
+        return {
+            **_stats,
+            "companyfacts_files": len(facts),
+            "disk_mb": round(sum(m.get("bytes", 0) for m in index.values()) / 1024 / 1024, 2),
+            "series_lru": len(_series_lru),
+            "ticker_map": len(_ticker_map or {}),
+        }
+
+
+def reset() -> None:
+    """Forget everything held in memory (the files on disk stay)."""
+    global _index, _index_stamp, _ticker_map, _ticker_map_checked
+    with _lock:
+        _index, _index_stamp = None, None
+        _series_lru.clear()
+        _ticker_map, _ticker_map_checked = None, 0.0
+        for k in _stats:
+            _stats[k] = 0
@@ -0,0 +1,214 @@
+"""
+modules/trading_calendar.py
+───────────────────────────
+NYSE / NASDAQ session calendar used to decide cache freshness.
+
+Caches used to be "fresh" when written on the current calendar day, so opening
+the app on a Saturday, a US holiday or a Hong Kong morning before the US open
+re-downloaded the whole universe for identical bars.  A cache is now fresh
+when it contains the *last completed session*: every cache stamps the date of
+that session (cache_asof()) and compares stamps, so nothing expires until the
+next US close.
+
+Sessions are precomputed per year from the exchange rules — fixed-date
+holidays with weekend observance, the Monday holidays, Good Friday (Easter
+computus), Juneteenth from 2022 — plus known unscheduled closures and the
+13:00 ET early closes (3 Jul, the day after Thanksgiving, 24 Dec).  A session
+counts as completed TRADING_SESSION_SETTLE_MIN minutes after its close, when
+the daily bar is final at the data vendors.
+
+Usage:
+    trading_calendar.cache_asof()                # "2026-10-16" on Sat 17 Oct
+    trading_calendar.last_completed_session()    # date
+    trading_calendar.session_close_hkt(d)        # tz-aware HKT datetime
+    trading_calendar.is_current(ts)              # fetched after the last close?
+"""
+
+import bisect
+import sys
+from datetime import date, datetime, time as dtime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+ET = ZoneInfo("America/New_York")
+HKT = ZoneInfo("Asia/Hong_Kong")
+
+SESSION_OPEN = dtime(9, 30)
+REGULAR_CLOSE = dtime(16, 0)
+EARLY_CLOSE = dtime(13, 0)
+
+# Unscheduled full-day closures (national days of mourning, weather)
+_SPECIAL_CLOSURES = frozenset({
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11), date(2007, 1, 2), date(2012, 10, 29), date(2012, 10, 30),
+    date(2018, 12, 5), date(2025, 1, 9),
+})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Calendar construction
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous computus)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th `weekday` (Mon=0) of a month; n=-1 → the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(d: date) -> date:
+    """Saturday holidays are observed Friday, Sunday holidays Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=None)
+def _year_rules(year: int) -> tuple:
+    """(holidays, early closes) of one year as frozensets of dates."""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),                  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                  # Presidents' Day
+        _easter(year) - timedelta(days=2),            # Good Friday
+        _nth_weekday(year, 5, 0, -1),                 # Memorial Day
+        _observed(date(year, 7, 4)),                  # Independence Day
+        _nth_weekday(year, 9, 0, 1),                  # Labor Day
+        _nth_weekday(year, 11, 3, 4),                 # Thanksgiving
+        _observed(date(year, 12, 25)),                # Christmas
+    }
+    # New Year's Day on a Saturday is not made up on Friday 31 Dec
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))   # Juneteenth
+    holidays |= {d for d in _SPECIAL_CLOSURES if d.year == year}
+
+    early = {date(year, 7, 3), _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+             date(year, 12, 24)}
+    early = {d for d in early if d.weekday() < 5 and d not in holidays}
+    return frozenset(holidays), frozenset(early)
+
+
+@lru_cache(maxsize=None)
+def _year_sessions(year: int) -> tuple:
+    holidays, _ = _year_rules(year)
+    d, out = date(year, 1, 1), []
+    while d.year == year:
+        if d.weekday() < 5 and d not in holidays:
+            out.append(d)
+        d += timedelta(days=1)
+    return tuple(out)
+
+
+def _sessions_around(d: date) -> list:
+    """Sorted sessions of the year before, of and after `d`."""
+    return [s for y in (d.year - 1, d.year, d.year + 1) for s in _year_sessions(y)]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def is_holiday(d: date) -> bool:
+    """True on an exchange holiday that falls on a weekday."""
+    return d in _year_rules(d.year)[0]
+
+
+def is_session(d: date) -> bool:
+    return d.weekday() < 5 and not is_holiday(d)
+
+
+def sessions(start: date, end: date) -> list:
+    """Session dates in [start, end]."""
+    out = []
+    for year in range(start.year, end.year + 1):
+        out.extend(s for s in _year_sessions(year) if start <= s <= end)
+    return out
+
+
+def previous_session(d: date) -> date:
+    """Last session strictly before `d`."""
+    days = _sessions_around(d)
+    return days[bisect.bisect_left(days, d) - 1]
+
+
+def next_session(d: date) -> date:
+    """First session strictly after `d`."""
+    days = _sessions_around(d)
+    return days[bisect.bisect_right(days, d)]
+
+
+def session_close(d: date) -> datetime:
+    """Close of session `d` in ET (13:00 on early-close days, else 16:00)."""
+    close = EARLY_CLOSE if d in _year_rules(d.year)[1] else REGULAR_CLOSE
+    return datetime.combine(d, close, tzinfo=ET)
+
+
+def session_close_hkt(d: date) -> datetime:
+    """Close of session `d` in Hong Kong time."""
+    return session_close(d).astimezone(HKT)
+
+
+def _now(now: Optional[datetime]) -> datetime:
+    """`now` in ET; naive datetimes are taken as Hong Kong time (the app's clock)."""
+    if now is None:
+        return datetime.now(ET)
+    return now.astimezone(ET) if now.tzinfo else now.replace(tzinfo=HKT).astimezone(ET)
+
+
+def last_session(now: Optional[datetime] = None) -> date:
+    """Latest session on or before the current ET date (it may still be trading)."""
+    today = _now(now).date()
+    return today if is_session(today) else previous_session(today)
+
+
+def last_completed_session(now: Optional[datetime] = None) -> date:
+    """Latest session whose daily bar is final (close + TRADING_SESSION_SETTLE_MIN)."""
+    now = _now(now)
+    settle = timedelta(minutes=float(getattr(C, "TRADING_SESSION_SETTLE_MIN", 15)))
+    d = last_session(now)
+    while session_close(d) + settle > now:
+        d = previous_session(d)
+    return d
+
+
+def cache_asof(now: Optional[datetime] = None) -> str:
+    """Freshness stamp for caches: ISO date of the last completed session."""
+    return last_completed_session(now).isoformat()
+
+
+def completed_at(now: Optional[datetime] = None) -> float:
+    """Epoch seconds at which the last completed session's bar became final."""
+    settle = timedelta(minutes=float(getattr(C, "TRADING_SESSION_SETTLE_MIN", 15)))
+    return (session_close(last_completed_session(now)) + settle).timestamp()
+
+
+def is_current(ts: float, now: Optional[datetime] = None) -> bool:
+    """True if epoch `ts` is after the last completed session became final."""
+    return ts >= completed_at(now)
@@ -0,0 +1,279 @@
+"""
+modules/trend_template.py
+─────────────────────────
+Minervini Trend Template (TT1–TT10) for many tickers in one vectorised pass.
+
+run_stage2 used to call validate_trend_template() once per ticker on a thread
+pool — iloc lookups, rolling fallbacks, note f-strings and dict building per
+ticker, all serialised by the GIL.  evaluate() gathers the handful of inputs
+the conditions need (last close, SMA50/150/200, SMA200 a month earlier,
+52-week high/low) into arrays — column-wise from a panel.Panel, or with one
+NumPy read per column from a dict of enriched frames — and evaluates every
+condition as an array comparison.
+
+The result is a DataFrame indexed by ticker: TT1…TT10, passes, score and the
+numeric fields.  Note strings are only built on request (notes() / result(),
+used for the tickers that are displayed).
+
+A single ticker (backtest walk-forward, watchlist refresh) goes through
+validate() instead, which applies the same conditions to scalars without
+building any DataFrame.
+
+Usage:
+    tt = trend_template.evaluate(enriched_map, rs_ranks={"NVDA": 95.0})
+    tt.index[tt["passes"]]                      # survivors
+    trend_template.result(tt, "NVDA")           # validate_trend_template() dict
+    trend_template.validate("NVDA", df, 95.0)   # same dict, one ticker
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+from modules.panel import Panel
+from modules.rs_ranking import RS_NOT_RANKED, get_rs_ranks
+
+CONDITIONS = [f"TT{i}" for i in range(1, 11)]
+MANDATORY = CONDITIONS[:8]              # TT9 (RS) is "extra"; TT10 is set at portfolio level
+MIN_BARS = 210
+
+_INPUTS = ["bars", "close", "sma50", "sma150", "sma200",
+           "sma200_now", "sma200_past", "low52", "high52"]
+_FRAME_COLS = ["Close", "SMA_50", "SMA_150", "SMA_200", "LOW_52W", "HIGH_52W"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Inputs
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _last_valid_pair(values: np.ndarray, back: int) -> tuple:
+    """(last non-NaN value, the one `back` non-NaN values earlier or NaN)."""
+    tail = values[-(back + 1):]
+    if len(tail) == back + 1 and not np.isnan(tail).any():
+        return tail[-1], tail[0]
+    clean = values[~np.isnan(values)]
+    if len(clean) == 0:
+        return np.nan, np.nan
+    return clean[-1], (clean[-(back + 1)] if len(clean) >= back + 1 else np.nan)
+
+
+def _frame_inputs(df: Optional[pd.DataFrame], back: int) -> list:
+    n = 0 if df is None else len(df)
+    if n < MIN_BARS:
+        return [n] + [np.nan] * (len(_INPUTS) - 1)
+    col = {c: df[c].to_numpy(dtype=float) for c in _FRAME_COLS if c in df.columns}
+    close = col["Close"]
+
+    def sma(length: int) -> float:
+        # Stored indicator, else a rolling mean over the last `length` closes
+        v = col.get(f"SMA_{length}")
+        if v is not None and not np.isnan(v[-1]):
+            return v[-1]
+        return close[-length:].mean()
+
+    sma200_series = col.get("SMA_200")
+    if sma200_series is None:
+        sma200_series = pd.Series(close).rolling(200).mean().to_numpy()
+    now, past = _last_valid_pair(sma200_series, back)
+    window = min(252, n)
+    low52 = col["LOW_52W"][-1] if "LOW_52W" in col else df["Low"].to_numpy(float)[-window:].min()
+    high52 = col["HIGH_52W"][-1] if "HIGH_52W" in col else df["High"].to_numpy(float)[-window:].max()
+    return [n, close[-1], sma(50), sma(150), sma(200), now, past, low52, high52]
+
+
+def _panel_inputs(p: Panel, back: int) -> pd.DataFrame:
+    n = p.valid.shape[0]
+    cols = np.arange(len(p.tickers))
+    bars = p.valid.sum(axis=0)
+    last_row = n - 1 - p.valid[::-1].argmax(axis=0)
+
+    def at_last(name: str) -> np.ndarray:
+        return p.column(name)[last_row, cols]
+
+    # SMA200 now and `back` bars earlier from a (back+1)-row window ending at
+    # each ticker's last bar; tickers with gaps in it take the exact path.
+    sma200 = p.column("SMA_200")
+    now, past = np.full(len(cols), np.nan), np.full(len(cols), np.nan)
+    simple = last_row >= back
+    if simple.any():
+        rows = np.clip(last_row[None, :] - np.arange(back, -1, -1)[:, None], 0, None)
+        window = sma200[rows, cols]
+        simple &= ~np.isnan(window).any(axis=0)
+        now[simple], past[simple] = window[-1, simple], window[0, simple]
+    for j in np.flatnonzero(~simple & (bars >= MIN_BARS)):
+        now[j], past[j] = _last_valid_pair(sma200[:, j], back)
+
+    out = pd.DataFrame({
+        "bars": bars, "close": at_last("Close"),
+        "sma50": at_last("SMA_50"), "sma150": at_last("SMA_150"), "sma200": at_last("SMA_200"),
+        "sma200_now": now, "sma200_past": past,
+        "low52": at_last("LOW_52W"), "high52": at_last("HIGH_52W"),
+    }, index=p.tickers)
+    out.loc[out["bars"] < MIN_BARS, _INPUTS[1:]] = np.nan
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Evaluation
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _checks(inp, rs) -> tuple:
+    """
+    TT1–TT9, % above the 52-week low and % below the 52-week high from the
+    inputs (`inp[name]` arrays, or scalars for one ticker) and RS ranks.
+    """
+    close, sma50, sma150, sma200 = inp["close"], inp["sma50"], inp["sma150"], inp["sma200"]
+    now, past = inp["sma200_now"], inp["sma200_past"]
+    low52, high52 = inp["low52"], inp["high52"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ok50, ok150, ok200 = ((v != 0) & ~np.isnan(v) for v in (sma50, sma150, sma200))
+        pct_above_low = np.where(low52 > 0, (close - low52) / low52 * 100, 0.0)
+        pct_below_high = np.where(high52 > 0, (high52 - close) / high52 * 100, 100.0)
+        checks = {
+            "TT1": ok150 & (close > sma150),
+            "TT2": ok200 & (close > sma200),
+            "TT3": ok150 & ok200 & (sma150 > sma200),
+            "TT4": ~np.isnan(past) & (now > past),
+            "TT5": ok50 & ok150 & ok200 & (sma50 > sma150) & (sma50 > sma200),
+            "TT6": ok50 & (close > sma50),
+            "TT7": pct_above_low >= C.TT7_MIN_ABOVE_52W_LOW_PCT,
+            "TT8": pct_below_high <= C.TT8_MAX_BELOW_52W_HIGH_PCT,
+            "TT9": (rs != RS_NOT_RANKED) & (rs >= C.TT9_MIN_RS_RANK),
+        }
+    return checks, pct_above_low, pct_below_high
+
+
+def evaluate(frames, rs_ranks: Optional[dict] = None) -> pd.DataFrame:
+    """
+    TT1–TT10 for every ticker of `frames` — a dict {ticker: enriched DataFrame}
+    or a panel.Panel.  `rs_ranks` maps ticker → RS rank; tickers missing from it
+    are looked up in one get_rs_ranks() call.
+
+    Returns a DataFrame indexed by ticker with boolean TT1…TT10 and `passes`,
+    integer `score`, and close, sma50/150/200, pct_from_52w_high/low, rs_rank,
+    bars plus the raw inputs the notes are built from.  Tickers with fewer than
+    MIN_BARS bars fail every condition.
+    """
+    back = int(C.TT4_SMA200_RISING_DAYS)
+    if isinstance(frames, Panel):
+        inp = _panel_inputs(frames, back)
+    else:
+        inp = pd.DataFrame([_frame_inputs(df, back) for df in frames.values()],
+                           index=list(frames), columns=_INPUTS, dtype=float)
+    enough = inp["bars"].to_numpy() >= MIN_BARS
+
+    rs_ranks = dict(rs_ranks or {})
+    lookup = [t for t, ok in zip(inp.index, enough) if ok and rs_ranks.get(t) is None]
+    if lookup:
+        rs_ranks.update(get_rs_ranks(lookup))
+    rs = np.array([RS_NOT_RANKED if rs_ranks.get(t) is None else rs_ranks[t]
+                   for t in inp.index], dtype=float)
+
+    checks, pct_above_low, pct_below_high = _checks({c: inp[c].to_numpy() for c in _INPUTS}, rs)
+    checks["TT10"] = np.ones(len(inp), bool)     # set at portfolio level (sector rankings)
+    out = pd.DataFrame({k: v & enough for k, v in checks.items()}, index=inp.index)
+    out["passes"] = out[MANDATORY].all(axis=1)
+    out["score"] = out[CONDITIONS].sum(axis=1).astype(int)
+    out["pct_from_52w_high"] = -pct_below_high
+    out["pct_from_52w_low"] = pct_above_low
+    out["rs_rank"] = rs
+    return pd.concat([out, inp], axis=1)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Per-ticker views (built lazily for displayed tickers)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _fmt(v: float) -> str:
+    return f"{v:.2f}" if v and not np.isnan(v) else "N/A"
+
+
+def notes(row: pd.Series) -> list:
+    """Human-readable failure notes for one row of evaluate()."""
+    if row["bars"] < MIN_BARS:
+        return [f"Insufficient history ({int(row['bars'])} days)"]
+    close, out = row["close"], []
+    if not row["TT1"]:
+        out.append(f"TT1 FAIL: Price {close:.2f} ≤ SMA150 {_fmt(row['sma150'])}")
+    if not row["TT2"]:
+        out.append(f"TT2 FAIL: Price {close:.2f} ≤ SMA200 {_fmt(row['sma200'])}")
+    if not row["TT3"]:
+        out.append("TT3 FAIL: SMA150 ≤ SMA200 (not properly aligned)")
+    if np.isnan(row["sma200_past"]):
+        out.append("TT4: Insufficient data to confirm SMA200 trend")
+    elif not row["TT4"]:
+        out.append(f"TT4 FAIL: SMA200 not rising ({row['sma200_past']:.2f}→{row['sma200_now']:.2f})")
+    if not row["TT5"]:
+        out.append("TT5 FAIL: SMA50 not above both SMA150 and SMA200")
+    if not row["TT6"]:
+        out.append(f"TT6 FAIL: Price {close:.2f} ≤ SMA50 {_fmt(row['sma50'])}")
+    if not row["TT7"]:
+        out.append(f"TT7 FAIL: Only {row['pct_from_52w_low']:.1f}% above 52W low "
+                   f"(need ≥{C.TT7_MIN_ABOVE_52W_LOW_PCT}%)")
+    if not row["TT8"]:
+        out.append(f"TT8 FAIL: {-row['pct_from_52w_high']:.1f}% below 52W high "
+                   f"(max {C.TT8_MAX_BELOW_52W_HIGH_PCT}%)")
+    if row["rs_rank"] == RS_NOT_RANKED:
+        out.append("TT9: RS rank not available (ticker not in RS universe)")
+    elif not row["TT9"]:
+        out.append(f"TT9: RS rank {row['rs_rank']:.0f} (need ≥{C.TT9_MIN_RS_RANK})")
+    if row["passes"] and not out:
+        out.append("[OK] All TT1-TT8 mandatory conditions passed")
+    return out
+
+
+def result(tt: pd.DataFrame, ticker: str) -> dict:
+    """One ticker of evaluate() in the validate_trend_template() dict form."""
+    return _result(tt.loc[ticker], ticker)
+
+
+def validate(ticker: str, df: Optional[pd.DataFrame], rs_rank: Optional[float] = None) -> dict:
+    """
+    evaluate() + result() for one ticker, computed on scalars (no DataFrames).
+    `rs_rank` None is looked up with get_rs_ranks() when the history is long enough.
+    """
+    row = dict(zip(_INPUTS, map(float, _frame_inputs(df, int(C.TT4_SMA200_RISING_DAYS)))))
+    enough = row["bars"] >= MIN_BARS
+    if enough and rs_rank is None:
+        rs_rank = get_rs_ranks([ticker]).get(ticker)
+    rs = RS_NOT_RANKED if rs_rank is None else float(rs_rank)
+    checks, pct_above_low, pct_below_high = _checks(row, rs)
+    row.update({k: bool(v) and enough for k, v in checks.items()})
+    row["TT10"] = enough
+    row["passes"] = all(row[k] for k in MANDATORY)
+    row["score"] = sum(row[k] for k in CONDITIONS)
+    row["pct_from_52w_high"] = -float(pct_below_high)
+    row["pct_from_52w_low"] = float(pct_above_low)
+    row["rs_rank"] = rs
+    return _result(row, ticker)
+
+
+def _result(row, ticker: str) -> dict:
+    checks = {k: bool(row[k]) for k in CONDITIONS}
+    if row["bars"] < MIN_BARS:
+        return {"passes": False, "score": 0, "checks": checks, "notes": notes(row)}
+
+    def _r(v, nd=2):
+        return float(round(v, nd)) if v and not np.isnan(v) else None
+
+    return {
+        "ticker":  ticker.upper(),
+        "passes":  bool(row["passes"]),
+        "score":   int(row["score"]),
+        "checks":  checks,
+        "close":   float(round(row["close"], 2)),
+        "sma50":   _r(row["sma50"]),
+        "sma150":  _r(row["sma150"]),
+        "sma200":  _r(row["sma200"]),
+        "rs_rank": float(round(row["rs_rank"], 1)) if row["rs_rank"] != RS_NOT_RANKED else None,
+        "pct_from_52w_high": float(round(row["pct_from_52w_high"], 1)),
+        "pct_from_52w_low":  float(round(row["pct_from_52w_low"], 1)),
+        "notes":   notes(row),
+    }
@@ -26,7 +26,7 @@ sys.path.insert(0, str(ROOT))
 import trader_config as C
 
 from modules.data_pipeline import get_enriched, get_snapshot
-from modules.rs_ranking import get_rs_rank, RS_NOT_RANKED
+from modules.rs_ranking import get_rs_rank, get_rs_ranks, RS_NOT_RANKED
 from modules.screener import validate_trend_template, score_sepa_pillars, _get_atr
 from modules.vcp_detector import detect_vcp
 
@@ -356,12 +356,13 @@ def refresh(verbose: bool = True):
     print(f"\nRefreshing {total} watchlist stocks...")
     all_tickers = {k: s for s in STRATEGY_KEYS for k in wl[s].keys()}
     changes = []
+    rs_ranks = get_rs_ranks(list(all_tickers))
 
     for ticker, current_strategy in all_tickers.items():
         print(f"  Updating {ticker}...", end="\r")
         try:
             df  = get_enriched(ticker, period="2y")
-            rs  = get_rs_rank(ticker)
+            rs  = rs_ranks[ticker]
             tt  = validate_trend_template(ticker, df=df, rs_rank=rs)
             vcp = detect_vcp(df) if df is not None and not df.empty else {}
 
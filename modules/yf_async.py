@@ -0,0 +1,297 @@
+"""
+modules/yf_async.py
+───────────────────
+Asyncio bulk OHLCV downloader over Yahoo's v8 chart endpoint.
+
+yf.download() has to run with threads=False (its threaded mode races on a
+shared dict), so every bulk download — Stage 2 batches, the RS universe, the
+NASDAQ price/volume sweep — fetched one batch at a time.  This engine issues
+one chart request per ticker from a single background event loop:
+
+  • one process-wide httpx.AsyncClient, so connections are pooled and kept
+    alive across batches and across callers;
+  • at most YF_ASYNC_MAX_CONCURRENCY requests outstanding, each also taking
+    a token and slot from the shared yf_limiter (401/429 feed its back-off);
+  • responses are parsed into tz-naive OHLCV frames with the same
+    auto-adjustment as yf.download(auto_adjust=True) and handed to the caller
+    as each one completes.
+
+A ticker that still fails after YF_ASYNC_RETRIES is yielded with None so the
+caller can fall back to yf.download() for it.  YF_CHART_BASE_URL points the
+engine at a stub server in tests.
+
+Usage:
+    for ticker, df in yf_async.stream(tickers, period="2y"):
+        ...                                   # df is None on failure
+    frames = yf_async.download(tickers, start="2025-01-02")
+"""
+
+import asyncio
+import logging
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+from modules import yf_limiter
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+               "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+_loop_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client = None                                  # created and used on the loop thread only
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "ok": 0, "empty": 0, "failed": 0, "retries": 0, "throttled": 0}
+
+
+class ChartError(Exception):
+    """Yahoo answered with an error payload or an unusable HTTP status."""
+
+
+def enabled() -> bool:
+    return HTTPX_AVAILABLE and bool(getattr(C, "YF_ASYNC_DOWNLOAD_ENABLED", False))
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def stats() -> dict:
+    with _stats_lock:
+        return {**_stats, "enabled": enabled()}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Chart JSON → OHLCV frame
+# ─────────────────────────────────────────────────────────────────────────────
+
+def chart_params(period: Optional[str] = None, start=None, interval: str = "1d") -> dict:
+    """Query parameters for one chart request (`start` wins over `period`)."""
+    params = {"interval": interval, "includeAdjustedClose": "true", "events": "div,split"}
+    if start is not None:
+        params["period1"] = int(pd.Timestamp(start).tz_localize("UTC").timestamp())
+        params["period2"] = int(time.time()) + 86400
+    else:
+        params["range"] = period or "1y"
+    return params
+
+
+def parse_chart(payload: dict, auto_adjust: bool = True) -> pd.DataFrame:
+    """
+    Convert a v8 chart response into an OHLCV frame indexed by tz-naive
+    exchange-local dates (intraday bars keep their time of day).  Raises
+    ChartError on an error payload; an unknown or empty symbol gives an empty frame.
+    """
+    chart = (payload or {}).get("chart") or {}
+    if chart.get("error"):
+        err = chart["error"]
+        raise ChartError(err.get("description") or err.get("code") or str(err))
+    result = (chart.get("result") or [None])[0]
+    if not result or not result.get("timestamp"):
+        return pd.DataFrame(columns=_OHLCV, index=pd.DatetimeIndex([], name="Date"))
+
+    meta = result.get("meta") or {}
+    tz = meta.get("exchangeTimezoneName") or "America/New_York"
+    index = pd.to_datetime(result["timestamp"], unit="s", utc=True).tz_convert(tz).tz_localize(None)
+    if str(meta.get("dataGranularity", "1d")).endswith(("d", "wk", "mo")):
+        index = index.normalize()
+
+    quote = (result.get("indicators", {}).get("quote") or [{}])[0]
+    df = pd.DataFrame({c: pd.to_numeric(pd.Series(quote.get(c.lower()), dtype=object),
+                                        errors="coerce").to_numpy()
+                       for c in _OHLCV},
+                      index=pd.DatetimeIndex(index, name="Date"))
+
+    adj = (result.get("indicators", {}).get("adjclose") or [{}])[0].get("adjclose")
+    if auto_adjust and adj is not None:
+        adj = pd.to_numeric(pd.Series(adj, dtype=object), errors="coerce").to_numpy()
+        ratio = adj / df["Close"].to_numpy()
+        for c in ("Open", "High", "Low"):
+            df[c] = df[c].to_numpy() * ratio
+        df["Close"] = adj
+
+    df = df[~df.index.duplicated(keep="last")]
+    return df.dropna()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Async engine
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """The background event loop every download runs on (started on first use)."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="yf-async", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+async def _get_client():
+    global _client
+    if _client is None:
+        conns = int(getattr(C, "YF_ASYNC_MAX_CONCURRENCY", 16))
+        _client = httpx.AsyncClient(
+            timeout=float(getattr(C, "YF_ASYNC_TIMEOUT_SEC", 15.0)),
+            limits=httpx.Limits(max_connections=conns, max_keepalive_connections=conns),
+            headers={"User-Agent": _USER_AGENT, "Accept": "application/json"},
+        )
+    return _client
+
+
+async def _acquire_slot() -> None:
+    """Take a yf_limiter token + slot without blocking the event loop."""
+    fut = asyncio.ensure_future(asyncio.to_thread(yf_limiter.acquire))
+    try:
+        await asyncio.shield(fut)
+    except asyncio.CancelledError:
+        # The worker thread still gets the slot — hand it back once it does
+        fut.add_done_callback(lambda f: f.exception() is None and yf_limiter.release(False))
+        raise
+
+
+async def _fetch(client, ticker: str, params: dict, base_url: str,
+                 sem: asyncio.Semaphore) -> tuple:
+    url = f"{base_url.rstrip('/')}/v8/finance/chart/{ticker}"
+    retries = int(getattr(C, "YF_ASYNC_RETRIES", 1))
+    backoff = float(getattr(C, "YFINANCE_RETRY_BACKOFF", 0.5))
+    limited = yf_limiter.enabled()
+    async with sem:
+        for attempt in range(retries + 1):
+            if limited:
+                await _acquire_slot()
+            ok = False
+            try:
+                _count("requests")
+                resp = await client.get(url, params=params)
+                if resp.status_code in (401, 429):
+                    _count("throttled")
+                    yf_limiter.on_throttle()
+                    raise ChartError(f"HTTP {resp.status_code}")
+                if resp.status_code == 404:
+                    ok = True
+                    _count("empty")
+                    return ticker, pd.DataFrame(columns=_OHLCV)
+                resp.raise_for_status()
+                df = parse_chart(resp.json())
+                ok = True
+                _count("ok" if not df.empty else "empty")
+                return ticker, df
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if attempt < retries:
+                    _count("retries")
+                    logger.debug("[yf_async] %s attempt %d failed: %s", ticker, attempt + 1, exc)
+                    await asyncio.sleep(backoff * (2 ** attempt))
+                    continue
+                _count("failed")
+                logger.debug("[yf_async] %s failed: %s", ticker, exc)
+                return ticker, None
+            finally:
+                if limited:
+                    yf_limiter.release(ok)
+    return ticker, None
+
+
+async def astream(tickers: list, period: Optional[str] = None, start=None,
+                  interval: str = "1d", base_url: Optional[str] = None) -> AsyncIterator[tuple]:
+    """Async generator of (ticker, frame-or-None) in completion order."""
+    client = await _get_client()
+    params = chart_params(period, start, interval)
+    base_url = base_url or getattr(C, "YF_CHART_BASE_URL", "https://query2.finance.yahoo.com")
+    sem = asyncio.Semaphore(max(1, int(getattr(C, "YF_ASYNC_MAX_CONCURRENCY", 16))))
+    tasks = [asyncio.ensure_future(_fetch(client, t, params, base_url, sem))
+             for t in dict.fromkeys(tickers)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+_DONE = object()
+
+
+def stream(tickers: list, period: Optional[str] = None, start=None,
+           interval: str = "1d", base_url: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Blocking generator over astream(): yields (ticker, frame-or-None) as each
+    request completes.  Closing the generator early cancels the rest.
+    """
+    if not HTTPX_AVAILABLE:
+        raise RuntimeError("httpx is not installed")
+    out: queue.Queue = queue.Queue()
+
+    async def _pump():
+        items = astream(tickers, period, start, interval, base_url)
+        try:
+            async for item in items:
+                out.put(item)
+        except Exception as exc:
+            out.put(exc)
+        finally:
+            await items.aclose()
+            out.put(_DONE)
+
+    fut = asyncio.run_coroutine_threadsafe(_pump(), _get_loop())
+    try:
+        while True:
+            item = out.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        if not fut.done():
+            fut.cancel()
+
+
+def download(tickers: list, period: Optional[str] = None, start=None,
+             interval: str = "1d", base_url: Optional[str] = None) -> dict:
+    """dict[ticker] -> OHLCV frame for every ticker that returned bars."""
+    return {t: df for t, df in stream(tickers, period, start, interval, base_url)
+            if df is not None and not df.empty}
+
+
+def shutdown() -> None:
+    """Close the pooled client and stop the background loop."""
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None:
+        return
+
+    async def _close():
+        global _client
+        if _client is not None:
+            await _client.aclose()
+            _client = None
+
+    try:
+        asyncio.run_coroutine_threadsafe(_close(), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,189 @@
+"""
+modules/yf_limiter.py
+─────────────────────
+Process-wide rate limiter for yfinance traffic.
+
+Scans, the RS ranking job, the NASDAQ universe build, Telegram /analyze
+threads and the web API all talk to Yahoo from their own thread pools, each
+pacing itself with fixed sleeps between batches.  Those sleeps neither add up
+across callers nor react when Yahoo starts answering 429 / 401.  Every yfinance
+request in data_pipeline, rs_ranking and nasdaq_universe now goes through one
+shared limiter instead:
+
+  • Token bucket — at most YF_RATE_PER_SEC requests per second on average,
+    bursts of up to YF_BURST.
+  • Concurrency window — at most `limit` requests in flight.
+
+Both adapt AIMD-style: each successful request raises the concurrency limit
+by 1/limit (≈ +1 per window of successes) and the rate by YF_RATE_STEP; a
+throttle signal (429 / 401 / crumb error, from a request or from
+data_pipeline._yf_track_error) multiplies both by YF_BACKOFF_FACTOR and
+empties the bucket.  Throttle signals within YF_BACKOFF_COOLDOWN_SEC of the
+last back-off count once, and no increase happens during that window, so a
+burst of failing in-flight requests halves the rate once, not N times.
+
+Usage:
+    with yf_limiter.request():          # blocks for a token and a slot
+        raw = yf.download(...)
+    yf_limiter.on_throttle()            # 429/401 noticed outside request()
+    yf_limiter.status()                 # rate / limit / inflight / queue_depth …
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import trader_config as C
+
+_cond = threading.Condition()
+_state: dict = {}                     # filled by reset() on first use
+_counters = {"requests": 0, "throttle_events": 0, "wait_sec": 0.0}
+
+_THROTTLE_MARKERS = ("429", "too many requests", "rate limit",
+                     "401", "unauthorized", "crumb")
+
+
+def _cfg(name: str, default: float) -> float:
+    return float(getattr(C, name, default))
+
+
+def enabled() -> bool:
+    return bool(getattr(C, "YF_LIMITER_ENABLED", True))
+
+
+def reset() -> None:
+    """(Re)initialise rate, limit and counters from trader_config."""
+    with _cond:
+        rate = _cfg("YF_RATE_PER_SEC", 4.0)
+        _state.clear()
+        _state.update({
+            "rate": rate,
+            "tokens": _cfg("YF_BURST", 8.0),
+            "limit": _cfg("YF_CONCURRENCY_INITIAL", 6.0),
+            "inflight": 0,
+            "waiting": 0,
+            "stamp": time.monotonic(),
+            "last_throttle": None,
+        })
+        _counters.update({"requests": 0, "throttle_events": 0, "wait_sec": 0.0})
+        _cond.notify_all()
+
+
+def _ensure_locked() -> None:
+    if not _state:
+        reset()
+
+
+def _refill_locked(now: float) -> None:
+    burst = _cfg("YF_BURST", 8.0)
+    _state["tokens"] = min(burst, _state["tokens"] + (now - _state["stamp"]) * _state["rate"])
+    _state["stamp"] = now
+
+
+def _in_cooldown(now: float) -> bool:
+    last = _state["last_throttle"]
+    return last is not None and now - last < _cfg("YF_BACKOFF_COOLDOWN_SEC", 10.0)
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """True when an exception looks like Yahoo rate limiting (429) or auth/crumb rejection (401)."""
+    desc = str(exc).lower()
+    return any(m in desc for m in _THROTTLE_MARKERS)
+
+
+def acquire() -> None:
+    """Block until a token and a concurrency slot are both available, then take them."""
+    t0 = time.monotonic()
+    with _cond:
+        _ensure_locked()
+        _state["waiting"] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                _refill_locked(now)
+                slot_free = _state["inflight"] < max(1, int(_state["limit"]))
+                if slot_free and _state["tokens"] >= 1.0:
+                    _state["tokens"] -= 1.0
+                    _state["inflight"] += 1
+                    _counters["requests"] += 1
+                    _counters["wait_sec"] += now - t0
+                    return
+                # Out of tokens: sleep until the next one accrues.  Out of
+                # slots: wait for a release() to notify.
+                timeout = (1.0 - _state["tokens"]) / _state["rate"] if slot_free else None
+                _cond.wait(timeout)
+        finally:
+            _state["waiting"] -= 1
+
+
+def release(ok: bool = True) -> None:
+    """Give back a concurrency slot; a successful request grows rate and limit additively."""
+    with _cond:
+        _ensure_locked()
+        _state["inflight"] = max(0, _state["inflight"] - 1)
+        if ok and not _in_cooldown(time.monotonic()):
+            limit = _state["limit"]
+            _state["limit"] = min(_cfg("YF_CONCURRENCY_MAX", 16.0), limit + 1.0 / limit)
+            _state["rate"] = min(_cfg("YF_RATE_MAX", 10.0),
+                                 _state["rate"] + _cfg("YF_RATE_STEP", 0.05))
+        _cond.notify_all()
+
+
+def on_throttle() -> bool:
+    """Multiplicative back-off after a 429/401.  Returns False when absorbed by the cooldown."""
+    with _cond:
+        _ensure_locked()
+        now = time.monotonic()
+        if _in_cooldown(now):
+            return False
+        factor = _cfg("YF_BACKOFF_FACTOR", 0.5)
+        _refill_locked(now)
+        _state["rate"] = max(_cfg("YF_RATE_MIN", 0.5), _state["rate"] * factor)
+        _state["limit"] = max(_cfg("YF_CONCURRENCY_MIN", 1.0), _state["limit"] * factor)
+        _state["tokens"] = 0.0
+        _state["last_throttle"] = now
+        _counters["throttle_events"] += 1
+        return True
+
+
+@contextmanager
+def request():
+    """Context manager around one yfinance request (no-op when the limiter is disabled)."""
+    if not enabled():
+        yield
+        return
+    acquire()
+    ok = False
+    try:
+        yield
+        ok = True
+    except Exception as exc:
+        if is_throttle_error(exc):
+            on_throttle()
+        raise
+    finally:
+        release(ok)
+
+
+def status() -> dict:
+    """Current adaptive rate, concurrency window and queue depth, for status endpoints."""
+    with _cond:
+        _ensure_locked()
+        now = time.monotonic()
+        _refill_locked(now)
+        return {
+            "enabled":           enabled(),
+            "rate_per_sec":      round(_state["rate"], 3),
+            "tokens":            round(_state["tokens"], 3),
+            "concurrency_limit": max(1, int(_state["limit"])),
+            "inflight":          _state["inflight"],
+            "queue_depth":       _state["waiting"],
+            "backing_off":       _in_cooldown(now),
+            "requests":          _counters["requests"],
+            "throttle_events":   _counters["throttle_events"],
+            "wait_sec":          round(_counters["wait_sec"], 3),
+        }
@@ -286,12 +286,16 @@ def api_chart_weekly(ticker: str):
     ticker_upper = ticker.upper()
 
     try:
-        import yfinance as yf
-        t = yf.Ticker(ticker_upper)
-        df = t.history(period="5y", interval="1wk")
-        if df.empty:
+        from modules.data_pipeline import get_historical
+        daily = get_historical(ticker_upper, period="5y")
+        if daily.empty:
             return jsonify({"ok": False, "error": "No weekly data"})
 
+        # Weekly bars labelled by the Monday of the week, as yfinance's 1wk bars are
+        df = daily.resample("W-MON", label="left", closed="left").agg({
+            "Open": "first", "High": "max",
+            "Low": "min", "Close": "last", "Volume": "sum",
+        }).dropna()
         df = df.tail(weeks).copy()
         for n in (9, 21, 50):
             df[f"EMA_{n}"] = df["Close"].ewm(span=n, adjust=False).mean()
@@ -348,8 +352,8 @@ def _get_next_earnings_date(ticker: str):
     if cached and now - cached["fetched_at"] < 86400:
         return cached["date"]
     try:
-        import yfinance as yf
-        cal = yf.Ticker(ticker).calendar
+        from modules.data_pipeline import get_provider
+        cal = get_provider().calendar(ticker)
         if cal is not None:
             if isinstance(cal, dict):
                 dates = cal.get("Earnings Date", [])
@@ -379,14 +383,14 @@ def _get_nasdaq_regime_snapshot() -> dict:
         return cached
 
     try:
-        import yfinance as yf
         import pandas as pd
+        from modules.data_pipeline import get_historical
         tkr = C.QM_NASDAQ_TICKER
         fast_p = C.QM_NASDAQ_SMA_FAST
         slow_p = C.QM_NASDAQ_SMA_SLOW
         slope_lb = C.QM_NASDAQ_SLOPE_LOOKBACK
 
-        df = yf.download(tkr, period="6mo", interval="1d", progress=False, auto_adjust=True)
+        df = get_historical(tkr, period="6mo")
         if df is None or df.empty or len(df) < slow_p + slope_lb:
             raise ValueError("insufficient data")
 
@@ -772,15 +776,15 @@ def qm_watch_signals(ticker: str):
         ticker = ticker.upper().strip()
         _data_source = "intraday"
 
-        import yfinance as yf
+        from modules.data_pipeline import get_intraday
 
         try:
-            df_5m = yf.Ticker(ticker).history(period="2d", interval="5m", prepost=False)
+            df_5m = get_intraday(ticker, period="2d", interval="5m")
             candles_5m = _df_to_candles(df_5m) if not df_5m.empty else []
         except Exception:
             candles_5m = []
         try:
-            df_1h = yf.Ticker(ticker).history(period="60d", interval="1h", prepost=False)
+            df_1h = get_intraday(ticker, period="60d", interval="1h")
             candles_1h = _df_to_candles(df_1h) if not df_1h.empty else []
         except Exception:
             candles_1h = []
@@ -1109,10 +1113,10 @@ def ml_watch_signals(ticker: str):
         ticker = ticker.upper().strip()
         _data_source = "intraday"
 
-        import yfinance as yf
+        from modules.data_pipeline import get_intraday
 
         try:
-            df_5m = yf.Ticker(ticker).history(period="2d", interval="5m", prepost=False)
+            df_5m = get_intraday(ticker, period="2d", interval="5m")
             candles_5m = _df_to_candles(df_5m) if not df_5m.empty else []
         except Exception:
             candles_5m = []
@@ -1302,10 +1306,9 @@ def api_chart_intraday(ticker: str):
             return False
 
     try:
-        import yfinance as yf
+        from modules.data_pipeline import get_intraday
 
-        t = yf.Ticker(ticker_upper)
-        df = t.history(period=f"{days}d", interval=interval, prepost=True)
+        df = get_intraday(ticker_upper, period=f"{days}d", interval=interval, prepost=True)
         if df.empty:
             return jsonify({"ok": False, "error": f"No {interval} data"})
 
@@ -249,6 +249,19 @@ def api_yf_status():
                         "errors": 0, "rate_limited": False})
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# Price cache lifecycle
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@bp.route("/api/cache/stats", methods=["GET"])
+def api_cache_stats():
+    try:
+        from modules import cache_manager
+        return jsonify({"ok": True, "stats": cache_manager.stats()})
+    except Exception as exc:
+        return jsonify({"ok": False, "error": str(exc)})
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # DB History API
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -290,8 +303,10 @@ def api_db_persistent_signals():
 def api_db_rs_trend(ticker: str):
     days = int(request.args.get("days", 90))
     try:
-        from modules.db import query_rs_trend
-        df = query_rs_trend(ticker.upper(), days)
+        from modules.rs_ranking import get_rs_history
+        df = get_rs_history(ticker.upper(), days).copy()
+        df["rank_date"] = df["rank_date"].astype(str).str[:10]
+        df = df.astype(object).where(df.notna(), None)
         return jsonify({"ok": True, "ticker": ticker.upper(),
                         "rows": df.to_dict(orient="records")})
     except Exception as exc:
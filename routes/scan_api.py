@@ -2,7 +2,7 @@
 
 import logging
 import threading
-from datetime import date, datetime
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 
 import trader_config as C
@@ -104,9 +104,8 @@ def api_scan_last():
 @bp.route("/api/scan/cache-info", methods=["GET"])
 def api_scan_cache_info():
     try:
-        today = date.today().isoformat()
-        cache_dir = ROOT / C.PRICE_CACHE_DIR
-
+        from modules import trading_calendar
+        today = trading_calendar.cache_asof()
         rs_file = ROOT / C.DATA_DIR / "rs_cache.csv"
         rs_cached = False
         rs_count = 0
@@ -131,41 +130,23 @@ def api_scan_cache_info():
                 pass
 
         price_cached_today = 0
-        if cache_dir.exists():
-            metas = list(cache_dir.glob("*_2y.meta"))
-            if len(metas) > 200:
-                import random
-                sample = random.sample(metas, 200)
-                hits = sum(1 for m in sample if m.read_text().strip() == today)
-                price_cached_today = int(hits / 200 * len(metas))
-            else:
-                for meta in metas:
-                    try:
-                        if meta.read_text().strip() == today:
-                            price_cached_today += 1
-                    except Exception:
-                        pass
+        try:
+            from modules import price_store
+            price_cached_today = price_store.count_fresh(price_store.MASTER, today)
+        except Exception:
+            pass
 
         fund_cached_today = 0
-        if cache_dir.exists():
-            fmetas = list(cache_dir.glob("*_fundamentals.fmeta"))
-            if len(fmetas) > 200:
-                import random
-                sample = random.sample(fmetas, 200)
-                hits = sum(1 for m in sample if m.read_text().strip() == today)
-                fund_cached_today = int(hits / 200 * len(fmetas))
-            else:
-                for fmeta in fmetas:
-                    try:
-                        if fmeta.read_text().strip() == today:
-                            fund_cached_today += 1
-                    except Exception:
-                        pass
+        try:
+            from modules import fundamentals_store
+            fund_cached_today = fundamentals_store.count_fresh("info")
+        except Exception:
+            pass
 
         finviz_cached = False
         try:
-            from modules.data_pipeline import _finviz_cache
-            finviz_cached = len(_finviz_cache) > 0
+            from modules import finviz_cache
+            finviz_cached = finviz_cache.has_fresh("screener")
         except Exception:
             pass
 
@@ -0,0 +1,79 @@
+"""
+bench_technicals.py
+───────────────────
+Microbenchmark: get_technicals() NumPy backend vs pandas_ta backend, and the
+cross-sectional panel, on synthetic 2-year OHLCV series.
+
+    python scripts/bench_technicals.py [n_tickers] [bars]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules import data_pipeline as dp
+from modules import panel
+
+
+def synthetic_ohlcv(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2023-01-02", periods=n, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    return pd.DataFrame({
+        "Open": (high + low) / 2, "High": high, "Low": low, "Close": close,
+        "Volume": rng.integers(100_000, 10_000_000, n).astype(float),
+    }, index=idx)
+
+
+def timed(label: str, fn, repeat: int = 3) -> float:
+    best = min(_once(fn) for _ in range(repeat))
+    print(f"  {label:<28s} {best * 1000:9.1f} ms")
+    return best
+
+
+def _once(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 504
+    frames = {f"T{i:04d}": synthetic_ohlcv(bars, i) for i in range(n_tickers)}
+    one = next(iter(frames.values()))
+
+    print(f"\nget_technicals() — {n_tickers} tickers × {bars} bars")
+    print("=" * 50)
+    t0 = time.perf_counter()
+    has_pta = dp._pandas_ta() is not None
+    if has_pta:
+        print(f"  {'pandas_ta import':<28s} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+
+    print("single frame")
+    timed("numpy", lambda: dp.get_technicals(one, backend="numpy"), repeat=20)
+    if has_pta:
+        timed("pandas_ta", lambda: dp.get_technicals(one, backend="pandas_ta"), repeat=20)
+
+    print(f"{n_tickers} frames")
+    t_np = timed("numpy, per frame", lambda: [dp.get_technicals(df, backend="numpy")
+                                              for df in frames.values()])
+    if has_pta:
+        t_pta = timed("pandas_ta, per frame", lambda: [dp.get_technicals(df, backend="pandas_ta")
+                                                       for df in frames.values()])
+        print(f"  {'speed-up':<28s} {t_pta / t_np:9.1f} ×")
+    timed("numpy panel (+ all views)", lambda: list(panel.build_panel(frames).values()))
+    if not has_pta:
+        print("  (pandas_ta not installed — backend comparison skipped)")
+
+
+if __name__ == "__main__":
+    main()
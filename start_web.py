@@ -26,6 +26,22 @@ def main():
         """Cleanup and exit immediately."""
         print("\n\n  ⏹  關閉伺服器... Shutting down server...")
         _shutdown_event.set()
+        # os._exit() skips atexit: write queued price-cache data, read times and
+        # the fundamentals manifest now
+        if "modules.cache_writer" in sys.modules:
+            try:
+                from modules import cache_writer, price_store
+                if not cache_writer.flush(timeout=10):
+                    print("  ⚠  快取寫入未完成 Price-cache write queue not fully flushed")
+                price_store.flush_access()
+            except Exception as exc:
+                print(f"  ⚠  快取寫入失敗 Price-cache flush failed: {exc}")
+        if "modules.fundamentals_store" in sys.modules:
+            try:
+                from modules import fundamentals_store
+                fundamentals_store.flush()
+            except Exception as exc:
+                print(f"  ⚠  基本面索引寫入失敗 Fundamentals manifest flush failed: {exc}")
         time.sleep(0.1)
         sys.stdout.flush()
         sys.stderr.flush()
@@ -0,0 +1,61 @@
+"""
+tests/conftest.py
+─────────────────
+Shared test hooks.
+
+Tests point price_store.STORE_DIR at a temp directory with monkeypatch.  The
+write-behind queue (modules/cache_writer.py) may still be writing a test's
+frames when monkeypatch restores the real directory, so queued writes are
+drained first: this fixture depends on monkeypatch, so its teardown runs
+before monkeypatch's.  isolated_price_store gives a test its own empty store.
+
+synthetic_ohlcv is the random-walk OHLCV factory shared by the indicator,
+panel and enrichment tests.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _drain_cache_writes(monkeypatch):
+    yield
+    cache_writer = sys.modules.get("modules.cache_writer")
+    if cache_writer is not None:
+        cache_writer.flush(timeout=10)
+
+
+@pytest.fixture
+def isolated_price_store(tmp_path, monkeypatch):
+    """An empty price store under tmp_path/"store" with no in-memory manifest state."""
+    from modules import price_store
+    monkeypatch.setattr(price_store, "STORE_DIR", tmp_path / "store")
+    for name in ("_manifests", "_schemas", "_stamps", "_bucket_sums", "_access"):
+        monkeypatch.setattr(price_store, name, {})
+    monkeypatch.setattr(price_store, "_access_dirty", set())
+    return tmp_path / "store"
+
+
+def _synthetic_ohlcv(n=520, seed=7):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2023-01-02", periods=n, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    return pd.DataFrame({
+        "Open": (high + low) / 2, "High": high, "Low": low, "Close": close,
+        "Volume": rng.integers(100_000, 10_000_000, n).astype(float),
+    }, index=idx)
+
+
+@pytest.fixture
+def synthetic_ohlcv():
+    """synthetic_ohlcv(n=520, seed=7) → random-walk OHLCV frame on business days from 2023-01-02."""
+    return _synthetic_ohlcv
@@ -0,0 +1,185 @@
+"""
+tests/test_cache_manager.py
+───────────────────────────
+Price-cache lifecycle (modules/cache_manager.py) on a temporary store.
+
+Covers:
+  • bucket checksums are recorded on write; a bucket rewritten behind the
+    manifest's back (crash before the manifest save) is detected and repaired
+  • an unreadable bucket is discarded and its tickers forgotten
+  • gc removes stale temp files, legacy per-ticker files and delisted
+    tickers (but not ones that were merely not re-fetched), then evicts the
+    least recently read tickers over CACHE_MAX_MB
+  • read times survive a restart via the manifest
+  • two processes writing the same store keep each other's tickers; column
+    lists are stored once per dataset
+  • int and float Volume frames share a bucket
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import cache_manager, fundamentals_store, price_store, trading_calendar
+
+
+def _ohlcv(n=50, end=None):
+    end = pd.Timestamp(end or trading_calendar.last_completed_session())
+    close = 10.0 + np.arange(n, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": np.full(n, 1e6)},
+                        index=pd.bdate_range(end=end, periods=n, name="Date"))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, isolated_price_store):
+    monkeypatch.setattr(C, "PRICE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(C, "PRICE_STORE_BUCKETS", 4)
+    monkeypatch.setattr(fundamentals_store, "STORE_DIR", tmp_path / "fundamentals")
+    monkeypatch.setattr(fundamentals_store, "LEGACY_DIR", tmp_path)
+    fundamentals_store.reset()
+    asof = trading_calendar.cache_asof()
+    price_store.write_frames(price_store.MASTER, {t: _ohlcv() for t in ("AAA", "BBB", "CCC", "DDD")},
+                             asof)
+    yield tmp_path
+    fundamentals_store.reset()
+
+
+def _restart():
+    for state in (price_store._manifests, price_store._schemas, price_store._stamps,
+                  price_store._bucket_sums, price_store._access):
+        state.clear()
+
+
+def test_verify_detects_and_repairs_a_bucket_written_behind_the_manifest(store):
+    assert cache_manager.verify()["problems"] == []
+    bucket = price_store.bucket_of("AAA")
+    path = price_store.bucket_path(price_store.MASTER, bucket)
+
+    # A crash after the bucket rename but before the manifest save
+    table = pq.read_table(path)
+    extra = pa.Table.from_pandas(_ohlcv(5).reset_index().assign(Ticker="ZZZ"), preserve_index=False)
+    pq.write_table(pa.concat_tables([table, extra.select(table.column_names)
+                                     .cast(table.schema)]), path)
+    _restart()
+    report = cache_manager.verify()
+    issues = report["problems"][0]["issues"]
+    assert "checksum mismatch" in issues and "1 tickers not in manifest" in issues
+
+    cache_manager.verify(repair=True)
+    assert cache_manager.verify()["problems"] == []
+    assert set(price_store.read_frames(price_store.MASTER)) == {"AAA", "BBB", "CCC", "DDD"}
+
+
+def test_unreadable_bucket_is_discarded(store):
+    bucket = price_store.bucket_of("BBB")
+    price_store.bucket_path(price_store.MASTER, bucket).write_bytes(b"not parquet")
+    _restart()
+    report = cache_manager.verify(repair=True)
+    assert any("unreadable" in i for p in report["problems"] for i in p["issues"])
+    assert "BBB" not in price_store.get_manifest(price_store.MASTER)
+    assert cache_manager.verify()["problems"] == []
+
+
+def test_gc_removes_dead_files_and_evicts_lru(store, monkeypatch):
+    old = time.time() - 7200
+    temp = store / "store" / "master" / ".part.parquet.1.2.tmp"
+    temp.write_bytes(b"x")
+    os.utime(temp, (old, old))
+    (store / "OLD_2y.parquet").write_bytes(b"x" * 100)
+    (store / "OLD_2y.meta").write_text("2020-01-01")
+
+    gone = trading_calendar.last_completed_session() - timedelta(days=90)
+    price_store.write_frame(price_store.MASTER, "DEAD", _ohlcv(end=gone), trading_calendar.cache_asof())
+    idle = trading_calendar.previous_session(gone)          # complete when last fetched, unused since
+    price_store.write_frame(price_store.MASTER, "IDLE", _ohlcv(end=idle), idle.isoformat())
+
+    monkeypatch.setattr(C, "CACHE_DELISTED_SESSIONS", 20)
+    monkeypatch.setattr(C, "CACHE_MAX_MB", 1e6)
+    dry = cache_manager.gc(dry_run=True)
+    assert dry["delisted"] == ["DEAD"] and (store / "OLD_2y.parquet").exists()
+
+    report = cache_manager.gc()
+    assert report["temp_files"] == 1 and report["legacy_files"] == 2 and report["evicted"] == []
+    assert not temp.exists() and not (store / "OLD_2y.meta").exists()
+    assert "DEAD" not in price_store.get_manifest(price_store.MASTER)
+    assert "IDLE" in price_store.get_manifest(price_store.MASTER)
+
+    # Over budget: everything but the recently read ticker goes first
+    price_store.read_frames(price_store.MASTER, ["AAA", "BBB", "CCC"])
+    time.sleep(1.1)
+    price_store.read_frame(price_store.MASTER, "DDD")
+    monkeypatch.setattr(C, "CACHE_MAX_MB", cache_manager.stats()["total_mb"] * 0.6)
+    report = cache_manager.gc()
+    assert report["evicted"] and "DDD" not in report["evicted"]
+    assert "DDD" in price_store.get_manifest(price_store.MASTER)
+
+
+def test_access_times_survive_restart(store):
+    price_store.read_frame(price_store.MASTER, "CCC")
+    read_at = price_store.get_access(price_store.MASTER)["CCC"]
+    price_store.flush_access()
+    _restart()
+    assert price_store.get_access(price_store.MASTER)["CCC"] == pytest.approx(read_at, abs=1)
+
+
+_WRITER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from pathlib import Path
+import numpy as np, pandas as pd
+import trader_config as C
+C.PRICE_STORE_BUCKETS = 4
+from modules import price_store
+price_store.STORE_DIR = Path(sys.argv[2])
+idx = pd.bdate_range(end=sys.argv[3], periods=50, name="Date")
+df = pd.DataFrame({c: np.arange(50.0) for c in ("Open", "High", "Low", "Close", "Volume")}, index=idx)
+for i in range(15):
+    price_store.write_frame(price_store.MASTER, f"P{i}", df, sys.argv[4])
+"""
+
+
+def test_int_and_float_volume_share_a_bucket(store):
+    asof = trading_calendar.cache_asof()
+    same = [t for t in ("AAA", "BBB", "CCC", "DDD", "EEE", "FFF", "GGG", "HHH")
+            if price_store.bucket_of(t) == price_store.bucket_of("AAA")]
+    as_int = _ohlcv().astype({"Volume": "int64"})              # Ticker.history()
+    assert price_store.write_frames(price_store.MASTER, {same[0]: as_int}, asof) == 1
+    assert price_store.write_frames(price_store.MASTER, {same[1]: _ohlcv()}, asof) == 1
+    frames = price_store.read_frames(price_store.MASTER, same[:2])
+    assert sorted(frames) == sorted(same[:2])
+    for df in frames.values():
+        assert df["Volume"].dtype == np.float64 and df["Volume"].iloc[-1] == 1e6
+
+
+def test_two_processes_write_the_same_store(store):
+    asof = trading_calendar.cache_asof()
+    other = subprocess.Popen([sys.executable, "-c", _WRITER, str(ROOT), str(store / "store"),
+                              str(trading_calendar.last_completed_session()), asof])
+    for i in range(15):
+        price_store.write_frame(price_store.MASTER, f"Q{i}", _ohlcv(), asof)
+    assert other.wait(60) == 0
+
+    expected = {"AAA", "BBB", "CCC", "DDD"} | {f"{p}{i}" for p in "PQ" for i in range(15)}
+    assert set(price_store.get_manifest(price_store.MASTER)) == expected
+    assert set(price_store.read_frames(price_store.MASTER)) == expected
+    assert cache_manager.verify()["problems"] == []
+    price_store.flush_access()
+    _restart()
+    doc = json.loads((store / "store" / "master" / "manifest.json").read_text())
+    assert len(doc["schemas"]) == 1 and set(doc["tickers"]) == expected
+    assert cache_manager.verify()["problems"] == []
@@ -0,0 +1,90 @@
+"""
+tests/test_cache_writer.py
+──────────────────────────
+Write-behind queue for price-store writes (modules/cache_writer.py).
+
+Covers:
+  • frames queued within the delay go out as one write_frames() per dataset;
+    a ticker queued twice is written once, with the latest frame
+  • read-your-writes: manifest reads wait for the tickers' queued writes
+  • on_written callbacks run after the store write; flush() drains the queue
+  • CACHE_WRITE_BEHIND_ENABLED = False writes synchronously
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import cache_writer, price_store
+
+ASOF = "2026-10-16"
+
+
+def _ohlcv(n=30, base=10.0):
+    close = base + np.arange(n, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": np.full(n, 1e6)},
+                        index=pd.bdate_range(end=ASOF, periods=n, name="Date"))
+
+
+@pytest.fixture
+def store(monkeypatch, isolated_price_store):
+    monkeypatch.setattr(C, "PRICE_STORE_BUCKETS", 4)
+    monkeypatch.setattr(C, "CACHE_WRITE_BEHIND_ENABLED", True, raising=False)
+    calls = []
+    real_write = price_store.write_frames
+
+    def counting_write(dataset, frames, asof, meta=None):
+        calls.append((dataset, sorted(frames)))
+        return real_write(dataset, frames, asof, meta)
+
+    monkeypatch.setattr(price_store, "write_frames", counting_write)
+    yield calls
+    cache_writer.flush(timeout=10)
+
+
+def test_batches_and_coalesces(store, monkeypatch):
+    monkeypatch.setattr(C, "CACHE_WRITE_DELAY_SEC", 5.0, raising=False)
+    before = cache_writer.stats()
+    cache_writer.submit(price_store.MASTER, {"AAA": _ohlcv(), "BBB": _ohlcv()}, ASOF)
+    cache_writer.submit(price_store.MASTER, {"AAA": _ohlcv(base=99.0)}, ASOF)
+    cache_writer.submit(price_store.MASTER, {"CCC": _ohlcv()}, ASOF)
+    assert cache_writer.stats()["depth"] == 3
+    assert store == []                                 # nothing written on the caller's path
+
+    assert cache_writer.flush(timeout=10)
+    assert store == [(price_store.MASTER, ["AAA", "BBB", "CCC"])]
+    assert price_store.read_frame(price_store.MASTER, "AAA")["Close"].iloc[0] == 99.0
+    after = cache_writer.stats()
+    assert after["depth"] == 0
+    assert after["coalesced"] - before["coalesced"] == 1
+    assert after["written"] - before["written"] == 3
+
+
+def test_reads_wait_for_queued_writes(store, monkeypatch):
+    monkeypatch.setattr(C, "CACHE_WRITE_DELAY_SEC", 30.0, raising=False)
+    written = threading.Event()
+    cache_writer.submit(price_store.MASTER_ENRICHED, {"NVDA": _ohlcv()}, ASOF,
+                        meta={"period": "2y"}, on_written=lambda ds, frames: written.set())
+    # Without the wait this read would find nothing until the 30 s delay ran out
+    assert price_store.fresh_tickers(price_store.MASTER_ENRICHED, ["NVDA", "MSFT"], ASOF) == {"NVDA"}
+    assert price_store.get_entry(price_store.MASTER_ENRICHED, "NVDA")["period"] == "2y"
+    assert written.wait(5)
+
+
+def test_disabled_writes_synchronously(store, monkeypatch):
+    monkeypatch.setattr(C, "CACHE_WRITE_BEHIND_ENABLED", False)
+    seen = {}
+    n = cache_writer.submit(price_store.MASTER, {"ZZZ": _ohlcv(), "EMPTY": pd.DataFrame()}, ASOF,
+                            on_written=lambda ds, frames: seen.update(frames))
+    assert n == 1 and list(seen) == ["ZZZ"]
+    assert store == [(price_store.MASTER, ["ZZZ"])]
+    assert cache_writer.stats()["depth"] == 0
@@ -0,0 +1,125 @@
+"""
+tests/test_data_providers.py
+────────────────────────────
+Market-data providers (modules/data_providers.py).
+
+Covers:
+  • synthetic series are deterministic per ticker and sliced by period/start
+  • RecordingProvider writes what the inner provider returned and
+    ReplayProvider serves it back with no network
+  • data_pipeline price / fundamentals / screener calls run entirely on the
+    replay provider (yfinance is never touched)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import data_providers as prov
+
+
+def _frame(n=30, start_price=50.0):
+    idx = pd.bdate_range(end=pd.Timestamp("2026-03-31"), periods=n, name="Date")
+    close = start_price + np.arange(n, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                         "Close": close, "Volume": np.full(n, 5e5)}, index=idx)
+
+
+class _FakeLive(prov.ReplayProvider):
+    name = "fake"
+
+    def __init__(self):
+        super().__init__(root=Path("/nonexistent"), synthetic=False)
+        self.calls = []
+
+    def history(self, ticker, period=None, start=None):
+        self.calls.append(("history", ticker))
+        return _frame()
+
+    def bulk_history(self, tickers, period=None, start=None):
+        self.calls.append(("bulk", tuple(tickers)))
+        return {t: _frame(start_price=10.0 * (i + 1)) for i, t in enumerate(tickers)}
+
+    def fundamentals(self, ticker, field):
+        self.calls.append(("fundamentals", ticker))
+        return {"symbol": ticker, "trailingEps": 1.5}
+
+    def screener(self, filters_dict, view="Overview"):
+        self.calls.append(("screener", view))
+        return pd.DataFrame({"Ticker": ["AAA", "BBB"], "Price": [10.0, 20.0]})
+
+
+@pytest.fixture
+def active_provider():
+    prev = prov.get_provider() if prov._active is not None else None
+    yield prov.set_provider
+    prov.set_provider(prev)
+
+
+def test_synthetic_history_is_deterministic_and_trimmed():
+    a, b = prov.synthetic_history("NVDA"), prov.synthetic_history("nvda")
+    pd.testing.assert_frame_equal(a, b)
+    assert not a.equals(prov.synthetic_history("AMD"))
+    assert list(a.columns) == prov.OHLCV and a.index.tz is None
+    assert (a["High"] >= a[["Open", "Close"]].max(axis=1)).all()
+    assert (a["Low"] <= a[["Open", "Close"]].min(axis=1)).all()
+
+    replay = prov.ReplayProvider(root=Path("/nonexistent"), synthetic=True)
+    one_year = replay.history("NVDA", period="1y")
+    assert one_year.index[0] >= a.index[-1] - pd.Timedelta(days=366)
+    since = replay.history("NVDA", start=a.index[-10])
+    assert len(since) == 10
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    live = _FakeLive()
+    rec = prov.RecordingProvider(inner=live, root=tmp_path)
+    rec.history("AAA", period="1y")
+    rec.bulk_history(["BBB", "CCC"], period="6mo")
+    rec.fundamentals("AAA", "info")
+    rec.screener({"Price": "Over $10"}, "Overview")
+
+    replay = prov.ReplayProvider(root=tmp_path, synthetic=False)
+    pd.testing.assert_frame_equal(replay.history("AAA"), _frame(), check_freq=False)
+    frames = replay.bulk_history(["BBB", "CCC", "ZZZ"], period="6mo")
+    assert sorted(frames) == ["BBB", "CCC"]
+    assert frames["CCC"]["Close"].iloc[0] == pytest.approx(20.0)
+    assert replay.fundamentals("AAA", "info")["trailingEps"] == 1.5
+    assert replay.fundamentals("ZZZ", "info") == {}
+    assert list(replay.screener({"Price": "Over $10"})["Ticker"]) == ["AAA", "BBB"]
+    # An unrecorded screen falls back to every ticker with recorded history
+    assert sorted(replay.screener({"Price": "Over $50"})["Ticker"]) == ["AAA", "BBB", "CCC"]
+    assert len(live.calls) == 4
+
+
+def test_pipeline_runs_offline_on_replay(tmp_path, monkeypatch, active_provider, isolated_price_store):
+    from modules import data_pipeline as dp
+    from modules import fundamentals_store
+
+    def _no_network(*args, **kwargs):
+        raise AssertionError("yfinance must not be called in replay mode")
+
+    monkeypatch.setattr(prov.yf, "Ticker", _no_network)
+    monkeypatch.setattr(prov.yf, "download", _no_network)
+    monkeypatch.setattr(dp, "PRICE_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(fundamentals_store, "STORE_DIR", tmp_path / "fundamentals")
+    fundamentals_store.reset()
+    monkeypatch.setattr(C, "DB_ENABLED", False)
+    active_provider(prov.ReplayProvider(root=tmp_path / "rec", synthetic=True))
+
+    df = dp.get_historical("SYNA", period="1y", use_cache=False)
+    assert len(df) > 200 and df["Close"].iloc[-1] > 0
+
+    fund = dp.get_fundamentals("SYNA", use_cache=False)
+    assert fund["info"]["symbol"] == "SYNA"
+
+    monkeypatch.setattr(C, "MARKET_DATA_SYNTHETIC_UNIVERSE", 5)
+    universe = dp.get_universe({"Price": "Over $10"})
+    assert len(universe) <= 5
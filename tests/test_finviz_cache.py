@@ -0,0 +1,157 @@
+"""
+tests/test_finviz_cache.py
+──────────────────────────
+Persistent finviz cache (modules/finviz_cache.py) and its use by
+data_pipeline.get_universe / get_sector_rankings.
+
+Covers:
+  • screener results survive a process restart (reset()) within the TTL
+  • a stricter filter set is answered by narrowing a cached looser one;
+    a filter that cannot be checked locally still goes to finviz
+  • group tables and breadth counts are cached per key and expire
+  • entries written by another process are seen and kept on the next write
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import data_providers, finviz_cache
+
+
+class _FakeFinviz(data_providers.ReplayProvider):
+    name = "fake_finviz"
+    live = True
+
+    def __init__(self):
+        super().__init__(root=Path("/nonexistent"), synthetic=False)
+        self.calls = []
+
+    def screener(self, filters_dict, view="Overview"):
+        self.calls.append(("screener", dict(filters_dict), view))
+        return pd.DataFrame({
+            "Ticker":  ["AAA", "BBB", "CCC", "DDD"],
+            "Country": ["USA", "USA", "China", "USA"],
+            "Price":   [4.0, 12.0, 30.0, 55.0],
+            "Volume":  [1e6, 2e5, 5e5, 3e6],
+        })
+
+    def group_performance(self, group="Sector"):
+        self.calls.append(("group", group))
+        return pd.DataFrame({"Name": ["Technology", "Energy"], "Perf Week": [0.03, -0.01]})
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    from modules import data_pipeline as dp
+    monkeypatch.setattr(finviz_cache, "CACHE_DIR", tmp_path / "finviz")
+    monkeypatch.setattr(dp, "FVF_AVAILABLE", True)
+    monkeypatch.setattr(dp, "_fvf_sleep", lambda *a, **k: None)
+    for name, value in {"FINVIZ_CACHE_TTL_HOURS": 4, "FINVIZ_GROUP_TTL_HOURS": 4,
+                        "FINVIZ_COUNT_TTL_HOURS": 1}.items():
+        monkeypatch.setattr(C, name, value, raising=False)
+    finviz_cache.reset()
+    provider = _FakeFinviz()
+    prev = data_providers.set_provider(provider)
+    yield provider
+    data_providers.set_provider(prev)
+    finviz_cache.reset()
+
+
+def test_screener_persists_across_restart(fake, monkeypatch):
+    from modules import data_pipeline as dp
+    filters = {"Country": "USA", "Price": "Over $5"}
+    assert len(dp.get_universe(filters, verbose=False)) == 4
+    finviz_cache.reset()                                        # new process
+    again = dp.get_universe(filters, verbose=False)
+    assert list(again["Ticker"]) == ["AAA", "BBB", "CCC", "DDD"]
+    assert len(fake.calls) == 1 and finviz_cache.stats()["hits"] == 1
+    assert finviz_cache.has_fresh("screener")
+
+    monkeypatch.setattr(C, "FINVIZ_CACHE_TTL_HOURS", 0)
+    dp.get_universe(filters, verbose=False)
+    assert len(fake.calls) == 2
+
+
+def test_stricter_filters_are_narrowed_locally(fake):
+    from modules import data_pipeline as dp
+    dp.get_universe({"Price": "Over $5"}, verbose=False)
+
+    stricter = dp.get_universe({"Price": "Over $10", "Country": "USA"}, verbose=False)
+    assert list(stricter["Ticker"]) == ["BBB", "DDD"]
+    assert len(fake.calls) == 1 and finviz_cache.stats()["superset_hits"] == 1
+
+    # Looser than the cache, or not checkable from the cached columns → finviz
+    dp.get_universe({"Price": "Over $1"}, verbose=False)
+    dp.get_universe({"Price": "Over $5", "200-Day Simple Moving Average": "Price above SMA200"},
+                    verbose=False)
+    dp.get_universe({"Price": "Over $10"}, view="Performance", verbose=False)
+    assert len(fake.calls) == 4
+
+
+def test_narrow_bounds():
+    df = pd.DataFrame({"Price": [3, 8, 20], "Avg Volume": [5e4, 4e5, 2e6]})
+    out = finviz_cache.narrow(df, {"Average Volume": "Over 100K"},
+                              {"Average Volume": "Over 300K", "Price": "Under $10"})
+    assert list(out["Price"]) == [8]
+    assert finviz_cache.narrow(df, {"Price": "Under $10"}, {"Price": "Under $20"}) is None
+    assert finviz_cache.narrow(df, {"Price": "Over $5"}, {}) is None
+
+
+def test_group_and_count_cache(fake, monkeypatch):
+    from modules import data_pipeline as dp
+    assert len(dp.get_sector_rankings("Sector")) == 2
+    finviz_cache.reset()
+    assert list(dp.get_sector_rankings("Sector")["Name"]) == ["Technology", "Energy"]
+    dp.get_sector_rankings("Industry")
+    assert fake.calls == [("group", "Sector"), ("group", "Industry")]
+
+    from modules import market_env
+    hits = []
+
+    class _Resp:
+        text = "#1 / 4,239 Total"
+
+        def raise_for_status(self):
+            pass
+
+    monkeypatch.setattr(market_env._requests, "get",
+                        lambda url, **kw: hits.append(url) or _Resp())
+    assert market_env._finviz_quick_count("geo_usa,sh_price_o5") == 4239
+    assert market_env._finviz_quick_count("geo_usa,sh_price_o5") == 4239
+    assert len(hits) == 1
+    monkeypatch.setattr(C, "FINVIZ_COUNT_TTL_HOURS", 0)
+    market_env._finviz_quick_count("geo_usa,sh_price_o5")
+    assert len(hits) == 2
+
+
+_OTHER_PROCESS = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from pathlib import Path
+import pandas as pd
+from modules import finviz_cache
+finviz_cache.CACHE_DIR = Path(sys.argv[2])
+finviz_cache.put_count("other", 7)
+finviz_cache.put_group("Sector", pd.DataFrame({"Name": ["Utilities"]}))
+"""
+
+
+def test_entries_of_another_process_are_kept(fake):
+    finviz_cache.put_count("mine", 1)
+    finviz_cache.put_group("Sector", pd.DataFrame({"Name": ["Energy"]}))
+    finviz_cache.get_group("Sector")                            # held in memory
+    subprocess.run([sys.executable, "-c", _OTHER_PROCESS, str(ROOT), str(finviz_cache.CACHE_DIR)],
+                   check=True, timeout=60)
+    assert finviz_cache.get_count("other") == 7
+    assert list(finviz_cache.get_group("Sector")["Name"]) == ["Utilities"]
+    finviz_cache.put_count("later", 2)
+    finviz_cache.reset()
+    assert [finviz_cache.get_count(p) for p in ("mine", "other", "later")] == [1, 7, 2]
@@ -0,0 +1,90 @@
+"""
+tests/test_frame_cache.py
+─────────────────────────
+In-process LRU of price-store frames (modules/frame_cache.py).
+
+Covers:
+  • byte-budget LRU eviction and hit/miss counters
+  • a lookup under a newer data version is a miss
+  • repeat get_enriched() calls are served without reading the store, and a
+    store write (incremental refresh) invalidates the cached frame
+"""
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import frame_cache, trading_calendar
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    frame_cache.clear()
+    yield
+    frame_cache.clear()
+
+
+def _ohlcv(n, start_price=100.0):
+    end = pd.Timestamp(date.today() - timedelta(days=1))
+    idx = pd.bdate_range(end=end, periods=n, name="Date")
+    close = start_price + np.arange(n, dtype=float)
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1,
+        "Close": close, "Volume": np.full(n, 1_000_000.0),
+    }, index=idx)
+
+
+def test_lru_eviction_within_byte_budget(monkeypatch):
+    df = _ohlcv(100)
+    monkeypatch.setattr(C, "FRAME_CACHE_MAX_MB", 2.5 * frame_cache.frame_nbytes(df) / 2**20)
+
+    frame_cache.put("ds", "AAA", 1, df)
+    frame_cache.put("ds", "BBB", 1, df)
+    assert frame_cache.get("ds", "AAA", 1) is df          # AAA now most recent
+    frame_cache.put("ds", "CCC", 1, df)                   # evicts BBB
+
+    assert frame_cache.get("ds", "BBB", 1) is None
+    assert frame_cache.get("ds", "CCC", 1) is df
+    st = frame_cache.stats()
+    assert (st["hits"], st["misses"], st["evictions"], st["entries"]) == (2, 1, 1, 2)
+
+
+def test_new_data_version_is_a_miss():
+    frame_cache.put("ds", "AAA", 1, _ohlcv(10))
+
+    assert frame_cache.get("ds", "AAA", 2) is None
+    assert frame_cache.stats()["entries"] == 0
+
+
+def test_get_enriched_served_from_memory_until_store_write(monkeypatch, isolated_price_store):
+    from modules import data_pipeline as dp, price_store
+
+    today = trading_calendar.cache_asof()
+    raw = _ohlcv(300)
+    price_store.write_frame(price_store.MASTER_ENRICHED, "AAA", dp.get_technicals(raw), today,
+                            meta={"period": "2y"})
+    reads = []
+    real_read = price_store.read_frame
+    monkeypatch.setattr(price_store, "read_frame",
+                        lambda ds, t: reads.append((ds, t)) or real_read(ds, t))
+
+    first = dp.get_enriched("AAA", period="6mo")
+    first["Close"] = 0.0                                   # callers get their own copy
+    second = dp.get_enriched("AAA", period="6mo")
+    assert len(reads) == 1
+    assert (second["Close"] > 0).all()
+
+    price_store.write_frame(price_store.MASTER_ENRICHED, "AAA",
+                            dp.get_technicals(_ohlcv(300, start_price=50.0)), today,
+                            meta={"period": "2y"})
+    third = dp.get_enriched("AAA", period="6mo")
+    assert len(reads) == 2
+    assert third["Close"].iloc[-1] == 50.0 + 299
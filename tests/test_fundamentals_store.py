@@ -0,0 +1,191 @@
+"""
+tests/test_fundamentals_store.py
+────────────────────────────────
+Fundamentals store (modules/fundamentals_store.py) and its use by
+data_pipeline.get_fundamentals / prefetch_fundamentals.
+
+Covers:
+  • per-field TTLs; quarterly fields also expire once the earnings date seen
+    when they were stored has passed, even after .info has moved on
+  • DataFrames round-trip with index and columns; legacy JSON caches import
+  • get_fundamentals re-fetches only expired fields and falls back to stale
+    .info when the live fetch comes back empty
+  • prefetched tickers are store hits for Stage 3
+  • manifest updates are saved in batches and merged with the entries
+    another process saved meanwhile
+"""
+
+import json
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import data_providers, fundamentals_store as fs
+
+DAY = 86400.0
+
+
+class _CountingProvider(data_providers.ReplayProvider):
+    name = "counting"
+    live = False
+
+    def __init__(self, info=None):
+        super().__init__(root=Path("/nonexistent"), synthetic=False)
+        self.calls = []
+        self.info = {"symbol": "T", "shortName": "Test Co"} if info is None else info
+
+    def fundamentals(self, ticker, field):
+        self.calls.append((ticker, field))
+        if field == "info":
+            return dict(self.info)
+        if field == "quarterly_income_stmt":
+            return pd.DataFrame({"2026-03-31": [1.2, 900.0], "2025-12-31": [1.0, 800.0]},
+                                index=["Basic EPS", "Total Revenue"])
+        return pd.DataFrame({"value": [1, 2]})
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs, "STORE_DIR", tmp_path / "fundamentals")
+    monkeypatch.setattr(fs, "LEGACY_DIR", tmp_path)
+    monkeypatch.setattr(C, "FUNDAMENTALS_CACHE_DAYS", 1)
+    monkeypatch.setattr(C, "FUNDAMENTALS_FIELD_TTL_DAYS",
+                        {"quarterly_eps": 45, "earnings_surprise": 45, "eps_trend": 3,
+                         "institutional_holders": 30, "insider_transactions": 3})
+    # Only the TTLs decide here; session-aware freshness is covered in test_trading_calendar
+    monkeypatch.setattr(fs.trading_calendar, "completed_at", lambda now=None: float("inf"))
+    fs.reset()
+    yield fs
+    fs.reset()
+
+
+@pytest.fixture
+def provider(store):
+    from modules import data_pipeline as dp
+    fake = _CountingProvider()
+    prev = data_providers.set_provider(fake)
+    yield fake
+    dp.cancel_prefetch()
+    data_providers.set_provider(prev)
+
+
+def test_field_ttls_and_earnings_expiry(store):
+    eps = pd.DataFrame({"2026-03-31": [1.2]}, index=["Basic EPS"])
+    store.put("abc", {"info": {"symbol": "ABC"}, "quarterly_eps": eps},
+              ts=time.time() - 3 * DAY)
+    entries = store.read("ABC")
+    assert not entries["info"].fresh and entries["info"].age_days == 3
+    assert entries["quarterly_eps"].fresh
+    pd.testing.assert_frame_equal(entries["quarterly_eps"].value, eps)
+    assert store.missing("ABC", ["info", "quarterly_eps", "eps_trend"]) == ["info", "eps_trend"]
+
+    # The company reported yesterday: the stored quarter is superseded
+    store.put("ABC", {"info": {"symbol": "ABC", "earningsTimestamp": time.time() - DAY}})
+    entries = store.read("ABC")
+    assert entries["info"].fresh and not entries["quarterly_eps"].fresh
+    assert store.count_fresh("info") == 1 and store.count_fresh("eps_trend") == 0
+
+    # Stored ahead of a report; by the time .info is refreshed again it
+    # already shows the following quarter's date
+    store.put("XYZ", {"info": {"symbol": "XYZ", "earningsTimestamp": time.time() - DAY},
+                      "quarterly_eps": eps}, ts=time.time() - 3 * DAY)
+    assert store.read("XYZ")["quarterly_eps"].fresh is False
+    store.put("XYZ", {"info": {"symbol": "XYZ", "earningsTimestamp": time.time() + 90 * DAY}})
+    entries = store.read("XYZ")
+    assert entries["info"].fresh and not entries["quarterly_eps"].fresh
+
+
+def test_legacy_cache_is_imported(store, tmp_path):
+    legacy = {"info": {"symbol": "OLD"}, "eps_trend": [{"period": "0q", "current": 1.1}],
+              "quarterly_eps": []}
+    (tmp_path / "OLD_fundamentals.json").write_text(json.dumps(legacy), encoding="utf-8")
+    (tmp_path / "OLD_fundamentals.fmeta").write_text(
+        (date.today() - timedelta(days=2)).isoformat())
+    entries = store.read("OLD")
+    assert set(entries) == {"info", "eps_trend"}           # empty lists were never fetched
+    assert entries["info"].age_days == 2 and entries["eps_trend"].fresh
+    assert entries["eps_trend"].value["current"].iloc[0] == pytest.approx(1.1)
+    assert (store.STORE_DIR / "OLD.json").exists()
+
+
+def test_get_fundamentals_refetches_only_expired_fields(provider, store):
+    from modules import data_pipeline as dp
+
+    first = dp.get_fundamentals("T", scan_mode=False)
+    assert first["fundamentals_source"] == "live"
+    assert "Total Revenue" in first["quarterly_revenue"].index
+    assert len(provider.calls) == len(dp._FUND_FIELDS)
+
+    # Everything fresh → served from the store with the frame index intact
+    provider.calls.clear()
+    cached = dp.get_fundamentals("T", scan_mode=False)
+    assert provider.calls == [] and cached["fundamentals_source"] == "cache_fresh"
+    assert cached["quarterly_eps"].loc["Basic EPS", "2026-03-31"] == pytest.approx(1.2)
+
+    # A day later only .info (and the 3-day fields after 3 days) expire
+    store.put("T", {"info": cached["info"]}, ts=time.time() - DAY)
+    dp.get_fundamentals("T", scan_mode=True)
+    assert provider.calls == [("T", "info")]
+
+
+def test_stale_info_fallback_when_live_info_is_empty(provider, store, monkeypatch):
+    from modules import data_pipeline as dp
+    monkeypatch.setattr(C, "YFINANCE_MAX_RETRIES", 0)
+    monkeypatch.setattr(dp, "_compose_free_fundamentals_fallback", lambda t: None)
+    store.put("T", {"info": {"symbol": "T"}}, ts=time.time() - 2 * DAY)
+    provider.info = {}
+    result = dp.get_fundamentals("T", scan_mode=True)
+    assert result["fundamentals_source"] == "cache_stale"
+    assert result["info"]["symbol"] == "T" and result["stale_age_days"] == 2
+
+
+def test_prefetch_warms_the_store(provider, store):
+    from modules import data_pipeline as dp
+
+    assert dp.prefetch_fundamentals(["AAA", "BBB", "AAA"]) == 2
+    deadline = time.monotonic() + 5
+    while dp.get_prefetch_status()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert {t for t, _ in provider.calls} == {"AAA", "BBB"}
+
+    provider.calls.clear()
+    assert dp.prefetch_fundamentals(["AAA"]) == 0              # already fresh
+    assert dp.get_fundamentals("BBB", scan_mode=True)["fundamentals_source"] == "cache_fresh"
+    assert provider.calls == []
+
+
+_OTHER_PROCESS = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from pathlib import Path
+from modules import fundamentals_store as fs
+fs.STORE_DIR = Path(sys.argv[2])
+fs.put("OTHER", {"info": {"symbol": "OTHER"}})
+fs.drop("GONE")
+"""
+
+
+def test_manifest_batches_and_merges_other_processes(store, monkeypatch):
+    monkeypatch.setattr(C, "FUNDAMENTALS_MANIFEST_BATCH", 3)
+    manifest = store.STORE_DIR / "manifest.json"
+    store.put("GONE", {"info": {"symbol": "GONE"}})
+    store.flush()
+    store.put("MINE", {"info": {"symbol": "MINE"}})
+    assert set(json.loads(manifest.read_text())) == {"GONE"}     # not saved yet
+    subprocess.run([sys.executable, "-c", _OTHER_PROCESS, str(ROOT), str(store.STORE_DIR)],
+                   check=True, timeout=60)                         # saves at exit
+    assert set(json.loads(manifest.read_text())) == {"OTHER"}
+    assert store.stats()["tickers"] == 2                         # re-read, own update kept
+    store.put("B", {"info": {"symbol": "B"}})
+    store.put("C", {"info": {"symbol": "C"}})                    # third update → saved
+    assert set(json.loads(manifest.read_text())) == {"OTHER", "MINE", "B", "C"}
+    assert not list(store.STORE_DIR.glob("*.tmp"))
@@ -0,0 +1,68 @@
+"""
+tests/test_indicator_engine.py
+──────────────────────────────
+Incremental indicator engine vs the batch get_technicals() computation.
+
+Covers:
+  • appending new bars from saved state matches a full recompute
+  • rewinding to the last unchanged bar when overlapping bars are restated
+  • falling back (None) when the cached history was restated
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+
+from modules import data_pipeline as dp
+from modules import indicator_engine as ie
+
+
+def _assert_matches_batch(out, batch):
+    assert list(out.columns) == list(batch.columns)
+    assert out.index.equals(batch.index)
+    num = [c for c in batch.columns if batch[c].dtype != bool]
+    flags = [c for c in batch.columns if batch[c].dtype == bool]
+    np.testing.assert_allclose(out[num].to_numpy(float), batch[num].to_numpy(float),
+                               rtol=1e-9, atol=1e-9)
+    assert (out[flags] == batch[flags]).all().all()
+
+
+@pytest.mark.parametrize("n_new", [1, 5, 60])
+def test_extend_matches_batch_computation(n_new, synthetic_ohlcv):
+    raw = synthetic_ohlcv()
+    prefix = dp.get_technicals(raw.iloc[:-n_new])
+    state = ie.seed_state(prefix)
+
+    out, new_state = ie.extend(prefix, state, raw)
+
+    _assert_matches_batch(out, dp.get_technicals(raw))
+    assert new_state.index[-1] == raw.index[-1]
+    assert len(new_state) == len(state)
+
+
+def test_extend_rewinds_past_restated_overlap(monkeypatch, synthetic_ohlcv):
+    monkeypatch.setattr(C, "INDICATOR_STATE_BARS", 10)
+    raw = synthetic_ohlcv()
+    cached_raw = raw.iloc[:-3].copy()
+    cached_raw.iloc[-2:, cached_raw.columns.get_loc("Close")] *= 1.01   # intraday bars
+    prefix = dp.get_technicals(cached_raw)
+
+    out, _state = ie.extend(prefix, ie.seed_state(prefix), raw)
+
+    _assert_matches_batch(out, dp.get_technicals(raw))
+
+
+def test_extend_refuses_restated_history(synthetic_ohlcv):
+    raw = synthetic_ohlcv()
+    prefix = dp.get_technicals(raw.iloc[:-5])
+    restated = raw.copy()
+    restated[["Open", "High", "Low", "Close"]] *= 0.5     # split back-adjustment
+
+    assert ie.extend(prefix, ie.seed_state(prefix), restated) is None
@@ -0,0 +1,84 @@
+"""
+tests/test_indicators.py
+────────────────────────
+NumPy indicator kernels (modules/indicators.py).
+
+Covers:
+  • closed-form rolling slope vs the per-window np.polyfit definition
+  • NaN semantics (incomplete windows, NaN inside a window, zero base)
+  • 2-D (dates × tickers) batched variant equals the per-column result
+  • panel views (modules/panel.py) equal single-ticker computation, including
+    tickers with a shorter history or a hole on the shared date axis
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules import indicators, panel
+
+
+def _polyfit_slope_pct(values, window):
+    def slope(arr):
+        if len(arr) < 2 or np.isnan(arr).any():
+            return np.nan
+        x = np.arange(len(arr), dtype=float)
+        base = arr[0] if arr[0] != 0 else 1.0
+        return np.polyfit(x, arr, 1)[0] / base * 100
+
+    return pd.Series(values).rolling(window).apply(slope, raw=True).to_numpy()
+
+
+def _series(n=600, seed=3):
+    rng = np.random.default_rng(seed)
+    y = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    y[:199] = np.nan          # SMA_200 warm-up
+    y[350] = np.nan
+    y[420] = 0.0
+    return y
+
+
+def test_rolling_slope_matches_polyfit():
+    y = _series()
+    expected = _polyfit_slope_pct(y, 22)
+    got = indicators.rolling_slope_pct(y, 22)
+
+    assert np.array_equal(np.isnan(got), np.isnan(expected))
+    np.testing.assert_allclose(got, expected, rtol=1e-7, atol=1e-9)
+
+
+def test_rolling_slope_batched_matches_columns():
+    cols = [_series(seed=s) for s in range(4)] + [np.full(600, np.nan)]
+    panel = np.column_stack(cols)
+
+    got = indicators.rolling_slope_pct(panel, 22)
+
+    for k, col in enumerate(cols):
+        np.testing.assert_allclose(got[:, k], indicators.rolling_slope_pct(col, 22),
+                                   rtol=1e-9, atol=1e-12)
+
+
+def test_rolling_slope_short_input_is_nan():
+    assert np.isnan(indicators.rolling_slope_pct(np.arange(10.0), 22)).all()
+
+
+def test_panel_views_match_single_ticker(synthetic_ohlcv):
+    frames = {f"T{i}": synthetic_ohlcv(seed=i) for i in range(4)}
+    frames["SHORT"] = synthetic_ohlcv(300, seed=9).set_axis(frames["T0"].index[220:])
+    frames["HOLE"] = synthetic_ohlcv(seed=11).drop(frames["T0"].index[100])
+
+    p = panel.build_panel(frames)
+
+    assert sorted(p) == sorted(frames)
+    for tkr, df in frames.items():
+        single = panel.build_panel({tkr: df})[tkr]
+        got = p[tkr]
+        assert list(got.columns) == list(single.columns)
+        assert got.index.equals(df.index)
+        pd.testing.assert_frame_equal(got, single, rtol=1e-9, atol=1e-9)
+    assert p.last("Close")["HOLE"] == frames["HOLE"]["Close"].iloc[-1]
@@ -0,0 +1,60 @@
+"""
+tests/test_lazy_frame.py
+────────────────────────
+Column-on-demand enriched frames (modules/lazy_frame.py).
+
+Covers:
+  • reading one column computes only it and its inputs
+  • to_frame() equals the full get_technicals() frame
+  • rows= views equal the tail of the full-history computation
+  • selective get_technicals(indicators=[…]) skips unknown names
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules import data_pipeline as dp
+from modules import indicators
+from modules.lazy_frame import LazyFrame
+
+
+def test_reading_a_column_computes_only_its_inputs(monkeypatch, synthetic_ohlcv):
+    computed = []
+    real = indicators.compute_column
+    monkeypatch.setattr(indicators, "compute_column",
+                        lambda name, get: computed.append(name) or real(name, get))
+    lf = LazyFrame(synthetic_ohlcv())
+
+    assert "SMA_200" in lf.columns
+    lf["ABOVE_SMA50"]
+    lf["ABOVE_SMA50"]
+
+    assert computed == ["ABOVE_SMA50", "SMA_50"]
+
+
+def test_to_frame_matches_get_technicals(synthetic_ohlcv):
+    df = synthetic_ohlcv()
+    pd.testing.assert_frame_equal(LazyFrame(df).to_frame(),
+                                  dp.get_technicals(df, backend="numpy"))
+
+
+def test_rows_view_is_tail_of_full_history(synthetic_ohlcv):
+    df = synthetic_ohlcv()
+    full = dp.get_technicals(df, backend="numpy")
+    lf = LazyFrame(df, rows=60)
+
+    assert len(lf) == 60 and lf.index.equals(df.index[-60:])
+    pd.testing.assert_series_equal(lf["SMA200_SLOPE"], full["SMA200_SLOPE"].iloc[-60:])
+    assert lf.last(["EMA_21"])["EMA_21"] == full["EMA_21"].iloc[-1]
+
+
+def test_selective_get_technicals_skips_unknown_names(synthetic_ohlcv):
+    df = synthetic_ohlcv()
+    out = dp.get_technicals(df, indicators=["EMA_9", "SMA_20", "NOT_AN_INDICATOR"])
+
+    assert list(out.columns) == ["Open", "High", "Low", "Close", "Volume", "EMA_9", "SMA_20"]
@@ -0,0 +1,144 @@
+"""
+tests/test_price_cache.py
+─────────────────────────
+Price cache behaviour of the data pipeline.
+
+Covers:
+  • incremental OHLCV refresh — appending only the missing bars
+  • split/dividend restatement detection via adjusted-price drift
+  • period-agnostic master series — shorter periods served as slices
+  • streaming batch download — tickers are yielded per batch while the next
+    batch is still downloading
+"""
+
+import sys
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+
+
+def _ohlcv(index, start_price=100.0):
+    close = start_price + np.arange(len(index), dtype=float)
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1,
+        "Close": close, "Volume": np.full(len(index), 1_000_000.0),
+    }, index=index)
+
+
+def _recent_bdays(n):
+    end = pd.Timestamp(date.today() - timedelta(days=1))
+    return pd.bdate_range(end=end, periods=n, name="Date")
+
+
+def test_merge_incremental_appends_new_bars():
+    from modules import data_pipeline as dp
+
+    idx = _recent_bdays(60)
+    full = _ohlcv(idx)
+    cached = full.iloc[:55]
+    fresh = full.iloc[50:]          # 5 overlapping bars + 5 new bars
+
+    merged = dp._merge_incremental(cached, fresh, "2y")
+
+    assert merged is not None
+    assert len(merged) == 60
+    assert merged.index[-1] == idx[-1]
+    pd.testing.assert_frame_equal(merged, full[merged.columns], check_freq=False)
+
+
+def test_merge_incremental_rejects_restated_history(monkeypatch):
+    from modules import data_pipeline as dp
+
+    monkeypatch.setattr(C, "PRICE_INCREMENTAL_DRIFT_TOL", 0.002)
+    idx = _recent_bdays(60)
+    cached = _ohlcv(idx[:55])
+    restated = _ohlcv(idx[50:], start_price=50.0 + 25.0)   # 2:1 split back-adjusted
+
+    assert dp._merge_incremental(cached, restated, "2y") is None
+
+
+def test_batch_incremental_downloads_only_missing_bars(monkeypatch):
+    from modules import data_pipeline as dp, data_providers as prov
+
+    idx = _recent_bdays(60)
+    full = {"AAA": _ohlcv(idx), "BBB": _ohlcv(idx, start_price=20.0)}
+    cached = {t: df.iloc[:58] for t, df in full.items()}
+    calls = []
+
+    def _fake_download(tickers, start=None, **kwargs):
+        calls.append({"tickers": list(tickers), "start": start, **kwargs})
+        since = pd.Timestamp(start)
+        frames = {t: full[t][full[t].index >= since] for t in tickers}
+        return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1)
+
+    monkeypatch.setattr(prov.yf, "download", _fake_download)
+
+    merged, need_full = dp._refresh_batch_incremental(cached, "2y")
+
+    assert need_full == []
+    assert len(calls) == 1 and "period" not in calls[0]
+    assert pd.Timestamp(calls[0]["start"]) == idx[58 - C.PRICE_INCREMENTAL_OVERLAP_BARS]
+    for tkr in full:
+        assert len(merged[tkr]) == 60
+
+
+def test_shorter_periods_are_sliced_from_master(monkeypatch, isolated_price_store):
+    from modules import data_pipeline as dp, data_providers as prov
+
+    monkeypatch.setattr(C, "YFINANCE_INTRA_REQUEST_DELAY_SEC", 0, raising=False)
+    idx = _recent_bdays(520)
+    periods = []
+
+    class _FakeTicker:
+        def __init__(self, ticker):
+            pass
+
+        def history(self, period=None, **kwargs):
+            periods.append(period)
+            return _ohlcv(idx)
+
+    monkeypatch.setattr(prov.yf, "Ticker", _FakeTicker)
+
+    six_mo = dp.get_historical("AAA", period="6mo")
+    two_y = dp.get_historical("AAA", period="2y")
+    one_y = dp.get_historical("AAA", period="1y")
+
+    assert periods == [C.PRICE_MASTER_PERIOD]
+    assert two_y.index[-1] == six_mo.index[-1] == one_y.index[-1] == idx[-1]
+    assert len(six_mo) < len(one_y) < len(two_y)
+    assert six_mo.index[0] >= idx[-1] - pd.DateOffset(months=6)
+
+
+def test_stream_yields_batches_before_download_finishes(monkeypatch, isolated_price_store):
+    from modules import cache_writer, data_pipeline as dp, data_providers as prov
+
+    monkeypatch.setattr(C, "STAGE2_BATCH_SIZE", 2)
+    idx = _recent_bdays(300)
+    release = threading.Event()
+
+    class _SlowBulk(prov.ReplayProvider):
+        def bulk_history(self, tickers, period=None, start=None):
+            if "CCC" in tickers:
+                assert release.wait(5), "second batch was not overlapped with the consumer"
+            return {t: _ohlcv(idx, start_price=10.0 * (i + 1)) for i, t in enumerate(tickers)}
+
+    prev = prov.set_provider(_SlowBulk(root=Path("/nonexistent"), synthetic=False))
+    try:
+        stream = dp.stream_download_and_enrich(["AAA", "BBB", "CCC", "DDD"], period="1y")
+        first = [next(stream)[0], next(stream)[0]]
+        assert first == ["AAA", "BBB"]
+        release.set()                       # only now may the second batch finish
+        rest = dict(stream)
+    finally:
+        prov.set_provider(prev)
+        cache_writer.flush(timeout=10)
+    assert sorted(rest) == ["CCC", "DDD"]
+    assert "SMA_50" in rest["CCC"].columns
@@ -0,0 +1,212 @@
+"""
+tests/test_rs_ranking.py
+────────────────────────
+RS rank lookups through the in-memory snapshot (modules/rs_ranking.py).
+
+Covers:
+  • single and batch lookups are case-insensitive, keyed as passed in, and
+    return RS_NOT_RANKED for tickers outside the universe
+  • compute=False loads a stale rs_cache.csv but never rebuilds the universe
+  • concurrent first lookups load the rankings once; a reload swaps in a new
+    snapshot without touching the one readers already hold
+  • RS histories read through a snapshot are kept in a bounded LRU
+  • rankings from the persisted close matrix (modules/rs_matrix.py): a daily
+    update downloads only the newest sessions, reloads a restated ticker in
+    full, matches a full rebuild and adds the new sessions to the rank history
+  • the point-in-time back-fill ranks each past session as a ranking run on
+    that day would have, leaves sessions without a year of history unranked,
+    and flags RS-line new highs (also ahead of price); a stale dataset is
+    extended by its new sessions to the same values as a full back-fill
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import data_providers as prov
+from modules import price_store, rs_matrix
+from modules import rs_ranking as rs
+from modules.rs_ranking import RS_NOT_RANKED
+
+
+def _ranking(n=20, asof="2026-10-16", shift=0.0):
+    return pd.DataFrame({"Ticker": [f"T{i}" for i in range(n)],
+                         "RS_Raw": [float(i) for i in range(n)],
+                         "RS_Rank": [float(min(99, i * 5 + 1 + shift)) for i in range(n)],
+                         "CacheDate": asof})
+
+
+@pytest.fixture
+def rankings(tmp_path, monkeypatch):
+    """Empty in-memory state, a temp cache file, and a counting compute_rs_rankings."""
+    monkeypatch.setattr(rs, "RS_CACHE_FILE", tmp_path / "rs_cache.csv")
+    monkeypatch.setattr(rs, "_snapshot", rs.RSSnapshot())
+    monkeypatch.setattr(rs, "_rs_df", rs._snapshot.df)
+    calls = []
+
+    def fake_compute(universe=None, force_refresh=False):
+        calls.append(force_refresh)
+        return _ranking(shift=len(calls) - 1)
+
+    monkeypatch.setattr(rs, "compute_rs_rankings", fake_compute)
+    return calls
+
+
+def test_single_and_batch_lookups(rankings):
+    assert rs.get_rs_rank("t3") == 16.0
+    assert rs.get_rs_ranks(["T3", "t19", "NOPE"]) == {"T3": 16.0, "t19": 96.0, "NOPE": RS_NOT_RANKED}
+    assert rs.get_rs_dataframe().equals(_ranking())
+    assert list(rs.get_rs_top(90.0)["Ticker"]) == ["T19", "T18"]
+    assert rankings == [False]
+
+
+def test_compute_false_uses_stale_cache_only(rankings):
+    assert rs.get_rs_ranks(["T1"], compute=False) == {"T1": RS_NOT_RANKED}
+    _ranking(asof="2020-01-02").to_csv(rs.RS_CACHE_FILE, index=False)
+    assert rs.get_rs_ranks(["T1"], compute=False) == {"T1": 6.0}
+    assert rs.get_rs_rank_lightweight("T2") == 11.0
+    assert rs._snapshot.asof == "2020-01-02"
+    assert rankings == []
+
+
+def test_concurrent_load_and_atomic_swap(rankings):
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def worker():
+        barrier.wait()
+        seen.append(rs.get_rs_ranks(["T0", "T10"]))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert rankings == [False]
+    assert seen == [{"T0": 1.0, "T10": 51.0}] * 8
+
+    held = rs._ensure_rs_loaded()
+    rs.get_rs_rank("T0", force_refresh=True)
+    assert rs._snapshot is not held and rs.get_rs_rank("T0") == 2.0
+    assert held.rank("T0") == 1.0 and rs._rs_df is rs._snapshot.df
+
+
+def test_history_lru_is_bounded(monkeypatch):
+    reads = []
+    monkeypatch.setattr(C, "RS_HISTORY_LRU_SIZE", 2)
+    monkeypatch.setattr(rs_matrix, "rank_history",
+                        lambda tickers, days=None: reads.append(tickers[0]) or
+                        pd.DataFrame({tickers[0]: [50.0]}, index=pd.DatetimeIndex(["2026-10-16"])))
+    monkeypatch.setattr(rs_matrix, "point_in_time",
+                        lambda ticker, days=None: pd.DataFrame(columns=["rs_rank"], dtype=float))
+    snap = rs.RSSnapshot()
+    for t in ("AAA", "BBB", "aaa", "CCC", "AAA", "BBB"):
+        assert snap.history(t, days=30)["rs_rank"].tolist() == [50.0]
+    assert reads == ["AAA", "BBB", "CCC", "BBB"]    # BBB was the least recently used
+    assert list(snap._history) == [("AAA", 30), ("BBB", 30)]
+
+
+class _MatrixProvider(prov.ReplayProvider):
+    """Serves closes from a fixed matrix and records every request."""
+
+    def __init__(self, closes):
+        super().__init__(root=Path("/nonexistent"), synthetic=False)
+        self.closes, self.calls = closes, []
+
+    def bulk_history(self, tickers, period=None, start=None):
+        self.calls.append((len(tickers), start))
+        rows = self.closes if start is None else self.closes[self.closes.index >= pd.Timestamp(start)]
+        return {t: pd.DataFrame({"Close": rows[t]}) for t in tickers if t in rows}
+
+
+def test_incremental_matches_rebuild(tmp_path, monkeypatch):
+    monkeypatch.setattr(rs, "RS_CACHE_FILE", tmp_path / "rs_cache.csv")
+    monkeypatch.setattr(rs_matrix, "RS_DIR", tmp_path / "rs")
+    monkeypatch.setattr(C, "DB_ENABLED", False)
+    monkeypatch.setattr(C, "RS_INCREMENTAL_ENABLED", True, raising=False)
+    idx = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.offsets.BDay(1), periods=300, name="Date")
+    rng = np.random.default_rng(7)
+    closes = pd.DataFrame(50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (300, 40)), axis=0)),
+                          index=idx, columns=[f"T{i}" for i in range(40)])
+    universe = list(closes.columns)
+    feed = _MatrixProvider(closes)
+    monkeypatch.setattr(rs, "get_provider", lambda: feed)
+
+    rebuilt = rs.compute_rs_rankings(universe, force_refresh=True, rebuild=True)
+    assert len(rebuilt) == 40 and list(rs_matrix.rank_history().index) == [idx[-1]]
+
+    # Matrix as of three sessions ago, with T5 split-adjusted since then
+    stale = rs_matrix.load_closes().iloc[:-3]
+    stale["T5"] *= 2
+    rs_matrix.save_closes(stale)
+    feed.calls.clear()
+    updated = rs.compute_rs_rankings(universe, force_refresh=True)
+    assert feed.calls[0] == (40, stale.index[-5].date())   # overlap + new sessions only
+    assert feed.calls[1:] == [(1, None)]                   # T5 reloaded in full
+    pd.testing.assert_frame_equal(updated, rebuilt)
+    assert list(rs_matrix.rank_history().index) == list(idx[-3:])
+    assert rs_matrix.rank_history(["t0"], days=30)["T0"].iloc[-1] == \
+        updated.set_index("Ticker").loc["T0", "RS_Rank"]
+
+
+def test_point_in_time_backfill(tmp_path, monkeypatch, isolated_price_store):
+    monkeypatch.setattr(rs_matrix, "RS_DIR", tmp_path / "rs")
+    monkeypatch.setattr(C, "DB_ENABLED", False)
+    idx = pd.bdate_range(end="2026-10-16", periods=450, name="Date")
+    rng = np.random.default_rng(11)
+    closes = pd.DataFrame(50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (450, 40)), axis=0)),
+                          index=idx, columns=[f"T{i}" for i in range(40)])
+    t = np.arange(450)
+    closes["T0"] = 20 * np.exp(0.003 * t)           # steady leader
+    closes["T1"] = 50 * np.exp(-0.001 * t)          # falls slower than the benchmark
+    closes.loc[idx[:200], "T39"] = np.nan           # listed later
+    spy = pd.DataFrame({"Close": 400 * np.exp(-0.002 * t)}, index=idx)
+    monkeypatch.setattr(rs, "get_historical", lambda ticker, period="2y": spy)
+
+    # Two years in the store for most tickers; the last year only for T30+
+    price_store.write_frames(price_store.MASTER, {c: closes[[c]].rename(columns={c: "Close"})
+                                                  for c in closes.columns[:30]}, "2026-10-16")
+    rs_matrix.save_closes(prov.trim(closes, "1y"))
+    summary = rs.backfill_rs_history()
+    assert summary["tickers"] == 40 and summary["last"] == "2026-10-16"
+    cached = closes.copy()
+    cached.loc[cached.index <= idx[-1] - pd.DateOffset(years=1), closes.columns[30:]] = np.nan
+
+    def ranked_on(day):
+        window = prov.trim(cached[cached.index <= day], "1y")
+        return rs._percentile_ranks(rs._calculate_returns(window).to_frame().T).iloc[0]
+
+    for day in (idx[-1], idx[-120]):
+        pit = {c: rs.get_rs_point_in_time(c).loc[day, "rs_rank"] for c in closes.columns}
+        pd.testing.assert_series_equal(pd.Series(pit), ranked_on(day), check_names=False)
+    t0 = rs.get_rs_point_in_time("t0")
+    assert t0["rs_rank"].iloc[:250].isna().all() and t0["rs_rank"].iloc[-130:].notna().all()
+    assert t0["rs_line"].iloc[-1] == pytest.approx(closes["T0"].iloc[-1] / spy["Close"].iloc[-1])
+    assert t0["rs_line_new_high"].iloc[-1] and not t0["rs_line_high_before_price"].iloc[-1]
+    t1 = rs.get_rs_point_in_time("T1")
+    assert t1["rs_line_new_high"].iloc[-1] and t1["rs_line_high_before_price"].iloc[-1]
+    assert rs.get_rs_point_in_time("NOPE").empty
+    trend = rs.RSSnapshot().history("T1", days=30)
+    assert list(trend.columns) == ["rank_date", "rs_rank", "rs_line", "rs_line_new_high"]
+    assert trend["rs_rank"].iloc[-1] == t1["rs_rank"].iloc[-1]
+
+    # A dataset five sessions behind the close matrix is extended, not rebuilt
+    full = {f: rs_matrix._read(f) for f in (rs_matrix.PIT_RANK_FILE, rs_matrix.PIT_LINE_FILE,
+                                            rs_matrix.PIT_FLAGS_FILE)}
+    rs_matrix.save_point_in_time(*(df.iloc[:-5] for df in full.values()))
+    calls = []
+    backfill = rs.backfill_rs_history
+    monkeypatch.setattr(rs, "backfill_rs_history",
+                        lambda **kw: calls.append(kw) or backfill(**kw))
+    assert rs.ensure_rs_history() and calls == [{"since": idx[-6]}]
+    for name, df in full.items():
+        pd.testing.assert_frame_equal(rs_matrix._read(name), df)
+    assert rs.ensure_rs_history() and len(calls) == 1      # up to date
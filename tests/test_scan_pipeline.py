@@ -0,0 +1,93 @@
+"""
+tests/test_scan_pipeline.py
+───────────────────────────
+Pipelined Stage 2 → Stage 3 scoring (modules/scan_pipeline.py).
+
+Covers:
+  • rows are scored while the producer is still adding rows, and progress
+    callbacks report whether Stage 2 is still feeding
+  • the queue is bounded: put() blocks while Stage 3 is that far behind
+  • a failing row does not stop the others; cancel stops scoring and put()
+  • run_qm_scan's pipelined Stage 2 → 3 scores the same rows as the
+    sequential run_qm_stage3
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import qm_screener as qm
+from modules.scan_pipeline import Stage3Pipeline
+
+
+def test_scores_while_feeding():
+    first = threading.Event()
+    seen = []
+
+    def score(row):
+        first.set()
+        return row * 10
+
+    pipe = Stage3Pipeline(score, workers=2, maxsize=4,
+                          on_scored=lambda row, res, done, sub, feeding: seen.append(feeding))
+    pipe.put(1)
+    assert first.wait(5)            # scored before the producer is done
+    for i in range(2, 6):
+        pipe.put(i)
+    assert sorted(pipe.close()) == [10, 20, 30, 40, 50]
+    assert pipe.done == pipe.submitted == 5 and seen[0] is True
+
+
+def test_bounded_queue_blocks_producer():
+    release = threading.Event()
+    pipe = Stage3Pipeline(lambda row: release.wait(5) and row, workers=1, maxsize=2)
+    producer = threading.Thread(target=lambda: [pipe.put(i) for i in range(5)])
+    producer.start()
+    time.sleep(0.3)
+    assert producer.is_alive()      # one row in the worker, two queued, the rest waiting
+    release.set()
+    producer.join(5)
+    assert not producer.is_alive() and sorted(pipe.close()) == [0, 1, 2, 3, 4]
+
+
+def test_errors_and_cancel():
+    def score(row):
+        if row == 2:
+            raise ValueError("bad row")
+        return row
+
+    with Stage3Pipeline(score, workers=2) as pipe:
+        for i in range(4):
+            pipe.put(i)
+    assert sorted(pipe.results) == [0, 1, 3]
+
+    stop = threading.Event()
+    stop.set()
+    pipe = Stage3Pipeline(lambda row: row, workers=2, cancelled=stop.is_set)
+    assert pipe.put(1) is False and pipe.close() == [] and pipe.submitted == 0
+
+
+def test_qm_pipelined_matches_sequential(monkeypatch):
+    from modules import data_pipeline
+    frames = {f"T{i}": pd.DataFrame({"Close": [float(i)]}) for i in range(30)}
+    monkeypatch.setattr(data_pipeline, "stream_download_and_enrich",
+                        lambda tickers, **kw: iter(frames.items()))
+    monkeypatch.setattr(qm, "_attach_rs_ranks", lambda rows: None)
+    monkeypatch.setattr(qm, "_check_qm_stage2",
+                        lambda t, df: {"ticker": t, "adr": 5.0, "dollar_volume_m": 10.0}
+                        if int(t[1:]) % 3 else None)
+    monkeypatch.setattr(qm, "_score_qm_row",
+                        lambda row, enriched_cache=None: {**row, "qm_star": int(row["ticker"][1:]) / 10})
+    monkeypatch.setattr(C, "QM_SCAN_TOP_N", 50, raising=False)
+
+    s2_rows, df_pipe = qm._run_qm_stage2_3_pipelined(list(frames), verbose=False)
+    df_seq = qm.run_qm_stage3(qm.run_qm_stage2(list(frames), verbose=False))
+    assert len(s2_rows) == 20
+    pd.testing.assert_frame_equal(df_pipe, df_seq)
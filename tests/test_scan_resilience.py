@@ -23,7 +23,8 @@ import trader_config as C
 
 
 def test_get_fundamentals_uses_stale_cache_when_live_empty(tmp_path, monkeypatch):
-    from modules import data_pipeline as dp
+    from modules import data_pipeline as dp, data_providers as prov
+    from modules import fundamentals_store
 
     ticker = "ZZZZ"
     cache_file = tmp_path / f"{ticker}_fundamentals.json"
@@ -43,7 +44,12 @@ def test_get_fundamentals_uses_stale_cache_when_live_empty(tmp_path, monkeypatch
     cache_file.write_text(json.dumps(stale_payload), encoding="utf-8")
     meta_file.write_text((date.today() - timedelta(days=3)).isoformat(), encoding="utf-8")
 
-    monkeypatch.setattr(dp, "PRICE_CACHE_DIR", tmp_path)
+    # A legacy {T}_fundamentals.json cache, imported by the fundamentals store
+    monkeypatch.setattr(fundamentals_store, "LEGACY_DIR", tmp_path)
+    monkeypatch.setattr(fundamentals_store, "STORE_DIR", tmp_path / "fundamentals")
+    fundamentals_store.reset()
+    # Only the TTL decides here, whatever the day of the week
+    monkeypatch.setattr(fundamentals_store.trading_calendar, "completed_at", lambda now=None: float("inf"))
     monkeypatch.setattr(C, "DB_ENABLED", False)
     monkeypatch.setattr(C, "FUNDAMENTALS_CACHE_DAYS", 1)
     monkeypatch.setattr(C, "FUNDAMENTALS_USE_STALE_FALLBACK", True)
@@ -63,7 +69,7 @@ def test_get_fundamentals_uses_stale_cache_when_live_empty(tmp_path, monkeypatch
         def get_insider_transactions(self):
             return []
 
-    monkeypatch.setattr(dp.yf, "Ticker", _FakeTicker)
+    monkeypatch.setattr(prov.yf, "Ticker", _FakeTicker)
 
     out = dp.get_fundamentals(ticker, use_cache=True, scan_mode=True)
 
@@ -132,7 +138,7 @@ def test_stage3_shuffle_changes_processing_order(monkeypatch):
 
 
 def test_get_fundamentals_uses_finviz_fallback_when_live_empty(monkeypatch):
-    from modules import data_pipeline as dp
+    from modules import data_pipeline as dp, data_providers as prov
 
     ticker = "AAPL"
 
@@ -155,7 +161,7 @@ def test_get_fundamentals_uses_finviz_fallback_when_live_empty(monkeypatch):
         def get_insider_transactions(self):
             return []
 
-    monkeypatch.setattr(dp.yf, "Ticker", _FakeTicker)
+    monkeypatch.setattr(prov.yf, "Ticker", _FakeTicker)
 
     monkeypatch.setattr(
         dp,
@@ -186,7 +192,7 @@ def test_get_fundamentals_uses_finviz_fallback_when_live_empty(monkeypatch):
 
 
 def test_get_fundamentals_uses_sec_finviz_composite_fallback(monkeypatch):
-    from modules import data_pipeline as dp
+    from modules import data_pipeline as dp, data_providers as prov
 
     ticker = "MSFT"
 
@@ -206,7 +212,7 @@ def test_get_fundamentals_uses_sec_finviz_composite_fallback(monkeypatch):
         def get_insider_transactions(self):
             return []
 
-    monkeypatch.setattr(dp.yf, "Ticker", _FakeTicker)
+    monkeypatch.setattr(prov.yf, "Ticker", _FakeTicker)
 
     sec_fb = {
         "ticker": ticker,
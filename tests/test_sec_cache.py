@@ -0,0 +1,151 @@
+"""
+tests/test_sec_cache.py
+───────────────────────
+Disk-backed SEC cache (modules/sec_cache.py) against a local stub server.
+
+Covers:
+  • ticker map and companyfacts are stored gzip-compressed and survive a
+    process restart (reset()) without a download
+  • after SEC_CACHE_REVALIDATE_HOURS the copy is revalidated with
+    If-None-Match; 304 keeps it, 200 replaces it
+  • repeat lookups are served from the series LRU without touching disk,
+    and companyfacts files are evicted past SEC_CACHE_MAX_MB
+  • data_pipeline's SEC fallback computes YoY growth from the cached series
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import sec_cache
+
+
+def _facts(eps_now=2.0, eps_prior=1.0, padding=0):
+    points = [
+        {"form": "10-Q", "val": eps_prior, "fp": "Q1", "fy": 2025, "end": "2025-03-31",
+         "accn": "0000000000-25-000001", "frame": "CY2025Q1"},
+        {"form": "10-Q", "val": eps_now, "fp": "Q1", "fy": 2026, "end": "2026-03-31",
+         "accn": "0000000000-26-000001", "frame": "CY2026Q1"},
+    ]
+    return {"cik": 1, "entityName": "Demo", "facts": {"us-gaap": {
+        "EarningsPerShareDiluted": {"units": {"USD/shares": points}},
+        "Filler": {"units": {"USD": [{"val": i} for i in range(padding)]}},
+    }}}
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    docs: dict = {}                # path → (etag, payload)
+    hits: list = []
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        _Stub.hits.append((path, self.headers.get("If-None-Match")))
+        if path not in _Stub.docs:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag, payload = _Stub.docs[path]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sec(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    _Stub.docs = {
+        "/files/company_tickers.json": ('"t1"', {"0": {"cik_str": 1, "ticker": "DEMO"},
+                                                  "1": {"cik_str": 2, "ticker": "BIG"}}),
+        "/api/xbrl/companyfacts/CIK0000000001.json": ('"f1"', _facts()),
+        "/api/xbrl/companyfacts/CIK0000000002.json": ('"f2"', _facts(padding=3000)),
+    }
+    _Stub.hits = []
+    monkeypatch.setattr(sec_cache, "CACHE_DIR", tmp_path / "sec")
+    monkeypatch.setattr(sec_cache, "_MIN_GAP_SEC", 0.0)
+    for name, value in {"SEC_DATA_URL": url, "SEC_WWW_URL": url,
+                        "SEC_CACHE_REVALIDATE_HOURS": 24, "SEC_CACHE_MAX_MB": 256,
+                        "SEC_SERIES_LRU_SIZE": 512}.items():
+        monkeypatch.setattr(C, name, value, raising=False)
+    sec_cache.reset()
+    yield _Stub
+    sec_cache.reset()
+    server.shutdown()
+    server.server_close()
+
+
+EPS = ("EarningsPerShareDiluted", "USD/shares")
+
+
+def test_cached_on_disk_and_reused_after_restart(sec):
+    assert sec_cache.ticker_map() == {"DEMO": 1, "BIG": 2}
+    got = sec_cache.series(1, [EPS, ("Revenues", "USD")])
+    assert [p["val"] for p in got[EPS]] == [1.0, 2.0]
+    assert set(got[EPS][0]) == {"form", "val", "fp", "fy", "end"}     # trimmed points
+    assert got[("Revenues", "USD")] == []
+    assert (sec_cache.CACHE_DIR / "CIK0000000001.json.gz").exists()
+
+    sec_cache.series(1, [EPS])
+    assert sec_cache.stats()["lru_hits"] == 1
+    n_requests = len(sec.hits)
+
+    sec_cache.reset()                                           # new process
+    assert sec_cache.ticker_map()["DEMO"] == 1
+    assert sec_cache.series(1, [EPS])[EPS][1]["val"] == 2.0
+    assert len(sec.hits) == n_requests                          # nothing downloaded
+    assert sec_cache.stats()["disk_reads"] == 2
+
+
+def test_conditional_get_after_revalidate_window(sec, monkeypatch):
+    sec_cache.series(1, [EPS])
+    monkeypatch.setattr(C, "SEC_CACHE_REVALIDATE_HOURS", 0)
+
+    sec_cache.series(1, [EPS])
+    assert sec.hits[-1] == ("/api/xbrl/companyfacts/CIK0000000001.json", '"f1"')
+    assert sec_cache.stats()["not_modified"] == 1
+
+    sec.docs["/api/xbrl/companyfacts/CIK0000000001.json"] = ('"f1b"', _facts(eps_now=3.0))
+    assert sec_cache.series(1, [EPS])[EPS][1]["val"] == 3.0
+    assert sec_cache.stats()["downloaded"] == 2
+
+
+def test_eviction_past_budget(sec, monkeypatch):
+    sec_cache.series(2, [EPS])
+    big = (sec_cache.CACHE_DIR / "CIK0000000002.json.gz").stat().st_size
+    monkeypatch.setattr(C, "SEC_CACHE_MAX_MB", (big + 100) / 1024 / 1024)
+    sec_cache.series(1, [EPS])
+    assert not (sec_cache.CACHE_DIR / "CIK0000000002.json.gz").exists()
+    assert (sec_cache.CACHE_DIR / "CIK0000000001.json.gz").exists()
+    assert sec_cache.stats()["evicted"] == 1
+
+
+def test_pipeline_sec_fallback_uses_cache(sec, monkeypatch):
+    from modules import data_pipeline as dp
+    monkeypatch.setattr(C, "FUNDAMENTALS_ENABLE_SEC_FALLBACK", True)
+    out = dp._get_sec_fundamentals_fallback("DEMO")
+    assert out["info"]["earningsGrowth"] == pytest.approx(1.0)
+    assert dp._get_sec_fundamentals_fallback("NOPE") is None
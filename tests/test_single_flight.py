@@ -0,0 +1,94 @@
+"""
+tests/test_single_flight.py
+───────────────────────────
+Single-flight request coalescing in the data pipeline.
+
+Covers:
+  • concurrent get_historical() calls for one ticker issue one download
+  • followers receive an independent copy of the leader's result
+  • a leader's exception reaches every waiting caller
+"""
+
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+
+
+def _ohlcv(n):
+    end = pd.Timestamp(date.today() - timedelta(days=1))
+    idx = pd.bdate_range(end=end, periods=n, name="Date")
+    close = 100.0 + np.arange(n, dtype=float)
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1,
+        "Close": close, "Volume": np.full(n, 1_000_000.0),
+    }, index=idx)
+
+
+def _run_concurrently(fn, n):
+    results, errors = [None] * n, [None] * n
+
+    def _call(i):
+        try:
+            results[i] = fn()
+        except Exception as exc:
+            errors[i] = exc
+
+    threads = [threading.Thread(target=_call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_concurrent_history_requests_share_one_download(monkeypatch, isolated_price_store):
+    from modules import data_pipeline as dp, data_providers as prov, frame_cache
+
+    monkeypatch.setattr(C, "YFINANCE_INTRA_REQUEST_DELAY_SEC", 0, raising=False)
+    frame_cache.clear()
+    calls = []
+
+    class _SlowTicker:
+        def __init__(self, ticker):
+            pass
+
+        def history(self, period=None, **kwargs):
+            calls.append(period)
+            time.sleep(0.3)                 # every caller arrives while in flight
+            return _ohlcv(300)
+
+    monkeypatch.setattr(prov.yf, "Ticker", _SlowTicker)
+    before = dp.get_yf_status()["coalesced"]
+
+    results, errors = _run_concurrently(lambda: dp.get_historical("aaa", "1y"), 4)
+
+    assert errors == [None] * 4
+    assert len(calls) == 1
+    assert dp.get_yf_status()["coalesced"] - before == 3
+    assert len({id(df) for df in results}) == 4
+    for df in results[1:]:
+        pd.testing.assert_frame_equal(df, results[0])
+
+
+def test_leader_error_reaches_followers():
+    from modules import data_pipeline as dp
+
+    def _failing():
+        time.sleep(0.2)
+        raise RuntimeError("401 Unauthorized")
+
+    results, errors = _run_concurrently(
+        lambda: dp._single_flight(("test", "AAA"), _failing), 3)
+
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert dp.get_yf_status()["inflight"] == 0
@@ -0,0 +1,79 @@
+"""
+tests/test_technicals_backend.py
+────────────────────────────────
+get_technicals() NumPy backend vs the pandas_ta backend.
+
+Covers:
+  • identical column names and order, index and NaN warm-up pattern
+  • values equal to floating-point noise for full, short (< 200 / < 252 bars)
+    and flat-priced (zero true range) histories
+  • columns pandas_ta omits for too-short histories are present, all NaN / False
+  • selective mode (indicators=[…]) equals the pandas_ta full-mode columns
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("pandas_ta")
+
+from modules import data_pipeline as dp
+
+
+def _flat_stretch(df):
+    df = df.copy()
+    df.iloc[300:320, :4] = df["Close"].iloc[299]      # halted: O = H = L = C
+    return df
+
+
+def _assert_same_frame(got, ref):
+    assert list(got.columns) == list(ref.columns)
+    assert got.index.equals(ref.index)
+    # A zero-width band makes %B pure round-off (pandas' rolling std is not
+    # exactly 0 over identical closes); compare it where the band is open.
+    degenerate = (ref["BBB_20_2.0"] < 1e-6).to_numpy() if "BBB_20_2.0" in ref else None
+    for col in ref.columns:
+        a, b = got[col].to_numpy(), ref[col].to_numpy()
+        if col == "BBP_20_2.0" and degenerate is not None:
+            a, b = a[~degenerate], b[~degenerate]
+        if b.dtype == bool:
+            assert (a == b).all(), col
+            continue
+        a, b = a.astype(float), b.astype(float)
+        assert np.array_equal(np.isnan(a), np.isnan(b)), col
+        np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+@pytest.mark.parametrize("n, seed, flat", [(520, 7, False), (230, 3, False), (520, 11, True)],
+                         ids=["full", "short_252", "flat"])
+def test_numpy_backend_matches_pandas_ta(n, seed, flat, synthetic_ohlcv):
+    frame = synthetic_ohlcv(n, seed=seed)
+    if flat:
+        frame = _flat_stretch(frame)
+    _assert_same_frame(dp.get_technicals(frame, backend="numpy"),
+                       dp.get_technicals(frame, backend="pandas_ta"))
+
+
+def test_short_history_keeps_full_column_set(synthetic_ohlcv):
+    frame = synthetic_ohlcv(120, seed=5)
+    got = dp.get_technicals(frame, backend="numpy")
+    ref = dp.get_technicals(frame, backend="pandas_ta")     # no SMA_150/200 columns
+
+    assert list(got.columns) == list(dp.get_technicals(synthetic_ohlcv(), backend="numpy").columns)
+    _assert_same_frame(got[ref.columns], ref)
+    for col in got.columns.difference(ref.columns):
+        assert not got[col].astype(float).any(), col      # NaN or False throughout
+
+
+def test_selective_columns_match_pandas_ta_full_mode(synthetic_ohlcv):
+    frame = synthetic_ohlcv()
+    wanted = ["EMA_9", "RSI_14", "ATR_14"]
+    ref = dp.get_technicals(frame, backend="pandas_ta")
+
+    _assert_same_frame(dp.get_technicals(frame, wanted),
+                       ref[["Open", "High", "Low", "Close", "Volume"] + wanted])
@@ -0,0 +1,74 @@
+"""
+tests/test_trading_calendar.py
+──────────────────────────────
+Session calendar (modules/trading_calendar.py) and session-aware freshness.
+
+Covers:
+  • holidays incl. Good Friday, Juneteenth and weekend observance; early closes
+  • last completed session from ET / HKT clocks: weekends, holidays, before
+    the close and inside the settle window
+  • a fundamentals field fetched after the last close stays fresh over a
+    weekend even though its calendar-day TTL has run out
+"""
+
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import trading_calendar as tc
+
+ET, HKT = tc.ET, tc.HKT
+
+
+def test_holidays_and_early_closes():
+    assert tc.is_holiday(date(2026, 4, 3))            # Good Friday
+    assert tc.is_holiday(date(2026, 6, 19))           # Juneteenth
+    assert tc.is_holiday(date(2026, 7, 3))            # 4 July on a Saturday
+    assert tc.is_holiday(date(2027, 12, 24))          # Christmas on a Saturday
+    assert not tc.is_holiday(date(2021, 12, 31))      # New Year on a Saturday: no make-up
+    assert not tc.is_session(date(2026, 11, 26))      # Thanksgiving
+    assert tc.session_close(date(2026, 11, 27)).hour == 13
+    assert tc.session_close(date(2026, 10, 16)).hour == 16
+    assert tc.session_close_hkt(date(2026, 10, 16)) == datetime(2026, 10, 17, 4, 0, tzinfo=HKT)
+    assert len(tc.sessions(date(2026, 1, 1), date(2026, 12, 31))) == 251
+
+
+def test_last_completed_session(monkeypatch):
+    monkeypatch.setattr(C, "TRADING_SESSION_SETTLE_MIN", 15, raising=False)
+    fri = date(2026, 10, 16)
+    # Saturday morning in Hong Kong, Sunday evening ET: Friday
+    assert tc.last_completed_session(datetime(2026, 10, 17, 9, 0, tzinfo=HKT)) == fri
+    assert tc.last_completed_session(datetime(2026, 10, 18, 20, 0, tzinfo=ET)) == fri
+    # Monday before the close and inside the settle window: still Friday
+    assert tc.last_completed_session(datetime(2026, 10, 19, 12, 0, tzinfo=ET)) == fri
+    assert tc.last_completed_session(datetime(2026, 10, 19, 16, 10, tzinfo=ET)) == fri
+    assert tc.cache_asof(datetime(2026, 10, 19, 16, 20, tzinfo=ET)) == "2026-10-19"
+    # Naive datetimes are Hong Kong time: Friday 09:00 HKT is Thanksgiving evening ET
+    assert tc.last_completed_session(datetime(2026, 11, 27, 9, 0)) == date(2026, 11, 25)
+    assert tc.last_session(datetime(2026, 11, 27, 9, 0)) == date(2026, 11, 25)
+
+
+def test_fundamentals_fresh_until_next_close(tmp_path, monkeypatch):
+    from modules import fundamentals_store as fs
+    monkeypatch.setattr(fs, "STORE_DIR", tmp_path / "fundamentals")
+    monkeypatch.setattr(fs, "LEGACY_DIR", tmp_path)
+    monkeypatch.setattr(C, "FUNDAMENTALS_CACHE_DAYS", 1)
+    fs.reset()
+    real_completed_at = tc.completed_at
+    friday_evening = datetime(2024, 3, 8, 18, 0, tzinfo=ET).timestamp()
+    fs.put("ABC", {"info": {"symbol": "ABC"}}, ts=friday_evening)
+
+    sunday = datetime(2024, 3, 10, 20, 0, tzinfo=ET)
+    monkeypatch.setattr(tc, "completed_at", lambda now=None: real_completed_at(sunday))
+    entry = fs.read("ABC")["info"]
+    assert entry.age_days >= 2 and entry.fresh              # calendar TTL alone: stale
+    assert fs.count_fresh("info") == 1
+
+    tuesday = datetime(2024, 3, 12, 9, 0, tzinfo=ET)        # Monday's session completed
+    monkeypatch.setattr(tc, "completed_at", lambda now=None: real_completed_at(tuesday))
+    assert not fs.read("ABC")["info"].fresh
+    fs.reset()
@@ -0,0 +1,80 @@
+"""
+tests/test_trend_template.py
+────────────────────────────
+Vectorised Trend Template (modules/trend_template.py).
+
+Covers:
+  • a panel and the same tickers as a dict of frames give identical results,
+    incl. tickers that stopped trading early or have a gap in the SMA200 window;
+    the single-ticker validate() agrees with both
+  • missing indicator columns fall back to rolling values; short histories
+    fail every condition; unranked RS fails TT9 only
+  • notes are built per ticker on request and match the failed conditions
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from modules import data_pipeline as dp
+from modules import data_providers as prov
+from modules import trend_template as tt
+from modules.rs_ranking import RS_NOT_RANKED
+
+
+def _uptrend(n=400):
+    close = 20.0 * np.exp(np.linspace(0, 1.2, n))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": np.full(n, 1e6)},
+                        index=pd.bdate_range(end="2026-10-16", periods=n, name="Date"))
+
+
+def test_panel_matches_frames():
+    frames = {f"S{i}": prov.synthetic_history(f"S{i}") for i in range(30)}
+    frames["UP"] = _uptrend()
+    frames["S1"] = frames["S1"].iloc[:-3]                            # stopped trading
+    frames["S2"] = frames["S2"].drop(frames["S2"].index[-10])        # gap in the window
+    frames["S3"] = frames["S3"].iloc[-215:]
+    frames["S4"] = frames["S4"].iloc[-150:]                          # too short
+    p = dp.enrich_panel(frames)
+    ranks = {t: float(i * 3) for i, t in enumerate(p)}
+
+    by_panel = tt.evaluate(p, ranks)
+    by_frames = tt.evaluate({t: p[t] for t in p}, ranks)
+    for t in p:
+        assert tt.result(by_panel, t) == tt.result(by_frames, t), t
+        assert tt.validate(t, p[t], ranks[t]) == tt.result(by_frames, t), t   # scalar path
+    assert by_panel.loc["UP", "passes"] and not by_panel.loc["S4", tt.CONDITIONS].any()
+
+
+def test_fallbacks_and_rs():
+    full = dp.get_technicals(_uptrend())
+    bare = full[["Open", "High", "Low", "Close", "Volume"]]
+    res = tt.evaluate({"FULL": full, "BARE": bare, "SHORT": full.iloc[-100:]},
+                      rs_ranks={"FULL": 90.0, "BARE": RS_NOT_RANKED, "SHORT": 90.0})
+    a, b = tt.result(res, "FULL"), tt.result(res, "BARE")
+    assert a["passes"] and a["checks"]["TT9"]
+    assert b["passes"] and not b["checks"]["TT9"] and b["rs_rank"] is None
+    assert {k: v for k, v in a["checks"].items() if k != "TT9"} == \
+           {k: v for k, v in b["checks"].items() if k != "TT9"}
+    assert (a["sma50"], a["sma150"], a["sma200"]) == (b["sma50"], b["sma150"], b["sma200"])
+    assert tt.result(res, "SHORT") == {"passes": False, "score": 0,
+                                       "checks": {k: False for k in tt.CONDITIONS},
+                                       "notes": ["Insufficient history (100 days)"]}
+
+
+def test_notes_follow_failed_conditions():
+    df = dp.get_technicals(_uptrend())
+    falling = df.copy()
+    falling.loc[falling.index[-1], "Close"] = falling["SMA_200"].iloc[-1] * 0.9
+    res = tt.evaluate({"UP": df, "DOWN": falling}, rs_ranks={"UP": 80.0, "DOWN": 40.0})
+    assert tt.notes(res.loc["UP"]) == ["[OK] All TT1-TT8 mandatory conditions passed"]
+    down = tt.notes(res.loc["DOWN"])
+    failed = {c for c in tt.CONDITIONS if not res.loc["DOWN", c]}
+    assert {"TT1", "TT2", "TT6", "TT8", "TT9"} <= failed
+    assert {n.split(" ")[0].rstrip(":") for n in down} == failed
@@ -0,0 +1,152 @@
+"""
+tests/test_yf_async.py
+──────────────────────
+Asyncio bulk downloader (modules/yf_async.py) against a local stub server
+that serves recorded-shape v8 chart JSON.
+
+Covers:
+  • chart JSON → auto-adjusted, tz-naive OHLCV frame
+  • results stream in completion order (a slow ticker does not hold back
+    the others) over a small pool of kept-alive connections
+  • 429 is retried and feeds the limiter back-off; 404 gives an empty frame;
+    a persistent 500 is yielded as None
+  • data_pipeline._download_batches retries engine failures via yf.download,
+    yielding each ticker once
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("httpx")
+
+import trader_config as C
+from modules import yf_async, yf_limiter
+
+
+def _chart(ticker, n=5, split_ratio=1.0):
+    """Chart payload shaped like a recorded query2 /v8/finance/chart response."""
+    # 14:30 UTC = 09:30 New York: daily bars are stamped at the session open
+    ts = [int(pd.Timestamp("2026-03-02 14:30", tz="UTC").timestamp()) + 86400 * i for i in range(n)]
+    close = list(100.0 + np.arange(n))
+    return {"chart": {"error": None, "result": [{
+        "meta": {"symbol": ticker, "exchangeTimezoneName": "America/New_York",
+                 "dataGranularity": "1d"},
+        "timestamp": ts,
+        "indicators": {
+            "quote": [{"open": [c - 1 for c in close], "high": [c + 1 for c in close],
+                       "low": [c - 2 for c in close], "close": close,
+                       "volume": [1_000_000] * (n - 1) + [None]}],
+            "adjclose": [{"adjclose": [c * split_ratio for c in close]}],
+        },
+    }]}}
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"             # keep-alive
+    routes: dict = {}
+    hits: dict = {}
+    peers: set = set()
+
+    def do_GET(self):
+        ticker = self.path.split("?")[0].rsplit("/", 1)[-1]
+        _Stub.peers.add(self.client_address[1])
+        _Stub.hits[ticker] = _Stub.hits.get(ticker, 0) + 1
+        route = _Stub.routes.get(ticker)
+        status, body, delay = route(_Stub.hits[ticker]) if route else (404, {}, 0)
+        time.sleep(delay)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _Stub.routes, _Stub.hits, _Stub.peers = {}, {}, set()
+    for name, value in {"YF_CHART_BASE_URL": f"http://127.0.0.1:{server.server_port}",
+                        "YF_ASYNC_MAX_CONCURRENCY": 2, "YF_ASYNC_RETRIES": 1,
+                        "YFINANCE_RETRY_BACKOFF": 0.01, "YF_RATE_PER_SEC": 200.0,
+                        "YF_BURST": 50, "YF_BACKOFF_COOLDOWN_SEC": 60.0}.items():
+        monkeypatch.setattr(C, name, value, raising=False)
+    yf_limiter.reset()
+    yf_async.shutdown()                       # fresh pool for this server
+    yield _Stub
+    yf_async.shutdown()
+    server.shutdown()
+    server.server_close()
+    yf_limiter.reset()
+
+
+def test_parse_chart_auto_adjusts_and_drops_incomplete_bars():
+    df = yf_async.parse_chart(_chart("AAA", n=5, split_ratio=0.5))
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert df.index.tz is None and df.index.name == "Date"
+    assert df.index[0] == pd.Timestamp("2026-03-02")
+    assert len(df) == 4                                       # last bar has no volume
+    assert df["Close"].iloc[0] == pytest.approx(50.0)
+    assert df["Open"].iloc[0] == pytest.approx(99.0 * 0.5)
+    assert yf_async.parse_chart({"chart": {"result": None, "error": None}}).empty
+    with pytest.raises(yf_async.ChartError):
+        yf_async.parse_chart({"chart": {"result": None,
+                                        "error": {"code": "Not Found", "description": "No data"}}})
+
+
+def test_stream_yields_in_completion_order_over_pooled_connections(stub):
+    stub.routes["SLOW"] = lambda hit: (200, _chart("SLOW"), 0.5)
+    for t in ("A", "B", "C", "D", "E"):
+        stub.routes[t] = lambda hit, t=t: (200, _chart(t), 0.01)
+    order = [t for t, df in yf_async.stream(["SLOW", "A", "B", "C", "D", "E"], period="5d")]
+    assert sorted(order) == ["A", "B", "C", "D", "E", "SLOW"]
+    assert order[-1] == "SLOW"
+    assert len(stub.peers) <= 2                               # connections were reused
+
+
+def test_throttle_retry_missing_and_failed_tickers(stub):
+    stub.routes["RL"] = lambda hit: (429, {}, 0) if hit == 1 else (200, _chart("RL"), 0)
+    stub.routes["BAD"] = lambda hit: (500, {}, 0)
+    frames = dict(yf_async.stream(["RL", "BAD", "GONE"], start="2026-03-01"))
+    assert len(frames["RL"]) == 4 and stub.hits["RL"] == 2
+    assert frames["BAD"] is None and stub.hits["BAD"] == 2
+    assert frames["GONE"].empty
+    assert yf_limiter.status()["throttle_events"] == 1
+    assert yf_limiter.status()["inflight"] == 0
+    assert set(yf_async.download(["RL", "GONE"], period="5d")) == {"RL"}
+
+
+def test_download_batches_falls_back_to_yf_download(stub, monkeypatch):
+    from modules import data_pipeline as dp, data_providers as prov
+    monkeypatch.setattr(C, "YF_ASYNC_DOWNLOAD_ENABLED", True)
+    for t in ("A", "B", "C"):
+        stub.routes[t] = lambda hit, t=t: (200, _chart(t), 0)
+    stub.routes["BAD"] = lambda hit: (500, {}, 0)
+    fallback = []
+
+    def _fake_download(tickers, **kwargs):
+        fallback.append(list(tickers))
+        return yf_async.parse_chart(_chart("BAD"))
+
+    monkeypatch.setattr(prov.yf, "download", _fake_download)
+    batches = list(dp._download_batches(["A", "B", "BAD", "C"], batch_size=2, period="5d"))
+    assert [len(b) for b, _ in batches] == [2, 1, 1]
+    assert sorted(t for b, _ in batches for t in b) == ["A", "B", "BAD", "C"]   # each once
+    assert fallback == [["BAD"]]
+    frames = {t: df for _, f in batches for t, df in f.items()}
+    assert sorted(frames) == ["A", "B", "BAD", "C"]
@@ -0,0 +1,113 @@
+"""
+tests/test_yf_limiter.py
+────────────────────────
+Shared yfinance rate limiter (modules/yf_limiter.py).
+
+Covers:
+  • the token bucket paces requests once the burst is spent
+  • the concurrency window blocks extra callers (visible as queue_depth)
+  • successes grow rate / window additively; a 429 halves both once per
+    cooldown, including when reported through data_pipeline._yf_track_error
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import trader_config as C
+from modules import yf_limiter
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    def configure(**cfg):
+        base = {"YF_LIMITER_ENABLED": True, "YF_RATE_PER_SEC": 50.0, "YF_BURST": 2,
+                "YF_CONCURRENCY_INITIAL": 4, "YF_CONCURRENCY_MIN": 1,
+                "YF_CONCURRENCY_MAX": 8, "YF_RATE_MIN": 1.0, "YF_RATE_MAX": 100.0,
+                "YF_RATE_STEP": 1.0, "YF_BACKOFF_FACTOR": 0.5,
+                "YF_BACKOFF_COOLDOWN_SEC": 60.0}
+        base.update(cfg)
+        for name, value in base.items():
+            monkeypatch.setattr(C, name, value, raising=False)
+        yf_limiter.reset()
+    yield configure
+    yf_limiter.reset()
+
+
+def test_token_bucket_paces_after_burst(limiter):
+    limiter(YF_RATE_PER_SEC=20.0, YF_BURST=2, YF_RATE_STEP=0.0)
+    t0 = time.monotonic()
+    for _ in range(6):
+        with yf_limiter.request():
+            pass
+    elapsed = time.monotonic() - t0
+    # 2 from the burst, then 4 more at 20/s ≈ 0.2s
+    assert elapsed >= 0.15
+    assert yf_limiter.status()["requests"] == 6
+
+
+def test_concurrency_window_queues_callers(limiter):
+    limiter(YF_CONCURRENCY_INITIAL=1, YF_BURST=10)
+    release = threading.Event()
+    entered = []
+
+    def worker():
+        with yf_limiter.request():
+            entered.append(1)
+            release.wait(5)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2
+    while yf_limiter.status()["queue_depth"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    st = yf_limiter.status()
+    assert st["inflight"] == 1 and st["queue_depth"] == 2 and len(entered) == 1
+
+    release.set()
+    for t in threads:
+        t.join(5)
+    st = yf_limiter.status()
+    assert len(entered) == 3 and st["inflight"] == 0 and st["queue_depth"] == 0
+
+
+def test_aimd_increase_and_single_backoff(limiter):
+    limiter(YF_RATE_PER_SEC=10.0, YF_BURST=10, YF_CONCURRENCY_INITIAL=4)
+    for _ in range(4):
+        with yf_limiter.request():
+            pass
+    st = yf_limiter.status()
+    assert st["rate_per_sec"] == pytest.approx(14.0)
+    assert st["concurrency_limit"] == 4           # 4 → ~4.9: below the next slot
+
+    with pytest.raises(RuntimeError):
+        with yf_limiter.request():
+            raise RuntimeError("429 Client Error: Too Many Requests")
+    assert yf_limiter.on_throttle() is False      # absorbed by the cooldown
+    st = yf_limiter.status()
+    assert st["rate_per_sec"] == pytest.approx(7.0)
+    assert st["concurrency_limit"] == 2
+    assert st["throttle_events"] == 1 and st["backing_off"]
+
+    with yf_limiter.request():                    # no additive increase while backing off
+        pass
+    assert yf_limiter.status()["rate_per_sec"] == pytest.approx(7.0)
+
+
+def test_track_error_backs_off_and_status_exposes_limiter(limiter):
+    from modules import data_pipeline as dp
+    limiter(YF_RATE_PER_SEC=8.0)
+    dp._yf_track_error(RuntimeError("ReadTimeout"))
+    assert yf_limiter.status()["throttle_events"] == 0
+    dp._yf_track_error(RuntimeError("401 Unauthorized: Invalid Crumb"))
+    status = dp.get_yf_status()
+    assert status["rate_per_sec"] == pytest.approx(4.0)
+    assert status["queue_depth"] == 0
+    assert status["limiter"]["throttle_events"] == 1
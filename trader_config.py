@@ -108,8 +108,15 @@ RS_UNIVERSE_MIN_PRICE  = 5.0       # Min price for RS universe stocks
 RS_UNIVERSE_MIN_VOLUME = 100_000   # Min avg volume for RS universe
 RS_CACHE_DAYS = 1                  # How many days before refreshing RS cache
 RS_BATCH_SIZE = 200                # Tickers per yfinance batch download (larger = fewer batches)
-RS_BATCH_SLEEP = 0.5               # Seconds between RS batch downloads
 RS_PARALLEL_BATCHES = 3            # Number of concurrent RS batch downloads
+RS_INCREMENTAL_ENABLED = True      # Rank from the persisted close matrix, downloading only new sessions
+RS_MATRIX_DIR = "data/price_cache/rs"   # Close matrix + RS-rank history (modules/rs_matrix.py)
+RS_HISTORY_MAX_DAYS = 756          # Sessions of RS_Rank history kept (~3 years)
+RS_HISTORY_LRU_SIZE = 256          # (ticker, days) RS histories kept in memory per loaded ranking
+RS_LINE_BENCHMARK = "SPY"          # RS line = close / benchmark close (point-in-time RS dataset)
+RS_LINE_HIGH_BARS = 252            # RS-line new high = highest RS line of the last N sessions
+RS_PIT_AUTO_BACKFILL = True        # Backtests build a missing point-in-time RS dataset, or extend a stale one by its new sessions
+RS_PIT_MIN_COVERAGE = 0.5          # Rank a past session only if ≥ this share of the widest cross-section has history
 
 # ─────────────────────────────────────────────────────────────────────────────
 # SCAN OUTPUT QUALITY GATE
@@ -122,13 +129,57 @@ SCAN_TOP_N     = 100               # Max stocks to return (top N by score)
 # ─────────────────────────────────────────────────────────────────────────────
 STAGE2_MAX_WORKERS    = 32         # Parallel threads for Stage 2 TT validation (32 > cores: PyArrow/NumPy release GIL)
 STAGE2_BATCH_SIZE     = 50         # Tickers per yf.download() batch in Stage 2
-STAGE2_BATCH_SLEEP    = 1.5        # Sleep between Stage 2 download batches (sec)
+STAGE2_PREFETCH_BATCHES = 2        # Download batches fetched ahead while Stage 2 validates the current one
 STAGE3_MAX_WORKERS    = 32         # Parallel threads for Stage 3 SEPA scoring
+SCAN_PIPELINE_ENABLED = True       # Score Stage 2 survivors in Stage 3 while Stage 2 is still running (modules/scan_pipeline.py)
+SCAN_PIPELINE_QUEUE_SIZE = 64      # Bounded Stage 2 → Stage 3 queue; Stage 2 waits while it is full
 FUNDAMENTALS_MAX_CONCURRENT = 4    # Global cap for concurrent fundamentals requests (across all scan threads)
-FUNDAMENTALS_CACHE_DAYS = 1        # How many days before re-fetching fundamentals
+FUNDAMENTALS_CACHE_DAYS = 1        # How many days before re-fetching fundamentals .info (and unlisted fields)
+# Per-field TTLs in the fundamentals store (modules/fundamentals_store.py);
+# quarterly fields also expire once an earnings date in .info has passed.
+FUNDAMENTALS_FIELD_TTL_DAYS = {
+    "quarterly_eps":         45,
+    "earnings_surprise":     45,
+    "eps_revisions":         3,
+    "eps_trend":             3,
+    "analyst_targets":       3,
+    "insider_transactions":  3,
+    "institutional_holders": 30,
+}
+FUNDAMENTALS_STORE_DIR  = "data/price_cache/fundamentals"
+FUNDAMENTALS_MANIFEST_BATCH = 200     # Save the store's manifest after this many updated documents …
+FUNDAMENTALS_MANIFEST_FLUSH_SEC = 5.0 # … or this long after the first unsaved update (and at exit)
+FUNDAMENTALS_PREFETCH_ENABLED = True  # Warm fundamentals for Stage 2 survivors while Stage 2 runs
+FUNDAMENTALS_PREFETCH_WORKERS = 4     # Background prefetch threads (still capped by FUNDAMENTALS_MAX_CONCURRENT)
 FINVIZ_CACHE_TTL_HOURS  = 4        # Cache finviz screener results for N hours
+FINVIZ_GROUP_TTL_HOURS  = 4        # Sector / industry group performance tables
+FINVIZ_COUNT_TTL_HOURS  = 1        # Page-1 breadth counts (market_env)
+FINVIZ_CACHE_DIR        = "data/finviz_cache"   # Persisted across restarts, shared by scans
 FINVIZ_TIMEOUT_SEC    = 600.0      # 10 minutes max (finvizfinance needs ~2 sec per page × 464 pages = 15 min for full scan)
 
+# Incremental OHLCV refresh: stale cached series are extended with only the
+# missing bars instead of re-downloading the full period.
+PRICE_INCREMENTAL_ENABLED      = True   # False → always full re-download of stale caches
+PRICE_INCREMENTAL_OVERLAP_BARS = 5      # Cached bars re-downloaded to detect split/dividend restatement
+PRICE_INCREMENTAL_DRIFT_TOL    = 0.002  # Max |new/old - 1| of overlapping adjusted closes before full reload
+PRICE_INCREMENTAL_MAX_GAP_DAYS = 30     # Caches older than this are re-downloaded in full
+PRICE_INCREMENTAL_BATCH_SIZE   = 200    # Tickers per start-date yf.download() batch
+
+# Cache freshness follows the US trading calendar (modules/trading_calendar):
+# a cache is fresh while it contains the last completed session.
+TRADING_SESSION_SETTLE_MIN     = 15     # Minutes after the close before a session's daily bar counts as final
+
+# Price-cache lifecycle (modules/cache_manager, `minervini.py cache gc/verify/stats`)
+CACHE_MAX_MB                   = 2048   # Disk budget for data/price_cache; gc evicts least-recently-used tickers
+CACHE_DELISTED_SESSIONS        = 20     # gc drops tickers whose last fetch was this many sessions past their last bar
+CACHE_FUNDAMENTALS_MAX_AGE_DAYS = 120   # gc drops fundamentals documents not refreshed for this long
+
+# Write-behind queue for price-store writes (modules/cache_writer)
+CACHE_WRITE_BEHIND_ENABLED     = True   # False = store writes happen inline (synchronously)
+CACHE_WRITE_DELAY_SEC          = 0.5    # Queued writes wait this long to be batched / coalesced
+CACHE_WRITE_BATCH              = 500    # …or until this many tickers are queued
+CACHE_WRITE_MAX_PENDING        = 5000   # Writers block while this many tickers are queued (memory bound)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # YFINANCE RETRY & RESILIENCE PARAMETERS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -140,11 +191,49 @@ FUNDAMENTALS_SKIP_ON_TIMEOUT = True # Skip ticker on timeout instead of retrying
 FUNDAMENTALS_ENABLE_SEC_FALLBACK = True     # Use SEC CompanyFacts as free fallback for US fundamentals
 SEC_USER_AGENT = "SEPA-StockLab/1.0 (contact: local@localhost)"  # SEC requires a descriptive User-Agent
 SEC_HTTP_TIMEOUT_SEC = 8.0                  # SEC endpoint timeout (seconds)
+SEC_CACHE_DIR = "data/sec_cache"            # gzip companyfacts + ticker map (modules/sec_cache.py)
+SEC_CACHE_MAX_MB = 256                      # companyfacts on disk beyond this are evicted LRU
+SEC_CACHE_REVALIDATE_HOURS = 24             # Conditional GET (ETag / Last-Modified) after this age
+SEC_SERIES_LRU_SIZE = 512                   # CIKs whose extracted EPS/revenue series stay in memory
+SEC_DATA_URL = "https://data.sec.gov"
+SEC_WWW_URL = "https://www.sec.gov"
 FUNDAMENTALS_ENABLE_FINVIZ_FALLBACK = True  # Use free finviz quote snapshot when yfinance info is empty
 FUNDAMENTALS_USE_STALE_FALLBACK = True  # If live fetch degrades, reuse recent stale fundamentals cache
 FUNDAMENTALS_STALE_FALLBACK_DAYS = 7    # Max stale age (days) allowed for fallback in scan mode
 CRUMB_RESET_COOLDOWN     = 3.0      # Min interval between session resets (prevent auth cascade)
 OHLCV_TIMEOUT_SEC        = 10.0     # Per-ticker OHLCV fetch timeout
+
+# Shared yfinance limiter (modules/yf_limiter.py): token bucket + AIMD
+# concurrency window for every yfinance request, replacing per-loop sleeps.
+YF_LIMITER_ENABLED       = True
+YF_RATE_PER_SEC          = 4.0      # Starting request rate (tokens/sec)
+YF_RATE_MIN              = 0.5      # Floor after repeated back-offs
+YF_RATE_MAX              = 10.0     # Ceiling for additive increase
+YF_RATE_STEP             = 0.05     # Rate increase per successful request
+YF_BURST                 = 8        # Token bucket capacity
+YF_CONCURRENCY_INITIAL   = 6        # Starting in-flight request window
+YF_CONCURRENCY_MIN       = 1
+YF_CONCURRENCY_MAX       = 16
+YF_BACKOFF_FACTOR        = 0.5      # Rate and window multiplier on 429/401
+YF_BACKOFF_COOLDOWN_SEC  = 10.0     # Throttle signals within this window count once
+
+# Asyncio bulk downloader (modules/yf_async.py): concurrent v8 chart requests
+# over one pooled HTTP client for Stage 2 / RS / NASDAQ bulk downloads.  Off by
+# default — yf.download() batches are used; failed tickers always fall back to them.
+YF_ASYNC_DOWNLOAD_ENABLED = False
+YF_ASYNC_MAX_CONCURRENCY  = 16      # Outstanding chart requests (= pooled connections)
+YF_ASYNC_TIMEOUT_SEC      = 15.0
+YF_ASYNC_RETRIES          = 1       # Per-ticker retries before falling back
+YF_CHART_BASE_URL         = "https://query2.finance.yahoo.com"
+
+# Market-data provider (modules/data_providers.py):
+#   "live"   — yfinance + finvizfinance (default)
+#   "record" — live, and every response is saved under MARKET_DATA_RECORD_DIR
+#   "replay" — serve those recordings offline, no network and no pacing
+MARKET_DATA_PROVIDER           = os.getenv("SEPA_DATA_PROVIDER", "live").strip().lower()
+MARKET_DATA_RECORD_DIR         = "data/provider_recordings"
+MARKET_DATA_SYNTHETIC          = True   # Replay: deterministic synthetic data for unrecorded tickers
+MARKET_DATA_SYNTHETIC_UNIVERSE = 200    # Replay: screener size when nothing is recorded
 FINVIZ_MAX_PAGES      = 60         # If using pagination limiting (currently unused; finvizfinance loads all pages)
 FINVIZ_MIN_TARGET_ROWS = 800       # Minimum rows before accepting results
 
@@ -271,8 +360,7 @@ STAGE1_SOURCE = "nasdaq_ftp"   # Switch to "finviz" to use finvizfinance
 # ─────────────────────────────────────────────────────────────────────────────
 NASDAQ_TICKER_CACHE_DAYS = 1    # Re-download full ticker list every N days
 NASDAQ_BATCH_SIZE        = 200  # Tickers per yfinance batch download (优化: 100→200, 减少批次)
-NASDAQ_BATCH_SLEEP       = 0.3  # Seconds between batches (优化: 0.5→0.3, 减少等待)
-                                 # ✓ 已验证安全（无 HTTP 429 限速，成功率 95.7%）
+                                # ✓ 已验证安全（无 HTTP 429 限速，成功率 95.7%）
 
 # ─────────────────────────────────────────────────────────────────────────────
 # REPORTING
@@ -280,6 +368,17 @@ NASDAQ_BATCH_SLEEP       = 0.3  # Seconds between batches (优化: 0.5→0.3, 
 REPORTS_DIR   = "reports"
 DATA_DIR      = "data"
 PRICE_CACHE_DIR = "data/price_cache"
+PRICE_STORE_DIR = "data/price_cache/store"   # Consolidated bucketed Parquet price store
+PRICE_STORE_BUCKETS = 64                     # Ticker hash buckets (one Parquet file each)
+FRAME_CACHE_ENABLED = True                   # In-process LRU of master frames (raw + enriched)
+FRAME_CACHE_MAX_MB = 512                     # Byte budget of that cache (least-recently-used evicted)
+PRICE_MASTER_PERIOD = "2y"                   # Minimum span of the cached master series; shorter periods are slices
+INDICATOR_INCREMENTAL_ENABLED = True         # Resume indicators from stored rolling state instead of full recompute
+INDICATOR_STATE_BARS = 10                    # Per-bar state snapshots kept (≥ PRICE_INCREMENTAL_OVERLAP_BARS + 2)
+TECHNICALS_BACKEND = "numpy"                 # get_technicals(): "numpy" (modules/indicators.py) | "pandas_ta"
+PANEL_ENRICH_ENABLED = True                  # Enrich multi-ticker batches as one dates × tickers panel
+PANEL_MIN_TICKERS = 8                        # Smaller batches use per-ticker get_technicals()
+PANEL_CHUNK_TICKERS = 500                    # Tickers per panel (bounds peak memory)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # DATABASE  (DuckDB historical storage)
@@ -402,7 +501,6 @@ QM_SCAN_RESULTS_KEEP       = 30   # Max CSV files to keep per label in scan_resu
 # (Stage 1 remains simple: Price > $5, Volume > 300K, USA only)
 QM_STAGE2_MAX_WORKERS      = 32   # Parallel threads for Stage 2 historical enrichment (32 > cores: GIL-releasing ops)
 QM_STAGE2_BATCH_SIZE       = 60   # Tickers per yf.download() batch (increased from 40)
-QM_STAGE2_BATCH_SLEEP      = 1.0  # Seconds between batch downloads (reduced from 1.5)
 QM_STAGE3_WORKERS          = 6    # Stage 3 scoring workers (limited: each makes yfinance network calls;
                                    # >8 causes 401/rate-limit cascades under combined scan)
 
@@ -820,7 +918,7 @@ ML_COMBINED_MIN_STAR      = 3.0     # Min star to pass combined scan ML filter
 # ── Scan performance tuning ──────────────────────────────────────────────────
 ML_STAGE2_MAX_WORKERS     = 32      # Parallel threads for Stage 2 (32 > cores: GIL-releasing ops)
 ML_STAGE2_BATCH_SIZE      = 60      # Tickers per yf.download() batch
-ML_STAGE2_BATCH_SLEEP     = 1.0     # Seconds between batch downloads
+ML_STAGE3_WORKERS         = 4       # Stage 3 scoring threads in the pipelined scan (SCAN_PIPELINE_ENABLED)
 
 # ── Market environment gate ──────────────────────────────────────────────────
 # Martin reduces activity in corrections but doesn't fully block